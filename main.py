@@ -1,14 +1,25 @@
 import uvicorn
 import sqlite3
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from pathlib import Path
 
 # Configurações
-from util.config import APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION
+from util.config import (
+    APP_NAME,
+    SECRET_KEY,
+    HOST,
+    PORT,
+    RELOAD,
+    VERSION,
+    WORKERS,
+    CHAT_PUBSUB_BACKEND,
+    ASSETS_CONSTRUIR_NA_INICIALIZACAO,
+    TEMPLATES_PRECOMPILAR,
+)
 
 # Logger
 from util.logger_config import logger
@@ -30,7 +41,7 @@ from repo import (
     chamado_interacao_repo,
     indices_repo,
 )
-from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo
+from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, chat_evento_repo
 # Repositórios específicos do Compraê
 from repo import anuncio_repo, endereco_repo, mensagem_repo, pedido_repo, categoria_repo, curtida_repo
 
@@ -60,11 +71,49 @@ from routes.vendedor_pedidos_routes import router as vendedor_pedidos_router
 # Seeds
 from util.seed_data import inicializar_dados
 
+# Banco de dados
+from util.db_util import obter_estatisticas_pool
+
+# Cache de configurações
+from util.config_cache import config
+
+# Cache das páginas públicas para visitantes anônimos
+from util.cache_paginas import cache_paginas
+
+# Execução das consultas das rotas fora do event loop
+from util.repo_executor import encerrar_executor, obter_estatisticas_executor
+
+# Hash/verificação de senhas em processos dedicados
+from util.security import encerrar_pool_senhas, metricas_senha
+
+# Processamento de fotos em processos dedicados
+from util.imagem_worker import encerrar_pool_imagens, obter_estatisticas_imagens
+from util.foto_anuncio_util import manifesto_fotos_anuncios
+
+# Arquivos estáticos com hash, pré-comprimidos e cache imutável
+from util.assets import ArquivosEstaticos, construir_assets, manifesto_assets
+
+# Ambiente Jinja2 compartilhado por todas as rotas
+from util.template_util import precompilar_templates
+
+# Chat em tempo real
+from util.chat_manager import gerenciador_chat
+
 # CSRF Protection
 from util.csrf_protection import MiddlewareProtecaoCSRF
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ciclo de vida da aplicação: libera recursos de background no shutdown"""
+    yield
+    await gerenciador_chat.parar()
+    encerrar_executor()
+    encerrar_pool_senhas()
+    encerrar_pool_imagens()
+
+
 # Criar aplicação FastAPI
-app = FastAPI(title=APP_NAME, version=VERSION)
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
 # Configurar SessionMiddleware
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
@@ -80,10 +129,16 @@ app.add_exception_handler(ErroValidacaoFormulario, form_validation_exception_han
 app.add_exception_handler(Exception, generic_exception_handler)
 logger.info("Exception handlers registrados")
 
-# Montar arquivos estáticos
+# Montar arquivos estáticos (CSS/JS com hash servidos com cache imutável)
 static_path = Path("static")
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    if ASSETS_CONSTRUIR_NA_INICIALIZACAO:
+        try:
+            construir_assets()
+        except OSError as e:
+            logger.error(f"Erro ao construir assets estáticos: {e}", exc_info=True)
+    manifesto_assets.carregar()
+    app.mount("/static", ArquivosEstaticos(directory="static"), name="static")
     logger.info("Arquivos estáticos montados em /static")
 
 # Definir repositórios e nomes das tabelas
@@ -95,6 +150,7 @@ TABELAS = [
     (chat_sala_repo, "chat_sala"),
     (chat_participante_repo, "chat_participante"),
     (chat_mensagem_repo, "chat_mensagem"),
+    (chat_evento_repo, "chat_evento"),
     # Tabelas específicas do Compraê
     (endereco_repo, "endereco"),
     (categoria_repo, "categoria"),
@@ -113,6 +169,9 @@ try:
 
     # Criar índices para otimização de performance
     indices_repo.criar_indices()
+    indices_repo.remover_indices_substituidos()
+    # Conferir com EXPLAIN QUERY PLAN que as consultas críticas usam índices
+    indices_repo.verificar_indices()
 
 except sqlite3.Error as e:
     logger.error(f"Erro ao criar tabelas: {e}")
@@ -132,6 +191,25 @@ try:
 except sqlite3.Error as e:
     logger.error(f"Erro ao migrar configurações para banco: {e}", exc_info=True)
 
+# Pré-carregar o cache de configurações (todas as chaves em uma consulta)
+try:
+    logger.info(f"Cache de configurações carregado: {config.carregar()} chaves")
+except sqlite3.Error as e:
+    logger.error(f"Erro ao carregar cache de configurações: {e}", exc_info=True)
+
+# Pré-carregar o catálogo de categorias (listagens sem consultar a tabela)
+try:
+    logger.info(f"Catálogo de categorias carregado: {categoria_repo.catalogo_categorias.carregar()}")
+except sqlite3.Error as e:
+    logger.error(f"Erro ao carregar catálogo de categorias: {e}", exc_info=True)
+
+# Montar o manifesto das fotos de anúncios (filtro foto_anuncio sem acesso ao disco)
+manifesto_fotos_anuncios.carregar()
+
+# Compilar os templates antes da primeira requisição
+if TEMPLATES_PRECOMPILAR:
+    logger.info(f"Templates pré-compilados: {precompilar_templates()}")
+
 # Definir routers e suas configurações
 # IMPORTANTE: public_router e examples_router devem ser incluídos por último
 ROUTERS = [
@@ -167,7 +245,20 @@ for router, tags, nome in ROUTERS:
 @app.get("/health")
 async def health_check():
     """Endpoint de health check"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "pool_conexoes": obter_estatisticas_pool(),
+        "executor_repo": obter_estatisticas_executor(),
+        # Latência de hash/verificação de senhas (login, cadastro, troca de senha)
+        "senhas": metricas_senha.obter(),
+        # Fila de processamento de fotos de perfil e de anúncios
+        "imagens": obter_estatisticas_imagens(),
+        "fotos_anuncios": manifesto_fotos_anuncios.obter_estatisticas(),
+        "paginas_publicas": cache_paginas.obter_estatisticas(),
+        "categorias": categoria_repo.catalogo_categorias.obter_estatisticas(),
+        # Versão/geração das configurações em uso por este worker
+        "configuracoes": config.obter_estatisticas(),
+    }
 
 
 if __name__ == "__main__":
@@ -177,11 +268,25 @@ if __name__ == "__main__":
 
     logger.info(f"Servidor rodando em http://{HOST}:{PORT}")
     logger.info(f"Hot reload: {'Ativado' if RELOAD else 'Desativado'}")
+    if not RELOAD:
+        logger.info(f"Workers: {WORKERS} (pub/sub do chat: {CHAT_PUBSUB_BACKEND})")
+        if WORKERS > 1 and CHAT_PUBSUB_BACKEND == "memoria":
+            logger.warning(
+                "CHAT_PUBSUB_BACKEND=memoria com mais de um worker: mensagens "
+                "do chat só chegam a usuários conectados ao mesmo worker"
+            )
     logger.info(f"Documentação API: http://{HOST}:{PORT}/docs")
     logger.info("=" * 60)
 
     try:
-        uvicorn.run("main:app", host=HOST, port=PORT, reload=RELOAD, log_level="info")
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            reload=RELOAD,
+            workers=None if RELOAD else WORKERS,
+            log_level="info",
+        )
     except KeyboardInterrupt:
         logger.info("Servidor encerrado pelo usuário")
     except Exception as e:
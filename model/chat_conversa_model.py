@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class ChatConversa:
+    """
+    Resumo de uma conversa exibido na lista de conversas do usuário.
+
+    Não corresponde a uma tabela: é montado a partir de chat_sala,
+    chat_participante, usuario e chat_mensagem em uma única consulta.
+
+    Attributes:
+        sala_id: ID da sala de chat
+        ultima_atividade: Timestamp da última atividade na sala
+        outro_usuario_id: ID do outro participante
+        outro_usuario_nome: Nome do outro participante
+        outro_usuario_email: E-mail do outro participante
+        nao_lidas: Mensagens do outro participante ainda não lidas
+        ultima_mensagem: Texto da última mensagem da sala (None se não houver)
+        ultima_mensagem_data: Data de envio da última mensagem
+        ultima_mensagem_usuario_id: ID do autor da última mensagem
+    """
+    sala_id: str
+    ultima_atividade: Optional[datetime]
+    outro_usuario_id: int
+    outro_usuario_nome: str
+    outro_usuario_email: str
+    nao_lidas: int = 0
+    ultima_mensagem: Optional[str] = None
+    ultima_mensagem_data: Optional[datetime] = None
+    ultima_mensagem_usuario_id: Optional[int] = None
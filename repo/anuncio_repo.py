@@ -1,22 +1,85 @@
 """
 Repositório para operações com anúncios (produtos).
 """
+import re
 from typing import Optional
 from datetime import datetime
 
 from model.anuncio_model import Anuncio
+from repo import categoria_repo
 from sql.anuncio_sql import *
-from util.db_util import obter_conexao
+from util.cache_paginas import GRUPO_ANUNCIOS, cache_paginas
+from util.db_util import obter_conexao, obter_conexao_leitura
+from util.paginacao_util import decodificar_cursor, fatiar_pagina
 
 
 def criar_tabela() -> bool:
-    """Cria a tabela de anúncios"""
+    """
+    Cria a tabela de anúncios, o índice de busca textual (FTS5) e os
+    triggers do contador de versão.
+
+    Se o índice FTS ainda não existia (banco criado antes da busca textual),
+    ele é populado a partir dos anúncios existentes. Em bancos criados antes
+    do contador, adiciona a coluna versao.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        if cursor.execute(EXISTE_COLUNA_VERSAO).fetchone() is None:
+            cursor.execute(ADICIONAR_COLUNA_VERSAO)
+        for trigger in TRIGGERS_VERSAO:
+            cursor.execute(trigger)
+
+        fts_existia = cursor.execute(EXISTE_TABELA_FTS).fetchone() is not None
+        cursor.execute(CRIAR_TABELA_FTS)
+        for trigger in TRIGGERS_FTS:
+            cursor.execute(trigger)
+        if not fts_existia:
+            cursor.execute(RECONSTRUIR_FTS)
         return True
 
 
+def reconstruir_indice_busca() -> None:
+    """
+    Reconstrói o índice de busca textual a partir da tabela anuncio.
+
+    Útil após importações feitas com triggers desabilitados ou restauração
+    de backups antigos. Ver scripts/reconstruir_indice_busca.py.
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA_FTS)
+        for trigger in TRIGGERS_FTS:
+            cursor.execute(trigger)
+        cursor.execute(RECONSTRUIR_FTS)
+
+
+def _montar_consulta_fts(termo: Optional[str], coluna: Optional[str] = None) -> Optional[str]:
+    """
+    Converte o termo digitado pelo usuário em uma expressão MATCH do FTS5.
+
+    Cada palavra vira uma consulta por prefixo entre aspas ("note"* "dell"*),
+    o que neutraliza a sintaxe do FTS5 (operadores, aspas, parênteses) no texto
+    do usuário. Todas as palavras precisam estar presentes (AND implícito).
+
+    Args:
+        termo: Texto de busca livre
+        coluna: Se informado, restringe a busca a essa coluna do índice
+
+    Returns:
+        Expressão MATCH ou None se o termo não contém palavras
+    """
+    if not termo:
+        return None
+    palavras = re.findall(r"\w+", termo)
+    if not palavras:
+        return None
+    expressao = " ".join(f'"{palavra}"*' for palavra in palavras)
+    if coluna:
+        return f"{coluna} : ({expressao})"
+    return expressao
+
+
 def inserir(anuncio: Anuncio) -> Optional[Anuncio]:
     """Insere um novo anúncio"""
     with obter_conexao() as conn:
@@ -35,6 +98,8 @@ def inserir(anuncio: Anuncio) -> Optional[Anuncio]:
         )
         anuncio_id = cursor.lastrowid
 
+    cache_paginas.invalidar(GRUPO_ANUNCIOS)
+
     # Buscar o anúncio inserido após commit
     if anuncio_id:
         return obter_por_id(anuncio_id)
@@ -58,7 +123,10 @@ def alterar(anuncio: Anuncio) -> bool:
                 anuncio.id
             )
         )
-        return cursor.rowcount > 0
+        alterado = cursor.rowcount > 0
+
+    cache_paginas.invalidar(GRUPO_ANUNCIOS)
+    return alterado
 
 
 def excluir(id: int) -> bool:
@@ -66,63 +134,102 @@ def excluir(id: int) -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (id,))
-        return cursor.rowcount > 0
+        excluido = cursor.rowcount > 0
+
+    cache_paginas.invalidar(GRUPO_ANUNCIOS)
+    return excluido
 
 
 def obter_por_id(id: int) -> Optional[Anuncio]:
     """Obtém um anúncio por ID"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
-        if row:
-            return _row_to_anuncio(row)
-        return None
+    if row:
+        return _preencher_categorias([_row_to_anuncio(row)])[0]
+    return None
 
 
 def obter_todos() -> list[Anuncio]:
     """Obtém todos os anúncios"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
+
+
+def obter_todos_por_cursor(
+    cursor: Optional[str] = None, limite: int = 50
+) -> tuple[list[Anuncio], Optional[str]]:
+    """
+    Obtém uma página de anúncios (ativos e inativos), do mais recente ao
+    mais antigo, usando paginação por cursor em (data_cadastro, id).
+
+    Args:
+        cursor: Cursor retornado pela página anterior (None = primeira página)
+        limite: Quantidade máxima de anúncios na página
+
+    Returns:
+        Tupla com (lista de anúncios, cursor da próxima página ou None)
+    """
+    chave = decodificar_cursor(cursor, 2)
+    filtro = FILTRO_CURSOR_DATA if chave else ""
+    params = (*(chave or ()), limite + 1)
+
+    with obter_conexao_leitura() as conn:
+        cur = conn.cursor()
+        cur.execute(OBTER_TODOS_POR_CURSOR.format(filtro_cursor=filtro), params)
+        rows, proximo = fatiar_pagina(cur.fetchall(), limite, _chave_cursor)
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows]), proximo
+
+
+def contar_todos() -> int:
+    """Conta todos os anúncios (ativos e inativos)"""
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_TODOS)
+        return cursor.fetchone()["total"]
 
 
 def obter_todos_ativos() -> list[Anuncio]:
     """Obtém apenas anúncios ativos com estoque"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS_ATIVOS)
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
 
 
 def obter_por_vendedor(id_vendedor: int) -> list[Anuncio]:
     """Obtém todos os anúncios de um vendedor"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_VENDEDOR, (id_vendedor,))
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
 
 
 def obter_por_categoria(id_categoria: int) -> list[Anuncio]:
     """Obtém anúncios ativos de uma categoria"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_CATEGORIA, (id_categoria,))
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
 
 
 def buscar_por_nome(termo: str) -> list[Anuncio]:
-    """Busca anúncios por nome (LIKE)"""
-    with obter_conexao() as conn:
+    """Busca anúncios por nome (busca textual por prefixo, ordenada por relevância)"""
+    consulta = _montar_consulta_fts(termo, coluna="nome")
+    if consulta is None:
+        return []
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
-        cursor.execute(BUSCAR_POR_NOME, (f"%{termo}%",))
+        cursor.execute(BUSCAR_POR_NOME, (consulta,))
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
 
 
 def buscar_com_filtros(
@@ -132,21 +239,21 @@ def buscar_com_filtros(
     preco_max: Optional[float] = None
 ) -> list[Anuncio]:
     """Busca anúncios com filtros opcionais"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         # Preparar parâmetros para query SQL com IS NULL checks
-        termo_like = f"%{termo}%" if termo else None
+        consulta = _montar_consulta_fts(termo, coluna="nome")
         cursor.execute(
             BUSCAR_COM_FILTROS,
             (
-                termo_like, termo_like,
+                consulta, consulta,
                 id_categoria, id_categoria,
                 preco_min, preco_min,
                 preco_max, preco_max
             )
         )
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
 
 
 def atualizar_estoque(id: int, quantidade: int) -> bool:
@@ -157,71 +264,191 @@ def atualizar_estoque(id: int, quantidade: int) -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(ATUALIZAR_ESTOQUE, (quantidade, id, quantidade))
-        return cursor.rowcount > 0
+        atualizado = cursor.rowcount > 0
+
+    # Anúncio sem estoque deixa as listagens públicas
+    cache_paginas.invalidar(GRUPO_ANUNCIOS)
+    return atualizado
 
 
 def obter_ativos_paginados(
     pagina: int = 1,
     por_pagina: int = 12,
     termo: Optional[str] = None,
-    id_categoria: Optional[int] = None
+    id_categoria: Optional[int] = None,
+    ordenar_por: Optional[str] = None
 ) -> tuple[list[Anuncio], int]:
     """
     Obtém anúncios ativos com paginação e filtros.
 
+    Quando há termo de busca, usa o índice FTS5 (nome e descrição, sem
+    acentos, por prefixo) e ordena por relevância (bm25) por padrão.
+
+    Args:
+        ordenar_por: Chave de ORDENACOES_ATIVOS; valores desconhecidos usam o padrão
+
     Returns:
         Tupla com (lista de anúncios, total de registros)
     """
-    with obter_conexao() as conn:
+    consulta = _montar_consulta_fts(termo)
+    padrao = "relevancia" if consulta else "data_desc"
+    if ordenar_por not in ORDENACOES_ATIVOS or (ordenar_por == "relevancia" and not consulta):
+        ordenar_por = padrao
+    ordem = ORDENACOES_ATIVOS[ordenar_por]
+    offset = (pagina - 1) * por_pagina
+
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
 
-        # Preparar parâmetros de busca
-        termo_like = f"%{termo}%" if termo else None
-        offset = (pagina - 1) * por_pagina
-
-        # Buscar anúncios paginados
-        cursor.execute(
-            OBTER_ATIVOS_PAGINADOS,
-            (
-                termo_like, termo_like, termo_like,  # termo para nome e descricao
-                id_categoria, id_categoria,           # categoria
-                por_pagina, offset                    # paginacao
+        if consulta:
+            cursor.execute(
+                OBTER_ATIVOS_PAGINADOS_FTS.format(ordem=ordem),
+                (consulta, id_categoria, id_categoria, por_pagina, offset)
             )
-        )
-        rows = cursor.fetchall()
-        anuncios = [_row_to_anuncio(row) for row in rows]
-
-        # Contar total
-        cursor.execute(
-            CONTAR_ATIVOS,
-            (
-                termo_like, termo_like, termo_like,
-                id_categoria, id_categoria
+            rows = cursor.fetchall()
+            cursor.execute(CONTAR_ATIVOS_FTS, (consulta, id_categoria, id_categoria))
+        else:
+            cursor.execute(
+                OBTER_ATIVOS_PAGINADOS.format(ordem=ordem),
+                (id_categoria, id_categoria, por_pagina, offset)
             )
-        )
+            rows = cursor.fetchall()
+            cursor.execute(CONTAR_ATIVOS, (id_categoria, id_categoria))
+
         total = cursor.fetchone()["total"]
 
-        return anuncios, total
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows]), total
+
+
+def obter_ativos_por_cursor(
+    cursor: Optional[str] = None,
+    por_pagina: int = 12,
+    termo: Optional[str] = None,
+    id_categoria: Optional[int] = None
+) -> tuple[list[Anuncio], Optional[str]]:
+    """
+    Obtém anúncios ativos com paginação por cursor (keyset).
+
+    Ordena do mais recente ao mais antigo por (data_cadastro, id) e começa
+    logo após a chave guardada no cursor, sem OFFSET e sem COUNT(*). O
+    total, quando necessário, vem de contar_ativos.
+
+    Args:
+        cursor: Cursor retornado pela página anterior (None = primeira página)
+        por_pagina: Quantidade máxima de anúncios na página
+        termo: Termo de busca (índice FTS5, como em obter_ativos_paginados)
+        id_categoria: Filtra pela categoria
+
+    Returns:
+        Tupla com (lista de anúncios, cursor da próxima página ou None)
+    """
+    consulta = _montar_consulta_fts(termo)
+    chave = decodificar_cursor(cursor, 2)
+    filtro = FILTRO_CURSOR_DATA if chave else ""
+    params = (id_categoria, id_categoria, *(chave or ()), por_pagina + 1)
+
+    with obter_conexao_leitura() as conn:
+        cur = conn.cursor()
+        if consulta:
+            cur.execute(
+                OBTER_ATIVOS_POR_CURSOR_FTS.format(filtro_cursor=filtro),
+                (consulta, *params)
+            )
+        else:
+            cur.execute(OBTER_ATIVOS_POR_CURSOR.format(filtro_cursor=filtro), params)
+        rows, proximo = fatiar_pagina(cur.fetchall(), por_pagina, _chave_cursor)
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows]), proximo
+
+
+def contar_ativos(
+    termo: Optional[str] = None, id_categoria: Optional[int] = None
+) -> int:
+    """
+    Conta anúncios ativos com os mesmos filtros de obter_ativos_por_cursor.
+
+    Returns:
+        Total de anúncios ativos com estoque que atendem aos filtros
+    """
+    consulta = _montar_consulta_fts(termo)
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        if consulta:
+            cursor.execute(CONTAR_ATIVOS_FTS, (consulta, id_categoria, id_categoria))
+        else:
+            cursor.execute(CONTAR_ATIVOS, (id_categoria, id_categoria))
+        return cursor.fetchone()["total"]
 
 
 def obter_ultimos_ativos(limite: int = 12) -> list[Anuncio]:
     """Obtém os últimos anúncios ativos (para home page)"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_ULTIMOS_ATIVOS, (limite,))
         rows = cursor.fetchall()
-        return [_row_to_anuncio(row) for row in rows]
+    return _preencher_categorias([_row_to_anuncio(row) for row in rows])
 
 
 def obter_por_id_com_detalhes(id: int) -> Optional[Anuncio]:
     """Obtém anúncio por ID com dados do vendedor e categoria"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID_COM_DETALHES, (id,))
         row = cursor.fetchone()
-        if row:
-            return _row_to_anuncio(row)
-        return None
+    if row:
+        return _preencher_categorias([_row_to_anuncio(row)])[0]
+    return None
+
+
+def obter_versao() -> int:
+    """
+    Obtém a versão atual dos anúncios.
+
+    Mantida pelos triggers da tabela: muda a cada inserção, alteração ou
+    exclusão, feita por qualquer worker.
+
+    Returns:
+        Versão atual (0 para tabela vazia)
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        return cursor.fetchone()["versao"]
+
+
+def obter_versao_detalhes(id: int) -> Optional[dict]:
+    """
+    Obtém os dados que identificam a versão da página de detalhes do anúncio.
+
+    Args:
+        id: ID do anúncio
+
+    Returns:
+        Dicionário com versao, id_categoria, ativo, estoque e dados do
+        vendedor exibidos na página, ou None se o anúncio não existir
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO_DETALHES, (id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+
+def _chave_cursor(row) -> tuple:
+    """Chave de ordenação (data_cadastro, id) usada nos cursores de paginação"""
+    return (row["data_cadastro"], row["id"])
+
+
+def _preencher_categorias(anuncios: list[Anuncio]) -> list[Anuncio]:
+    """
+    Preenche nome_categoria pelo catálogo em memória (sem JOIN com categoria).
+
+    Deve ser chamada depois de devolver a conexão de leitura: a recarga do
+    catálogo usa outra conexão do pool, e segurar as duas ao mesmo tempo
+    esgota o pool quando vários leitores chegam logo após uma escrita.
+    """
+    for anuncio in anuncios:
+        anuncio.nome_categoria = categoria_repo.obter_nome(anuncio.id_categoria)
+    return anuncios
 
 
 def _row_to_anuncio(row) -> Anuncio:
@@ -242,8 +469,6 @@ def _row_to_anuncio(row) -> Anuncio:
     )
     # Adicionar campos extras se presentes no resultado
     keys = row.keys()
-    if "nome_categoria" in keys:
-        anuncio.nome_categoria = row["nome_categoria"]
     if "nome_vendedor" in keys:
         anuncio.nome_vendedor = row["nome_vendedor"]
     if "email_vendedor" in keys:
@@ -1,17 +1,199 @@
-from typing import Optional
+import threading
+from dataclasses import replace
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional
 from model.categoria_model import Categoria
 from sql.categoria_sql import *
-from util.db_util import obter_conexao
+from util.cache_paginas import GRUPO_CATEGORIAS, cache_paginas
+from util.config import CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS
+from util.db_util import obter_conexao, obter_conexao_leitura, obter_versao_dados
+from util.logger_config import logger
+
+
+class _SnapshotCategorias(NamedTuple):
+    """Categorias carregadas do banco (nunca alterado após publicado)."""
+    por_id: Mapping[int, Categoria]
+    ordenadas: tuple
+    versao: Optional[int]
+
+
+class CatalogoCategorias:
+    """
+    Catálogo de categorias em memória.
+
+    A tabela é pequena e só muda pela administração de categorias, mas é
+    lida em toda listagem de anúncios. Todas as linhas são carregadas em
+    uma consulta e publicadas como um snapshot imutável (id -> Categoria e
+    lista ordenada por nome), substituído atomicamente a cada recarga.
+    Leitores não usam lock e recebem cópias das categorias.
+
+    inserir/alterar/excluir descartam o snapshot após o commit e avançam o
+    contador de geração: uma carga que leu as linhas antes do commit não
+    publica o snapshot (mesma proteção de CachePaginas.guardar). Alterações
+    feitas por outros workers são detectadas pelo contador de versão da
+    tabela (triggers em categoria_sql), verificado no máximo a cada
+    CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS e só quando o PRAGMA data_version
+    indica que o banco mudou.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_SnapshotCategorias] = None
+        self._versao_dados: Optional[int] = None
+        self._proxima_verificacao = 0.0
+        self._lock = threading.Lock()
+        # Protege geração + publicação; não é mantido durante consultas
+        self._lock_geracao = threading.Lock()
+        self._geracao = 0
+        self._recargas = 0
+
+    def carregar(self) -> int:
+        """
+        Carrega todas as categorias do banco.
+
+        Returns:
+            Quantidade de categorias carregadas
+
+        Raises:
+            sqlite3.Error: Se a consulta falhar
+        """
+        return len(self._carregar().ordenadas)
+
+    def _carregar(self) -> _SnapshotCategorias:
+        """
+        Carrega as categorias e publica o snapshot, se nenhuma escrita o
+        invalidou durante a carga.
+
+        Returns:
+            Snapshot carregado (publicado ou não)
+        """
+        with self._lock:
+            geracao = self._geracao
+            versao_dados = obter_versao_dados()
+            with obter_conexao_leitura() as conn:
+                cursor = conn.cursor()
+                # Versão lida antes das linhas: uma escrita entre as duas
+                # consultas só provoca mais uma recarga
+                versao = cursor.execute(OBTER_VERSAO).fetchone()["versao"]
+                rows = cursor.execute(OBTER_TODOS).fetchall()
+
+            ordenadas = tuple(_row_to_categoria(row) for row in rows)
+            snapshot = _SnapshotCategorias(
+                MappingProxyType({c.id: c for c in ordenadas}), ordenadas, versao
+            )
+            with self._lock_geracao:
+                # Invalidado durante a carga: as linhas podem ser anteriores
+                # ao commit da escrita; a próxima leitura recarrega
+                if self._geracao == geracao:
+                    self._snapshot = snapshot
+                    self._versao_dados = versao_dados
+                    self._proxima_verificacao = (
+                        monotonic() + CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS
+                    )
+            self._recargas += 1
+            return snapshot
+
+    def invalidar(self) -> None:
+        """Descarta o snapshot: a próxima leitura recarrega do banco."""
+        with self._lock_geracao:
+            self._geracao += 1
+            self._snapshot = None
+
+    def _verificar_versao(self) -> None:
+        """
+        Descarta o snapshot se outro worker alterou as categorias.
+
+        Se outra thread já está verificando, o leitor segue com o snapshot atual.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            agora = monotonic()
+            if agora < self._proxima_verificacao:
+                return
+            self._proxima_verificacao = agora + CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS
+            versao_dados = obter_versao_dados()
+            if versao_dados == self._versao_dados:
+                return
+            snapshot = self._snapshot
+            if snapshot is not None and obter_versao() != snapshot.versao:
+                self.invalidar()
+                # Páginas públicas deste worker montadas com as categorias antigas
+                cache_paginas.invalidar(GRUPO_CATEGORIAS)
+            self._versao_dados = versao_dados
+        finally:
+            self._lock.release()
+
+    def obter(self) -> _SnapshotCategorias:
+        """
+        Retorna o snapshot atual, carregando-o se necessário.
+
+        Raises:
+            sqlite3.Error: Se a carga falhar
+        """
+        if self._snapshot is not None and monotonic() >= self._proxima_verificacao:
+            self._verificar_versao()
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._carregar()
+        return snapshot
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Retorna quantidade de categorias, recargas e versão (para o /health)."""
+        snapshot = self._snapshot
+        return {
+            "categorias": len(snapshot.ordenadas) if snapshot else 0,
+            "recargas": self._recargas,
+            "versao": snapshot.versao if snapshot else None,
+        }
+
+
+# Instância global usada pelas funções de leitura deste módulo
+catalogo_categorias = CatalogoCategorias()
+
+
+def _row_to_categoria(row) -> Categoria:
+    """Converte row do banco para objeto Categoria"""
+    return Categoria(
+        id=row["id"],
+        nome=row["nome"],
+        descricao=row["descricao"],
+        data_cadastro=row["data_cadastro"],
+        data_atualizacao=row["data_atualizacao"]
+    )
 
 
 def criar_tabela():
     """
-    Cria a tabela de categorias se ela não existir.
+    Cria a tabela de categorias e os triggers do contador de versão.
     Deve ser chamada na inicialização do sistema.
+
+    Em bancos criados antes do contador, adiciona a coluna versao.
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        if cursor.execute(EXISTE_COLUNA_VERSAO).fetchone() is None:
+            cursor.execute(ADICIONAR_COLUNA_VERSAO)
+        for trigger in TRIGGERS_VERSAO:
+            cursor.execute(trigger)
+    catalogo_categorias.invalidar()
+
+
+def obter_versao() -> int:
+    """
+    Obtém a versão atual das categorias.
+
+    Mantida pelos triggers da tabela: muda a cada inserção, alteração ou
+    exclusão, feita por qualquer worker.
+
+    Returns:
+        Versão atual (0 para tabela vazia)
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        return cursor.fetchone()["versao"]
 
 
 def inserir(categoria: Categoria) -> Optional[Categoria]:
@@ -19,11 +201,14 @@ def inserir(categoria: Categoria) -> Optional[Categoria]:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(INSERIR, (categoria.nome, categoria.descricao))
+            id_inserido = cursor.lastrowid
 
-            if cursor.lastrowid:
-                categoria.id = cursor.lastrowid
-                return categoria
-            return None
+        if id_inserido:
+            categoria.id = id_inserido
+            catalogo_categorias.invalidar()
+            cache_paginas.invalidar(GRUPO_CATEGORIAS)
+            return categoria
+        return None
     except Exception as e:
         print(f"Erro ao inserir categoria: {e}")
         return None
@@ -34,7 +219,10 @@ def alterar(categoria: Categoria) -> bool:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(ALTERAR, (categoria.nome, categoria.descricao, categoria.id))
-            return cursor.rowcount > 0
+            alterada = cursor.rowcount > 0
+        catalogo_categorias.invalidar()
+        cache_paginas.invalidar(GRUPO_CATEGORIAS)
+        return alterada
     except Exception as e:
         print(f"Erro ao alterar categoria: {e}")
         return False
@@ -45,70 +233,77 @@ def excluir(id: int) -> bool:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(EXCLUIR, (id,))
-            return cursor.rowcount > 0
+            excluida = cursor.rowcount > 0
+        catalogo_categorias.invalidar()
+        cache_paginas.invalidar(GRUPO_CATEGORIAS)
+        return excluida
     except Exception as e:
         print(f"Erro ao excluir categoria: {e}")
         return False
 
 
 def obter_por_id(id: int) -> Optional[Categoria]:
+    """Busca uma categoria por ID no catálogo em memória (retorna uma cópia)"""
     try:
-        with obter_conexao() as conn:
-            cursor = conn.cursor()
-            cursor.execute(OBTER_POR_ID, (id,))
-            row = cursor.fetchone()
-
-            if row:
-                return Categoria(
-                    id=row["id"],
-                    nome=row["nome"],
-                    descricao=row["descricao"],
-                    data_cadastro=row["data_cadastro"],
-                    data_atualizacao=row["data_atualizacao"]
-                )
-            return None
+        categoria = catalogo_categorias.obter().por_id.get(id)
+        return replace(categoria) if categoria else None
     except Exception as e:
         print(f"Erro ao obter categoria por ID: {e}")
         return None
 
 
 def obter_todos() -> list[Categoria]:
+    """Lista as categorias ordenadas por nome, do catálogo em memória (cópias)"""
     try:
-        with obter_conexao() as conn:
-            cursor = conn.cursor()
-            cursor.execute(OBTER_TODOS)
-            rows = cursor.fetchall()
-
-            return [
-                Categoria(
-                    id=row["id"],
-                    nome=row["nome"],
-                    descricao=row["descricao"],
-                    data_cadastro=row["data_cadastro"],
-                    data_atualizacao=row["data_atualizacao"]
-                )
-                for row in rows
-            ]
+        return [replace(categoria) for categoria in catalogo_categorias.obter().ordenadas]
     except Exception as e:
         print(f"Erro ao obter todas as categorias: {e}")
         return []
 
 
+def obter_nome(id: int) -> Optional[str]:
+    """
+    Obtém o nome de uma categoria sem consultar o banco.
+
+    Usado pelo anuncio_repo no lugar do LEFT JOIN com categoria.
+
+    Args:
+        id: ID da categoria
+
+    Returns:
+        Nome da categoria ou None se não existir
+    """
+    try:
+        categoria = catalogo_categorias.obter().por_id.get(id)
+        return categoria.nome if categoria else None
+    except Exception as e:
+        logger.error(f"Erro ao obter nome da categoria: {e}")
+        return None
+
+
+def obter_versao_catalogo() -> Optional[int]:
+    """
+    Versão das categorias em uso pelo catálogo em memória (sem consultar o banco).
+
+    Returns:
+        Versão do snapshot atual ou None se o catálogo não puder ser carregado
+    """
+    try:
+        return catalogo_categorias.obter().versao
+    except Exception as e:
+        logger.error(f"Erro ao obter versão do catálogo de categorias: {e}")
+        return None
+
+
 def obter_por_nome(nome: str) -> Optional[Categoria]:
     try:
-        with obter_conexao() as conn:
+        with obter_conexao_leitura() as conn:
             cursor = conn.cursor()
             cursor.execute(OBTER_POR_NOME, (nome,))
             row = cursor.fetchone()
 
             if row:
-                return Categoria(
-                    id=row["id"],
-                    nome=row["nome"],
-                    descricao=row["descricao"],
-                    data_cadastro=row["data_cadastro"],
-                    data_atualizacao=row["data_atualizacao"]
-                )
+                return _row_to_categoria(row)
             return None
     except Exception as e:
         print(f"Erro ao obter categoria por nome: {e}")
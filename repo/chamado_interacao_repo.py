@@ -12,7 +12,7 @@ from sql.chamado_interacao_sql import (
     CONTAR_NAO_LIDAS_POR_CHAMADO,
     TEM_RESPOSTA_ADMIN,
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 
 
 def _row_to_interacao(row: sqlite3.Row) -> ChamadoInteracao:
@@ -89,7 +89,7 @@ def obter_por_chamado(chamado_id: int) -> list[ChamadoInteracao]:
     Returns:
         Lista de objetos ChamadoInteracao ordenados por data
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_CHAMADO, (chamado_id,))
         rows = cursor.fetchall()
@@ -106,7 +106,7 @@ def obter_por_id(id: int) -> Optional[ChamadoInteracao]:
     Returns:
         Objeto ChamadoInteracao ou None se não encontrado
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -125,7 +125,7 @@ def contar_por_chamado(chamado_id: int) -> int:
     Returns:
         Número de interações
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_POR_CHAMADO, (chamado_id,))
         row = cursor.fetchone()
@@ -186,7 +186,7 @@ def obter_contador_nao_lidas(usuario_id: int) -> dict[int, int]:
     Returns:
         Dict {chamado_id: quantidade_nao_lidas}
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_NAO_LIDAS_POR_CHAMADO, (usuario_id,))
         rows = cursor.fetchall()
@@ -209,7 +209,7 @@ def tem_resposta_admin(chamado_id: int) -> bool:
     Returns:
         True se houver pelo menos uma resposta de admin, False caso contrário
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(TEM_RESPOSTA_ADMIN, (chamado_id,))
         row = cursor.fetchone()
@@ -28,7 +28,7 @@ from sql.chamado_sql import (
     CONTAR_ABERTOS_POR_USUARIO,
     CONTAR_PENDENTES,
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.datetime_util import agora
 from util.logger_config import logger
 
@@ -100,7 +100,7 @@ def inserir(chamado: Chamado) -> Optional[int]:
 def obter_todos(usuario_logado_id: int) -> list[Chamado]:
     from repo import chamado_interacao_repo
 
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
@@ -119,7 +119,7 @@ def obter_todos(usuario_logado_id: int) -> list[Chamado]:
 def obter_por_usuario(usuario_id: int) -> list[Chamado]:
     from repo import chamado_interacao_repo
 
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_USUARIO, (usuario_id,))
         rows = cursor.fetchall()
@@ -137,7 +137,7 @@ def obter_por_usuario(usuario_id: int) -> list[Chamado]:
 
 
 def obter_por_id(id: int) -> Optional[Chamado]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -172,7 +172,7 @@ def excluir(id: int) -> bool:
 
 
 def contar_abertos_por_usuario(usuario_id: int) -> int:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_ABERTOS_POR_USUARIO, (usuario_id,))
         row = cursor.fetchone()
@@ -180,7 +180,7 @@ def contar_abertos_por_usuario(usuario_id: int) -> int:
 
 
 def contar_pendentes() -> int:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_PENDENTES)
         row = cursor.fetchone()
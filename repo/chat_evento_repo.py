@@ -0,0 +1,92 @@
+"""
+Repositório para operações com a tabela chat_evento.
+"""
+import json
+import time
+from typing import List, Tuple
+
+from sql.chat_evento_sql import (
+    CRIAR_TABELA,
+    INSERIR,
+    OBTER_ULTIMO_ID,
+    LISTAR_POSTERIORES,
+    EXCLUIR_ANTERIORES
+)
+from util.db_util import obter_conexao, obter_conexao_leitura
+
+
+def criar_tabela():
+    """Cria a tabela chat_evento se não existir."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+
+
+def inserir(sala_id: str, mensagem: dict) -> int:
+    """
+    Registra um evento de broadcast para uma sala.
+
+    Args:
+        sala_id: ID da sala
+        mensagem: Dicionário enviado aos participantes via SSE
+
+    Returns:
+        ID do evento criado
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR, (sala_id, json.dumps(mensagem), time.time()))
+        return cursor.lastrowid
+
+
+def obter_ultimo_id() -> int:
+    """
+    Obtém o id do evento mais recente.
+
+    Returns:
+        ID do último evento ou 0 se a tabela estiver vazia
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ULTIMO_ID)
+        row = cursor.fetchone()
+
+        return row["ultimo_id"] if row else 0
+
+
+def listar_posteriores(ultimo_id: int, limite: int = 500) -> List[Tuple[int, str, str]]:
+    """
+    Lista os eventos gravados depois de um id, em ordem de gravação.
+
+    O payload é devolvido como texto JSON: quem consome decodifica cada
+    evento e pode descartar um payload inválido sem perder os demais.
+
+    Args:
+        ultimo_id: ID do último evento já processado
+        limite: Quantidade máxima de eventos retornados
+
+    Returns:
+        Lista de tuplas (id, sala_id, payload JSON)
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_POSTERIORES, (ultimo_id, limite))
+        rows = cursor.fetchall()
+
+        return [(row["id"], row["sala_id"], row["payload"]) for row in rows]
+
+
+def excluir_anteriores(instante: float) -> int:
+    """
+    Exclui eventos gravados antes de um instante.
+
+    Args:
+        instante: Epoch (segundos); eventos mais antigos são excluídos
+
+    Returns:
+        Quantidade de eventos excluídos
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_ANTERIORES, (instante,))
+        return cursor.rowcount
@@ -12,10 +12,13 @@ from sql.chat_mensagem_sql import (
     LISTAR_POR_SALA,
     CONTAR_POR_SALA,
     MARCAR_COMO_LIDAS,
+    INCREMENTAR_NAO_LIDAS,
+    ZERAR_NAO_LIDAS,
+    DECREMENTAR_NAO_LIDAS,
     OBTER_ULTIMA_MENSAGEM_SALA,
     EXCLUIR
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.datetime_util import agora
 
 
@@ -51,6 +54,9 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
     """
     Insere uma nova mensagem em uma sala.
 
+    Na mesma transação, incrementa o contador de não lidas dos demais
+    participantes da sala.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que enviou
@@ -65,6 +71,7 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
         cursor = conn.cursor()
         cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
         mensagem_id = cursor.lastrowid
+        cursor.execute(INCREMENTAR_NAO_LIDAS, (sala_id, usuario_id))
 
     return ChatMensagem(
         id=mensagem_id,
@@ -86,7 +93,7 @@ def obter_por_id(mensagem_id: int) -> Optional[ChatMensagem]:
     Returns:
         Objeto ChatMensagem ou None se não encontrada
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (mensagem_id,))
         row = cursor.fetchone()
@@ -108,7 +115,7 @@ def listar_por_sala(sala_id: str, limit: int = 50, offset: int = 0) -> List[Chat
     Returns:
         Lista de objetos ChatMensagem (ordenadas por ID crescente - mais antigas primeiro)
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(LISTAR_POR_SALA, (sala_id, limit, offset))
         rows = cursor.fetchall()
@@ -126,7 +133,7 @@ def contar_por_sala(sala_id: str) -> int:
     Returns:
         Número total de mensagens
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_POR_SALA, (sala_id,))
         row = cursor.fetchone()
@@ -138,6 +145,8 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     """
     Marca como lidas todas as mensagens não lidas de outros usuários em uma sala.
 
+    Também zera o contador de não lidas do usuário na sala.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que está marcando como lidas
@@ -147,7 +156,9 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
-        cursor.execute(MARCAR_COMO_LIDAS, (agora(), sala_id, usuario_id))
+        momento = agora()
+        cursor.execute(MARCAR_COMO_LIDAS, (momento, sala_id, usuario_id))
+        cursor.execute(ZERAR_NAO_LIDAS, (momento, sala_id, usuario_id))
         return cursor.rowcount >= 0  # Retorna True mesmo se nenhuma mensagem foi marcada
 
 
@@ -161,7 +172,7 @@ def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
     Returns:
         Objeto ChatMensagem ou None se não houver mensagens
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_ULTIMA_MENSAGEM_SALA, (sala_id,))
         row = cursor.fetchone()
@@ -175,6 +186,9 @@ def excluir(mensagem_id: int) -> bool:
     """
     Exclui uma mensagem.
 
+    Se a mensagem ainda não tinha sido lida por algum participante, o
+    contador de não lidas dele é decrementado na mesma transação.
+
     Args:
         mensagem_id: ID da mensagem
 
@@ -183,5 +197,6 @@ def excluir(mensagem_id: int) -> bool:
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
+        cursor.execute(DECREMENTAR_NAO_LIDAS, (mensagem_id,))
         cursor.execute(EXCLUIR, (mensagem_id,))
         return cursor.rowcount > 0
@@ -4,19 +4,26 @@ Repositório para operações com a tabela chat_participante.
 from typing import Optional, List
 from sqlite3 import Row
 
+from model.chat_conversa_model import ChatConversa
 from model.chat_participante_model import ChatParticipante
 from sql.chat_participante_sql import (
     CRIAR_TABELA,
+    EXISTE_COLUNA_NAO_LIDAS,
+    ADICIONAR_COLUNA_NAO_LIDAS,
     INSERIR,
     OBTER_POR_SALA_E_USUARIO,
     LISTAR_POR_SALA,
     LISTAR_POR_USUARIO,
     ATUALIZAR_ULTIMA_LEITURA,
-    CONTAR_MENSAGENS_NAO_LIDAS,
+    OBTER_NAO_LIDAS,
+    SOMAR_NAO_LIDAS_POR_USUARIO,
+    RECALCULAR_NAO_LIDAS,
+    LISTAR_CONVERSAS_POR_USUARIO,
     EXCLUIR
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.datetime_util import agora
+from util.logger_config import logger
 
 
 def _row_to_participante(row: Row) -> ChatParticipante:
@@ -25,19 +32,31 @@ def _row_to_participante(row: Row) -> ChatParticipante:
     ultima_leitura = None
     if "ultima_leitura" in row.keys():
         ultima_leitura = row["ultima_leitura"]
+    nao_lidas = 0
+    if "nao_lidas" in row.keys():
+        nao_lidas = row["nao_lidas"]
 
     return ChatParticipante(
         sala_id=row["sala_id"],
         usuario_id=row["usuario_id"],
-        ultima_leitura=ultima_leitura
+        ultima_leitura=ultima_leitura,
+        nao_lidas=nao_lidas
     )
 
 
 def criar_tabela():
-    """Cria a tabela chat_participante se não existir."""
+    """
+    Cria a tabela chat_participante se não existir.
+
+    Em bancos criados antes do contador de não lidas, adiciona a coluna
+    nao_lidas e a preenche a partir das mensagens existentes.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        if cursor.execute(EXISTE_COLUNA_NAO_LIDAS).fetchone() is None:
+            cursor.execute(ADICIONAR_COLUNA_NAO_LIDAS)
+            cursor.execute(RECALCULAR_NAO_LIDAS)
 
 
 def adicionar_participante(sala_id: str, usuario_id: int) -> ChatParticipante:
@@ -73,7 +92,7 @@ def obter_por_sala_e_usuario(sala_id: str, usuario_id: int) -> Optional[ChatPart
     Returns:
         Objeto ChatParticipante ou None se não encontrado
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_SALA_E_USUARIO, (sala_id, usuario_id))
         row = cursor.fetchone()
@@ -93,7 +112,7 @@ def listar_por_sala(sala_id: str) -> List[ChatParticipante]:
     Returns:
         Lista de objetos ChatParticipante
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(LISTAR_POR_SALA, (sala_id,))
         rows = cursor.fetchall()
@@ -111,7 +130,7 @@ def listar_por_usuario(usuario_id: int) -> List[ChatParticipante]:
     Returns:
         Lista de objetos ChatParticipante
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(LISTAR_POR_USUARIO, (usuario_id,))
         rows = cursor.fetchall()
@@ -119,9 +138,46 @@ def listar_por_usuario(usuario_id: int) -> List[ChatParticipante]:
         return [_row_to_participante(row) for row in rows]
 
 
+def listar_conversas(usuario_id: int, limit: int = 12, offset: int = 0) -> List[ChatConversa]:
+    """
+    Lista as conversas de um usuário, da atividade mais recente para a mais antiga.
+
+    Outro participante, última mensagem e contador de não lidas vêm na mesma
+    consulta, já paginada pelo SQLite.
+
+    Args:
+        usuario_id: ID do usuário
+        limit: Quantidade máxima de conversas
+        offset: Quantidade de conversas a pular
+
+    Returns:
+        Lista de objetos ChatConversa
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_CONVERSAS_POR_USUARIO, (usuario_id, limit, offset))
+        rows = cursor.fetchall()
+
+        return [
+            ChatConversa(
+                sala_id=row["sala_id"],
+                ultima_atividade=row["ultima_atividade"],
+                outro_usuario_id=row["outro_usuario_id"],
+                outro_usuario_nome=row["outro_usuario_nome"],
+                outro_usuario_email=row["outro_usuario_email"],
+                nao_lidas=row["nao_lidas"],
+                ultima_mensagem=row["ultima_mensagem"],
+                ultima_mensagem_data=row["ultima_mensagem_data"],
+                ultima_mensagem_usuario_id=row["ultima_mensagem_usuario_id"],
+            )
+            for row in rows
+        ]
+
+
 def atualizar_ultima_leitura(sala_id: str, usuario_id: int) -> bool:
     """
-    Atualiza o timestamp de última leitura do participante.
+    Atualiza o timestamp de última leitura do participante e zera seu
+    contador de não lidas.
 
     Args:
         sala_id: ID da sala
@@ -140,6 +196,9 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     Conta quantas mensagens não lidas existem para um usuário em uma sala.
 
+    Lê o contador mantido em chat_participante (busca pela chave primária),
+    sem percorrer as mensagens da sala.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário
@@ -147,15 +206,53 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     Returns:
         Número de mensagens não lidas
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_NAO_LIDAS, (sala_id, usuario_id))
+        row = cursor.fetchone()
+
+        return row["total"] if row else 0
+
+
+def contar_nao_lidas_por_usuario(usuario_id: int) -> int:
+    """
+    Soma as mensagens não lidas de um usuário em todas as suas salas.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Total de mensagens não lidas
+    """
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
-        # Passar usuario_id 3 vezes: para sala_id, usuario_id != ?, e duas vezes na subquery
-        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id, usuario_id, usuario_id))
+        cursor.execute(SOMAR_NAO_LIDAS_POR_USUARIO, (usuario_id,))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
 
 
+def recalcular_nao_lidas() -> int:
+    """
+    Reconstrói os contadores de não lidas a partir das mensagens.
+
+    Corrige divergências deixadas por escritas fora do repositório (ex.:
+    exclusões em cascata de usuários, restauração de backups). Ver
+    scripts/recalcular_nao_lidas.py.
+
+    Returns:
+        Quantidade de participações cujo contador foi corrigido
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RECALCULAR_NAO_LIDAS)
+        corrigidos = cursor.rowcount
+
+    if corrigidos:
+        logger.warning(f"Contador de não lidas corrigido em {corrigidos} participação(ões)")
+    return corrigidos
+
+
 def excluir(sala_id: str, usuario_id: int) -> bool:
     """
     Remove um participante de uma sala.
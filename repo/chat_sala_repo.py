@@ -12,7 +12,7 @@ from sql.chat_sala_sql import (
     ATUALIZAR_ULTIMA_ATIVIDADE,
     EXCLUIR
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.datetime_util import agora
 
 
@@ -107,7 +107,7 @@ def obter_por_id(sala_id: str) -> Optional[ChatSala]:
     Returns:
         Objeto ChatSala ou None se não encontrada
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (sala_id,))
         row = cursor.fetchone()
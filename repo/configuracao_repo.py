@@ -3,12 +3,16 @@ from typing import Optional
 from model.configuracao_model import Configuracao
 from sql.configuracao_sql import (
     CRIAR_TABELA,
+    EXISTE_COLUNA_VERSAO,
+    ADICIONAR_COLUNA_VERSAO,
+    TRIGGERS_VERSAO,
     INSERIR,
     OBTER_POR_CHAVE,
     OBTER_TODOS,
     ATUALIZAR,
+    OBTER_VERSAO,
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.logger_config import logger
 
 
@@ -31,14 +35,23 @@ def _row_to_configuracao(row: sqlite3.Row) -> Configuracao:
 
 
 def criar_tabela() -> bool:
+    """
+    Cria a tabela configuracao e os triggers do contador de versão.
+
+    Em bancos criados antes do contador, adiciona a coluna versao.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        if cursor.execute(EXISTE_COLUNA_VERSAO).fetchone() is None:
+            cursor.execute(ADICIONAR_COLUNA_VERSAO)
+        for trigger in TRIGGERS_VERSAO:
+            cursor.execute(trigger)
         return True
 
 
 def obter_por_chave(chave: str) -> Optional[Configuracao]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_CHAVE, (chave,))
         row = cursor.fetchone()
@@ -48,13 +61,29 @@ def obter_por_chave(chave: str) -> Optional[Configuracao]:
 
 
 def obter_todos() -> list[Configuracao]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
         return [_row_to_configuracao(row) for row in rows]
 
 
+def obter_versao() -> int:
+    """
+    Obtém a versão atual das configurações.
+
+    Mantida pelos triggers da tabela: muda a cada inserção, alteração de
+    valor ou exclusão, feita por qualquer worker.
+
+    Returns:
+        Versão atual (0 para tabela vazia)
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        return cursor.fetchone()["versao"]
+
+
 def obter_por_categoria() -> dict[str, list[Configuracao]]:
     """
     Obtém todas as configurações agrupadas por categoria.
@@ -1,7 +1,7 @@
 from typing import Optional
 from model.curtida_model import Curtida
 from sql.curtida_sql import *
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 
 def criar_tabela() -> bool:
     with obter_conexao() as conn:
@@ -22,7 +22,7 @@ def excluir(id_usuario: int, id_anuncio: int) -> bool:
         return (cursor.rowcount > 0)
 
 def obter_por_id(id_usuario: int, id_anuncio: int) -> Optional[Curtida]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id_usuario, id_anuncio))
         row = cursor.fetchone()
@@ -35,13 +35,13 @@ def obter_por_id(id_usuario: int, id_anuncio: int) -> Optional[Curtida]:
         return None
 
 def obter_quantidade_por_anuncio(id_anuncio: int) -> int:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_QUANTIDADE_POR_ANUNCIO, (id_anuncio,))
         return cursor.fetchone()["quantidade"]
 
 def obter_todos() -> list[Curtida]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
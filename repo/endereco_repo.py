@@ -1,10 +1,11 @@
 """
 Repository para operações com Endereços.
 """
+import json
 from typing import Optional
 from model.endereco_model import Endereco
 from sql.endereco_sql import *
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 
 
 def criar_tabela() -> bool:
@@ -61,7 +62,7 @@ def excluir(id: int) -> bool:
 
 def obter_por_id(id: int) -> Optional[Endereco]:
     """Obtém endereço por ID"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -82,9 +83,43 @@ def obter_por_id(id: int) -> Optional[Endereco]:
         return None
 
 
+def obter_por_ids(ids: list[int]) -> dict[int, Endereco]:
+    """
+    Obtém vários endereços em uma única consulta (ex.: listagem de pedidos).
+
+    Args:
+        ids: IDs dos endereços (repetições são ignoradas)
+
+    Returns:
+        Dicionário id -> Endereco; IDs inexistentes ficam de fora
+    """
+    if not ids:
+        return {}
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_IDS, (json.dumps(sorted(set(ids))),))
+        rows = cursor.fetchall()
+        return {
+            row["id"]: Endereco(
+                id=row["id"],
+                id_usuario=row["id_usuario"],
+                titulo=row["titulo"],
+                logradouro=row["logradouro"],
+                numero=row["numero"],
+                complemento=row["complemento"],
+                bairro=row["bairro"],
+                cidade=row["cidade"],
+                uf=row["uf"],
+                cep=row["cep"],
+                usuario=None
+            )
+            for row in rows
+        }
+
+
 def obter_por_usuario(id_usuario: int) -> list[Endereco]:
     """Obtém todos os endereços de um usuário"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS_POR_USUARIO, (id_usuario,))
         rows = cursor.fetchall()
@@ -119,7 +154,7 @@ def usuario_tem_endereco(id_usuario: int) -> bool:
 
 def obter_todos() -> list[Endereco]:
     """Obtém todos os endereços"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
@@ -143,7 +178,7 @@ def obter_todos() -> list[Endereco]:
 
 def obter_por_uf(uf: str) -> list[Endereco]:
     """Obtém endereços por UF"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM endereco WHERE uf = ? ORDER BY cidade, logradouro", (uf,))
         rows = cursor.fetchall()
@@ -167,7 +202,7 @@ def obter_por_uf(uf: str) -> list[Endereco]:
 
 def obter_estatisticas() -> dict:
     """Obtém estatísticas de endereços"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
 
         # Total de endereços
@@ -190,7 +225,7 @@ def obter_estatisticas() -> dict:
 
 def contar_por_uf() -> list[dict]:
     """Conta endereços por UF"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT uf, COUNT(*) as total
@@ -204,7 +239,7 @@ def contar_por_uf() -> list[dict]:
 
 def contar_por_cidade() -> list[dict]:
     """Conta endereços por cidade (top 10)"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT cidade, uf, COUNT(*) as total
@@ -226,7 +261,7 @@ def contar_por_cidade() -> list[dict]:
 
 def obter_duplicados() -> list[dict]:
     """Detecta endereços potencialmente duplicados (mesmo CEP + número)"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT
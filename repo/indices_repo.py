@@ -1,12 +1,24 @@
 """
-Repository para criação de índices do banco de dados
+Repository para criação e verificação de índices do banco de dados
 """
+import re
 import sqlite3
 
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.logger_config import logger
 from sql import indices_sql
 
+# Passo de plano que percorre a tabela inteira: "SCAN a" (SQLite >= 3.36)
+# ou "SCAN TABLE anuncio AS a" (versões anteriores)
+_REGEX_VARREDURA_COMPLETA = re.compile(r"^SCAN (TABLE )?(\S+)( AS \S+)?$")
+
+# Resultado intermediário (CTE ou subconsulta) montado pelo SQLite; percorrê-lo
+# não é varredura de tabela, pois ele já contém apenas as linhas filtradas
+_REGEX_TEMPORARIA = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+
+# Índice citado em um passo do plano ("USING INDEX x" / "USING COVERING INDEX x")
+_REGEX_INDICE_USADO = re.compile(r"USING (?:COVERING )?INDEX (\S+)")
+
 
 def criar_indices() -> None:
     """
@@ -32,3 +44,128 @@ def criar_indices() -> None:
     except sqlite3.Error as e:
         logger.error(f"Erro ao criar índices: {e}")
         # Não lançar exceção - índices são otimização, não críticos
+
+
+def remover_indices_substituidos() -> None:
+    """
+    Remove índices antigos que foram substituídos por índices compostos.
+
+    Um índice cujas colunas são prefixo de outro não acelera nenhuma
+    consulta a mais, mas continua custando em cada INSERT/UPDATE.
+    """
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.cursor()
+            for nome in indices_sql.INDICES_SUBSTITUIDOS:
+                cursor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao remover índices substituídos: {e}")
+
+
+def obter_plano_consulta(sql: str, parametros: tuple = ()) -> list[str]:
+    """
+    Obtém o plano de execução de uma consulta (EXPLAIN QUERY PLAN).
+
+    Args:
+        sql: Consulta a analisar
+        parametros: Parâmetros de exemplo para os placeholders
+
+    Returns:
+        Lista com o detalhe de cada passo do plano
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)
+        return [row["detail"] for row in cursor.fetchall()]
+
+
+def _eh_varredura_completa(detalhe: str, temporarias: frozenset = frozenset()) -> bool:
+    """Indica se o passo do plano percorre a tabela inteira sem índice"""
+    encontrado = _REGEX_VARREDURA_COMPLETA.match(detalhe)
+    return encontrado is not None and encontrado.group(2) not in temporarias
+
+
+def verificar_planos_consultas() -> dict[str, list[str]]:
+    """
+    Verifica se alguma consulta crítica faz varredura completa de tabela.
+
+    Executa EXPLAIN QUERY PLAN para cada item de CONSULTAS_CRITICAS e loga
+    um warning para cada consulta cujo plano contém "SCAN <tabela>" sem
+    índice (varredura de índice, "SCAN ... USING INDEX", é aceita).
+
+    Returns:
+        Dicionário {nome da consulta: passos com varredura completa};
+        vazio quando todas as consultas usam índices
+    """
+    problemas: dict[str, list[str]] = {}
+    for nome, (sql, parametros) in indices_sql.CONSULTAS_CRITICAS.items():
+        try:
+            plano = obter_plano_consulta(sql, parametros)
+        except sqlite3.Error as e:
+            logger.warning(f"Não foi possível analisar a consulta '{nome}': {e}")
+            continue
+
+        temporarias = frozenset(
+            m.group(1) for m in map(_REGEX_TEMPORARIA.match, plano) if m
+        )
+        varreduras = [
+            passo for passo in plano if _eh_varredura_completa(passo, temporarias)
+        ]
+        if varreduras:
+            problemas[nome] = varreduras
+            logger.warning(
+                f"Consulta '{nome}' faz varredura completa de tabela: {'; '.join(varreduras)}"
+            )
+    return problemas
+
+
+def listar_indices_nao_utilizados() -> list[str]:
+    """
+    Lista os índices que nenhuma consulta crítica utiliza.
+
+    O SQLite não guarda estatísticas de uso de índices; a referência aqui
+    são os planos de CONSULTAS_CRITICAS. Índices que servem apenas a chaves
+    estrangeiras ou a consultas raras também aparecem na lista e devem ser
+    avaliados caso a caso.
+
+    Returns:
+        Nomes dos índices criados explicitamente e não usados, em ordem alfabética
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(indices_sql.LISTAR_INDICES_EXPLICITOS)
+        existentes = {row["name"] for row in cursor.fetchall()}
+
+    utilizados: set[str] = set()
+    for sql, parametros in indices_sql.CONSULTAS_CRITICAS.values():
+        try:
+            plano = obter_plano_consulta(sql, parametros)
+        except sqlite3.Error:
+            continue
+        for passo in plano:
+            encontrado = _REGEX_INDICE_USADO.search(passo)
+            if encontrado:
+                utilizados.add(encontrado.group(1))
+
+    return sorted(existentes - utilizados)
+
+
+def verificar_indices() -> None:
+    """
+    Verifica planos das consultas críticas e relata índices não utilizados.
+
+    Chamado no startup, após criar_indices(). Apenas loga; nunca interrompe
+    a aplicação.
+    """
+    try:
+        problemas = verificar_planos_consultas()
+        if not problemas:
+            logger.info("Consultas críticas verificadas: nenhuma varredura completa de tabela")
+
+        nao_utilizados = listar_indices_nao_utilizados()
+        if nao_utilizados:
+            logger.info(
+                f"Índices não utilizados pelas consultas críticas: {', '.join(nao_utilizados)}"
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao verificar índices: {e}")
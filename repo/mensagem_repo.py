@@ -6,7 +6,7 @@ from datetime import datetime
 
 from model.mensagem_model import Mensagem
 from sql.mensagem_sql import *
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 
 
 def criar_tabela() -> bool:
@@ -43,7 +43,7 @@ def marcar_como_lida(id: int) -> bool:
 
 def obter_por_id(id: int) -> Optional[Mensagem]:
     """Obtém uma mensagem por ID"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -63,7 +63,7 @@ def obter_por_id(id: int) -> Optional[Mensagem]:
 
 def obter_conversa(id_usuario1: int, id_usuario2: int) -> list[Mensagem]:
     """Obtém todas as mensagens entre dois usuários"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_CONVERSA, (id_usuario1, id_usuario2, id_usuario2, id_usuario1))
         rows = cursor.fetchall()
@@ -84,7 +84,7 @@ def obter_conversa(id_usuario1: int, id_usuario2: int) -> list[Mensagem]:
 
 def obter_mensagens_recebidas(id_usuario: int) -> list[Mensagem]:
     """Obtém todas as mensagens recebidas por um usuário"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_MENSAGENS_RECEBIDAS, (id_usuario,))
         rows = cursor.fetchall()
@@ -105,7 +105,7 @@ def obter_mensagens_recebidas(id_usuario: int) -> list[Mensagem]:
 
 def obter_mensagens_nao_lidas(id_usuario: int) -> list[Mensagem]:
     """Obtém mensagens não lidas de um usuário"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_MENSAGENS_NAO_LIDAS, (id_usuario,))
         rows = cursor.fetchall()
@@ -126,7 +126,7 @@ def obter_mensagens_nao_lidas(id_usuario: int) -> list[Mensagem]:
 
 def contar_nao_lidas(id_usuario: int) -> int:
     """Conta mensagens não lidas de um usuário"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(CONTAR_NAO_LIDAS, (id_usuario,))
         row = cursor.fetchone()
@@ -6,7 +6,8 @@ from datetime import datetime
 
 from model.pedido_model import Pedido
 from sql.pedido_sql import *
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
+from util.paginacao_util import decodificar_cursor, fatiar_pagina
 
 
 def criar_tabela() -> bool:
@@ -102,7 +103,7 @@ def avaliar(id: int, nota: int, comentario: str) -> bool:
 
 def obter_por_id(id: int) -> Optional[Pedido]:
     """Obtém um pedido por ID"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -113,7 +114,7 @@ def obter_por_id(id: int) -> Optional[Pedido]:
 
 def obter_por_comprador(id_comprador: int) -> list[Pedido]:
     """Obtém todos os pedidos de um comprador"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_COMPRADOR, (id_comprador,))
         rows = cursor.fetchall()
@@ -122,7 +123,7 @@ def obter_por_comprador(id_comprador: int) -> list[Pedido]:
 
 def obter_por_vendedor(id_vendedor: int) -> list[Pedido]:
     """Obtém todos os pedidos relacionados aos anúncios de um vendedor"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_VENDEDOR, (id_vendedor,))
         rows = cursor.fetchall()
@@ -131,25 +132,69 @@ def obter_por_vendedor(id_vendedor: int) -> list[Pedido]:
 
 def obter_por_status(status: str) -> list[Pedido]:
     """Obtém pedidos por status"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_STATUS, (status,))
         rows = cursor.fetchall()
         return [_row_to_pedido(row) for row in rows]
 
 
+def obter_por_endereco(id_endereco: int) -> list[Pedido]:
+    """Obtém os pedidos que usaram um endereço"""
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_ENDERECO, (id_endereco,))
+        rows = cursor.fetchall()
+        return [_row_to_pedido(row) for row in rows]
+
+
 def obter_todos() -> list[Pedido]:
     """Obtém todos os pedidos"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
         return [_row_to_pedido(row) for row in rows]
 
 
+def obter_por_cursor(
+    cursor: Optional[str] = None, limite: int = 50, status: Optional[str] = None
+) -> tuple[list[Pedido], Optional[str]]:
+    """
+    Obtém uma página de pedidos, do mais recente ao mais antigo (paginação por cursor).
+
+    Args:
+        cursor: Cursor retornado pela página anterior (None = primeira página)
+        limite: Quantidade máxima de pedidos na página
+        status: Filtra pelo status do pedido (None = todos)
+
+    Returns:
+        Tupla com (lista de pedidos, cursor da próxima página ou None)
+    """
+    chave = decodificar_cursor(cursor, 2)
+    filtro = FILTRO_CURSOR_DATA if chave else ""
+    params = (status, status, *(chave or ()), limite + 1)
+
+    with obter_conexao_leitura() as conn:
+        cur = conn.cursor()
+        cur.execute(OBTER_POR_CURSOR.format(filtro_cursor=filtro), params)
+        rows, proximo = fatiar_pagina(
+            cur.fetchall(), limite, lambda row: (row["data_hora_pedido"], row["id"])
+        )
+        return [_row_to_pedido(row) for row in rows], proximo
+
+
+def contar(status: Optional[str] = None) -> int:
+    """Conta pedidos, opcionalmente filtrando por status"""
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR, (status, status))
+        return cursor.fetchone()["total"]
+
+
 def obter_por_id_com_detalhes(id: int) -> Optional[Pedido]:
     """Obtém pedido por ID com detalhes (produto, comprador, vendedor, endereço)"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_COM_DETALHES, (id,))
         row = cursor.fetchone()
@@ -160,7 +205,7 @@ def obter_por_id_com_detalhes(id: int) -> Optional[Pedido]:
 
 def obter_por_comprador_com_detalhes(id_comprador: int) -> list[Pedido]:
     """Obtém pedidos de um comprador com detalhes do produto e vendedor"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_COMPRADOR_COM_DETALHES, (id_comprador,))
         rows = cursor.fetchall()
@@ -169,7 +214,7 @@ def obter_por_comprador_com_detalhes(id_comprador: int) -> list[Pedido]:
 
 def obter_por_vendedor_com_detalhes(id_vendedor: int) -> list[Pedido]:
     """Obtém pedidos de um vendedor com detalhes do produto e comprador"""
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_VENDEDOR_COM_DETALHES, (id_vendedor,))
         rows = cursor.fetchall()
@@ -11,6 +11,9 @@ from sql.usuario_sql import (
     OBTER_POR_ID,
     OBTER_TODOS,
     OBTER_QUANTIDADE,
+    FILTRO_CURSOR_NOME,
+    OBTER_POR_CURSOR,
+    CONTAR_POR_PERFIL,
     OBTER_POR_EMAIL,
     ATUALIZAR_TOKEN,
     OBTER_POR_TOKEN,
@@ -18,8 +21,9 @@ from sql.usuario_sql import (
     OBTER_TODOS_POR_PERFIL,
     BUSCAR_POR_TERMO,
 )
-from util.db_util import obter_conexao
+from util.db_util import obter_conexao, obter_conexao_leitura
 from util.foto_util import criar_foto_padrao_usuario
+from util.paginacao_util import decodificar_cursor, fatiar_pagina
 
 
 def _row_to_usuario(row: sqlite3.Row) -> Usuario:
@@ -97,7 +101,7 @@ def excluir(id: int) -> bool:
 
 
 def obter_por_id(id: int) -> Optional[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_ID, (id,))
         row = cursor.fetchone()
@@ -107,15 +111,54 @@ def obter_por_id(id: int) -> Optional[Usuario]:
 
 
 def obter_todos() -> list[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS)
         rows = cursor.fetchall()
         return [_row_to_usuario(row) for row in rows]
 
 
+def obter_por_cursor(
+    cursor: Optional[str] = None, limite: int = 50
+) -> tuple[list[Usuario], Optional[str]]:
+    """
+    Obtém uma página de usuários ordenados por nome (paginação por cursor).
+
+    Args:
+        cursor: Cursor retornado pela página anterior (None = primeira página)
+        limite: Quantidade máxima de usuários na página
+
+    Returns:
+        Tupla com (lista de usuários, cursor da próxima página ou None)
+    """
+    chave = decodificar_cursor(cursor, 2)
+    filtro = FILTRO_CURSOR_NOME if chave else ""
+    params = (*(chave or ()), limite + 1)
+
+    with obter_conexao_leitura() as conn:
+        cur = conn.cursor()
+        cur.execute(OBTER_POR_CURSOR.format(filtro_cursor=filtro), params)
+        rows, proximo = fatiar_pagina(
+            cur.fetchall(), limite, lambda row: (row["nome"], row["id"])
+        )
+        return [_row_to_usuario(row) for row in rows], proximo
+
+
+def contar_por_perfil() -> dict[str, int]:
+    """
+    Conta usuários agrupados por perfil.
+
+    Returns:
+        Dicionário {perfil: quantidade}
+    """
+    with obter_conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_POR_PERFIL)
+        return {row["perfil"]: row["quantidade"] for row in cursor.fetchall()}
+
+
 def obter_quantidade() -> int:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_QUANTIDADE)
         row = cursor.fetchone()
@@ -123,7 +166,7 @@ def obter_quantidade() -> int:
 
 
 def obter_por_email(email: str) -> Optional[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_EMAIL, (email,))
         row = cursor.fetchone()
@@ -140,7 +183,7 @@ def atualizar_token(email: str, token: str, data_expiracao: datetime) -> bool:
 
 
 def obter_por_token(token: str) -> Optional[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_POR_TOKEN, (token,))
         row = cursor.fetchone()
@@ -157,7 +200,7 @@ def limpar_token(id: int) -> bool:
 
 
 def obter_todos_por_perfil(perfil: str) -> list[Usuario]:
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(OBTER_TODOS_POR_PERFIL, (perfil,))
         rows = cursor.fetchall()
@@ -175,7 +218,7 @@ def buscar_por_termo(termo: str, limit: int = 10) -> list[Usuario]:
     Returns:
         Lista de usuários que correspondem à busca
     """
-    with obter_conexao() as conn:
+    with obter_conexao_leitura() as conn:
         cursor = conn.cursor()
         cursor.execute(BUSCAR_POR_TERMO, (f"%{termo}%", f"%{termo}%", limit))
         rows = cursor.fetchall()
@@ -23,6 +23,7 @@ from model.usuario_logado_model import UsuarioLogado
 from repo import configuracao_repo
 
 # Utilities
+from util.assets import construir_assets
 from util.auth_decorator import requer_autenticacao
 from util.config_cache import config
 from util.datetime_util import agora
@@ -184,7 +185,10 @@ async def post_salvar_lote_configuracoes(
             configuracao_repo.atualizar_multiplas(dto.configs)
         )
 
-        # Limpar cache de configurações
+        # Recarregar o cache deste worker imediatamente (nova geração: os
+        # rate limiters dinâmicos releem seus limites na próxima verificação).
+        # Os demais workers detectam a nova versão das configurações em até
+        # CONFIG_CACHE_VERIFICACAO_SEGUNDOS.
         config.limpar()
 
         # Log de auditoria
@@ -344,6 +348,10 @@ async def post_aplicar_tema(
         css_destino = Path("static/css/bootstrap.min.css")
         shutil.copy2(css_origem, css_destino)
 
+        # Nova versão com hash do bootstrap.min.css; os demais workers
+        # detectam o manifesto atualizado
+        construir_assets()
+
         # Atualizar ou inserir configuração no banco (upsert)
         sucesso = configuracao_repo.inserir_ou_atualizar(
             chave="theme",
@@ -352,7 +360,7 @@ async def post_aplicar_tema(
         )
 
         if sucesso:
-            # Limpar cache de configurações
+            # Recarregar o cache deste worker (os demais detectam a nova versão)
             config.limpar()
 
             logger.info(
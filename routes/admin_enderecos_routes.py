@@ -4,6 +4,7 @@ from fastapi.responses import RedirectResponse
 
 from repo import endereco_repo, usuario_repo, pedido_repo
 from util.auth_decorator import requer_autenticacao
+from util.repo_executor import executar_repo
 from util.template_util import criar_templates
 from util.logger_config import logger
 from util.perfis import Perfil
@@ -54,18 +55,18 @@ async def listar(
     try:
         # Buscar endereços
         if uf_filtro:
-            enderecos = endereco_repo.obter_por_uf(uf_filtro)
+            enderecos = await executar_repo(endereco_repo.obter_por_uf, uf_filtro)
             logger.info(
                 f"Admin {usuario_logado['id']} listou endereços da UF {uf_filtro}"
             )
         else:
-            enderecos = endereco_repo.obter_todos()
+            enderecos = await executar_repo(endereco_repo.obter_todos)
             logger.info(f"Admin {usuario_logado['id']} listou todos os endereços")
 
         # Carregar informações dos usuários
         enderecos_com_usuario = []
         for endereco in enderecos:
-            usuario = usuario_repo.obter_por_id(endereco.id_usuario)
+            usuario = await executar_repo(usuario_repo.obter_por_id, endereco.id_usuario)
             enderecos_com_usuario.append({"endereco": endereco, "usuario": usuario})
 
         # Obter lista de UFs para o filtro
@@ -104,7 +105,7 @@ async def detalhes(request: Request, id: int, usuario_logado: Optional[dict] = N
 
     try:
         # Buscar endereço
-        endereco = endereco_repo.obter_por_id(id)
+        endereco = await executar_repo(endereco_repo.obter_por_id, id)
         if not endereco:
             logger.warning(f"Endereço {id} não encontrado")
             return RedirectResponse(
@@ -112,11 +113,10 @@ async def detalhes(request: Request, id: int, usuario_logado: Optional[dict] = N
             )
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_id(endereco.id_usuario)
+        usuario = await executar_repo(usuario_repo.obter_por_id, endereco.id_usuario)
 
         # Buscar pedidos que usaram este endereço
-        todos_pedidos = pedido_repo.obter_todos()
-        pedidos_endereco = [p for p in todos_pedidos if p.id_endereco == id]
+        pedidos_endereco = await executar_repo(pedido_repo.obter_por_endereco, id)
 
         logger.info(
             f"Admin {usuario_logado['id']} visualizou detalhes do endereço {id}"
@@ -154,9 +154,9 @@ async def estatisticas(request: Request, usuario_logado: Optional[dict] = None):
 
     try:
         # Buscar estatísticas
-        stats = endereco_repo.obter_estatisticas()
-        por_uf = endereco_repo.contar_por_uf()
-        por_cidade = endereco_repo.contar_por_cidade()
+        stats = await executar_repo(endereco_repo.obter_estatisticas)
+        por_uf = await executar_repo(endereco_repo.contar_por_uf)
+        por_cidade = await executar_repo(endereco_repo.contar_por_cidade)
 
         logger.info(
             f"Admin {usuario_logado['id']} visualizou estatísticas de endereços"
@@ -194,7 +194,7 @@ async def duplicados(request: Request, usuario_logado: Optional[dict] = None):
 
     try:
         # Buscar endereços duplicados
-        duplicados_list = endereco_repo.obter_duplicados()
+        duplicados_list = await executar_repo(endereco_repo.obter_duplicados)
 
         logger.info(
             f"Admin {usuario_logado['id']} visualizou detecção de endereços duplicados"
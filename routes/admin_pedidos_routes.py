@@ -1,9 +1,11 @@
 from typing import Optional
+from urllib.parse import urlencode
 from fastapi import APIRouter, Form, Request, status
 from fastapi.responses import RedirectResponse
 
 from repo import pedido_repo, anuncio_repo, endereco_repo, usuario_repo
 from util.auth_decorator import requer_autenticacao
+from util.repo_executor import executar_repo
 from util.template_util import criar_templates
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
@@ -13,6 +15,9 @@ from util.rate_limiter import RateLimiter, obter_identificador_cliente
 router = APIRouter(prefix="/admin/pedidos")
 templates = criar_templates()
 
+# Quantidade de pedidos por página na listagem
+PEDIDOS_POR_PAGINA = 50
+
 # Rate limiter para operações admin
 admin_pedidos_limiter = RateLimiter(
     max_tentativas=10,
@@ -35,19 +40,24 @@ async def index(request: Request, usuario_logado: Optional[dict] = None):
 async def listar(
     request: Request,
     status_filtro: Optional[str] = None,
+    cursor: Optional[str] = None,
     usuario_logado: Optional[dict] = None,
 ):
-    """Lista todos os pedidos do sistema com filtro opcional por status"""
-    if status_filtro and status_filtro != "todos":
-        pedidos = pedido_repo.obter_por_status(status_filtro)
-    else:
-        pedidos = pedido_repo.obter_todos()
+    """Lista os pedidos do sistema com filtro opcional por status (paginação por cursor)"""
+    status_pedido = status_filtro if status_filtro and status_filtro != "todos" else None
+    pedidos, proximo_cursor = await executar_repo(
+        pedido_repo.obter_por_cursor,
+        cursor, PEDIDOS_POR_PAGINA, status_pedido
+    )
 
-    # Carregar dados relacionados para exibição
+    # Carregar dados relacionados para exibição (endereços em uma só consulta)
+    enderecos = await executar_repo(
+        endereco_repo.obter_por_ids, [pedido.id_endereco for pedido in pedidos]
+    )
     for pedido in pedidos:
-        pedido.anuncio = anuncio_repo.obter_por_id(pedido.id_anuncio)
-        pedido.comprador = usuario_repo.obter_por_id(pedido.id_comprador)
-        pedido.endereco = endereco_repo.obter_por_id(pedido.id_endereco)
+        pedido.anuncio = await executar_repo(anuncio_repo.obter_por_id, pedido.id_anuncio)
+        pedido.comprador = await executar_repo(usuario_repo.obter_por_id, pedido.id_comprador)
+        pedido.endereco = enderecos.get(pedido.id_endereco)
 
     return templates.TemplateResponse(
         "admin/pedidos/listar.html",
@@ -55,6 +65,12 @@ async def listar(
             "request": request,
             "pedidos": pedidos,
             "status_filtro": status_filtro or "todos",
+            "total_pedidos": await executar_repo(pedido_repo.contar, status_pedido),
+            "cursor_atual": cursor,
+            "proximo_cursor": proximo_cursor,
+            "parametros_filtro": (
+                urlencode({"status_filtro": status_pedido}) if status_pedido else ""
+            ),
         },
     )
 
@@ -63,7 +79,7 @@ async def listar(
 @requer_autenticacao([Perfil.ADMIN.value])
 async def detalhes(request: Request, id: int, usuario_logado: Optional[dict] = None):
     """Exibe detalhes completos de um pedido"""
-    pedido = pedido_repo.obter_por_id(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado")
@@ -72,12 +88,14 @@ async def detalhes(request: Request, id: int, usuario_logado: Optional[dict] = N
         )
 
     # Carregar dados relacionados
-    pedido.anuncio = anuncio_repo.obter_por_id(pedido.id_anuncio)
-    pedido.comprador = usuario_repo.obter_por_id(pedido.id_comprador)
-    pedido.endereco = endereco_repo.obter_por_id(pedido.id_endereco)
+    pedido.anuncio = await executar_repo(anuncio_repo.obter_por_id, pedido.id_anuncio)
+    pedido.comprador = await executar_repo(usuario_repo.obter_por_id, pedido.id_comprador)
+    pedido.endereco = await executar_repo(endereco_repo.obter_por_id, pedido.id_endereco)
 
     if pedido.anuncio:
-        pedido.anuncio.vendedor = usuario_repo.obter_por_id(pedido.anuncio.id_vendedor)
+        pedido.anuncio.vendedor = await executar_repo(
+            usuario_repo.obter_por_id, pedido.anuncio.id_vendedor
+        )
 
     return templates.TemplateResponse(
         "admin/pedidos/detalhes.html", {"request": request, "pedido": pedido}
@@ -105,7 +123,7 @@ async def cancelar(
             "/admin/pedidos/listar", status_code=status.HTTP_303_SEE_OTHER
         )
 
-    pedido = pedido_repo.obter_por_id(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado")
@@ -120,7 +138,7 @@ async def cancelar(
         )
 
     try:
-        pedido_repo.cancelar(id)
+        await executar_repo(pedido_repo.cancelar, id)
         logger.info(
             f"Pedido {id} cancelado por admin {usuario_logado['id']} (admin override)"
         )
@@ -138,7 +156,7 @@ async def cancelar(
 @requer_autenticacao([Perfil.ADMIN.value])
 async def estatisticas(request: Request, usuario_logado: Optional[dict] = None):
     """Exibe estatísticas gerais sobre pedidos"""
-    todos = pedido_repo.obter_todos()
+    todos = await executar_repo(pedido_repo.obter_todos)
 
     stats = {
         "total": len(todos),
@@ -7,6 +7,7 @@ from dtos.anuncio_dto import AlterarAnuncioDTO, ModerarProdutoDTO
 from model.anuncio_model import Anuncio
 from repo import anuncio_repo, categoria_repo
 from util.auth_decorator import requer_autenticacao
+from util.repo_executor import executar_repo
 from util.template_util import criar_templates
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
@@ -17,6 +18,9 @@ from util.rate_limiter import RateLimiter, obter_identificador_cliente
 router = APIRouter(prefix="/admin/produtos")
 templates = criar_templates()
 
+# Quantidade de produtos por página na listagem
+PRODUTOS_POR_PAGINA = 50
+
 # Rate limiter para operações admin
 admin_produtos_limiter = RateLimiter(
     max_tentativas=10,
@@ -36,13 +40,27 @@ async def index(request: Request, usuario_logado: Optional[dict] = None):
 
 @router.get("/listar")
 @requer_autenticacao([Perfil.ADMIN.value])
-async def listar(request: Request, usuario_logado: Optional[dict] = None):
-    """Lista todos os produtos do sistema"""
-    # Obter todos os anúncios (ativos e inativos)
-    anuncios = anuncio_repo.obter_todos()
+async def listar(
+    request: Request,
+    cursor: Optional[str] = None,
+    usuario_logado: Optional[dict] = None,
+):
+    """Lista todos os produtos do sistema (paginação por cursor)"""
+    # Obter uma página de anúncios (ativos e inativos)
+    anuncios, proximo_cursor = await executar_repo(
+        anuncio_repo.obter_todos_por_cursor,
+        cursor, PRODUTOS_POR_PAGINA
+    )
 
     return templates.TemplateResponse(
-        "admin/produtos/listar.html", {"request": request, "anuncios": anuncios}
+        "admin/produtos/listar.html",
+        {
+            "request": request,
+            "anuncios": anuncios,
+            "total_anuncios": await executar_repo(anuncio_repo.contar_todos),
+            "cursor_atual": cursor,
+            "proximo_cursor": proximo_cursor,
+        },
     )
 
 
@@ -51,7 +69,7 @@ async def listar(request: Request, usuario_logado: Optional[dict] = None):
 async def moderar(request: Request, usuario_logado: Optional[dict] = None):
     """Lista produtos pendentes de moderação ou inativos"""
     # Obter todos os produtos inativos (pendentes de aprovação)
-    anuncios = anuncio_repo.obter_todos()
+    anuncios = await executar_repo(anuncio_repo.obter_todos)
     anuncios_pendentes = [a for a in anuncios if not a.ativo]
 
     return templates.TemplateResponse(
@@ -81,7 +99,7 @@ async def aprovar(
             "/admin/produtos/moderar", status_code=status.HTTP_303_SEE_OTHER
         )
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Produto não encontrado")
@@ -91,7 +109,7 @@ async def aprovar(
 
     # Ativar produto
     anuncio.ativo = True
-    anuncio_repo.alterar(anuncio)
+    await executar_repo(anuncio_repo.alterar, anuncio)
 
     logger.info(
         f"Produto {id} ({anuncio.nome}) aprovado por admin {usuario_logado['id']}"
@@ -124,7 +142,7 @@ async def reprovar(
             "/admin/produtos/moderar", status_code=status.HTTP_303_SEE_OTHER
         )
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Produto não encontrado")
@@ -160,7 +178,7 @@ async def reprovar(
 @requer_autenticacao([Perfil.ADMIN.value])
 async def get_editar(request: Request, id: int, usuario_logado: Optional[dict] = None):
     """Exibe formulário de edição de produto (admin)"""
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Produto não encontrado")
@@ -210,7 +228,7 @@ async def post_editar(
         )
 
     # Verificar se anúncio existe
-    anuncio_atual = anuncio_repo.obter_por_id(id)
+    anuncio_atual = await executar_repo(anuncio_repo.obter_por_id, id)
     if not anuncio_atual:
         informar_erro(request, "Produto não encontrado")
         return RedirectResponse(
@@ -259,7 +277,7 @@ async def post_editar(
             data_cadastro=anuncio_atual.data_cadastro,  # Mantém data original
         )
 
-        anuncio_repo.alterar(anuncio_atualizado)
+        await executar_repo(anuncio_repo.alterar, anuncio_atualizado)
         logger.info(f"Produto {id} editado por admin {usuario_logado['id']}")
 
         informar_sucesso(request, "Produto alterado com sucesso!")
@@ -269,7 +287,7 @@ async def post_editar(
 
     except ValidationError as e:
         # Adicionar dados necessários para renderizar o template
-        dados_formulario["anuncio"] = anuncio_repo.obter_por_id(id)
+        dados_formulario["anuncio"] = await executar_repo(anuncio_repo.obter_por_id, id)
         dados_formulario["categorias"] = categoria_repo.obter_todos()
         raise ErroValidacaoFormulario(
             validation_error=e,
@@ -300,7 +318,7 @@ async def post_excluir(
             "/admin/produtos/listar", status_code=status.HTTP_303_SEE_OTHER
         )
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Produto não encontrado")
@@ -309,7 +327,7 @@ async def post_excluir(
         )
 
     try:
-        anuncio_repo.excluir(id)
+        await executar_repo(anuncio_repo.excluir, id)
         logger.info(
             f"Produto {id} ({anuncio.nome}) excluído por admin {usuario_logado['id']}"
         )
@@ -27,8 +27,9 @@ from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.repo_executor import executar_repo
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha
+from util.security import criar_hash_senha_async
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -39,6 +40,9 @@ from util.validation_helpers import verificar_email_disponivel
 router = APIRouter(prefix="/admin/usuarios")
 templates = criar_templates()
 
+# Quantidade de usuários por página na listagem
+USUARIOS_POR_PAGINA = 50
+
 # =============================================================================
 # Rate Limiters
 # =============================================================================
@@ -65,14 +69,29 @@ async def index(request: Request, usuario_logado: Optional[UsuarioLogado] = None
 
 @router.get("/listar")
 @requer_autenticacao([Perfil.ADMIN.value])
-async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
-    """Lista todos os usuários do sistema"""
+async def listar(
+    request: Request,
+    cursor: Optional[str] = None,
+    usuario_logado: Optional[UsuarioLogado] = None,
+):
+    """Lista os usuários do sistema (paginação por cursor)"""
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
-    usuarios = usuario_repo.obter_todos()
+    usuarios, proximo_cursor = await executar_repo(
+        usuario_repo.obter_por_cursor, cursor, USUARIOS_POR_PAGINA
+    )
+    totais_perfil = await executar_repo(usuario_repo.contar_por_perfil)
     return templates.TemplateResponse(
         "admin/usuarios/listar.html",
-        {"request": request, "usuarios": usuarios, "usuario_logado": usuario_logado},
+        {
+            "request": request,
+            "usuarios": usuarios,
+            "usuario_logado": usuario_logado,
+            "total_usuarios": sum(totais_perfil.values()),
+            "totais_perfil": totais_perfil,
+            "cursor_atual": cursor,
+            "proximo_cursor": proximo_cursor,
+        },
     )
 
 
@@ -123,7 +142,7 @@ async def post_cadastrar(
         dto = CriarUsuarioDTO(nome=nome, email=email, senha=senha, perfil=perfil)
 
         # Verificar se e-mail já existe
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email)
+        disponivel, mensagem_erro = await executar_repo(verificar_email_disponivel, dto.email)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             perfis = Perfil.valores()
@@ -138,14 +157,14 @@ async def post_cadastrar(
             )
 
         # Criar hash da senha
-        senha_hash = criar_hash_senha(dto.senha)
+        senha_hash = await criar_hash_senha_async(dto.senha)
 
         # Criar usuário
         usuario = Usuario(
             id=0, nome=dto.nome, email=dto.email, senha=senha_hash, perfil=dto.perfil
         )
 
-        usuario_repo.inserir(usuario)
+        await executar_repo(usuario_repo.inserir, usuario)
         logger.info(f"Usuário '{dto.email}' cadastrado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário cadastrado com sucesso!")
@@ -174,7 +193,7 @@ async def get_editar(
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_repo(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar",
@@ -225,7 +244,7 @@ async def post_editar(
 
     # Obter usuário ou retornar 404
     usuario_atual = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_repo(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar",
@@ -241,7 +260,7 @@ async def post_editar(
         dto = AlterarUsuarioDTO(id=id, nome=nome, email=email, perfil=perfil)
 
         # Verificar se e-mail já existe em outro usuário
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email, id)
+        disponivel, mensagem_erro = await executar_repo(verificar_email_disponivel, dto.email, id)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             perfis = Perfil.valores()
@@ -265,7 +284,7 @@ async def post_editar(
             perfil=dto.perfil,
         )
 
-        usuario_repo.alterar(usuario_atualizado)
+        await executar_repo(usuario_repo.alterar, usuario_atualizado)
         logger.info(f"Usuário {id} alterado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário alterado com sucesso!")
@@ -276,7 +295,7 @@ async def post_editar(
     except ValidationError as e:
         # Adicionar perfis e usuario aos dados para renderizar o template
         dados_formulario["perfis"] = Perfil.valores()
-        dados_formulario["usuario"] = usuario_repo.obter_por_id(id)
+        dados_formulario["usuario"] = await executar_repo(usuario_repo.obter_por_id, id)
         raise ErroValidacaoFormulario(
             validation_error=e,
             template_path="admin/usuarios/editar.html",
@@ -309,7 +328,7 @@ async def post_excluir(
 
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_repo(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar",
@@ -325,7 +344,7 @@ async def post_excluir(
             "/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER
         )
 
-    usuario_repo.excluir(id)
+    await executar_repo(usuario_repo.excluir, id)
     logger.info(
         f"Usuário {id} ({usuario.email}) excluído por admin {usuario_logado.id}"
     )
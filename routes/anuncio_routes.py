@@ -23,10 +23,11 @@ from repo import anuncio_repo, categoria_repo
 # Utilities
 from util.auth_decorator import requer_autenticacao
 from util.exceptions import ErroValidacaoFormulario
-from util.flash_messages import informar_sucesso, informar_erro
-from util.foto_anuncio_util import salvar_foto_anuncio, excluir_foto_anuncio
+from util.flash_messages import informar_aviso, informar_erro, informar_sucesso
+from util.foto_anuncio_util import enfileirar_foto_anuncio, excluir_foto_anuncio
 from util.logger_config import logger
 from util.perfis import Perfil
+from util.repo_executor import executar_repo
 from util.template_util import criar_templates
 
 # =============================================================================
@@ -37,6 +38,34 @@ router = APIRouter(prefix="/vendedor/anuncios", tags=["Anúncios do Vendedor"])
 templates_anuncio = criar_templates()
 
 
+MSG_FOTO_NAO_PROCESSADA = (
+    "não foi possível processar a foto agora. "
+    "Verifique se o arquivo é uma imagem válida e envie-a novamente na edição do anúncio."
+)
+
+
+def _enviar_foto(request: Request, id_anuncio: int, foto_base64: str, id_vendedor: int) -> bool:
+    """
+    Envia a foto do anúncio, se houver, para o pool de processamento de imagens.
+
+    A tarefa fica na sessão para que a listagem acompanhe o processamento e
+    avise o vendedor se ele falhar.
+
+    Returns:
+        False se a foto foi enviada mas recusada (base64 inválido ou fila cheia)
+    """
+    if not foto_base64 or len(foto_base64) <= 100:
+        return True
+
+    tarefa = enfileirar_foto_anuncio(id_anuncio, foto_base64, id_vendedor)
+    if not tarefa:
+        logger.warning(f"Foto do anúncio {id_anuncio} não enviada para processamento")
+        return False
+
+    request.session["tarefa_foto_anuncio"] = tarefa.id
+    return True
+
+
 # =============================================================================
 # Rotas
 # =============================================================================
@@ -48,7 +77,7 @@ async def listar_anuncios(request: Request, usuario_logado: Optional[UsuarioLoga
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    anuncios = anuncio_repo.obter_por_vendedor(usuario_logado.id)
+    anuncios = await executar_repo(anuncio_repo.obter_por_vendedor, usuario_logado.id)
 
     return templates_anuncio.TemplateResponse(
         "vendedor/anuncios/listar.html",
@@ -56,6 +85,8 @@ async def listar_anuncios(request: Request, usuario_logado: Optional[UsuarioLoga
             "request": request,
             "anuncios": anuncios,
             "usuario_logado": usuario_logado,
+            # Foto recém-enviada ainda em processamento (ver cadastrar/editar)
+            "tarefa_foto": request.session.pop("tarefa_foto_anuncio", None),
         },
     )
 
@@ -130,14 +161,14 @@ async def post_cadastrar_anuncio(
         )
 
         # Inserir no banco
-        anuncio_inserido = anuncio_repo.inserir(anuncio)
+        anuncio_inserido = await executar_repo(anuncio_repo.inserir, anuncio)
         if anuncio_inserido:
-            # Salvar foto se foi enviada
-            if foto_base64 and len(foto_base64) > 100:
-                salvar_foto_anuncio(anuncio_inserido.id, foto_base64)
-
             logger.info(f"Anúncio cadastrado ID: {anuncio_inserido.id} - Vendedor: {usuario_logado.id}")
-            informar_sucesso(request, "Anúncio cadastrado com sucesso!")
+            # Processar foto em background (pool de imagens) se foi enviada
+            if _enviar_foto(request, anuncio_inserido.id, foto_base64, usuario_logado.id):
+                informar_sucesso(request, "Anúncio cadastrado com sucesso!")
+            else:
+                informar_aviso(request, f"Anúncio cadastrado, mas {MSG_FOTO_NAO_PROCESSADA}")
             return RedirectResponse(
                 url="/vendedor/anuncios",
                 status_code=status.HTTP_303_SEE_OTHER
@@ -173,7 +204,7 @@ async def get_editar_anuncio(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Anúncio não encontrado.")
@@ -223,7 +254,7 @@ async def post_editar_anuncio(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Anúncio não encontrado.")
@@ -268,13 +299,13 @@ async def post_editar_anuncio(
         anuncio.ativo = dto.ativo
 
         # Salvar no banco
-        if anuncio_repo.alterar(anuncio):
-            # Salvar foto se foi enviada nova
-            if foto_base64 and len(foto_base64) > 100:
-                salvar_foto_anuncio(anuncio.id, foto_base64)
-
+        if await executar_repo(anuncio_repo.alterar, anuncio):
             logger.info(f"Anúncio atualizado ID: {anuncio.id} - Vendedor: {usuario_logado.id}")
-            informar_sucesso(request, "Anúncio atualizado com sucesso!")
+            # Processar nova foto em background (pool de imagens) se foi enviada
+            if _enviar_foto(request, anuncio.id, foto_base64, usuario_logado.id):
+                informar_sucesso(request, "Anúncio atualizado com sucesso!")
+            else:
+                informar_aviso(request, f"Anúncio atualizado, mas {MSG_FOTO_NAO_PROCESSADA}")
             return RedirectResponse(
                 url="/vendedor/anuncios",
                 status_code=status.HTTP_303_SEE_OTHER
@@ -314,7 +345,7 @@ async def post_excluir_anuncio(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Anúncio não encontrado.")
@@ -331,7 +362,7 @@ async def post_excluir_anuncio(
             status_code=status.HTTP_303_SEE_OTHER
         )
 
-    if anuncio_repo.excluir(id):
+    if await executar_repo(anuncio_repo.excluir, id):
         # Excluir foto do anúncio
         excluir_foto_anuncio(id)
         logger.info(f"Anúncio excluído ID: {id} - Vendedor: {usuario_logado.id}")
@@ -357,7 +388,7 @@ async def post_toggle_ativo(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    anuncio = anuncio_repo.obter_por_id(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
 
     if not anuncio:
         informar_erro(request, "Anúncio não encontrado.")
@@ -377,7 +408,7 @@ async def post_toggle_ativo(
     # Toggle status
     anuncio.ativo = not anuncio.ativo
 
-    if anuncio_repo.alterar(anuncio):
+    if await executar_repo(anuncio_repo.alterar, anuncio):
         status_msg = "ativado" if anuncio.ativo else "desativado"
         logger.info(f"Anúncio {status_msg} ID: {id} - Vendedor: {usuario_logado.id}")
         informar_sucesso(request, f"Anúncio {status_msg} com sucesso!")
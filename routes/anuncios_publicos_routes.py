@@ -4,6 +4,7 @@
 
 # Standard library
 from typing import Optional
+from urllib.parse import urlencode
 import math
 
 # Third-party
@@ -17,7 +18,12 @@ from repo import anuncio_repo, categoria_repo
 
 # Utilities
 from util.auth_decorator import obter_usuario_logado
+from util.cache_paginas import GRUPO_ANUNCIOS, GRUPO_CATEGORIAS, cache_paginas
+from util.foto_anuncio_util import manifesto_fotos_anuncios
 from util.flash_messages import informar_erro
+from util.paginacao_util import cache_totais
+from util.repo_executor import executar_repo
+from util.respostas_condicionais import responder_condicional
 from util.template_util import criar_templates
 
 # =============================================================================
@@ -30,6 +36,9 @@ templates_anuncios = criar_templates()
 # Configuracoes de paginacao
 ANUNCIOS_POR_PAGINA = 12
 
+# Dados exibidos na listagem publica (anuncios e filtro de categorias)
+GRUPOS_LISTAGEM = (GRUPO_ANUNCIOS, GRUPO_CATEGORIAS)
+
 
 # =============================================================================
 # Rotas
@@ -42,22 +51,83 @@ async def listar_anuncios(
     busca: Optional[str] = Query(None, description="Termo de busca"),
     categoria: Optional[int] = Query(None, description="ID da categoria"),
     ordenar: Optional[str] = Query(None, description="Ordenacao"),
+    cursor: Optional[str] = Query(None, description="Cursor da pagina (paginacao por data)"),
 ):
     """Lista anuncios publicos com paginacao e filtros"""
+    # 304 se nada mudou desde a copia do cliente; senao, visitantes anonimos
+    # recebem a pagina do cache (chave: rota + query), valida apenas para a
+    # mesma versao dos dados
+    versao = await _validador_listagem()
+    return await responder_condicional(
+        request,
+        versao,
+        lambda: cache_paginas.responder(
+            request,
+            GRUPOS_LISTAGEM,
+            lambda: _renderizar_listagem(request, pagina, busca, categoria, ordenar, cursor),
+            versao=versao,
+        ),
+    )
+
+
+async def _validador_listagem():
+    """Versao dos anuncios, das categorias e das fotos (ETag da listagem)"""
+    return [
+        await executar_repo(anuncio_repo.obter_versao),
+        categoria_repo.obter_versao_catalogo(),
+        manifesto_fotos_anuncios.obter_assinatura(),
+    ]
+
+
+async def _renderizar_listagem(
+    request: Request,
+    pagina: int,
+    busca: Optional[str],
+    categoria: Optional[int],
+    ordenar: Optional[str],
+    cursor: Optional[str],
+):
+    """Consulta os anuncios e renderiza a listagem publica"""
     usuario_logado: Optional[UsuarioLogado] = obter_usuario_logado(request)
 
-    # Buscar anuncios com filtros
-    anuncios, total = anuncio_repo.obter_ativos_paginados(
-        pagina=pagina,
-        por_pagina=ANUNCIOS_POR_PAGINA,
-        termo=busca,
-        id_categoria=categoria,
-        ordenar_por=ordenar
-    )
+    # Na ordem por data (padrao sem busca) a paginacao e por cursor, sem
+    # OFFSET; links antigos com ?pagina=N sem cursor seguem por OFFSET
+    ordem_por_data = ordenar == "data_desc" or (not ordenar and not busca)
+    modo_cursor = ordem_por_data and (cursor is not None or pagina == 1)
+
+    proximo_cursor = None
+    if modo_cursor:
+        anuncios, proximo_cursor = await executar_repo(
+            anuncio_repo.obter_ativos_por_cursor,
+            cursor=cursor,
+            por_pagina=ANUNCIOS_POR_PAGINA,
+            termo=busca,
+            id_categoria=categoria
+        )
+        # Total aproximado: reaproveitado por alguns segundos entre paginas
+        total = await executar_repo(
+            cache_totais.obter,
+            ("anuncios_ativos", busca or "", categoria),
+            lambda: anuncio_repo.contar_ativos(termo=busca, id_categoria=categoria)
+        )
+    else:
+        # Buscar anuncios com filtros
+        anuncios, total = await executar_repo(
+            anuncio_repo.obter_ativos_paginados,
+            pagina=pagina,
+            por_pagina=ANUNCIOS_POR_PAGINA,
+            termo=busca,
+            id_categoria=categoria,
+            ordenar_por=ordenar
+        )
 
     # Calcular paginacao
     total_paginas = math.ceil(total / ANUNCIOS_POR_PAGINA) if total > 0 else 1
 
+    # Filtros atuais para os links de paginacao
+    filtros = {"busca": busca, "categoria": categoria, "ordenar": ordenar}
+    parametros_filtro = urlencode({k: v for k, v in filtros.items() if v})
+
     # Obter categorias para o filtro
     categorias = categoria_repo.obter_todos()
 
@@ -76,16 +146,44 @@ async def listar_anuncios(
             "pagina_atual": pagina,
             "total_paginas": total_paginas,
             "total_anuncios": total,
+            "modo_cursor": modo_cursor,
+            "cursor_atual": cursor,
+            "proximo_cursor": proximo_cursor,
+            "parametros_filtro": parametros_filtro,
         },
     )
 
 @router.get("/{id}")
 async def detalhes_anuncio(request: Request, id: int):
     """Exibe detalhes de um anuncio"""
+    # 304 se o anuncio, a categoria, o vendedor e a foto nao mudaram
+    return await responder_condicional(
+        request,
+        await _validador_detalhes(id),
+        lambda: _renderizar_detalhes(request, id),
+    )
+
+
+async def _validador_detalhes(id: int):
+    """Dados de que a pagina de detalhes depende (ETag), sem montar o anuncio"""
+    dados = await executar_repo(anuncio_repo.obter_versao_detalhes, id)
+    # Anuncio inexistente ou indisponivel: a pagina traz uma flash message
+    if not dados or not dados["ativo"] or dados["estoque"] <= 0:
+        return None
+    foto = manifesto_fotos_anuncios.obter(id)
+    return [
+        dados,
+        categoria_repo.obter_nome(dados["id_categoria"]),
+        [foto.versao, sorted(foto.variantes)] if foto else None,
+    ]
+
+
+async def _renderizar_detalhes(request: Request, id: int):
+    """Consulta o anuncio e renderiza a pagina de detalhes"""
     usuario_logado: Optional[UsuarioLogado] = obter_usuario_logado(request)
 
     # Buscar anuncio com detalhes
-    anuncio = anuncio_repo.obter_por_id_com_detalhes(id)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id_com_detalhes, id)
 
     if not anuncio:
         informar_erro(request, "Anúncio não encontrado.")
@@ -27,9 +27,10 @@ from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.repo_executor import executar_repo
 from util.security import (
-    criar_hash_senha,
-    verificar_senha,
+    criar_hash_senha_async,
+    verificar_e_atualizar_senha_async,
     gerar_token_redefinicao,
     obter_data_expiracao_token,
 )
@@ -173,10 +174,15 @@ async def post_login(
         dto = LoginDTO(email=email, senha=senha)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await executar_repo(usuario_repo.obter_por_email, dto.email)
 
-        # Verificar credenciais
-        if not usuario or not verificar_senha(dto.senha, usuario.senha):
+        # Verificar credenciais (bcrypt no pool de processos)
+        senha_valida, novo_hash = (
+            await verificar_e_atualizar_senha_async(dto.senha, usuario.senha)
+            if usuario
+            else (False, None)
+        )
+        if not senha_valida:
             informar_erro(request, "E-mail ou senha inválidos")
             logger.warning(f"Tentativa de login falhou para: {dto.email}")
             erros = {"geral": "E-mail ou senha inválidos"}
@@ -190,6 +196,11 @@ async def post_login(
                 },
             )
 
+        # Hash com custo antigo: regravar com o custo atual (SENHA_BCRYPT_ROUNDS)
+        if novo_hash:
+            await executar_repo(usuario_repo.atualizar_senha, usuario.id, novo_hash)
+            logger.info(f"Hash de senha atualizado no login: {usuario.email}")
+
         # Salvar sessão
         usuario_logado = UsuarioLogado.from_usuario(usuario)
         criar_sessao(request, usuario_logado)
@@ -261,7 +272,7 @@ async def post_cadastrar(
         )
 
         # Verificar se e-mail já existe
-        disponivel, mensagem_erro = verificar_email_disponivel(dto.email)
+        disponivel, mensagem_erro = await executar_repo(verificar_email_disponivel, dto.email)
         if not disponivel:
             informar_erro(request, mensagem_erro)
             return templates.TemplateResponse(
@@ -273,12 +284,12 @@ async def post_cadastrar(
             id=0,
             nome=dto.nome,
             email=dto.email,
-            senha=criar_hash_senha(dto.senha),
+            senha=await criar_hash_senha_async(dto.senha),
             perfil=dto.perfil,
         )
 
         # Inserir no banco
-        usuario_id = usuario_repo.inserir(usuario)
+        usuario_id = await executar_repo(usuario_repo.inserir, usuario)
 
         if usuario_id:
             logger.info(f"Novo usuário cadastrado: {usuario.email}")
@@ -334,7 +345,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
         dto = EsqueciSenhaDTO(email=email)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await executar_repo(usuario_repo.obter_por_email, dto.email)
 
         if usuario:
             # Gerar token de redefinição
@@ -342,7 +353,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
             data_expiracao = obter_data_expiracao_token(horas=TOKEN_EXPIRACAO_HORAS)
 
             # Salvar token no banco
-            usuario_repo.atualizar_token(usuario.email, token, data_expiracao)
+            await executar_repo(usuario_repo.atualizar_token, usuario.email, token, data_expiracao)
 
             # Enviar e-mail com link de recuperação
             email_enviado = servico_email.enviar_recuperacao_senha(
@@ -376,7 +387,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
 async def get_redefinir_senha(request: Request, token: str):
     """Exibe formulário de redefinição de senha"""
     # Validar token
-    usuario = usuario_repo.obter_por_token(token)
+    usuario = await executar_repo(usuario_repo.obter_por_token, token)
 
     if not usuario or not usuario.data_token:
         informar_erro(request, "Token inválido ou expirado")
@@ -421,7 +432,7 @@ async def post_redefinir_senha(
         )
 
         # Validar token e expiração
-        usuario = usuario_repo.obter_por_token(dto.token)
+        usuario = await executar_repo(usuario_repo.obter_por_token, dto.token)
 
         if not usuario or not usuario.data_token:
             informar_erro(request, "Token inválido")
@@ -445,11 +456,11 @@ async def post_redefinir_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha)
-        usuario_repo.atualizar_senha(usuario.id, senha_hash)
+        senha_hash = await criar_hash_senha_async(dto.senha)
+        await executar_repo(usuario_repo.atualizar_senha, usuario.id, senha_hash)
 
         # Limpar token
-        usuario_repo.limpar_token(usuario.id)
+        await executar_repo(usuario_repo.limpar_token, usuario.id)
 
         logger.info(f"Senha redefinida com sucesso para usuário: {usuario.email}")
         informar_sucesso(
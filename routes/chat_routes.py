@@ -7,7 +7,6 @@ Rotas para o sistema de chat em tempo real.
 # =============================================================================
 
 # Standard library
-import json
 import asyncio
 from typing import Optional
 
@@ -32,12 +31,13 @@ from repo import (
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
-from util.chat_manager import gerenciador_chat
+from util.chat_manager import formatar_lote_sse, gerenciador_chat
 from util.datetime_util import agora
 from util.foto_util import obter_caminho_foto_usuario
 from util.logger_config import logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.repo_executor import executar_repo
 
 # =============================================================================
 # Configuração do Router
@@ -86,7 +86,8 @@ async def stream_mensagens(
 ):
     """
     Endpoint SSE para receber mensagens em tempo real.
-    Cada usuário mantém UMA conexão que recebe mensagens de TODAS as suas salas.
+    Cada conexão (aba) recebe mensagens de TODAS as salas do usuário; abas
+    diferentes do mesmo usuário mantêm conexões independentes.
     """
     if not usuario_logado:
         raise HTTPException(
@@ -99,20 +100,15 @@ async def stream_mensagens(
         queue = await gerenciador_chat.conectar(usuario_id)
         try:
             while True:
-                # Aguardar mensagem na fila
-                evento = await queue.get()
-
-                # Formatar como SSE
-                sse_data = f"data: {json.dumps(evento)}\n\n"
-                yield sse_data
-
-                # Pequeno delay para não sobrecarregar
-                await asyncio.sleep(0.1)
+                # Aguardar o próximo evento (ou o heartbeat) e enviar tudo o
+                # que já estiver na fila em uma única escrita
+                eventos = await queue.obter_lote()
+                yield formatar_lote_sse(eventos)
         except asyncio.CancelledError:
             logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
         finally:
-            # Desconectar ao fechar stream
-            await gerenciador_chat.desconectar(usuario_id)
+            # Desconectar ao fechar stream (apenas esta conexão/aba)
+            await gerenciador_chat.desconectar(usuario_id, queue.conexao_id)
 
     return StreamingResponse(
         event_generator(),
@@ -161,29 +157,36 @@ async def criar_ou_obter_sala(
             )
 
         # Verificar se outro usuário existe
-        outro_usuario = usuario_repo.obter_por_id(dto.outro_usuario_id)
+        outro_usuario = await executar_repo(usuario_repo.obter_por_id, dto.outro_usuario_id)
         if not outro_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado."
             )
 
         # Criar ou obter sala
-        sala = chat_sala_repo.criar_ou_obter_sala(
+        sala = await executar_repo(
+            chat_sala_repo.criar_ou_obter_sala,
             usuario_logado.id, dto.outro_usuario_id
         )
 
         # Adicionar participantes se sala foi recém-criada
-        participante1 = chat_participante_repo.obter_por_sala_e_usuario(
+        participante1 = await executar_repo(
+            chat_participante_repo.obter_por_sala_e_usuario,
             sala.id, usuario_logado.id
         )
         if not participante1:
-            chat_participante_repo.adicionar_participante(sala.id, usuario_logado.id)
+            await executar_repo(
+                chat_participante_repo.adicionar_participante, sala.id, usuario_logado.id
+            )
 
-        participante2 = chat_participante_repo.obter_por_sala_e_usuario(
+        participante2 = await executar_repo(
+            chat_participante_repo.obter_por_sala_e_usuario,
             sala.id, dto.outro_usuario_id
         )
         if not participante2:
-            chat_participante_repo.adicionar_participante(sala.id, dto.outro_usuario_id)
+            await executar_repo(
+                chat_participante_repo.adicionar_participante, sala.id, dto.outro_usuario_id
+            )
 
         return JSONResponse(
             status_code=status.HTTP_200_OK, content={"sala_id": sala.id}
@@ -218,74 +221,43 @@ async def listar_conversas(
             detail="Muitas requisições de listagem. Aguarde alguns minutos.",
         )
 
-    usuario_id = usuario_logado.id
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    conversas = []
-    for participacao in participacoes:
-        sala = chat_sala_repo.obter_por_id(participacao.sala_id)
-        if not sala:
-            continue
-
-        # Obter o outro participante da sala
-        participantes = chat_participante_repo.listar_por_sala(sala.id)
-        outro_participante = next(
-            (p for p in participantes if p.usuario_id != usuario_id), None
-        )
-
-        if not outro_participante:
-            continue
-
-        # Obter dados do outro usuário
-        outro_usuario = usuario_repo.obter_por_id(outro_participante.usuario_id)
-        if not outro_usuario:
-            continue
-
-        # Obter última mensagem
-        ultima_mensagem = chat_mensagem_repo.obter_ultima_mensagem_sala(sala.id)
-
-        # Contar não lidas
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            sala.id, usuario_id
-        )
-
-        conversa = {
-            "sala_id": sala.id,
+    # Uma única consulta já ordenada e paginada (sem N+1 por sala)
+    conversas = [
+        {
+            "sala_id": conversa.sala_id,
             "outro_usuario": {
-                "id": outro_usuario.id,
-                "nome": outro_usuario.nome,
-                "email": outro_usuario.email,
-                "foto_url": obter_caminho_foto_usuario(outro_usuario.id),
+                "id": conversa.outro_usuario_id,
+                "nome": conversa.outro_usuario_nome,
+                "email": conversa.outro_usuario_email,
+                "foto_url": obter_caminho_foto_usuario(conversa.outro_usuario_id),
             },
             "ultima_mensagem": (
                 {
-                    "mensagem": ultima_mensagem.mensagem,
+                    "mensagem": conversa.ultima_mensagem,
                     "data_envio": (
-                        ultima_mensagem.data_envio.isoformat()
-                        if ultima_mensagem.data_envio
+                        conversa.ultima_mensagem_data.isoformat()
+                        if conversa.ultima_mensagem_data
                         else None
                     ),
-                    "usuario_id": ultima_mensagem.usuario_id,
+                    "usuario_id": conversa.ultima_mensagem_usuario_id,
                 }
-                if ultima_mensagem
+                if conversa.ultima_mensagem is not None
                 else None
             ),
-            "nao_lidas": nao_lidas,
+            "nao_lidas": conversa.nao_lidas,
             "ultima_atividade": (
-                sala.ultima_atividade.isoformat() if sala.ultima_atividade else ""
+                conversa.ultima_atividade.isoformat()
+                if conversa.ultima_atividade
+                else ""
             ),
         }
-        conversas.append(conversa)
-
-    # Ordenar por última atividade (mais recente primeiro)
-    conversas.sort(key=lambda c: c["ultima_atividade"], reverse=True)
-
-    # Aplicar paginação
-    conversas_paginadas = conversas[offset : offset + limit]
+        for conversa in await executar_repo(
+            chat_participante_repo.listar_conversas,
+            usuario_logado.id, max(limit, 0), max(offset, 0)
+        )
+    ]
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=conversas_paginadas)
+    return JSONResponse(status_code=status.HTTP_200_OK, content=conversas)
 
 
 @router.get("/mensagens/{sala_id}")
@@ -317,7 +289,9 @@ async def listar_mensagens(
     usuario_id = usuario_logado.id
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await executar_repo(
+        chat_participante_repo.obter_por_sala_e_usuario, sala_id, usuario_id
+    )
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -325,7 +299,7 @@ async def listar_mensagens(
         )
 
     # Obter mensagens
-    mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
+    mensagens = await executar_repo(chat_mensagem_repo.listar_por_sala, sala_id, limit, offset)
 
     mensagens_json = [
         {
@@ -374,7 +348,8 @@ async def enviar_mensagem(
         usuario_id = usuario_logado.id
 
         # Verificar se usuário participa da sala
-        participante = chat_participante_repo.obter_por_sala_e_usuario(
+        participante = await executar_repo(
+            chat_participante_repo.obter_por_sala_e_usuario,
             dto.sala_id, usuario_id
         )
         if not participante:
@@ -384,19 +359,20 @@ async def enviar_mensagem(
             )
 
         # Verificar se sala existe
-        sala = chat_sala_repo.obter_por_id(dto.sala_id)
+        sala = await executar_repo(chat_sala_repo.obter_por_id, dto.sala_id)
         if not sala:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Sala não encontrada."
             )
 
         # Inserir mensagem
-        nova_mensagem = chat_mensagem_repo.inserir(
+        nova_mensagem = await executar_repo(
+            chat_mensagem_repo.inserir,
             dto.sala_id, usuario_id, dto.mensagem
         )
 
         # Atualizar última atividade da sala
-        chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
+        await executar_repo(chat_sala_repo.atualizar_ultima_atividade, dto.sala_id)
 
         # Broadcast via SSE para ambos participantes
         mensagem_sse = {
@@ -455,7 +431,9 @@ async def marcar_como_lidas(
     usuario_id = usuario_logado.id
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await executar_repo(
+        chat_participante_repo.obter_por_sala_e_usuario, sala_id, usuario_id
+    )
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -463,10 +441,10 @@ async def marcar_como_lidas(
         )
 
     # Marcar mensagens como lidas
-    chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
+    await executar_repo(chat_mensagem_repo.marcar_como_lidas, sala_id, usuario_id)
 
     # Atualizar última leitura do participante
-    chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
+    await executar_repo(chat_participante_repo.atualizar_ultima_leitura, sala_id, usuario_id)
 
     # Notificar via SSE para atualizar contador
     await gerenciador_chat.broadcast_para_sala(
@@ -504,7 +482,7 @@ async def buscar_usuarios(
         return JSONResponse(status_code=status.HTTP_200_OK, content=[])
 
     # Buscar usuários
-    usuarios = usuario_repo.buscar_por_termo(q, limit=10)
+    usuarios = await executar_repo(usuario_repo.buscar_por_termo, q, limit=10)
 
     # Excluir o próprio usuário e administradores dos resultados
     usuarios_filtrados = [
@@ -526,7 +504,9 @@ async def buscar_usuarios(
     return JSONResponse(status_code=status.HTTP_200_OK, content=usuarios_json)
 
 
-@router.get("/mensagens/não-lidas/total")
+@router.get("/mensagens/nao-lidas/total")
+# Caminho antigo, com acento: mantido para clientes que ainda o usam
+@router.get("/mensagens/não-lidas/total", include_in_schema=False)
 @requer_autenticacao()
 async def contar_nao_lidas_total(
     request: Request, usuario_logado: Optional[UsuarioLogado] = None
@@ -538,17 +518,11 @@ async def contar_nao_lidas_total(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado"
         )
-    usuario_id = usuario_logado.id
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    total_nao_lidas = 0
-    for participacao in participacoes:
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            participacao.sala_id, usuario_id
-        )
-        total_nao_lidas += nao_lidas
+    # Soma dos contadores mantidos em chat_participante
+    total_nao_lidas = await executar_repo(
+        chat_participante_repo.contar_nao_lidas_por_usuario,
+        usuario_logado.id
+    )
 
     return JSONResponse(
         status_code=status.HTTP_200_OK, content={"total": total_nao_lidas}
@@ -565,6 +539,8 @@ async def chat_health():
         content={
             "status": "healthy",
             "conexoes_ativas": estatisticas["total_usuarios_ativos"],
+            "profundidade_max_filas": estatisticas["profundidade_max_filas"],
+            "eventos_descartados": estatisticas["eventos_descartados"],
             "timestamp": agora().isoformat(),
         },
     )
@@ -19,6 +19,7 @@ from repo import pedido_repo, anuncio_repo, endereco_repo
 from util.auth_decorator import requer_autenticacao
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
+from util.repo_executor import executar_repo
 from util.status_pedido import StatusPedido
 from util.template_util import criar_templates
 
@@ -41,7 +42,7 @@ async def listar_pedidos_comprador(request: Request, usuario_logado: Optional[Us
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedidos = pedido_repo.obter_por_comprador_com_detalhes(usuario_logado.id)
+    pedidos = await executar_repo(pedido_repo.obter_por_comprador_com_detalhes, usuario_logado.id)
 
     return templates_pedido.TemplateResponse(
         "pedidos/listar_comprador.html",
@@ -60,7 +61,7 @@ async def detalhes_pedido(request: Request, id: int, usuario_logado: Optional[Us
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id_com_detalhes(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id_com_detalhes, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -99,7 +100,7 @@ async def get_criar_pedido(
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
     # Buscar anuncio
-    anuncio_obj = anuncio_repo.obter_por_id_com_detalhes(anuncio)
+    anuncio_obj = await executar_repo(anuncio_repo.obter_por_id_com_detalhes, anuncio)
     if not anuncio_obj:
         informar_erro(request, "Anúncio não encontrado.")
         return RedirectResponse(url="/anuncios", status_code=status.HTTP_303_SEE_OTHER)
@@ -143,7 +144,7 @@ async def post_criar_pedido(
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
     # Buscar anuncio
-    anuncio = anuncio_repo.obter_por_id(id_anuncio)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id_anuncio)
     if not anuncio:
         informar_erro(request, "Anúncio não encontrado.")
         return RedirectResponse(url="/anuncios", status_code=status.HTTP_303_SEE_OTHER)
@@ -160,7 +161,8 @@ async def post_criar_pedido(
         return RedirectResponse(url="/usuario/endereco/cadastrar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Criar pedido com status Negociando
-    pedido_id = pedido_repo.inserir_negociando(
+    pedido_id = await executar_repo(
+        pedido_repo.inserir_negociando,
         id_endereco=endereco.id,
         id_comprador=usuario_logado.id,
         id_anuncio=id_anuncio
@@ -187,7 +189,7 @@ async def post_pagar_pedido(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -203,7 +205,7 @@ async def post_pagar_pedido(
         informar_erro(request, "Este pedido não pode ser pago no status atual.")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
 
-    if pedido_repo.marcar_como_pago(id):
+    if await executar_repo(pedido_repo.marcar_como_pago, id):
         logger.info(f"Pedido pago ID: {id} - Comprador: {usuario_logado.id}")
         informar_sucesso(request, "Pagamento realizado com sucesso! Aguarde o envio.")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
@@ -224,7 +226,7 @@ async def post_cancelar_pedido(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id_com_detalhes(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id_com_detalhes, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -243,7 +245,7 @@ async def post_cancelar_pedido(
         informar_erro(request, "Este pedido não pode mais ser cancelado.")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
 
-    if pedido_repo.cancelar(id):
+    if await executar_repo(pedido_repo.cancelar, id):
         logger.info(f"Pedido cancelado ID: {id} - Usuario: {usuario_logado.id}")
         informar_sucesso(request, "Pedido cancelado com sucesso.")
     else:
@@ -264,7 +266,7 @@ async def post_confirmar_entrega(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -280,7 +282,7 @@ async def post_confirmar_entrega(
         informar_erro(request, "Este pedido ainda não foi enviado.")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
 
-    if pedido_repo.marcar_como_entregue(id):
+    if await executar_repo(pedido_repo.marcar_como_entregue, id):
         logger.info(f"Pedido entregue ID: {id} - Comprador: {usuario_logado.id}")
         informar_sucesso(request, "Entrega confirmada com sucesso!")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
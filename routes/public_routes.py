@@ -1,8 +1,14 @@
 from fastapi import APIRouter, Request, status
 
 from repo import anuncio_repo
+from util.cache_paginas import GRUPO_ANUNCIOS, GRUPO_CATEGORIAS, cache_paginas
+from util.repo_executor import executar_repo
 from util.template_util import criar_templates
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.rate_limiter import (
+    ALGORITMO_JANELA_DESLIZANTE,
+    DynamicRateLimiter,
+    obter_identificador_cliente,
+)
 from util.flash_messages import informar_erro
 from util.logger_config import logger
 
@@ -16,8 +22,23 @@ public_limiter = DynamicRateLimiter(
     padrao_max=100,
     padrao_minutos=1,
     nome="public_pages",
+    # Executado em todo acesso: registro compacto por IP em vez da lista de instantes
+    algoritmo=ALGORITMO_JANELA_DESLIZANTE,
 )
 
+# Dados exibidos na landing page (cards com nome da categoria)
+GRUPOS_LANDING = (GRUPO_ANUNCIOS, GRUPO_CATEGORIAS)
+
+
+async def _renderizar_landing(request: Request):
+    """Renderiza a landing page com os últimos anúncios"""
+    ultimos_anuncios = await executar_repo(anuncio_repo.obter_ultimos_ativos, limite=12)
+
+    return templates_public.TemplateResponse(
+        "index.html",
+        {"request": request, "ultimos_anuncios": ultimos_anuncios}
+    )
+
 
 @router.get("/")
 async def home(request: Request):
@@ -35,12 +56,9 @@ async def home(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         )
 
-    # Obter ultimos anuncios para exibir na home
-    ultimos_anuncios = anuncio_repo.obter_ultimos_ativos(limite=12)
-
-    return templates_public.TemplateResponse(
-        "index.html",
-        {"request": request, "ultimos_anuncios": ultimos_anuncios}
+    # Visitantes anônimos recebem a página do cache (invalidada ao alterar anúncios)
+    return await cache_paginas.responder(
+        request, GRUPOS_LANDING, lambda: _renderizar_landing(request)
     )
 
 
@@ -61,12 +79,9 @@ async def index(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         )
 
-    # Obter ultimos anuncios para exibir na home
-    ultimos_anuncios = anuncio_repo.obter_ultimos_ativos(limite=12)
-
-    return templates_public.TemplateResponse(
-        "index.html",
-        {"request": request, "ultimos_anuncios": ultimos_anuncios}
+    # Visitantes anônimos recebem a página do cache (invalidada ao alterar anúncios)
+    return await cache_paginas.responder(
+        request, GRUPOS_LANDING, lambda: _renderizar_landing(request)
     )
 
 
@@ -7,7 +7,7 @@ from typing import Optional
 
 # Third-party
 from fastapi import APIRouter, Form, Request, status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 from pydantic import ValidationError
 
 # DTOs
@@ -23,11 +23,13 @@ from repo import usuario_repo, chamado_repo, endereco_repo
 from util.auth_decorator import requer_autenticacao
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
-from util.foto_util import salvar_foto_cropada_usuario
+from util.foto_util import enfileirar_foto_usuario
+from util.imagem_worker import obter_tarefa
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.repo_executor import executar_repo
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha, verificar_senha
+from util.security import criar_hash_senha_async, verificar_senha_async
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -102,7 +104,7 @@ async def get_visualizar_perfil(
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout",
@@ -120,6 +122,8 @@ async def get_visualizar_perfil(
             "usuario": usuario,
             "usuario_logado": usuario_logado,
             "endereco": endereco,
+            # Foto recém-enviada ainda em processamento (ver atualizar-foto)
+            "tarefa_foto": request.session.pop("tarefa_foto", None),
         },
     )
 
@@ -145,7 +149,7 @@ async def get_editar_perfil(
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout",
@@ -177,7 +181,7 @@ async def post_editar_perfil(
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout",
@@ -192,8 +196,8 @@ async def post_editar_perfil(
         dto = EditarPerfilDTO(nome=nome, email=email)
 
         # Verificar se o e-mail já está em uso por outro usuário
-        disponivel, mensagem_erro = verificar_email_disponivel(
-            dto.email, usuario_logado.id
+        disponivel, mensagem_erro = await executar_repo(
+            verificar_email_disponivel, dto.email, usuario_logado.id
         )
         if not disponivel:
             informar_erro(request, mensagem_erro)
@@ -212,7 +216,7 @@ async def post_editar_perfil(
         usuario.email = dto.email
 
         # Salvar no banco
-        if usuario_repo.alterar(usuario):
+        if await executar_repo(usuario_repo.alterar, usuario):
             # Atualizar sessão
             request.session["usuario_logado"]["nome"] = usuario.nome
             request.session["usuario_logado"]["email"] = usuario.email
@@ -319,7 +323,7 @@ async def post_alterar_senha(
 
         # Obter usuário ou redirecionar para logout
         usuario = obter_ou_404(
-            usuario_repo.obter_por_id(usuario_logado.id),
+            await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
             request,
             "Usuário não encontrado!",
             "/logout",
@@ -328,7 +332,7 @@ async def post_alterar_senha(
             return usuario
 
         # Validar senha atual
-        if not verificar_senha(dto.senha_atual, usuario.senha):
+        if not await verificar_senha_async(dto.senha_atual, usuario.senha):
             informar_erro(request, "Senha atual está incorreta")
             logger.warning(
                 f"Tentativa de alteração de senha com senha atual incorreta - Usuário ID: {usuario.id}"
@@ -343,7 +347,7 @@ async def post_alterar_senha(
             )
 
         # Verificar se a nova senha é diferente da atual
-        if verificar_senha(dto.senha_nova, usuario.senha):
+        if await verificar_senha_async(dto.senha_nova, usuario.senha):
             informar_erro(request, "A nova senha deve ser diferente da senha atual.")
             return templates_usuario.TemplateResponse(
                 "perfil/alterar-senha.html",
@@ -357,8 +361,8 @@ async def post_alterar_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha_nova)
-        if usuario_repo.atualizar_senha(usuario.id, senha_hash):
+        senha_hash = await criar_hash_senha_async(dto.senha_nova)
+        if await executar_repo(usuario_repo.atualizar_senha, usuario.id, senha_hash):
             logger.info(f"Senha alterada com sucesso - Usuário ID: {usuario.id}")
             informar_sucesso(request, "Senha alterada com sucesso!")
             return RedirectResponse(
@@ -434,14 +438,17 @@ async def post_atualizar_foto(
                 "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
             )
 
-        # Salvar foto cropada
-        if salvar_foto_cropada_usuario(usuario_id, foto_base64):
-            logger.info(f"Foto de perfil atualizada - Usuário ID: {usuario_id}")
-            informar_sucesso(request, "Foto de perfil atualizada com sucesso!")
+        # Enviar para o pool de processamento; a página de perfil acompanha a
+        # tarefa e troca a foto quando ela estiver pronta
+        tarefa = enfileirar_foto_usuario(usuario_id, foto_base64)
+        if tarefa:
+            request.session["tarefa_foto"] = tarefa.id
+            logger.info(f"Foto de perfil enviada para processamento - Usuário ID: {usuario_id}")
+            informar_sucesso(request, "Foto de perfil enviada! Ela será atualizada em instantes.")
         else:
             msg_erro = (
-                "Ocorreu um erro desconhecido ao atualizar foto. "
-                "A equipe de suporte foi notificada. Tente novamente mais tarde."
+                "Não foi possível processar a imagem agora. "
+                "Verifique se o arquivo é uma imagem válida e tente novamente."
             )
             informar_erro(request, msg_erro)
 
@@ -460,3 +467,27 @@ async def post_atualizar_foto(
         return RedirectResponse(
             "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
         )
+
+
+@router.get("/usuario/imagens/tarefas/{tarefa_id}")
+@requer_autenticacao()
+async def get_status_tarefa_imagem(
+    request: Request, tarefa_id: str, usuario_logado: Optional[UsuarioLogado] = None
+):
+    """
+    Status do processamento de uma foto enviada (polling).
+
+    Retorna {"id", "status", "url", "erro"}, com status "pendente",
+    "concluida" ou "erro". A tarefa fica em memória no worker que recebeu o
+    upload; 404 se não existir, já expirou ou pertence a outro usuário.
+    """
+    if not usuario_logado:
+        return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
+
+    tarefa = obter_tarefa(tarefa_id, usuario_logado.id)
+    if not tarefa:
+        return JSONResponse(
+            {"detail": "Tarefa não encontrada"}, status_code=status.HTTP_404_NOT_FOUND
+        )
+
+    return JSONResponse(tarefa.para_dict(), headers={"Cache-Control": "no-store"})
@@ -20,6 +20,7 @@ from util.auth_decorator import requer_autenticacao
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.perfis import Perfil
+from util.repo_executor import executar_repo
 from util.status_pedido import StatusPedido
 from util.template_util import criar_templates
 
@@ -42,7 +43,7 @@ async def listar_pedidos_vendedor(request: Request, usuario_logado: Optional[Usu
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedidos = pedido_repo.obter_por_vendedor_com_detalhes(usuario_logado.id)
+    pedidos = await executar_repo(pedido_repo.obter_por_vendedor_com_detalhes, usuario_logado.id)
 
     return templates_pedido.TemplateResponse(
         "pedidos/listar_vendedor.html",
@@ -61,7 +62,7 @@ async def get_definir_preco(request: Request, id: int, usuario_logado: Optional[
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id_com_detalhes(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id_com_detalhes, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -78,7 +79,7 @@ async def get_definir_preco(request: Request, id: int, usuario_logado: Optional[
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
 
     # Buscar anuncio para preco sugerido
-    anuncio = anuncio_repo.obter_por_id(pedido.id_anuncio)
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, pedido.id_anuncio)
 
     return templates_pedido.TemplateResponse(
         "pedidos/definir_preco.html",
@@ -103,7 +104,7 @@ async def post_definir_preco(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id_com_detalhes(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id_com_detalhes, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -124,7 +125,7 @@ async def post_definir_preco(
         informar_erro(request, "O preço deve ser maior que zero.")
         return RedirectResponse(url=f"/vendedor/pedidos/definir-preco/{id}", status_code=status.HTTP_303_SEE_OTHER)
 
-    if pedido_repo.definir_preco_final(id, preco):
+    if await executar_repo(pedido_repo.definir_preco_final, id, preco):
         logger.info(f"Preço definido para pedido ID: {id} - Vendedor: {usuario_logado.id} - Preço: {preco}")
         informar_sucesso(request, f"Preço definido! Aguardando pagamento do comprador.")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
@@ -140,7 +141,7 @@ async def get_enviar_pedido(request: Request, id: int, usuario_logado: Optional[
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id_com_detalhes(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id_com_detalhes, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -178,7 +179,7 @@ async def post_enviar_pedido(
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    pedido = pedido_repo.obter_por_id_com_detalhes(id)
+    pedido = await executar_repo(pedido_repo.obter_por_id_com_detalhes, id)
 
     if not pedido:
         informar_erro(request, "Pedido não encontrado.")
@@ -194,7 +195,7 @@ async def post_enviar_pedido(
         informar_erro(request, "O pedido só pode ser enviado após o pagamento.")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
 
-    if pedido_repo.marcar_como_enviado(id, codigo_rastreio or ""):
+    if await executar_repo(pedido_repo.marcar_como_enviado, id, codigo_rastreio or ""):
         logger.info(f"Pedido enviado ID: {id} - Vendedor: {usuario_logado.id} - Rastreio: {codigo_rastreio}")
         informar_sucesso(request, "Pedido marcado como enviado!")
         return RedirectResponse(url=f"/pedidos/detalhes/{id}", status_code=status.HTTP_303_SEE_OTHER)
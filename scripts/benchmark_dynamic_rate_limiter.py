@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de DynamicRateLimiter.verificar() com várias threads.
+
+Compara o caminho atual (relê o config_cache só quando a geração das
+configurações muda) com a releitura a cada verificação. A coluna "locks"
+conta aquisições do RLock do ConfigCache, que só é usado nas recargas.
+
+Uso (a partir da raiz do projeto):
+    python scripts/benchmark_dynamic_rate_limiter.py [verificacoes_por_thread] [threads]
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repo import configuracao_repo  # noqa: E402
+from util.config_cache import ConfigCache  # noqa: E402
+from util.rate_limit_armazenamento import ArmazenamentoMemoria  # noqa: E402
+from util.rate_limiter import DynamicRateLimiter  # noqa: E402
+
+
+class LimiterSempreRelendo(DynamicRateLimiter):
+    """Comportamento anterior: relê as configurações em toda verificação."""
+
+    def _sincronizar_config(self) -> None:
+        self._atualizar_valores()
+
+
+class ContadorLock:
+    """RLock que conta as aquisições (para mostrar o caminho sem lock)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.aquisicoes = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self.aquisicoes += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+def medir(classe, verificacoes: int, threads: int) -> tuple[float, int]:
+    """
+    Executa verificações em paralelo.
+
+    Args:
+        classe: Classe do limiter
+        verificacoes: Verificações por thread
+        threads: Quantidade de threads
+
+    Returns:
+        Tupla (µs por verificação, aquisições do lock do ConfigCache)
+    """
+    limiter = classe(
+        chave_max="rate_limit_benchmark_max",
+        chave_minutos="rate_limit_benchmark_minutos",
+        padrao_max=10**9,
+        padrao_minutos=1,
+        nome="benchmark",
+        # Contagem O(1) para que o custo medido seja o do config
+        algoritmo="janela_deslizante",
+        armazenamento=ArmazenamentoMemoria("benchmark"),
+    )
+    lock = ContadorLock()
+    ConfigCache._lock = lock
+
+    def trabalhar(indice: int):
+        ip = f"10.0.0.{indice}"
+        for _ in range(verificacoes):
+            limiter.verificar(ip)
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+    return decorrido / (verificacoes * threads) * 1_000_000, lock.aquisicoes
+
+
+if __name__ == "__main__":
+    verificacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    configuracao_repo.criar_tabela()
+    lock_original = ConfigCache._lock
+    try:
+        print(f"{threads} threads x {verificacoes} verificações")
+        print(f"{'modo':<30}{'µs/verificação':>16}{'locks':>12}")
+        for nome, classe in (
+            ("releitura a cada verificação", LimiterSempreRelendo),
+            ("geração (atual)", DynamicRateLimiter),
+        ):
+            microssegundos, locks = medir(classe, verificacoes, threads)
+            print(f"{nome:<30}{microssegundos:>16.2f}{locks:>12}")
+    finally:
+        ConfigCache._lock = lock_original
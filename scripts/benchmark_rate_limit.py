@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Script que mede a latência de RateLimiter.verificar() em cada armazenamento.
+
+Compara o algoritmo "registro" (lista de instantes, só em memória) com o
+"janela_deslizante" nos armazenamentos memoria, sqlite e mmap. Os arquivos
+dos armazenamentos compartilhados são criados em um diretório temporário.
+
+Uso (a partir da raiz do projeto):
+    python scripts/benchmark_rate_limit.py [verificacoes] [identificadores]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.rate_limit_armazenamento import (  # noqa: E402
+    ArmazenamentoMemoria,
+    ArmazenamentoMmap,
+    ArmazenamentoSQLite,
+)
+from util.rate_limiter import RateLimiter  # noqa: E402
+
+
+def medir(limiter: RateLimiter, verificacoes: int, identificadores: int) -> list[float]:
+    """
+    Executa verificações alternando identificadores.
+
+    Args:
+        limiter: Limiter a medir
+        verificacoes: Quantidade de chamadas a verificar()
+        identificadores: Quantidade de IPs distintos
+
+    Returns:
+        Latência de cada chamada, em microssegundos
+    """
+    ips = [f"10.0.{i // 256}.{i % 256}" for i in range(identificadores)]
+    latencias = []
+    for i in range(verificacoes):
+        inicio = time.perf_counter()
+        limiter.verificar(ips[i % identificadores])
+        latencias.append((time.perf_counter() - inicio) * 1_000_000)
+    return latencias
+
+
+if __name__ == "__main__":
+    verificacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    identificadores = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cenarios = {
+            "memoria (registro)": lambda: RateLimiter(
+                100, 1, "bench", algoritmo="registro", armazenamento="memoria"
+            ),
+            "memoria (janela_deslizante)": lambda: RateLimiter(
+                100, 1, "bench", armazenamento=ArmazenamentoMemoria("bench")
+            ),
+            "sqlite": lambda: RateLimiter(
+                100, 1, "bench",
+                armazenamento=ArmazenamentoSQLite("bench", os.path.join(diretorio, "rl.db")),
+            ),
+            "mmap": lambda: RateLimiter(
+                100, 1, "bench", armazenamento=ArmazenamentoMmap("bench", diretorio)
+            ),
+        }
+
+        print(f"{verificacoes} verificações, {identificadores} identificadores (µs por verificação)")
+        print(f"{'armazenamento':<30}{'média':>10}{'p50':>10}{'p99':>10}")
+        for nome, criar in cenarios.items():
+            limiter = criar()
+            # Aquecimento: cria os registros e as conexões
+            medir(limiter, identificadores, identificadores)
+            latencias = sorted(medir(limiter, verificacoes, identificadores))
+            print(
+                f"{nome:<30}"
+                f"{statistics.fmean(latencias):>10.2f}"
+                f"{latencias[len(latencias) // 2]:>10.2f}"
+                f"{latencias[int(len(latencias) * 0.99)]:>10.2f}"
+            )
+            if limiter.armazenamento is not None:
+                limiter.armazenamento.fechar()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Script para gerar os CSS/JS com hash e pré-comprimidos em static/dist.
+
+A aplicação já faz isso ao iniciar (ASSETS_CONSTRUIR_NA_INICIALIZACAO);
+use este script no deploy quando static/ não puder ser gravado em produção
+ou para remover versões antigas.
+
+Uso (a partir da raiz do projeto):
+    python scripts/construir_assets.py [--limpar]
+"""
+
+import argparse
+import os
+import sys
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.assets import brotli, construir_assets, limpar_assets_antigos  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--limpar",
+        action="store_true",
+        help="remove de static/dist as versões que não estão no manifesto",
+    )
+    args = parser.parse_args()
+
+    try:
+        manifesto = construir_assets()
+    except OSError as e:
+        print(f"Erro ao construir assets: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{len(manifesto)} assets em static/dist (gzip{' + brotli' if brotli else ''})")
+    if args.limpar:
+        print(f"{limpar_assets_antigos()} arquivos antigos removidos")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Script para gerar as variantes responsivas (160/320/800px, JPEG e WebP) das
+fotos de anúncios já existentes em static/img/anuncios.
+
+Fotos enviadas depois da geração de variantes já as recebem no upload; este
+script cobre as anteriores. Fotos cujas variantes já existem e são mais
+novas que a foto principal são puladas, a menos que --forcar seja usado.
+
+Uso (a partir da raiz do projeto):
+    python scripts/gerar_variantes_fotos_anuncios.py [--forcar] [--processos N]
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.foto_anuncio_util import (  # noqa: E402
+    PASTA_FOTOS_ANUNCIOS,
+    gerar_variantes_foto_anuncio,
+    variantes_atualizadas,
+)
+
+# Apenas as fotos principais ({id:06d}.jpg), não as variantes
+PADRAO_FOTO = re.compile(r"^(\d+)\.jpg$")
+
+
+def listar_ids_com_foto() -> list[int]:
+    """Retorna os IDs de anúncio que têm foto principal, em ordem."""
+    if not PASTA_FOTOS_ANUNCIOS.exists():
+        return []
+    ids = []
+    for path in PASTA_FOTOS_ANUNCIOS.iterdir():
+        match = PADRAO_FOTO.match(path.name)
+        if match:
+            ids.append(int(match.group(1)))
+    return sorted(ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--forcar", action="store_true", help="regera mesmo as atualizadas")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    ids = listar_ids_com_foto()
+    pendentes = ids if args.forcar else [id for id in ids if not variantes_atualizadas(id)]
+    print(f"{len(ids)} fotos encontradas, {len(pendentes)} a processar")
+
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=args.processos) as pool:
+        for id, sucesso in zip(pendentes, pool.map(gerar_variantes_foto_anuncio, pendentes)):
+            if not sucesso:
+                falhas += 1
+                print(f"Erro ao gerar variantes do anúncio {id}", file=sys.stderr)
+
+    print(f"Variantes geradas para {len(pendentes) - falhas} fotos")
+    if falhas:
+        sys.exit(1)
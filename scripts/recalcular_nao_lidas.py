@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular os contadores de mensagens não lidas do chat.
+
+O contador chat_participante.nao_lidas é mantido a cada mensagem enviada,
+lida ou excluída. Este script o reconstrói a partir das mensagens, para
+corrigir divergências (ex.: exclusões em cascata de usuários ou restauração
+de backups). Pode ser agendado periodicamente (cron).
+
+Uso (a partir da raiz do projeto):
+    python scripts/recalcular_nao_lidas.py
+"""
+
+import os
+import sys
+import sqlite3
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repo import chat_participante_repo  # noqa: E402
+
+
+if __name__ == "__main__":
+    try:
+        chat_participante_repo.criar_tabela()
+        corrigidos = chat_participante_repo.recalcular_nao_lidas()
+    except sqlite3.Error as e:
+        print(f"Erro ao recalcular contadores de não lidas: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Contadores de não lidas recalculados ({corrigidos} corrigido(s))")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Script para (re)construir o índice de busca textual (FTS5) dos anúncios.
+
+Uso em bancos existentes, criados antes da busca textual, ou quando o
+índice ficar dessincronizado da tabela anuncio.
+
+Uso (a partir da raiz do projeto):
+    python scripts/reconstruir_indice_busca.py
+"""
+
+import os
+import sys
+import sqlite3
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repo import anuncio_repo  # noqa: E402
+
+
+if __name__ == "__main__":
+    try:
+        anuncio_repo.criar_tabela()
+        anuncio_repo.reconstruir_indice_busca()
+    except sqlite3.Error as e:
+        print(f"Erro ao reconstruir índice de busca: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print("Índice de busca de anúncios reconstruído com sucesso")
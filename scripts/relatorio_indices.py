@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script que exibe o plano de execução das consultas críticas e os índices
+que nenhuma delas utiliza.
+
+Sai com código 1 se alguma consulta crítica fizer varredura completa de
+tabela, o que permite usá-lo em CI após alterar consultas ou índices.
+
+Uso (a partir da raiz do projeto):
+    python scripts/relatorio_indices.py
+"""
+
+import os
+import sys
+import sqlite3
+
+# Permitir importar os módulos da aplicação a partir da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repo import indices_repo  # noqa: E402
+from sql import indices_sql  # noqa: E402
+
+
+if __name__ == "__main__":
+    try:
+        indices_repo.criar_indices()
+        indices_repo.remover_indices_substituidos()
+
+        for nome, (sql, parametros) in indices_sql.CONSULTAS_CRITICAS.items():
+            print(nome)
+            for passo in indices_repo.obter_plano_consulta(sql, parametros):
+                print(f"    {passo}")
+
+        problemas = indices_repo.verificar_planos_consultas()
+        nao_utilizados = indices_repo.listar_indices_nao_utilizados()
+    except sqlite3.Error as e:
+        print(f"Erro ao analisar índices: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print()
+    print("Índices não utilizados pelas consultas críticas:")
+    for nome in nao_utilizados or ["(nenhum)"]:
+        print(f"    {nome}")
+
+    if problemas:
+        print()
+        print("Consultas com varredura completa de tabela:")
+        for nome, passos in problemas.items():
+            print(f"    {nome}: {'; '.join(passos)}")
+        sys.exit(1)
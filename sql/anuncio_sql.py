@@ -14,25 +14,111 @@ CREATE TABLE IF NOT EXISTS anuncio (
     estoque INTEGER NOT NULL,
     data_cadastro DATETIME DEFAULT CURRENT_TIMESTAMP,
     ativo BOOLEAN DEFAULT 1,
+    versao INTEGER NOT NULL DEFAULT 0,
     FOREIGN KEY (id_vendedor) REFERENCES usuario(id) ON DELETE CASCADE,
     FOREIGN KEY (id_categoria) REFERENCES categoria(id) ON DELETE RESTRICT
 )
 """
 
-# Índices para otimizar buscas
-CRIAR_INDICE_VENDEDOR = """
-CREATE INDEX IF NOT EXISTS idx_anuncio_vendedor
-ON anuncio(id_vendedor)
+# Índices: ver sql/indices_sql.py
+
+# Bancos criados antes do contador de versão não têm a coluna versao
+EXISTE_COLUNA_VERSAO = """
+SELECT 1 FROM pragma_table_info('anuncio')
+WHERE name = 'versao'
+"""
+
+ADICIONAR_COLUNA_VERSAO = """
+ALTER TABLE anuncio
+ADD COLUMN versao INTEGER NOT NULL DEFAULT 0
+"""
+
+# Contador de versão dos anúncios (mesmo esquema de configuracao_sql): cada
+# inserção ou alteração recebe MAX(versao) + 1, então a versao de uma linha
+# muda a cada alteração dela e MAX(versao) muda a cada escrita na tabela.
+# Usado como validador das respostas condicionais (ETag) das páginas públicas.
+CRIAR_TRIGGER_VERSAO_INSERIR = """
+CREATE TRIGGER IF NOT EXISTS anuncio_versao_ai AFTER INSERT ON anuncio BEGIN
+    UPDATE anuncio SET versao = (SELECT MAX(versao) FROM anuncio) + 1
+    WHERE id = new.id;
+END
+"""
+
+CRIAR_TRIGGER_VERSAO_ALTERAR = """
+CREATE TRIGGER IF NOT EXISTS anuncio_versao_au
+AFTER UPDATE OF id_vendedor, id_categoria, nome, descricao, peso, preco, estoque, ativo
+ON anuncio BEGIN
+    UPDATE anuncio SET versao = (SELECT MAX(versao) FROM anuncio) + 1
+    WHERE id = new.id;
+END
+"""
+
+# Na exclusão, a linha mais recente recebe versão acima da excluída: o
+# contador nunca volta a um valor já observado
+CRIAR_TRIGGER_VERSAO_EXCLUIR = """
+CREATE TRIGGER IF NOT EXISTS anuncio_versao_ad AFTER DELETE ON anuncio BEGIN
+    UPDATE anuncio
+    SET versao = MAX(old.versao, (SELECT MAX(versao) FROM anuncio)) + 1
+    WHERE id = (SELECT id FROM anuncio ORDER BY versao DESC LIMIT 1);
+END
+"""
+
+TRIGGERS_VERSAO = [
+    CRIAR_TRIGGER_VERSAO_INSERIR,
+    CRIAR_TRIGGER_VERSAO_ALTERAR,
+    CRIAR_TRIGGER_VERSAO_EXCLUIR,
+]
+
+# Busca textual (FTS5) sincronizada com a tabela anuncio via triggers.
+# unicode61 + remove_diacritics: "camera" encontra "câmera" e vice-versa.
+# prefix: índices auxiliares para consultas por prefixo ("not"* -> notebook).
+CRIAR_TABELA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS anuncio_fts USING fts5(
+    nome,
+    descricao,
+    content='anuncio',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+CRIAR_TRIGGER_FTS_INSERIR = """
+CREATE TRIGGER IF NOT EXISTS anuncio_fts_ai AFTER INSERT ON anuncio BEGIN
+    INSERT INTO anuncio_fts(rowid, nome, descricao)
+    VALUES (new.id, new.nome, new.descricao);
+END
 """
 
-CRIAR_INDICE_CATEGORIA = """
-CREATE INDEX IF NOT EXISTS idx_anuncio_categoria
-ON anuncio(id_categoria)
+CRIAR_TRIGGER_FTS_EXCLUIR = """
+CREATE TRIGGER IF NOT EXISTS anuncio_fts_ad AFTER DELETE ON anuncio BEGIN
+    INSERT INTO anuncio_fts(anuncio_fts, rowid, nome, descricao)
+    VALUES ('delete', old.id, old.nome, old.descricao);
+END
 """
 
-CRIAR_INDICE_ATIVO = """
-CREATE INDEX IF NOT EXISTS idx_anuncio_ativo
-ON anuncio(ativo)
+CRIAR_TRIGGER_FTS_ALTERAR = """
+CREATE TRIGGER IF NOT EXISTS anuncio_fts_au AFTER UPDATE OF nome, descricao ON anuncio BEGIN
+    INSERT INTO anuncio_fts(anuncio_fts, rowid, nome, descricao)
+    VALUES ('delete', old.id, old.nome, old.descricao);
+    INSERT INTO anuncio_fts(rowid, nome, descricao)
+    VALUES (new.id, new.nome, new.descricao);
+END
+"""
+
+TRIGGERS_FTS = [
+    CRIAR_TRIGGER_FTS_INSERIR,
+    CRIAR_TRIGGER_FTS_EXCLUIR,
+    CRIAR_TRIGGER_FTS_ALTERAR,
+]
+
+EXISTE_TABELA_FTS = """
+SELECT 1 FROM sqlite_master
+WHERE type = 'table' AND name = 'anuncio_fts'
+"""
+
+RECONSTRUIR_FTS = """
+INSERT INTO anuncio_fts(anuncio_fts) VALUES ('rebuild')
 """
 
 INSERIR = """
@@ -68,9 +154,8 @@ ORDER BY data_cadastro DESC
 """
 
 OBTER_POR_VENDEDOR = """
-SELECT a.*, c.nome as nome_categoria
+SELECT a.*
 FROM anuncio a
-LEFT JOIN categoria c ON a.id_categoria = c.id
 WHERE a.id_vendedor = ?
 ORDER BY a.data_cadastro DESC
 """
@@ -82,15 +167,16 @@ ORDER BY data_cadastro DESC
 """
 
 BUSCAR_POR_NOME = """
-SELECT * FROM anuncio
-WHERE nome LIKE ? AND ativo = 1 AND estoque > 0
-ORDER BY data_cadastro DESC
+SELECT a.* FROM anuncio_fts
+JOIN anuncio a ON a.id = anuncio_fts.rowid
+WHERE anuncio_fts MATCH ? AND a.ativo = 1 AND a.estoque > 0
+ORDER BY bm25(anuncio_fts, 10.0, 1.0), a.data_cadastro DESC
 """
 
 BUSCAR_COM_FILTROS = """
 SELECT * FROM anuncio
 WHERE ativo = 1 AND estoque > 0
-  AND (? IS NULL OR nome LIKE ?)
+  AND (? IS NULL OR id IN (SELECT rowid FROM anuncio_fts WHERE anuncio_fts MATCH ?))
   AND (? IS NULL OR id_categoria = ?)
   AND (? IS NULL OR preco >= ?)
   AND (? IS NULL OR preco <= ?)
@@ -104,15 +190,22 @@ WHERE id = ? AND estoque >= ?
 """
 
 # Queries para página pública de anúncios
+# {ordem} é substituído por um valor de ORDENACOES_ATIVOS (nunca por entrada do usuário)
+ORDENACOES_ATIVOS = {
+    "relevancia": "bm25(anuncio_fts, 10.0, 1.0), a.data_cadastro DESC",
+    "preco_asc": "a.preco ASC, a.id ASC",
+    "preco_desc": "a.preco DESC, a.id DESC",
+    "data_asc": "a.data_cadastro ASC, a.id ASC",
+    "data_desc": "a.data_cadastro DESC, a.id DESC",
+}
+
 OBTER_ATIVOS_PAGINADOS = """
-SELECT a.*, c.nome as nome_categoria, u.nome as nome_vendedor
+SELECT a.*, u.nome as nome_vendedor
 FROM anuncio a
-LEFT JOIN categoria c ON a.id_categoria = c.id
 LEFT JOIN usuario u ON a.id_vendedor = u.id
 WHERE a.ativo = 1 AND a.estoque > 0
-  AND (? IS NULL OR a.nome LIKE ? OR a.descricao LIKE ?)
   AND (? IS NULL OR a.id_categoria = ?)
-ORDER BY a.data_cadastro DESC
+ORDER BY {ordem}
 LIMIT ? OFFSET ?
 """
 
@@ -120,14 +213,71 @@ CONTAR_ATIVOS = """
 SELECT COUNT(*) as total
 FROM anuncio a
 WHERE a.ativo = 1 AND a.estoque > 0
-  AND (? IS NULL OR a.nome LIKE ? OR a.descricao LIKE ?)
   AND (? IS NULL OR a.id_categoria = ?)
 """
 
+OBTER_ATIVOS_PAGINADOS_FTS = """
+SELECT a.*, u.nome as nome_vendedor
+FROM anuncio_fts
+JOIN anuncio a ON a.id = anuncio_fts.rowid
+LEFT JOIN usuario u ON a.id_vendedor = u.id
+WHERE anuncio_fts MATCH ?
+  AND a.ativo = 1 AND a.estoque > 0
+  AND (? IS NULL OR a.id_categoria = ?)
+ORDER BY {ordem}
+LIMIT ? OFFSET ?
+"""
+
+CONTAR_ATIVOS_FTS = """
+SELECT COUNT(*) as total
+FROM anuncio_fts
+JOIN anuncio a ON a.id = anuncio_fts.rowid
+WHERE anuncio_fts MATCH ?
+  AND a.ativo = 1 AND a.estoque > 0
+  AND (? IS NULL OR a.id_categoria = ?)
+"""
+
+# Paginação por cursor (keyset) em (data_cadastro, id), do mais recente ao mais antigo.
+# {filtro_cursor} recebe FILTRO_CURSOR_DATA a partir da segunda página.
+FILTRO_CURSOR_DATA = "AND (a.data_cadastro, a.id) < (?, ?)"
+
+OBTER_ATIVOS_POR_CURSOR = """
+SELECT a.*, u.nome as nome_vendedor
+FROM anuncio a
+LEFT JOIN usuario u ON a.id_vendedor = u.id
+WHERE a.ativo = 1 AND a.estoque > 0
+  AND (? IS NULL OR a.id_categoria = ?)
+  {filtro_cursor}
+ORDER BY a.data_cadastro DESC, a.id DESC
+LIMIT ?
+"""
+
+OBTER_ATIVOS_POR_CURSOR_FTS = """
+SELECT a.*, u.nome as nome_vendedor
+FROM anuncio_fts
+JOIN anuncio a ON a.id = anuncio_fts.rowid
+LEFT JOIN usuario u ON a.id_vendedor = u.id
+WHERE anuncio_fts MATCH ?
+  AND a.ativo = 1 AND a.estoque > 0
+  AND (? IS NULL OR a.id_categoria = ?)
+  {filtro_cursor}
+ORDER BY a.data_cadastro DESC, a.id DESC
+LIMIT ?
+"""
+
+OBTER_TODOS_POR_CURSOR = """
+SELECT a.* FROM anuncio a
+WHERE 1 = 1
+  {filtro_cursor}
+ORDER BY a.data_cadastro DESC, a.id DESC
+LIMIT ?
+"""
+
+CONTAR_TODOS = "SELECT COUNT(*) as total FROM anuncio"
+
 OBTER_ULTIMOS_ATIVOS = """
-SELECT a.*, c.nome as nome_categoria, u.nome as nome_vendedor
+SELECT a.*, u.nome as nome_vendedor
 FROM anuncio a
-LEFT JOIN categoria c ON a.id_categoria = c.id
 LEFT JOIN usuario u ON a.id_vendedor = u.id
 WHERE a.ativo = 1 AND a.estoque > 0
 ORDER BY a.data_cadastro DESC
@@ -135,9 +285,20 @@ LIMIT ?
 """
 
 OBTER_POR_ID_COM_DETALHES = """
-SELECT a.*, c.nome as nome_categoria, u.nome as nome_vendedor, u.email as email_vendedor
+SELECT a.*, u.nome as nome_vendedor, u.email as email_vendedor
 FROM anuncio a
-LEFT JOIN categoria c ON a.id_categoria = c.id
 LEFT JOIN usuario u ON a.id_vendedor = u.id
 WHERE a.id = ?
-"""
\ No newline at end of file
+"""
+
+# Validadores das respostas condicionais (ETag): versão do catálogo inteiro
+# e dados de que a página de detalhes depende, sem montar o anúncio
+OBTER_VERSAO = "SELECT COALESCE(MAX(versao), 0) AS versao FROM anuncio"
+
+OBTER_VERSAO_DETALHES = """
+SELECT a.versao, a.id_categoria, a.ativo, a.estoque,
+       u.nome as nome_vendedor, u.email as email_vendedor
+FROM anuncio a
+LEFT JOIN usuario u ON a.id_vendedor = u.id
+WHERE a.id = ?
+"""
@@ -7,10 +7,57 @@ CRIAR_TABELA = """
         nome TEXT UNIQUE NOT NULL,
         descricao TEXT,
         data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        data_atualizacao TIMESTAMP
+        data_atualizacao TIMESTAMP,
+        versao INTEGER NOT NULL DEFAULT 0
     )
 """
 
+# Bancos criados antes do contador de versão não têm a coluna versao
+EXISTE_COLUNA_VERSAO = """
+    SELECT 1 FROM pragma_table_info('categoria')
+    WHERE name = 'versao'
+"""
+
+ADICIONAR_COLUNA_VERSAO = """
+    ALTER TABLE categoria
+    ADD COLUMN versao INTEGER NOT NULL DEFAULT 0
+"""
+
+# Contador de versão das categorias (mesmo esquema de configuracao_sql):
+# MAX(versao) muda a cada inserção, alteração ou exclusão, feita por
+# qualquer worker. O catálogo em memória de cada worker compara esse valor
+# para saber se precisa recarregar.
+CRIAR_TRIGGER_VERSAO_INSERIR = """
+    CREATE TRIGGER IF NOT EXISTS categoria_versao_ai AFTER INSERT ON categoria BEGIN
+        UPDATE categoria SET versao = (SELECT MAX(versao) FROM categoria) + 1
+        WHERE id = new.id;
+    END
+"""
+
+CRIAR_TRIGGER_VERSAO_ALTERAR = """
+    CREATE TRIGGER IF NOT EXISTS categoria_versao_au AFTER UPDATE OF nome, descricao ON categoria
+    BEGIN
+        UPDATE categoria SET versao = (SELECT MAX(versao) FROM categoria) + 1
+        WHERE id = new.id;
+    END
+"""
+
+# Na exclusão, a linha mais recente recebe versão acima da excluída: o
+# contador nunca volta a um valor já observado
+CRIAR_TRIGGER_VERSAO_EXCLUIR = """
+    CREATE TRIGGER IF NOT EXISTS categoria_versao_ad AFTER DELETE ON categoria BEGIN
+        UPDATE categoria
+        SET versao = MAX(old.versao, (SELECT MAX(versao) FROM categoria)) + 1
+        WHERE id = (SELECT id FROM categoria ORDER BY versao DESC LIMIT 1);
+    END
+"""
+
+TRIGGERS_VERSAO = [
+    CRIAR_TRIGGER_VERSAO_INSERIR,
+    CRIAR_TRIGGER_VERSAO_ALTERAR,
+    CRIAR_TRIGGER_VERSAO_EXCLUIR,
+]
+
 # Insere uma nova categoria
 INSERIR = """
     INSERT INTO categoria (nome, descricao)
@@ -36,16 +83,14 @@ OBTER_TODOS = """
     ORDER BY nome
 """
 
-# Busca uma categoria por ID
-OBTER_POR_ID = """
-    SELECT id, nome, descricao, data_cadastro, data_atualizacao
-    FROM categoria
-    WHERE id=?
-"""
-
 # Busca uma categoria por nome
 OBTER_POR_NOME = """
     SELECT id, nome, descricao, data_cadastro, data_atualizacao
     FROM categoria
     WHERE nome=?
 """
+
+# Versão atual das categorias (0 para tabela vazia)
+OBTER_VERSAO = """
+    SELECT COALESCE(MAX(versao), 0) AS versao FROM categoria
+"""
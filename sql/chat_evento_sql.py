@@ -0,0 +1,40 @@
+"""
+SQL statements para a tabela chat_evento.
+Log de eventos do chat usado pelo backend de pub/sub "sqlite"
+(util/chat_pubsub.py) para levar cada broadcast a todos os workers.
+"""
+
+# AUTOINCREMENT garante que ids não são reutilizados após a limpeza dos
+# eventos antigos; cada worker acompanha a tabela pelo último id lido.
+# criado_em é o instante (epoch, segundos) usado apenas na limpeza.
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS chat_evento (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sala_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    criado_em REAL NOT NULL
+)
+"""
+
+INSERIR = """
+INSERT INTO chat_evento (sala_id, payload, criado_em)
+VALUES (?, ?, ?)
+"""
+
+OBTER_ULTIMO_ID = """
+SELECT COALESCE(MAX(id), 0) AS ultimo_id
+FROM chat_evento
+"""
+
+LISTAR_POSTERIORES = """
+SELECT id, sala_id, payload
+FROM chat_evento
+WHERE id > ?
+ORDER BY id
+LIMIT ?
+"""
+
+EXCLUIR_ANTERIORES = """
+DELETE FROM chat_evento
+WHERE criado_em < ?
+"""
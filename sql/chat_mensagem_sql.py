@@ -49,6 +49,40 @@ WHERE sala_id = ?
   AND lida_em IS NULL
 """
 
+# Manutenção do contador chat_participante.nao_lidas, executada na mesma
+# transação que grava/lê/exclui a mensagem
+
+# Parâmetros: (sala_id, autor_id) - soma 1 para os demais participantes
+INCREMENTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = nao_lidas + 1
+WHERE sala_id = ? AND usuario_id != ?
+"""
+
+# Parâmetros: (agora, sala_id, usuario_id) - a leitura também avança
+# ultima_leitura, para que o recálculo do contador chegue ao mesmo zero
+ZERAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = 0, ultima_leitura = ?
+WHERE sala_id = ? AND usuario_id = ?
+"""
+
+# Parâmetros: (mensagem_id,) - antes de excluir, desconta a mensagem de quem
+# ainda não a tinha lido
+DECREMENTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = nao_lidas - 1
+WHERE nao_lidas > 0
+  AND EXISTS (
+    SELECT 1 FROM chat_mensagem m
+    WHERE m.id = ?
+      AND m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL
+           OR chat_participante.ultima_leitura < m.data_envio)
+  )
+"""
+
 OBTER_ULTIMA_MENSAGEM_SALA = """
 SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
 FROM chat_mensagem
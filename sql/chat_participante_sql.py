@@ -8,58 +8,122 @@ CREATE TABLE IF NOT EXISTS chat_participante (
     sala_id TEXT NOT NULL,
     usuario_id INTEGER NOT NULL,
     ultima_leitura TIMESTAMP,
+    nao_lidas INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (sala_id, usuario_id),
     FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE,
     FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
 )
 """
 
+# Bancos criados antes do contador de não lidas não têm a coluna nao_lidas
+EXISTE_COLUNA_NAO_LIDAS = """
+SELECT 1 FROM pragma_table_info('chat_participante')
+WHERE name = 'nao_lidas'
+"""
+
+ADICIONAR_COLUNA_NAO_LIDAS = """
+ALTER TABLE chat_participante
+ADD COLUMN nao_lidas INTEGER NOT NULL DEFAULT 0
+"""
+
 INSERIR = """
 INSERT INTO chat_participante (sala_id, usuario_id, ultima_leitura)
 VALUES (?, ?, ?)
 """
 
 OBTER_POR_SALA_E_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE sala_id = ? AND usuario_id = ?
 """
 
 LISTAR_POR_SALA = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE sala_id = ?
 """
 
 LISTAR_POR_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE usuario_id = ?
 """
 
 ATUALIZAR_ULTIMA_LEITURA = """
 UPDATE chat_participante
-SET ultima_leitura = ?
+SET ultima_leitura = ?, nao_lidas = 0
 WHERE sala_id = ? AND usuario_id = ?
 """
 
-CONTAR_MENSAGENS_NAO_LIDAS = """
-SELECT COUNT(*) as total
-FROM chat_mensagem m
-WHERE m.sala_id = ?
-  AND m.usuario_id != ?
-  AND (
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) IS NULL
-    OR
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) < m.data_envio
-  )
+# O contador nao_lidas é mantido por chat_mensagem_repo (inserir/excluir/
+# marcar_como_lidas) e zerado em ATUALIZAR_ULTIMA_LEITURA; a leitura é
+# uma busca pela chave primária.
+OBTER_NAO_LIDAS = """
+SELECT nao_lidas AS total
+FROM chat_participante
+WHERE sala_id = ? AND usuario_id = ?
+"""
+
+SOMAR_NAO_LIDAS_POR_USUARIO = """
+SELECT COALESCE(SUM(nao_lidas), 0) AS total
+FROM chat_participante
+WHERE usuario_id = ?
+"""
+
+# Recalcula o contador a partir das mensagens: não lidas são as mensagens
+# dos outros participantes enviadas depois da última leitura. Só altera
+# (e conta em rowcount) as linhas em que o contador estava divergente.
+_CONTAGEM_NAO_LIDAS = """(
+    SELECT COUNT(*)
+    FROM chat_mensagem m
+    WHERE m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL
+           OR chat_participante.ultima_leitura < m.data_envio)
+)"""
+
+RECALCULAR_NAO_LIDAS = f"""
+UPDATE chat_participante
+SET nao_lidas = {_CONTAGEM_NAO_LIDAS}
+WHERE nao_lidas != {_CONTAGEM_NAO_LIDAS}
 """
 
 EXCLUIR = """
 DELETE FROM chat_participante
 WHERE sala_id = ? AND usuario_id = ?
 """
+
+# Resumo das conversas de um usuário em uma única consulta: a página de salas
+# é ordenada e limitada primeiro (CTE) e só então são buscados o outro
+# participante e a última mensagem de cada sala.
+# Salas sem outro participante ou cujo outro usuário não existe são ignoradas.
+# Parâmetros: (usuario_id, limit, offset)
+LISTAR_CONVERSAS_POR_USUARIO = """
+WITH pagina AS (
+    SELECT eu.sala_id, eu.nao_lidas, s.ultima_atividade, outro.usuario_id AS outro_usuario_id
+    FROM chat_participante eu
+    INNER JOIN chat_sala s ON s.id = eu.sala_id
+    INNER JOIN chat_participante outro
+        ON outro.sala_id = eu.sala_id AND outro.usuario_id != eu.usuario_id
+    INNER JOIN usuario u ON u.id = outro.usuario_id
+    WHERE eu.usuario_id = ?
+    ORDER BY s.ultima_atividade DESC, eu.sala_id
+    LIMIT ? OFFSET ?
+)
+SELECT
+    pagina.sala_id,
+    pagina.ultima_atividade AS "ultima_atividade [timestamp]",
+    u.id AS outro_usuario_id,
+    u.nome AS outro_usuario_nome,
+    u.email AS outro_usuario_email,
+    m.mensagem AS ultima_mensagem,
+    m.data_envio AS "ultima_mensagem_data [timestamp]",
+    m.usuario_id AS ultima_mensagem_usuario_id,
+    pagina.nao_lidas
+FROM pagina
+INNER JOIN usuario u ON u.id = pagina.outro_usuario_id
+LEFT JOIN chat_mensagem m ON m.id = (
+    SELECT MAX(um.id) FROM chat_mensagem um WHERE um.sala_id = pagina.sala_id
+)
+ORDER BY pagina.ultima_atividade DESC, pagina.sala_id
+"""
@@ -3,10 +3,58 @@ CREATE TABLE IF NOT EXISTS configuracao (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     chave TEXT UNIQUE NOT NULL,
     valor TEXT NOT NULL,
-    descricao TEXT
+    descricao TEXT,
+    versao INTEGER NOT NULL DEFAULT 0
 )
 """
 
+# Bancos criados antes do contador de versão não têm a coluna versao
+EXISTE_COLUNA_VERSAO = """
+SELECT 1 FROM pragma_table_info('configuracao')
+WHERE name = 'versao'
+"""
+
+ADICIONAR_COLUNA_VERSAO = """
+ALTER TABLE configuracao
+ADD COLUMN versao INTEGER NOT NULL DEFAULT 0
+"""
+
+# Contador de versão das configurações: MAX(versao) muda a cada inserção,
+# alteração de valor ou exclusão, qualquer que seja o worker/processo que
+# escreveu. Os caches de configuração de cada worker comparam esse valor
+# para saber se precisam recarregar.
+CRIAR_TRIGGER_VERSAO_INSERIR = """
+CREATE TRIGGER IF NOT EXISTS configuracao_versao_ai AFTER INSERT ON configuracao BEGIN
+    UPDATE configuracao SET versao = (SELECT MAX(versao) FROM configuracao) + 1
+    WHERE id = new.id;
+END
+"""
+
+# Só altera a versão quando o valor (ou a chave) realmente muda
+CRIAR_TRIGGER_VERSAO_ALTERAR = """
+CREATE TRIGGER IF NOT EXISTS configuracao_versao_au AFTER UPDATE OF chave, valor ON configuracao
+WHEN old.valor IS NOT new.valor OR old.chave IS NOT new.chave BEGIN
+    UPDATE configuracao SET versao = (SELECT MAX(versao) FROM configuracao) + 1
+    WHERE id = new.id;
+END
+"""
+
+# Na exclusão, a linha mais recente recebe versão acima da excluída: o
+# contador nunca volta a um valor já observado
+CRIAR_TRIGGER_VERSAO_EXCLUIR = """
+CREATE TRIGGER IF NOT EXISTS configuracao_versao_ad AFTER DELETE ON configuracao BEGIN
+    UPDATE configuracao
+    SET versao = MAX(old.versao, (SELECT MAX(versao) FROM configuracao)) + 1
+    WHERE id = (SELECT id FROM configuracao ORDER BY versao DESC LIMIT 1);
+END
+"""
+
+TRIGGERS_VERSAO = [
+    CRIAR_TRIGGER_VERSAO_INSERIR,
+    CRIAR_TRIGGER_VERSAO_ALTERAR,
+    CRIAR_TRIGGER_VERSAO_EXCLUIR,
+]
+
 INSERIR = "INSERT INTO configuracao (chave, valor, descricao) VALUES (?, ?, ?)"
 
 OBTER_POR_CHAVE = "SELECT * FROM configuracao WHERE chave = ?"
@@ -14,3 +62,5 @@ OBTER_POR_CHAVE = "SELECT * FROM configuracao WHERE chave = ?"
 OBTER_TODOS = "SELECT * FROM configuracao ORDER BY chave"
 
 ATUALIZAR = "UPDATE configuracao SET valor = ? WHERE chave = ?"
+
+OBTER_VERSAO = "SELECT COALESCE(MAX(versao), 0) AS versao FROM configuracao"
@@ -18,11 +18,7 @@ CREATE TABLE IF NOT EXISTS endereco (
 )
 """
 
-# Índice para otimizar buscas por usuário
-CRIAR_INDICE = """
-CREATE INDEX IF NOT EXISTS idx_endereco_usuario
-ON endereco(id_usuario)
-"""
+# Índices: ver sql/indices_sql.py
 
 INSERIR = """
 INSERT INTO endereco (id_usuario, titulo, logradouro, numero, complemento, bairro, cidade, uf, cep)
@@ -55,4 +51,10 @@ ORDER BY titulo
 OBTER_TODOS = """
 SELECT * FROM endereco
 ORDER BY id_usuario, titulo
+"""
+
+# Endereços de vários pedidos em uma consulta: ids como array JSON ("[1, 2, 3]")
+OBTER_POR_IDS = """
+SELECT * FROM endereco
+WHERE id IN (SELECT value FROM json_each(?))
 """
\ No newline at end of file
@@ -1,3 +1,25 @@
+"""
+Declaração dos índices do banco de dados.
+
+Cada índice composto/parcial abaixo foi desenhado para uma consulta
+quente específica (indicada no comentário). CONSULTAS_CRITICAS lista essas
+consultas com parâmetros de exemplo; repo/indices_repo verifica com
+EXPLAIN QUERY PLAN que nenhuma delas cai em varredura completa de tabela.
+"""
+
+from sql import (
+    anuncio_sql,
+    chamado_interacao_sql,
+    chamado_sql,
+    chat_evento_sql,
+    chat_mensagem_sql,
+    chat_participante_sql,
+    endereco_sql,
+    mensagem_sql,
+    pedido_sql,
+    usuario_sql,
+)
+
 # Índices da tabela usuario
 CRIAR_INDICE_USUARIO_PERFIL = """
 CREATE INDEX IF NOT EXISTS idx_usuario_perfil
@@ -10,6 +32,12 @@ ON usuario(token_redefinicao)
 WHERE token_redefinicao IS NOT NULL
 """
 
+# Listagem admin paginada por (nome, id) - usuario_sql.OBTER_POR_CURSOR
+CRIAR_INDICE_USUARIO_NOME = """
+CREATE INDEX IF NOT EXISTS idx_usuario_nome
+ON usuario(nome)
+"""
+
 # Índices da tabela chamado
 CRIAR_INDICE_CHAMADO_USUARIO = """
 CREATE INDEX IF NOT EXISTS idx_chamado_usuario_id
@@ -22,9 +50,17 @@ ON chamado(status)
 """
 
 # Índices da tabela chamado_interacao
+# Histórico do chamado já ordenado - chamado_interacao_sql.OBTER_POR_CHAMADO
 CRIAR_INDICE_INTERACAO_CHAMADO = """
-CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado_id
-ON chamado_interacao(chamado_id)
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado_data
+ON chamado_interacao(chamado_id, data_interacao)
+"""
+
+# Parcial: só interações não lidas - chamado_interacao_sql.CONTAR_NAO_LIDAS_POR_CHAMADO
+CRIAR_INDICE_INTERACAO_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_nao_lidas
+ON chamado_interacao(chamado_id, usuario_id)
+WHERE data_leitura IS NULL
 """
 
 # Índices da tabela chat_mensagem
@@ -41,17 +77,204 @@ CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario_id
 ON chat_participante(usuario_id)
 """
 
+# Índices da tabela anuncio
+# Parcial: catálogo público (ativo = 1 AND estoque > 0) por data, também
+# usado na paginação por cursor - anuncio_sql.OBTER_ATIVOS_POR_CURSOR
+CRIAR_INDICE_ANUNCIO_ATIVOS_DATA = """
+CREATE INDEX IF NOT EXISTS idx_anuncio_ativos_data
+ON anuncio(data_cadastro)
+WHERE ativo = 1 AND estoque > 0
+"""
+
+# Parcial: anúncios ativos de uma categoria por data - anuncio_sql.OBTER_POR_CATEGORIA
+CRIAR_INDICE_ANUNCIO_CATEGORIA_ATIVOS = """
+CREATE INDEX IF NOT EXISTS idx_anuncio_categoria_ativos
+ON anuncio(id_categoria, data_cadastro)
+WHERE ativo = 1 AND estoque > 0
+"""
+
+# Chave estrangeira para categoria (todos os anúncios, inclusive inativos)
+CRIAR_INDICE_ANUNCIO_CATEGORIA = """
+CREATE INDEX IF NOT EXISTS idx_anuncio_categoria
+ON anuncio(id_categoria)
+"""
+
+# Anúncios do vendedor por data; também é o caminho de pedido -> anuncio
+# nas consultas de pedidos do vendedor - anuncio_sql.OBTER_POR_VENDEDOR
+CRIAR_INDICE_ANUNCIO_VENDEDOR_DATA = """
+CREATE INDEX IF NOT EXISTS idx_anuncio_vendedor_data
+ON anuncio(id_vendedor, data_cadastro)
+"""
+
+# Listagem admin de todos os anúncios - anuncio_sql.OBTER_TODOS_POR_CURSOR
+CRIAR_INDICE_ANUNCIO_DATA = """
+CREATE INDEX IF NOT EXISTS idx_anuncio_data
+ON anuncio(data_cadastro)
+"""
+
+# Contador de versão (triggers e validador do ETag) - anuncio_sql.OBTER_VERSAO
+CRIAR_INDICE_ANUNCIO_VERSAO = """
+CREATE INDEX IF NOT EXISTS idx_anuncio_versao
+ON anuncio(versao)
+"""
+
+# Índices da tabela pedido
+# Pedidos do comprador por data - pedido_sql.OBTER_POR_COMPRADOR_COM_DETALHES
+CRIAR_INDICE_PEDIDO_COMPRADOR_DATA = """
+CREATE INDEX IF NOT EXISTS idx_pedido_comprador_data
+ON pedido(id_comprador, data_hora_pedido)
+"""
+
+# Junção anuncio.id_vendedor -> pedido - pedido_sql.OBTER_POR_VENDEDOR_COM_DETALHES
+CRIAR_INDICE_PEDIDO_ANUNCIO_DATA = """
+CREATE INDEX IF NOT EXISTS idx_pedido_anuncio_data
+ON pedido(id_anuncio, data_hora_pedido)
+"""
+
+# Pedidos por status e data - pedido_sql.OBTER_POR_STATUS
+CRIAR_INDICE_PEDIDO_STATUS_DATA = """
+CREATE INDEX IF NOT EXISTS idx_pedido_status_data
+ON pedido(status, data_hora_pedido)
+"""
+
+# Listagem admin paginada por data - pedido_sql.OBTER_POR_CURSOR
+CRIAR_INDICE_PEDIDO_DATA = """
+CREATE INDEX IF NOT EXISTS idx_pedido_data
+ON pedido(data_hora_pedido)
+"""
+
+# Pedidos que usaram um endereço (detalhes do endereço no admin) - pedido_sql.OBTER_POR_ENDERECO
+CRIAR_INDICE_PEDIDO_ENDERECO_DATA = """
+CREATE INDEX IF NOT EXISTS idx_pedido_endereco_data
+ON pedido(id_endereco, data_hora_pedido)
+"""
+
+# Índices da tabela mensagem
+# Caixa de entrada por data - mensagem_sql.OBTER_MENSAGENS_RECEBIDAS
+CRIAR_INDICE_MENSAGEM_DESTINATARIO_DATA = """
+CREATE INDEX IF NOT EXISTS idx_mensagem_destinatario_data
+ON mensagem(id_destinatario, data_hora)
+"""
+
+# Conversa entre dois usuários - mensagem_sql.OBTER_CONVERSA
+CRIAR_INDICE_MENSAGEM_REMETENTE_DESTINATARIO = """
+CREATE INDEX IF NOT EXISTS idx_mensagem_remetente_destinatario
+ON mensagem(id_remetente, id_destinatario)
+"""
+
+# Índices da tabela endereco
+CRIAR_INDICE_ENDERECO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_endereco_usuario
+ON endereco(id_usuario)
+"""
+
 # Lista de todos os índices para criação
 TODOS_INDICES = [
     # Usuario
     CRIAR_INDICE_USUARIO_PERFIL,
     CRIAR_INDICE_USUARIO_TOKEN,
+    CRIAR_INDICE_USUARIO_NOME,
     # Chamado
     CRIAR_INDICE_CHAMADO_USUARIO,
     CRIAR_INDICE_CHAMADO_STATUS,
     # Chamado Interação
     CRIAR_INDICE_INTERACAO_CHAMADO,
+    CRIAR_INDICE_INTERACAO_NAO_LIDAS,
     # Chat
     CRIAR_INDICE_CHAT_MENSAGEM_SALA,
     CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO,
+    # Anuncio
+    CRIAR_INDICE_ANUNCIO_ATIVOS_DATA,
+    CRIAR_INDICE_ANUNCIO_CATEGORIA_ATIVOS,
+    CRIAR_INDICE_ANUNCIO_CATEGORIA,
+    CRIAR_INDICE_ANUNCIO_VENDEDOR_DATA,
+    CRIAR_INDICE_ANUNCIO_DATA,
+    CRIAR_INDICE_ANUNCIO_VERSAO,
+    # Pedido
+    CRIAR_INDICE_PEDIDO_COMPRADOR_DATA,
+    CRIAR_INDICE_PEDIDO_ANUNCIO_DATA,
+    CRIAR_INDICE_PEDIDO_STATUS_DATA,
+    CRIAR_INDICE_PEDIDO_DATA,
+    CRIAR_INDICE_PEDIDO_ENDERECO_DATA,
+    # Mensagem
+    CRIAR_INDICE_MENSAGEM_DESTINATARIO_DATA,
+    CRIAR_INDICE_MENSAGEM_REMETENTE_DESTINATARIO,
+    # Endereco
+    CRIAR_INDICE_ENDERECO_USUARIO,
 ]
+
+# Índices antigos cobertos por um índice composto acima (prefixo redundante)
+# ou que deixaram de ser usados (idx_chat_mensagem_sala_data servia à
+# contagem de não lidas, substituída pelo contador chat_participante.nao_lidas).
+# São removidos no startup para não pesar nas escritas.
+INDICES_SUBSTITUIDOS = [
+    "idx_chamado_interacao_chamado_id",
+    "idx_chat_mensagem_sala_data",
+]
+
+# Índices criados explicitamente (exclui os automáticos de PRIMARY KEY/UNIQUE)
+LISTAR_INDICES_EXPLICITOS = """
+SELECT name FROM sqlite_master
+WHERE type = 'index' AND sql IS NOT NULL
+"""
+
+# Consultas quentes verificadas com EXPLAIN QUERY PLAN: nome -> (sql, parâmetros de exemplo).
+# Os parâmetros só precisam ter o tipo certo; o plano não depende dos valores.
+CONSULTAS_CRITICAS = {
+    "anuncio.ativos_por_cursor": (
+        anuncio_sql.OBTER_ATIVOS_POR_CURSOR.format(filtro_cursor=""),
+        (None, None, 13),
+    ),
+    "anuncio.ativos_por_cursor_proxima": (
+        anuncio_sql.OBTER_ATIVOS_POR_CURSOR.format(filtro_cursor=anuncio_sql.FILTRO_CURSOR_DATA),
+        (None, None, "2000-01-01 00:00:00", 1, 13),
+    ),
+    "anuncio.ativos_paginados": (
+        anuncio_sql.OBTER_ATIVOS_PAGINADOS.format(ordem=anuncio_sql.ORDENACOES_ATIVOS["data_desc"]),
+        (None, None, 12, 0),
+    ),
+    "anuncio.contar_ativos": (anuncio_sql.CONTAR_ATIVOS, (None, None)),
+    "anuncio.ultimos_ativos": (anuncio_sql.OBTER_ULTIMOS_ATIVOS, (12,)),
+    "anuncio.todos_ativos": (anuncio_sql.OBTER_TODOS_ATIVOS, ()),
+    "anuncio.por_categoria": (anuncio_sql.OBTER_POR_CATEGORIA, (1,)),
+    "anuncio.por_vendedor": (anuncio_sql.OBTER_POR_VENDEDOR, (1,)),
+    "anuncio.versao": (anuncio_sql.OBTER_VERSAO, ()),
+    "anuncio.todos_por_cursor": (
+        anuncio_sql.OBTER_TODOS_POR_CURSOR.format(filtro_cursor=""),
+        (51,),
+    ),
+    "pedido.por_comprador": (pedido_sql.OBTER_POR_COMPRADOR_COM_DETALHES, (1,)),
+    "pedido.por_vendedor": (pedido_sql.OBTER_POR_VENDEDOR_COM_DETALHES, (1,)),
+    "pedido.por_status": (pedido_sql.OBTER_POR_STATUS, ("Pendente",)),
+    "pedido.por_endereco": (pedido_sql.OBTER_POR_ENDERECO, (1,)),
+    "pedido.por_cursor": (
+        pedido_sql.OBTER_POR_CURSOR.format(filtro_cursor=""),
+        (None, None, 51),
+    ),
+    "chat_mensagem.listar_por_sala": (chat_mensagem_sql.LISTAR_POR_SALA, ("sala", 50, 0)),
+    "chat_mensagem.ultima_da_sala": (chat_mensagem_sql.OBTER_ULTIMA_MENSAGEM_SALA, ("sala",)),
+    "chat_participante.listar_por_usuario": (chat_participante_sql.LISTAR_POR_USUARIO, (1,)),
+    "chat_evento.posteriores": (chat_evento_sql.LISTAR_POSTERIORES, (0, 500)),
+    "chat_participante.nao_lidas": (chat_participante_sql.OBTER_NAO_LIDAS, ("sala", 1)),
+    "chat_participante.nao_lidas_usuario": (
+        chat_participante_sql.SOMAR_NAO_LIDAS_POR_USUARIO,
+        (1,),
+    ),
+    "chat_participante.listar_conversas": (
+        chat_participante_sql.LISTAR_CONVERSAS_POR_USUARIO,
+        (1, 12, 0),
+    ),
+    "chamado.por_usuario": (chamado_sql.OBTER_POR_USUARIO, (1,)),
+    "chamado.pendentes": (chamado_sql.CONTAR_PENDENTES, ()),
+    "chamado_interacao.por_chamado": (chamado_interacao_sql.OBTER_POR_CHAMADO, (1,)),
+    "chamado_interacao.nao_lidas": (chamado_interacao_sql.CONTAR_NAO_LIDAS_POR_CHAMADO, (1,)),
+    "usuario.por_cursor": (
+        usuario_sql.OBTER_POR_CURSOR.format(filtro_cursor=usuario_sql.FILTRO_CURSOR_NOME),
+        ("", 0, 51),
+    ),
+    "usuario.por_perfil": (usuario_sql.OBTER_TODOS_POR_PERFIL, ("Comprador",)),
+    "usuario.por_token": (usuario_sql.OBTER_POR_TOKEN, ("token",)),
+    "mensagem.recebidas": (mensagem_sql.OBTER_MENSAGENS_RECEBIDAS, (1,)),
+    "mensagem.conversa": (mensagem_sql.OBTER_CONVERSA, (1, 2, 2, 1)),
+    "endereco.por_usuario": (endereco_sql.OBTER_TODOS_POR_USUARIO, (1,)),
+}
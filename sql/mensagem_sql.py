@@ -15,16 +15,7 @@ CREATE TABLE IF NOT EXISTS mensagem (
 )
 """
 
-# Índices para otimizar buscas por remetente e destinatário
-CRIAR_INDICE_REMETENTE = """
-CREATE INDEX IF NOT EXISTS idx_mensagem_remetente
-ON mensagem(id_remetente)
-"""
-
-CRIAR_INDICE_DESTINATARIO = """
-CREATE INDEX IF NOT EXISTS idx_mensagem_destinatario
-ON mensagem(id_destinatario)
-"""
+# Índices: ver sql/indices_sql.py
 
 INSERIR = """
 INSERT INTO mensagem (id_remetente, id_destinatario, mensagem)
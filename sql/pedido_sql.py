@@ -24,21 +24,7 @@ CREATE TABLE IF NOT EXISTS pedido (
 )
 """
 
-# Índices para otimizar buscas
-CRIAR_INDICE_COMPRADOR = """
-CREATE INDEX IF NOT EXISTS idx_pedido_comprador
-ON pedido(id_comprador)
-"""
-
-CRIAR_INDICE_ANUNCIO = """
-CREATE INDEX IF NOT EXISTS idx_pedido_anuncio
-ON pedido(id_anuncio)
-"""
-
-CRIAR_INDICE_STATUS = """
-CREATE INDEX IF NOT EXISTS idx_pedido_status
-ON pedido(status)
-"""
+# Índices: ver sql/indices_sql.py
 
 INSERIR = """
 INSERT INTO pedido (id_endereco, id_comprador, id_anuncio, preco, status)
@@ -116,11 +102,34 @@ WHERE status = ?
 ORDER BY data_hora_pedido DESC
 """
 
+OBTER_POR_ENDERECO = """
+SELECT * FROM pedido
+WHERE id_endereco = ?
+ORDER BY data_hora_pedido DESC
+"""
+
 OBTER_TODOS = """
 SELECT * FROM pedido
 ORDER BY data_hora_pedido DESC
 """
 
+# Paginação por cursor (keyset) em (data_hora_pedido, id), do mais recente ao mais antigo.
+# {filtro_cursor} recebe FILTRO_CURSOR_DATA a partir da segunda página.
+FILTRO_CURSOR_DATA = "AND (data_hora_pedido, id) < (?, ?)"
+
+OBTER_POR_CURSOR = """
+SELECT * FROM pedido
+WHERE (? IS NULL OR status = ?)
+  {filtro_cursor}
+ORDER BY data_hora_pedido DESC, id DESC
+LIMIT ?
+"""
+
+CONTAR = """
+SELECT COUNT(*) as total FROM pedido
+WHERE (? IS NULL OR status = ?)
+"""
+
 OBTER_COM_DETALHES = """
 SELECT
     p.*,
@@ -0,0 +1,72 @@
+"""
+SQL statements para a tabela rate_limit.
+Contadores do algoritmo janela_deslizante usados pelo armazenamento "sqlite"
+dos rate limiters (util/rate_limit_armazenamento.py). A tabela fica em um
+arquivo próprio (RATE_LIMIT_SQLITE_ARQUIVO), separado do banco da aplicação.
+"""
+
+# Um registro compacto por (limiter, identificador); indice é o número da
+# janela fixa (segundos monotônicos // tamanho da janela).
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS rate_limit (
+    limiter TEXT NOT NULL,
+    identificador TEXT NOT NULL,
+    indice INTEGER NOT NULL,
+    atual INTEGER NOT NULL,
+    anterior INTEGER NOT NULL,
+    PRIMARY KEY (limiter, identificador)
+) WITHOUT ROWID
+"""
+
+# Verificação e registro atômicos em um único comando: avança o registro até
+# a janela atual e incrementa a contagem somente se a estimativa ainda estiver
+# abaixo do limite. Nas expressões do UPDATE as colunas são os valores antigos.
+# Sem linha retornada = tentativa bloqueada (o UPDATE não ocorreu).
+# Parâmetros: limiter, identificador, indice, peso, max_tentativas
+REGISTRAR = """
+INSERT INTO rate_limit (limiter, identificador, indice, atual, anterior)
+VALUES (:limiter, :identificador, :indice, 1, 0)
+ON CONFLICT (limiter, identificador) DO UPDATE SET
+    anterior = CASE indice
+        WHEN :indice THEN anterior
+        WHEN :indice - 1 THEN atual
+        ELSE 0
+    END,
+    atual = CASE indice WHEN :indice THEN atual ELSE 0 END + 1,
+    indice = :indice
+WHERE CASE indice
+        WHEN :indice THEN anterior
+        WHEN :indice - 1 THEN atual
+        ELSE 0
+    END * :peso + CASE indice WHEN :indice THEN atual ELSE 0 END < :max_tentativas
+RETURNING atual, anterior
+"""
+
+OBTER = """
+SELECT indice, atual, anterior
+FROM rate_limit
+WHERE limiter = ? AND identificador = ?
+"""
+
+EXCLUIR = """
+DELETE FROM rate_limit
+WHERE limiter = ? AND identificador = ?
+"""
+
+EXCLUIR_POR_LIMITER = """
+DELETE FROM rate_limit
+WHERE limiter = ?
+"""
+
+# Ociosos: janela anterior à anterior, ou janela "do futuro" (relógio
+# monotônico reiniciado com o boot da máquina)
+EXCLUIR_OCIOSOS = """
+DELETE FROM rate_limit
+WHERE limiter = ? AND (indice < ? OR indice > ?)
+"""
+
+CONTAR_POR_LIMITER = """
+SELECT COUNT(*) AS total
+FROM rate_limit
+WHERE limiter = ?
+"""
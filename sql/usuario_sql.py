@@ -39,6 +39,23 @@ OBTER_TODOS = "SELECT * FROM usuario ORDER BY nome"
 
 OBTER_QUANTIDADE = "SELECT COUNT(*) as quantidade FROM usuario"
 
+# Paginação por cursor (keyset) em (nome, id), na mesma ordem de OBTER_TODOS.
+# {filtro_cursor} recebe FILTRO_CURSOR_NOME a partir da segunda página.
+FILTRO_CURSOR_NOME = "WHERE (nome, id) > (?, ?)"
+
+OBTER_POR_CURSOR = """
+SELECT * FROM usuario
+{filtro_cursor}
+ORDER BY nome, id
+LIMIT ?
+"""
+
+CONTAR_POR_PERFIL = """
+SELECT perfil, COUNT(*) as quantidade
+FROM usuario
+GROUP BY perfil
+"""
+
 OBTER_POR_EMAIL = "SELECT * FROM usuario WHERE email = ?"
 
 ATUALIZAR_TOKEN = """
@@ -0,0 +1,44 @@
+/**
+ * Acompanhar o processamento da foto de anuncio recem-enviada
+ *
+ * O cadastro/edicao do anuncio apenas enfileira a foto; o servidor a
+ * redimensiona em background. Consulta o status da tarefa e recarrega a
+ * listagem quando a foto (e suas variantes) estiver pronta, ou exibe o erro.
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    const listagem = document.getElementById('anuncios-vendedor');
+    const tarefaId = listagem && listagem.dataset.tarefaFoto;
+
+    if (!tarefaId) return;
+
+    const intervaloMs = 500;
+    let tentativas = 60;
+
+    async function consultar() {
+        try {
+            const resposta = await fetch(`/usuario/imagens/tarefas/${tarefaId}`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            // 404: tarefa expirou ou foi atendida por outro worker
+            if (!resposta.ok) return;
+
+            const tarefa = await resposta.json();
+            if (tarefa.status === 'concluida') {
+                window.location.reload();
+                return;
+            }
+            if (tarefa.status === 'erro') {
+                window.App.Modal.showError(tarefa.erro, 'Erro ao Processar a Foto do Anúncio');
+                return;
+            }
+        } catch (error) {
+            console.warn('Falha ao consultar processamento da foto', error);
+        }
+
+        if (--tentativas > 0) {
+            setTimeout(consultar, intervaloMs);
+        }
+    }
+
+    consultar();
+});
@@ -79,6 +79,52 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+/**
+ * Acompanhar o processamento da foto recem-enviada
+ *
+ * O upload apenas enfileira a imagem; o servidor a redimensiona em background.
+ * Consulta o status da tarefa e recarrega as imagens da foto quando estiver pronta.
+ */
+document.addEventListener('DOMContentLoaded', function() {
+    const profilePhoto = document.getElementById('profile-photo');
+    const tarefaId = profilePhoto && profilePhoto.dataset.tarefaFoto;
+
+    if (!tarefaId) return;
+
+    const intervaloMs = 500;
+    let tentativas = 60;
+
+    async function consultar() {
+        try {
+            const resposta = await fetch(`/usuario/imagens/tarefas/${tarefaId}`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            // 404: tarefa expirou ou foi atendida por outro worker
+            if (!resposta.ok) return;
+
+            const tarefa = await resposta.json();
+            if (tarefa.status === 'concluida') {
+                document.querySelectorAll(`img[src^="${tarefa.url}"]`).forEach(function(img) {
+                    img.src = `${tarefa.url}?v=${Date.now()}`;
+                });
+                return;
+            }
+            if (tarefa.status === 'erro') {
+                window.App.Modal.showError(tarefa.erro, 'Erro ao Processar Imagem');
+                return;
+            }
+        } catch (error) {
+            console.warn('Falha ao consultar processamento da foto', error);
+        }
+
+        if (--tentativas > 0) {
+            setTimeout(consultar, intervaloMs);
+        }
+    }
+
+    consultar();
+});
+
 /**
  * Inicializar namespace global do app
  */
@@ -41,11 +41,15 @@ def setup_test_database():
     """
     yield _TEST_DB_PATH
 
-    # Limpar: remover arquivo de banco após todos os testes
-    try:
-        os.unlink(_TEST_DB_PATH)
-    except Exception:
-        pass
+    # Limpar: fechar conexões do pool e remover arquivos do banco (incluindo WAL)
+    from util.db_util import fechar_pools
+
+    fechar_pools()
+    for sufixo in ("", "-wal", "-shm"):
+        try:
+            os.unlink(_TEST_DB_PATH + sufixo)
+        except Exception:
+            pass
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -127,6 +131,30 @@ def limpar_config_cache():
     config.limpar()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def limpar_cache_totais():
+    """Limpa o cache de totais das listagens paginadas antes de cada teste"""
+    from util.paginacao_util import cache_totais
+
+    cache_totais.limpar()
+
+    yield
+
+    cache_totais.limpar()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def limpar_cache_paginas():
+    """Limpa o cache das páginas públicas antes de cada teste"""
+    from util.cache_paginas import cache_paginas
+
+    cache_paginas.limpar()
+
+    yield
+
+    cache_paginas.limpar()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def limpar_chat_manager():
     """Limpa o gerenciador de chat antes de cada teste para evitar interferência"""
@@ -157,6 +185,7 @@ def limpar_banco_dados():
             tabelas_para_verificar = [
                 "chamado_interacao",
                 "chamado",
+                "chat_evento",
                 "chat_mensagem",
                 "chat_participante",
                 "chat_sala",
@@ -182,6 +211,7 @@ def limpar_banco_dados():
             ordem_limpeza = [
                 "chamado_interacao",
                 "chamado",
+                "chat_evento",
                 "chat_mensagem",
                 "chat_participante",
                 "chat_sala",
@@ -208,13 +238,17 @@ def limpar_banco_dados():
 
             conn.commit()
 
+    from repo.categoria_repo import catalogo_categorias
+
     # Limpar antes do teste
     _limpar_tabelas()
+    catalogo_categorias.invalidar()
 
     yield
 
     # Limpar depois do teste também
     _limpar_tabelas()
+    catalogo_categorias.invalidar()
 
 
 @pytest.fixture(scope="function")
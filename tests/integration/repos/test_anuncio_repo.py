@@ -2,11 +2,14 @@
 Testes para o repositório de anúncios.
 """
 import pytest
+from unittest.mock import patch
 from datetime import datetime
 from repo import anuncio_repo, usuario_repo, categoria_repo
 from model.anuncio_model import Anuncio
 from model.usuario_model import Usuario
 from model.categoria_model import Categoria
+from util import db_util
+from util.db_util import PoolConexoes
 from util.security import criar_hash_senha
 
 
@@ -296,3 +299,170 @@ class TestCascadeDelete:
 
         usuario_repo.excluir(vendedor)
         assert anuncio_repo.obter_por_id(resultado.id) is None
+
+
+class TestBuscaTextual:
+    def _inserir(self, vendedor, categoria, nome, descricao="Descrição padrão do produto"):
+        anuncio = Anuncio(0, vendedor, categoria, nome, descricao, 1.0, 10.0, 5, datetime.now(), True, None, None)
+        return anuncio_repo.inserir(anuncio)
+
+    def test_busca_ignora_acentos(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Câmera Fotográfica")
+
+        anuncios, total = anuncio_repo.obter_ativos_paginados(termo="camera")
+        assert total == 1
+        assert anuncios[0].nome == "Câmera Fotográfica"
+
+    def test_busca_por_prefixo(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Notebook Dell")
+
+        anuncios, total = anuncio_repo.obter_ativos_paginados(termo="note")
+        assert total == 1
+
+    def test_busca_na_descricao(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Mochila", "Resistente à água, ideal para trilhas")
+
+        anuncios, total = anuncio_repo.obter_ativos_paginados(termo="trilha")
+        assert [a.nome for a in anuncios] == ["Mochila"]
+
+    def test_busca_exige_todas_as_palavras(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Tênis Azul")
+        self._inserir(vendedor_teste, categoria_teste, "Tênis Vermelho")
+
+        anuncios, total = anuncio_repo.obter_ativos_paginados(termo="tenis azul")
+        assert [a.nome for a in anuncios] == ["Tênis Azul"]
+
+    def test_relevancia_prioriza_nome(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Capa de celular", "Compatível com relógio inteligente")
+        self._inserir(vendedor_teste, categoria_teste, "Relógio Digital")
+
+        anuncios, _ = anuncio_repo.obter_ativos_paginados(termo="relogio")
+        assert anuncios[0].nome == "Relógio Digital"
+
+    def test_sintaxe_fts_no_termo_nao_gera_erro(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Fone de ouvido")
+
+        anuncios, total = anuncio_repo.obter_ativos_paginados(termo='fone" OR (NEAR *')
+        assert total == 0
+
+    def test_indice_acompanha_alteracao_e_exclusao(self, vendedor_teste, categoria_teste):
+        anuncio = self._inserir(vendedor_teste, categoria_teste, "Teclado Mecânico")
+        anuncio.nome = "Mouse Gamer"
+        anuncio_repo.alterar(anuncio)
+
+        assert anuncio_repo.obter_ativos_paginados(termo="teclado")[1] == 0
+        assert anuncio_repo.obter_ativos_paginados(termo="mouse")[1] == 1
+
+        anuncio_repo.excluir(anuncio.id)
+        assert anuncio_repo.obter_ativos_paginados(termo="mouse")[1] == 0
+
+    def test_reconstruir_indice_busca(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Headphone Bluetooth")
+
+        anuncio_repo.reconstruir_indice_busca()
+
+        assert [a.nome for a in anuncio_repo.buscar_por_nome("headphone")] == ["Headphone Bluetooth"]
+
+    def test_ordenacao_por_preco(self, vendedor_teste, categoria_teste):
+        barato = Anuncio(0, vendedor_teste, categoria_teste, "Item barato", "Descrição", 1.0, 5.0, 1, datetime.now(), True, None, None)
+        caro = Anuncio(0, vendedor_teste, categoria_teste, "Item caro", "Descrição", 1.0, 50.0, 1, datetime.now(), True, None, None)
+        anuncio_repo.inserir(caro)
+        anuncio_repo.inserir(barato)
+
+        anuncios, _ = anuncio_repo.obter_ativos_paginados(termo="item", ordenar_por="preco_asc")
+        assert [a.preco for a in anuncios] == [5.0, 50.0]
+
+
+class TestPaginacaoCursor:
+    def _inserir(self, vendedor, categoria, nome, ativo=True):
+        anuncio = Anuncio(0, vendedor, categoria, nome, "Descrição padrão do produto", 1.0, 10.0, 5, datetime.now(), ativo, None, None)
+        return anuncio_repo.inserir(anuncio)
+
+    def test_ativos_por_cursor_sem_repeticao(self, vendedor_teste, categoria_teste):
+        ids = [self._inserir(vendedor_teste, categoria_teste, f"Produto {i}").id for i in range(7)]
+
+        vistos = []
+        cursor = None
+        while True:
+            anuncios, cursor = anuncio_repo.obter_ativos_por_cursor(cursor, por_pagina=3)
+            vistos.extend(a.id for a in anuncios)
+            if cursor is None:
+                break
+
+        # Mesmo segundo em data_cadastro: desempate por id decrescente
+        assert vistos == sorted(ids, reverse=True)
+        assert anuncio_repo.contar_ativos() == 7
+
+    def test_ativos_por_cursor_com_busca(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Câmera Antiga")
+        self._inserir(vendedor_teste, categoria_teste, "Câmera Nova")
+        self._inserir(vendedor_teste, categoria_teste, "Mochila")
+
+        anuncios, cursor = anuncio_repo.obter_ativos_por_cursor(por_pagina=1, termo="camera")
+        assert len(anuncios) == 1
+        anuncios2, cursor2 = anuncio_repo.obter_ativos_por_cursor(cursor, por_pagina=1, termo="camera")
+        assert {anuncios[0].nome, anuncios2[0].nome} == {"Câmera Antiga", "Câmera Nova"}
+        assert cursor2 is None
+        assert anuncio_repo.contar_ativos(termo="camera") == 2
+
+    def test_todos_por_cursor_inclui_inativos(self, vendedor_teste, categoria_teste):
+        self._inserir(vendedor_teste, categoria_teste, "Ativo")
+        self._inserir(vendedor_teste, categoria_teste, "Inativo", ativo=False)
+
+        anuncios, cursor = anuncio_repo.obter_todos_por_cursor(limite=10)
+        assert {a.nome for a in anuncios} == {"Ativo", "Inativo"}
+        assert cursor is None
+        assert anuncio_repo.contar_todos() == 2
+
+
+class TestVersao:
+    def _inserir(self, vendedor, categoria, nome="Produto"):
+        anuncio = Anuncio(0, vendedor, categoria, nome, "Desc", 1.0, 10.0, 5, datetime.now(), True, None, None)
+        return anuncio_repo.inserir(anuncio)
+
+    def test_escritas_incrementam_versao(self, vendedor_teste, categoria_teste):
+        anuncio = self._inserir(vendedor_teste, categoria_teste)
+        versao = anuncio_repo.obter_versao()
+
+        anuncio_repo.atualizar_estoque(anuncio.id, 1)
+        assert anuncio_repo.obter_versao() == versao + 1
+
+        outro = self._inserir(vendedor_teste, categoria_teste, "Outro")
+        anuncio_repo.excluir(outro.id)
+        assert anuncio_repo.obter_versao() == versao + 3
+
+    def test_versao_detalhes_muda_apenas_com_o_proprio_anuncio(self, vendedor_teste, categoria_teste):
+        anuncio = self._inserir(vendedor_teste, categoria_teste)
+        antes = anuncio_repo.obter_versao_detalhes(anuncio.id)
+
+        self._inserir(vendedor_teste, categoria_teste, "Outro")
+        assert anuncio_repo.obter_versao_detalhes(anuncio.id) == antes
+
+        anuncio.preco = 99.0
+        anuncio_repo.alterar(anuncio)
+        depois = anuncio_repo.obter_versao_detalhes(anuncio.id)
+        assert depois["versao"] > antes["versao"]
+        assert depois["nome_vendedor"] == "Vendedor Teste"
+
+    def test_versao_detalhes_inexistente(self):
+        assert anuncio_repo.obter_versao_detalhes(9999) is None
+
+
+class TestNomeCategoria:
+    def test_recarga_do_catalogo_com_uma_conexao_de_leitura(self, vendedor_teste, categoria_teste):
+        """O nome da categoria é resolvido depois de devolver a conexão de leitura"""
+        anuncio = Anuncio(0, vendedor_teste, categoria_teste, "Produto", "Desc", 1.0, 10.0, 5, datetime.now(), True, None, None)
+        resultado = anuncio_repo.inserir(anuncio)
+        categoria_repo.catalogo_categorias.invalidar()
+
+        pool = PoolConexoes(db_util.DATABASE_PATH, tamanho_max=1, timeout=0.2, somente_leitura=True)
+        chave = (db_util.DATABASE_PATH, True)
+        with patch.dict(db_util._pools, {chave: pool}):
+            recuperado = anuncio_repo.obter_por_id(resultado.id)
+            categoria_repo.catalogo_categorias.invalidar()
+            todos = anuncio_repo.obter_todos()
+        pool.fechar()
+
+        assert recuperado.nome_categoria is not None
+        assert todos[0].nome_categoria == recuperado.nome_categoria
+        assert pool.obter_estatisticas()["esperas"] == 0
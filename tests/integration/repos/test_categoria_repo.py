@@ -0,0 +1,138 @@
+"""
+Testes do categoria_repo
+
+Testa o catálogo de categorias em memória: leituras sem consulta ao banco,
+invalidação pelas escritas e detecção de alterações feitas por outros
+workers (contador de versão da tabela).
+"""
+
+from contextlib import contextmanager
+from time import monotonic
+from unittest.mock import patch
+
+import pytest
+
+from model.categoria_model import Categoria
+from repo import categoria_repo
+from repo.categoria_repo import catalogo_categorias
+from util.config import CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS
+from util.db_util import obter_conexao, obter_conexao_leitura
+
+
+def apos_intervalo():
+    """Simula a passagem do intervalo de verificação da versão"""
+    return patch(
+        "repo.categoria_repo.monotonic",
+        return_value=monotonic() + CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS,
+    )
+
+
+@pytest.fixture
+def categorias():
+    """Cria duas categorias e carrega o catálogo"""
+    livros = categoria_repo.inserir(Categoria(nome="Livros", descricao="Livros usados"))
+    eletronicos = categoria_repo.inserir(Categoria(nome="Eletrônicos", descricao=""))
+    catalogo_categorias.carregar()
+    return livros, eletronicos
+
+
+class TestCatalogo:
+    """Testes das leituras pelo catálogo em memória"""
+
+    def test_obter_todos_ordenado_por_nome(self, categorias):
+        assert [c.nome for c in categoria_repo.obter_todos()] == ["Eletrônicos", "Livros"]
+
+    def test_leituras_nao_consultam_o_banco(self, categorias):
+        livros, _ = categorias
+
+        with patch(
+            "repo.categoria_repo.obter_conexao_leitura",
+            side_effect=AssertionError("consulta ao banco"),
+        ):
+            assert len(categoria_repo.obter_todos()) == 2
+            assert categoria_repo.obter_por_id(livros.id).nome == "Livros"
+            assert categoria_repo.obter_nome(livros.id) == "Livros"
+            assert categoria_repo.obter_por_id(9999) is None
+
+    def test_alterar_copia_nao_afeta_o_catalogo(self, categorias):
+        livros, _ = categorias
+
+        categoria = categoria_repo.obter_por_id(livros.id)
+        categoria.nome = "Alterado sem salvar"
+
+        assert categoria_repo.obter_nome(livros.id) == "Livros"
+
+    def test_escritas_atualizam_na_hora(self, categorias):
+        livros, eletronicos = categorias
+
+        livros.nome = "Livros e Revistas"
+        categoria_repo.alterar(livros)
+        categoria_repo.excluir(eletronicos.id)
+        nova = categoria_repo.inserir(Categoria(nome="Jardinagem", descricao=""))
+
+        assert [c.nome for c in categoria_repo.obter_todos()] == [
+            "Jardinagem",
+            "Livros e Revistas",
+        ]
+        assert categoria_repo.obter_nome(nova.id) == "Jardinagem"
+
+    def test_alteracao_de_outro_worker_detectada_pela_versao(self, categorias):
+        livros, _ = categorias
+
+        # Outro processo altera a tabela diretamente
+        with obter_conexao() as conn:
+            conn.execute("UPDATE categoria SET nome = 'Livros Raros' WHERE id = ?", (livros.id,))
+
+        # Dentro do intervalo o snapshot atual continua valendo
+        assert categoria_repo.obter_nome(livros.id) == "Livros"
+
+        with apos_intervalo():
+            assert categoria_repo.obter_nome(livros.id) == "Livros Raros"
+
+    def test_carga_concorrente_com_escrita_nao_publica_snapshot(self, categorias):
+        """Carga que leu as linhas antes do commit de uma escrita"""
+        livros, _ = categorias
+        catalogo_categorias.invalidar()
+
+        @contextmanager
+        def leitura_com_escrita_concorrente():
+            with obter_conexao_leitura() as conn:
+                yield conn
+            # Outra thread grava e invalida enquanto a carga monta o snapshot
+            with obter_conexao() as conn:
+                conn.execute("UPDATE categoria SET nome = 'Livros Raros' WHERE id = ?", (livros.id,))
+            catalogo_categorias.invalidar()
+
+        with patch("repo.categoria_repo.obter_conexao_leitura", leitura_com_escrita_concorrente):
+            assert catalogo_categorias.carregar() == 2
+
+        assert catalogo_categorias._snapshot is None
+        assert categoria_repo.obter_nome(livros.id) == "Livros Raros"
+
+    def test_falha_na_carga_vai_para_o_logger(self, capsys):
+        """Erro ao carregar o catálogo é registrado no logger, não impresso"""
+        erro = RuntimeError("banco indisponível")
+        with patch.object(catalogo_categorias, "obter", side_effect=erro), patch(
+            "repo.categoria_repo.logger"
+        ) as logger:
+            assert categoria_repo.obter_nome(1) is None
+            assert categoria_repo.obter_versao_catalogo() is None
+
+        assert logger.error.call_count == 2
+        assert capsys.readouterr().out == ""
+
+
+class TestVersao:
+    """Testes do contador de versão das categorias (triggers)"""
+
+    def test_escritas_incrementam_versao(self):
+        categoria = categoria_repo.inserir(Categoria(nome="A", descricao=""))
+        versao = categoria_repo.obter_versao()
+
+        categoria.nome = "B"
+        categoria_repo.alterar(categoria)
+        assert categoria_repo.obter_versao() == versao + 1
+
+        categoria_repo.inserir(Categoria(nome="C", descricao=""))
+        categoria_repo.excluir(categoria.id)
+        assert categoria_repo.obter_versao() == versao + 3
@@ -914,7 +914,186 @@ class TestChatParticipanteRepoContar:
         total = chat_participante_repo.contar_mensagens_nao_lidas(sala.id, usuario2_id)
 
         # Deve contar as mensagens do usuario 1 como não lidas para usuario 2
-        assert total >= 0  # Valor depende da implementação
+        assert total == 2
+
+
+class TestChatParticipanteRepoContadorNaoLidas:
+    """Testes do contador nao_lidas mantido em chat_participante."""
+
+    def _criar_sala_com_participantes(self, prefixo: str):
+        ids = [
+            usuario_repo.inserir(
+                Usuario(
+                    id=0,
+                    nome=f"Contador {prefixo} {i}",
+                    email=f"contador_{prefixo}_{i}@example.com",
+                    senha=criar_hash_senha("Senha@123"),
+                    perfil=Perfil.COMPRADOR.value,
+                )
+            )
+            for i in (1, 2)
+        ]
+        sala = chat_sala_repo.criar_ou_obter_sala(ids[0], ids[1])
+        for usuario_id in ids:
+            chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+        return sala, ids[0], ids[1]
+
+    def test_inserir_incrementa_apenas_para_outros(self):
+        """Mensagem enviada conta como não lida só para o outro participante."""
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("inc")
+
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg 1")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg 2")
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, leitor_id) == 2
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, autor_id) == 0
+
+    def test_atualizar_ultima_leitura_zera_contador(self):
+        """Atualizar a última leitura deve zerar o contador."""
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("leitura")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg")
+
+        chat_participante_repo.atualizar_ultima_leitura(sala.id, leitor_id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, leitor_id) == 0
+
+    def test_marcar_como_lidas_zera_contador(self):
+        """Marcar mensagens como lidas deve zerar o contador."""
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("marcar")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg")
+
+        chat_mensagem_repo.marcar_como_lidas(sala.id, leitor_id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, leitor_id) == 0
+        assert chat_participante_repo.recalcular_nao_lidas() == 0
+
+    def test_excluir_mensagem_nao_lida_decrementa(self):
+        """Excluir mensagem ainda não lida deve descontá-la do contador."""
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("excluir")
+        mensagem = chat_mensagem_repo.inserir(sala.id, autor_id, "Msg 1")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg 2")
+
+        chat_mensagem_repo.excluir(mensagem.id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, leitor_id) == 1
+
+    def test_contar_nao_lidas_por_usuario(self):
+        """Deve somar os contadores de todas as salas do usuário."""
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("soma")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg 1")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg 2")
+
+        assert chat_participante_repo.contar_nao_lidas_por_usuario(leitor_id) == 2
+        assert chat_participante_repo.contar_nao_lidas_por_usuario(99999) == 0
+
+    def test_recalcular_corrige_divergencia(self):
+        """Recálculo deve restaurar o valor correto e informar as correções."""
+        from util.db_util import obter_conexao
+
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("recalc")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg")
+        with obter_conexao() as conn:
+            conn.execute("UPDATE chat_participante SET nao_lidas = 42")
+
+        assert chat_participante_repo.recalcular_nao_lidas() == 2
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, leitor_id) == 1
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, autor_id) == 0
+        assert chat_participante_repo.recalcular_nao_lidas() == 0
+
+    def test_criar_tabela_migra_banco_sem_coluna(self):
+        """Banco antigo sem a coluna deve recebê-la já preenchida."""
+        from util.db_util import obter_conexao
+
+        sala, autor_id, leitor_id = self._criar_sala_com_participantes("migra")
+        chat_mensagem_repo.inserir(sala.id, autor_id, "Msg")
+        with obter_conexao() as conn:
+            conn.execute("ALTER TABLE chat_participante DROP COLUMN nao_lidas")
+
+        chat_participante_repo.criar_tabela()
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala.id, leitor_id) == 1
+
+
+class TestChatParticipanteRepoListarConversas:
+    """Testes para a função listar_conversas."""
+
+    def _criar_usuario(self, nome: str, email: str) -> int:
+        return usuario_repo.inserir(
+            Usuario(
+                id=0,
+                nome=nome,
+                email=email,
+                senha=criar_hash_senha("Senha@123"),
+                perfil=Perfil.COMPRADOR.value,
+            )
+        )
+
+    def _criar_sala(self, usuario1_id: int, usuario2_id: int):
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario1_id, usuario2_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario1_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario2_id)
+        return sala
+
+    def test_listar_conversas_ordenadas_por_atividade(self):
+        """Deve listar conversas da atividade mais recente para a mais antiga."""
+        eu_id = self._criar_usuario("Conversas Eu", "conversas_eu@example.com")
+        antigo_id = self._criar_usuario("Conversas Antigo", "conversas_antigo@example.com")
+        recente_id = self._criar_usuario("Conversas Recente", "conversas_recente@example.com")
+        sala_antiga = self._criar_sala(eu_id, antigo_id)
+        sala_recente = self._criar_sala(eu_id, recente_id)
+        chat_sala_repo.atualizar_ultima_atividade(sala_recente.id)
+
+        conversas = chat_participante_repo.listar_conversas(eu_id)
+
+        assert [c.sala_id for c in conversas] == [sala_recente.id, sala_antiga.id]
+        assert conversas[0].outro_usuario_id == recente_id
+        assert conversas[0].outro_usuario_nome == "Conversas Recente"
+        assert conversas[0].outro_usuario_email == "conversas_recente@example.com"
+        assert conversas[0].ultima_mensagem is None
+        assert conversas[0].nao_lidas == 0
+
+    def test_listar_conversas_paginadas(self):
+        """Deve aplicar limit e offset no SQL."""
+        eu_id = self._criar_usuario("Paginas Eu", "paginas_eu@example.com")
+        outros = [
+            self._criar_usuario(f"Paginas {i}", f"paginas_{i}@example.com")
+            for i in range(3)
+        ]
+        for outro_id in outros:
+            self._criar_sala(eu_id, outro_id)
+
+        todas = chat_participante_repo.listar_conversas(eu_id, limit=10)
+        pagina = chat_participante_repo.listar_conversas(eu_id, limit=1, offset=1)
+
+        assert len(todas) == 3
+        assert [c.sala_id for c in pagina] == [todas[1].sala_id]
+
+    def test_listar_conversas_ultima_mensagem_e_nao_lidas(self):
+        """Deve trazer a última mensagem e contar só as do outro usuário."""
+        eu_id = self._criar_usuario("Resumo Eu", "resumo_eu@example.com")
+        outro_id = self._criar_usuario("Resumo Outro", "resumo_outro@example.com")
+        sala = self._criar_sala(eu_id, outro_id)
+        chat_mensagem_repo.inserir(sala.id, outro_id, "Oi")
+        chat_mensagem_repo.inserir(sala.id, outro_id, "Tudo bem?")
+        chat_mensagem_repo.inserir(sala.id, eu_id, "Tudo!")
+
+        conversa = chat_participante_repo.listar_conversas(eu_id)[0]
+
+        assert conversa.ultima_mensagem == "Tudo!"
+        assert conversa.ultima_mensagem_usuario_id == eu_id
+        assert conversa.ultima_mensagem_data is not None
+        assert conversa.nao_lidas == 2
+        assert conversa.nao_lidas == chat_participante_repo.contar_mensagens_nao_lidas(
+            sala.id, eu_id
+        )
+
+        chat_participante_repo.atualizar_ultima_leitura(sala.id, eu_id)
+
+        assert chat_participante_repo.listar_conversas(eu_id)[0].nao_lidas == 0
+
+    def test_listar_conversas_usuario_sem_salas(self):
+        """Deve retornar lista vazia para usuário sem conversas."""
+        assert chat_participante_repo.listar_conversas(99999) == []
 
 
 class TestChatParticipanteRepoExcluir:
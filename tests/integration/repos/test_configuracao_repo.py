@@ -521,6 +521,44 @@ class TestIntegracao:
         assert resultado["nao_existe"] is None
 
 
+
+class TestVersao:
+    """Testes do contador de versão das configurações (triggers)"""
+
+    def test_criar_tabela_adiciona_coluna_em_banco_antigo(self, configuracao_db):
+        """Tabela criada sem a coluna versao é migrada por criar_tabela()"""
+        configuracao_repo.criar_tabela()
+
+        with configuracao_repo.obter_conexao() as conn:
+            colunas = [row["name"] for row in conn.execute("PRAGMA table_info(configuracao)")]
+        assert "versao" in colunas
+        assert configuracao_repo.obter_versao() == 0
+
+    def test_escritas_incrementam_versao(self, configuracao_db):
+        """Inserção, alteração de valor e exclusão mudam a versão"""
+        configuracao_repo.criar_tabela()
+
+        configuracao_repo.inserir_ou_atualizar("a", "1")
+        configuracao_repo.inserir_ou_atualizar("b", "1")
+        assert configuracao_repo.obter_versao() == 2
+
+        configuracao_repo.atualizar_multiplas({"a": "2", "b": "2"})
+        assert configuracao_repo.obter_versao() == 4
+
+        with configuracao_repo.obter_conexao() as conn:
+            conn.execute("DELETE FROM configuracao WHERE chave = 'b'")
+        assert configuracao_repo.obter_versao() == 5
+
+    def test_salvar_mesmo_valor_mantem_versao(self, configuracao_db):
+        """Atualização sem mudança de valor não invalida os caches"""
+        configuracao_repo.criar_tabela()
+        configuracao_repo.inserir_ou_atualizar("a", "1")
+
+        configuracao_repo.atualizar("a", "1")
+
+        assert configuracao_repo.obter_versao() == 1
+
+
 # Fixture para banco de dados de teste
 @pytest.fixture
 def configuracao_db(tmp_path):
@@ -528,8 +566,9 @@ def configuracao_db(tmp_path):
     # Criar arquivo de banco temporário
     db_path = tmp_path / "test_config.db"
 
-    # Patch para usar o banco de teste
-    with patch.object(configuracao_repo, 'obter_conexao') as mock_obter:
+    # Patch para usar o banco de teste (leituras e escritas)
+    with patch.object(configuracao_repo, 'obter_conexao') as mock_obter, \
+            patch.object(configuracao_repo, 'obter_conexao_leitura') as mock_obter_leitura:
         # Criar conexão real para banco de teste
         def criar_conexao_teste():
             conn = sqlite3.connect(str(db_path))
@@ -556,6 +595,7 @@ def configuracao_db(tmp_path):
 
         # Atribuir o mock para funcionar como context manager
         mock_obter.side_effect = lambda: mock_context()
+        mock_obter_leitura.side_effect = lambda: mock_context()
 
         # Criar tabela
         with mock_context() as conn:
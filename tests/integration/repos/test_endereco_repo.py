@@ -244,6 +244,39 @@ class TestObterPorId:
         assert end_recuperado is None
 
 
+class TestObterPorIds:
+    """Testes de busca de vários endereços em uma consulta"""
+
+    def test_obter_varios_enderecos(self, usuario_teste):
+        """Testa busca em lote, com IDs repetidos e inexistentes"""
+        ids = [
+            endereco_repo.inserir(
+                Endereco(
+                    id=0,
+                    id_usuario=usuario_teste,
+                    titulo=titulo,
+                    logradouro="Rua Lote",
+                    numero="1",
+                    bairro="Centro",
+                    cidade="São Paulo",
+                    uf="SP",
+                    cep="01000-000",
+                    usuario=None,
+                )
+            )
+            for titulo in ("Casa", "Trabalho")
+        ]
+
+        enderecos = endereco_repo.obter_por_ids([ids[0], ids[1], ids[0], 99999])
+
+        assert set(enderecos) == set(ids)
+        assert enderecos[ids[1]].titulo == "Trabalho"
+
+    def test_lista_vazia(self):
+        """Testa que lista vazia não consulta o banco"""
+        assert endereco_repo.obter_por_ids([]) == {}
+
+
 class TestObterPorUsuario:
     """Testes de busca por usuário"""
 
@@ -90,3 +90,69 @@ class TestCriarIndices:
                     mock_cursor.execute.assert_not_called()
                     # Deve logar sucesso mesmo assim
                     mock_logger.info.assert_called_once()
+
+
+class TestVerificacaoIndices:
+    """Testes da verificação de planos (EXPLAIN QUERY PLAN) e do relatório de índices"""
+
+    def test_consultas_criticas_sem_varredura_completa(self):
+        """Nenhuma consulta crítica deve percorrer uma tabela inteira sem índice"""
+        assert indices_repo.verificar_planos_consultas() == {}
+
+    def test_detecta_varredura_completa(self):
+        """Consulta sem índice aplicável deve ser relatada"""
+        consultas = {"anuncio.por_preco": ("SELECT * FROM anuncio WHERE preco > ?", (1.0,))}
+
+        with patch.object(indices_repo.indices_sql, "CONSULTAS_CRITICAS", consultas):
+            with patch('repo.indices_repo.logger') as mock_logger:
+                problemas = indices_repo.verificar_planos_consultas()
+
+        assert list(problemas) == ["anuncio.por_preco"]
+        mock_logger.warning.assert_called_once()
+
+    def test_varredura_por_indice_nao_e_relatada(self):
+        """SCAN ... USING INDEX percorre o índice na ordem pedida e é aceito"""
+        plano = indices_repo.obter_plano_consulta(
+            "SELECT * FROM anuncio ORDER BY data_cadastro DESC LIMIT 10"
+        )
+        assert any("USING INDEX" in passo for passo in plano)
+        assert not any(indices_repo._eh_varredura_completa(passo) for passo in plano)
+
+    def test_varredura_de_cte_nao_e_relatada(self):
+        """Percorrer um CTE materializado não é varredura de tabela"""
+        temporarias = frozenset({"pagina"})
+        assert not indices_repo._eh_varredura_completa("SCAN pagina", temporarias)
+        assert indices_repo._eh_varredura_completa("SCAN usuario", temporarias)
+
+    def test_lista_indice_nao_utilizado(self):
+        """Índice que nenhuma consulta crítica usa deve aparecer no relatório"""
+        from util.db_util import obter_conexao
+
+        with obter_conexao() as conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_teste_nao_usado ON anuncio(preco)")
+        try:
+            nao_utilizados = indices_repo.listar_indices_nao_utilizados()
+        finally:
+            with obter_conexao() as conn:
+                conn.execute("DROP INDEX IF EXISTS idx_teste_nao_usado")
+
+        assert "idx_teste_nao_usado" in nao_utilizados
+        assert "idx_anuncio_ativos_data" not in nao_utilizados
+
+    def test_remove_indices_substituidos(self):
+        """Índice de prefixo redundante deve ser removido"""
+        from util.db_util import obter_conexao
+
+        with obter_conexao() as conn:
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado_id "
+                "ON chamado_interacao(chamado_id)"
+            )
+
+        indices_repo.remover_indices_substituidos()
+
+        with obter_conexao() as conn:
+            existe = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'idx_chamado_interacao_chamado_id'"
+            ).fetchone()
+        assert existe is None
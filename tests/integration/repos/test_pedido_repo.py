@@ -415,6 +415,25 @@ class TestObterPorStatus:
         assert len(pedidos) == 0
 
 
+class TestObterPorEndereco:
+    def test_obter_pedidos_do_endereco(
+        self, comprador_teste, endereco_teste, anuncio_teste
+    ):
+        outro_endereco = endereco_repo.inserir(
+            Endereco(0, comprador_teste, "Trabalho", "Av Teste", "1", "Centro",
+                     "São Paulo", "SP", "01000-000", None, None)
+        )
+        for id_endereco in (endereco_teste, endereco_teste, outro_endereco):
+            pedido_repo.inserir(
+                Pedido(0, id_endereco, comprador_teste, anuncio_teste, 50.0, "Pendente")
+            )
+
+        pedidos = pedido_repo.obter_por_endereco(endereco_teste)
+        assert len(pedidos) == 2
+        assert all(p.id_endereco == endereco_teste for p in pedidos)
+        assert len(pedido_repo.obter_por_endereco(outro_endereco)) == 1
+
+
 class TestObterTodos:
     def test_obter_todos_pedidos(self, comprador_teste, endereco_teste, anuncio_teste):
         for i in range(3):
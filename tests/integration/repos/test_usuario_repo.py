@@ -255,6 +255,52 @@ class TestUsuarioRepoObterTodos:
         assert len(resultado) >= 3
 
 
+class TestUsuarioRepoObterPorCursor:
+    """Testes para a paginação por cursor (obter_por_cursor)."""
+
+    def test_percorre_todos_os_usuarios_em_ordem(self):
+        """Páginas encadeadas devem cobrir todos os usuários, por nome, sem repetição."""
+        senha = criar_hash_senha("Senha@123")
+        for i in range(5):
+            usuario_repo.inserir(Usuario(
+                id=0,
+                nome=f"Cursor {4 - i}",
+                email=f"cursor{i}@example.com",
+                senha=senha,
+                perfil=Perfil.COMPRADOR.value,
+            ))
+
+        nomes = []
+        cursor = None
+        while True:
+            pagina, cursor = usuario_repo.obter_por_cursor(cursor, limite=2)
+            assert len(pagina) <= 2
+            nomes.extend(u.nome for u in pagina)
+            if cursor is None:
+                break
+
+        assert nomes == sorted(nomes)
+        assert [n for n in nomes if n.startswith("Cursor")] == [f"Cursor {i}" for i in range(5)]
+
+    def test_contar_por_perfil(self):
+        """Deve agrupar a contagem de usuários por perfil."""
+        senha = criar_hash_senha("Senha@123")
+        antes = usuario_repo.contar_por_perfil()
+        for i, perfil in enumerate([Perfil.COMPRADOR.value, Perfil.COMPRADOR.value, Perfil.VENDEDOR.value]):
+            usuario_repo.inserir(Usuario(
+                id=0,
+                nome=f"Perfil {i}",
+                email=f"perfil_cont{i}@example.com",
+                senha=senha,
+                perfil=perfil,
+            ))
+
+        depois = usuario_repo.contar_por_perfil()
+
+        assert depois[Perfil.COMPRADOR.value] == antes.get(Perfil.COMPRADOR.value, 0) + 2
+        assert depois[Perfil.VENDEDOR.value] == antes.get(Perfil.VENDEDOR.value, 0) + 1
+
+
 class TestUsuarioRepoObterQuantidade:
     """Testes para a função obter_quantidade."""
 
@@ -3,6 +3,7 @@ Testes de administração de usuários
 Testa CRUD completo de usuários por administradores
 """
 
+import re
 from unittest.mock import patch
 
 from fastapi import status
@@ -45,6 +46,27 @@ class TestListarUsuarios:
         response = client.get("/admin/usuarios/listar", follow_redirects=False)
         assert_permission_denied(response)
 
+    def test_listar_usuarios_paginado_por_cursor(
+        self, admin_autenticado, admin_teste, criar_usuario_direto
+    ):
+        """Listagem deve paginar por cursor mantendo o total geral"""
+        criar_usuario_direto("Zuleica Paginada", "zuleica@example.com", "Senha@123")
+
+        with patch("routes.admin_usuarios_routes.USUARIOS_POR_PAGINA", 1):
+            primeira = admin_autenticado.get("/admin/usuarios/listar")
+            assert primeira.status_code == status.HTTP_200_OK
+            assert admin_teste["email"] in primeira.text
+            assert "zuleica@example.com" not in primeira.text
+            assert "Total: 2 usuário(s)" in primeira.text
+
+            cursor = re.search(r"cursor=([A-Za-z0-9_-]+)", primeira.text).group(1)
+            segunda = admin_autenticado.get(
+                "/admin/usuarios/listar", params={"cursor": cursor}
+            )
+            assert segunda.status_code == status.HTTP_200_OK
+            assert "zuleica@example.com" in segunda.text
+            assert admin_teste["email"] not in segunda.text
+
 
 class TestCadastrarUsuario:
     """Testes de cadastro de usuário por admin"""
@@ -0,0 +1,99 @@
+"""
+Testes das rotas de anúncios do vendedor (/vendedor/anuncios)
+Testa o envio da foto do anúncio para o pool de imagens no cadastro e na edição.
+"""
+
+import re
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+
+from model.categoria_model import Categoria
+from repo import anuncio_repo, categoria_repo, usuario_repo
+from util.imagem_worker import obter_tarefa
+
+
+@pytest.fixture(autouse=True)
+def pasta_fotos_anuncios(tmp_path):
+    """Grava as fotos (e variantes) dos anúncios em um diretório temporário"""
+    with patch("util.foto_anuncio_util.PASTA_FOTOS_ANUNCIOS", tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def dados_anuncio():
+    """Dados válidos do formulário de anúncio"""
+    categoria = categoria_repo.inserir(Categoria(nome="Artesanato", descricao="Peças feitas à mão"))
+    return {
+        "nome": "Vaso de Cerâmica",
+        "descricao": "Vaso de cerâmica pintado à mão",
+        "id_categoria": categoria.id,
+        "peso": 1.5,
+        "preco": 89.9,
+        "estoque": 3,
+    }
+
+
+class TestFotoAnuncio:
+    """Testes do processamento da foto enviada com o anúncio"""
+
+    def test_cadastrar_com_foto_acompanha_tarefa(
+        self, vendedor_autenticado, vendedor_teste, dados_anuncio, foto_teste_base64
+    ):
+        """A listagem recebe a tarefa da foto para acompanhar o processamento"""
+        response = vendedor_autenticado.post(
+            "/vendedor/anuncios/cadastrar",
+            data={**dados_anuncio, "foto_base64": foto_teste_base64},
+            follow_redirects=True,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "cadastrado com sucesso" in response.text
+        match = re.search(r'data-tarefa-foto="([^"]+)"', response.text)
+        assert match
+
+        vendedor = usuario_repo.obter_por_email(vendedor_teste["email"])
+        tarefa = obter_tarefa(match.group(1), vendedor.id)
+        assert tarefa.aguardar(timeout=30)
+
+        status_tarefa = vendedor_autenticado.get(f"/usuario/imagens/tarefas/{tarefa.id}")
+        assert status_tarefa.json()["status"] == "concluida"
+
+        # A tarefa é entregue à listagem uma única vez
+        listagem = vendedor_autenticado.get("/vendedor/anuncios")
+        assert "data-tarefa-foto" not in listagem.text
+
+    def test_cadastrar_fila_cheia_avisa_vendedor(
+        self, vendedor_autenticado, dados_anuncio, foto_teste_base64
+    ):
+        """Foto recusada pelo pool: o anúncio é criado, mas o vendedor é avisado"""
+        with patch("routes.anuncio_routes.enfileirar_foto_anuncio", return_value=None):
+            response = vendedor_autenticado.post(
+                "/vendedor/anuncios/cadastrar",
+                data={**dados_anuncio, "foto_base64": foto_teste_base64},
+                follow_redirects=True,
+            )
+
+        assert "processar a foto agora" in response.text
+        assert "cadastrado com sucesso" not in response.text
+        assert "data-tarefa-foto" not in response.text
+        assert "Vaso de Cer" in response.text
+
+    def test_editar_fila_cheia_avisa_vendedor(
+        self, vendedor_autenticado, vendedor_teste, dados_anuncio, foto_teste_base64
+    ):
+        """Na edição, a foto recusada também gera aviso em vez de sucesso"""
+        vendedor_autenticado.post("/vendedor/anuncios/cadastrar", data=dados_anuncio)
+        vendedor = usuario_repo.obter_por_email(vendedor_teste["email"])
+        anuncio = anuncio_repo.obter_por_vendedor(vendedor.id)[0]
+
+        with patch("routes.anuncio_routes.enfileirar_foto_anuncio", return_value=None):
+            response = vendedor_autenticado.post(
+                f"/vendedor/anuncios/editar/{anuncio.id}",
+                data={**dados_anuncio, "ativo": "true", "foto_base64": foto_teste_base64},
+                follow_redirects=True,
+            )
+
+        assert "processar a foto agora" in response.text
+        assert "atualizado com sucesso" not in response.text
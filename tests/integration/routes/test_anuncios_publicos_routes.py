@@ -0,0 +1,252 @@
+"""
+Testes das rotas públicas de anúncios (/anuncios)
+Testa listagem, busca textual e detalhes de anúncios.
+"""
+
+import base64
+import io
+import re
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from PIL import Image
+
+from model.anuncio_model import Anuncio
+from model.categoria_model import Categoria
+from model.usuario_model import Usuario
+from repo import anuncio_repo, categoria_repo, usuario_repo
+from util.db_util import obter_conexao
+from util.foto_anuncio_util import salvar_foto_anuncio
+from util.perfis import Perfil
+from util.security import criar_hash_senha
+
+
+@pytest.fixture
+def anuncio_factory():
+    """Retorna função que cria anúncios ativos de um mesmo vendedor/categoria"""
+    vendedor_id = usuario_repo.inserir(
+        Usuario(
+            id=0,
+            nome="Vendedor Público",
+            email="vendedor_publico@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.VENDEDOR.value,
+        )
+    )
+    categoria = categoria_repo.inserir(Categoria(nome="Eletrônicos", descricao="Eletrônicos em geral"))
+
+    def _criar(nome: str, descricao: str = "Descrição do anúncio", preco: float = 10.0) -> Anuncio:
+        anuncio = Anuncio(0, vendedor_id, categoria.id, nome, descricao, 1.0, preco, 5, datetime.now(), True)
+        return anuncio_repo.inserir(anuncio)
+
+    return _criar
+
+
+class TestListarAnuncios:
+    """Testes da listagem pública de anúncios"""
+
+    def test_listar_sem_filtros(self, client, anuncio_factory):
+        """Listagem deve exibir anúncios ativos"""
+        anuncio_factory("Smartphone Galaxy")
+
+        response = client.get("/anuncios")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Smartphone Galaxy" in response.text
+
+    def test_busca_textual_sem_acento(self, client, anuncio_factory):
+        """Busca deve encontrar anúncios ignorando acentos"""
+        anuncio_factory("Relógio Inteligente")
+        anuncio_factory("Mochila Escolar")
+
+        response = client.get("/anuncios", params={"busca": "relogio"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Relógio Inteligente" in response.text
+        assert "Mochila Escolar" not in response.text
+
+    def test_busca_com_ordenacao(self, client, anuncio_factory):
+        """Busca deve aceitar parâmetro de ordenação"""
+        anuncio_factory("Tênis Corrida", preco=300.0)
+        anuncio_factory("Tênis Casual", preco=150.0)
+
+        response = client.get("/anuncios", params={"busca": "tenis", "ordenar": "preco_asc"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text.index("Tênis Casual") < response.text.index("Tênis Corrida")
+
+
+class TestPaginacaoCursor:
+    """Testes da paginação por cursor da listagem pública"""
+
+    def _proximo_cursor(self, html: str):
+        encontrado = re.search(r"cursor=([A-Za-z0-9_-]+)", html)
+        return encontrado.group(1) if encontrado else None
+
+    def test_percorre_paginas_sem_repetir(self, client, anuncio_factory):
+        """Seguir o cursor deve exibir os anúncios restantes, sem repetição"""
+        for i in range(15):
+            anuncio_factory(f"Produto Paginado {i:02d}")
+
+        primeira = client.get("/anuncios")
+        assert primeira.status_code == status.HTTP_200_OK
+        nomes_primeira = set(re.findall(r"Produto Paginado \d{2}", primeira.text))
+        assert len(nomes_primeira) == 12
+
+        cursor = self._proximo_cursor(primeira.text)
+        assert cursor is not None
+
+        segunda = client.get("/anuncios", params={"pagina": 2, "cursor": cursor})
+        assert segunda.status_code == status.HTTP_200_OK
+        nomes_segunda = set(re.findall(r"Produto Paginado \d{2}", segunda.text))
+        assert len(nomes_segunda) == 3
+        assert nomes_primeira.isdisjoint(nomes_segunda)
+        assert "Página 2 de 2" in segunda.text
+        assert self._proximo_cursor(segunda.text) is None
+
+    def test_cursor_invalido_exibe_primeira_pagina(self, client, anuncio_factory):
+        """Cursor adulterado não deve gerar erro"""
+        anuncio_factory("Produto Qualquer")
+
+        response = client.get("/anuncios", params={"cursor": "lixo!!"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Produto Qualquer" in response.text
+
+    def test_pagina_por_offset_continua_funcionando(self, client, anuncio_factory):
+        """Links antigos com ?pagina=N (sem cursor) continuam válidos"""
+        for i in range(13):
+            anuncio_factory(f"Produto Offset {i:02d}")
+
+        response = client.get("/anuncios", params={"pagina": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(set(re.findall(r"Produto Offset \d{2}", response.text))) == 1
+
+
+class TestCachePaginas:
+    """Testes do cache da listagem para visitantes anônimos"""
+
+    def test_visitante_anonimo_recebe_pagina_do_cache(self, client, anuncio_factory):
+        anuncio_factory("Cafeteira Elétrica")
+
+        primeira = client.get("/anuncios", params={"categoria": 1})
+        segunda = client.get("/anuncios", params={"categoria": 1})
+
+        assert primeira.headers["x-cache"] == "MISS"
+        assert segunda.headers["x-cache"] == "HIT"
+        assert segunda.text == primeira.text
+
+    def test_novo_anuncio_invalida_a_listagem(self, client, anuncio_factory):
+        anuncio_factory("Cafeteira Elétrica")
+        client.get("/anuncios")
+
+        anuncio_factory("Liquidificador")
+        response = client.get("/anuncios")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert "Liquidificador" in response.text
+
+    def test_alteracao_de_categoria_invalida_a_listagem(self, client, anuncio_factory):
+        anuncio_factory("Cafeteira Elétrica")
+        client.get("/anuncios")
+
+        categoria_repo.inserir(Categoria(nome="Jardinagem", descricao="Plantas"))
+        response = client.get("/anuncios")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert "Jardinagem" in response.text
+
+    def test_foto_salva_invalida_a_landing(self, client, anuncio_factory, tmp_path):
+        anuncio = anuncio_factory("Cafeteira Elétrica")
+        with patch("util.foto_anuncio_util.PASTA_FOTOS_ANUNCIOS", tmp_path):
+            assert f"/{anuncio.id:06d}.jpg?v=" not in client.get("/").text
+
+            foto = io.BytesIO()
+            Image.new("RGB", (50, 50)).save(foto, format="JPEG")
+            salvar_foto_anuncio(anuncio.id, base64.b64encode(foto.getvalue()).decode())
+            response = client.get("/")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert f"/{anuncio.id:06d}.jpg?v=" in response.text
+
+    def test_usuario_logado_nao_usa_cache(self, client, anuncio_factory, comprador_autenticado):
+        anuncio_factory("Cafeteira Elétrica")
+
+        client.get("/anuncios")
+        response = client.get("/anuncios")
+
+        assert response.headers["x-cache"] == "BYPASS"
+
+
+class TestRespostasCondicionais:
+    """Testes do ETag / 304 da listagem e dos detalhes"""
+
+    def test_detalhes_respondem_304_sem_alteracao(self, client, anuncio_factory):
+        anuncio = anuncio_factory("Cafeteira Elétrica")
+
+        primeira = client.get(f"/anuncios/{anuncio.id}")
+        etag = primeira.headers["etag"]
+        segunda = client.get(f"/anuncios/{anuncio.id}", headers={"If-None-Match": etag})
+
+        assert primeira.status_code == status.HTTP_200_OK
+        assert primeira.headers["cache-control"] == "private, no-cache"
+        assert segunda.status_code == status.HTTP_304_NOT_MODIFIED
+        assert segunda.headers["etag"] == etag
+        assert segunda.content == b""
+
+    def test_alteracao_do_anuncio_muda_etag(self, client, anuncio_factory):
+        anuncio = anuncio_factory("Cafeteira Elétrica")
+        etag = client.get(f"/anuncios/{anuncio.id}").headers["etag"]
+
+        anuncio_repo.atualizar_estoque(anuncio.id, 1)
+        response = client.get(f"/anuncios/{anuncio.id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    def test_outro_anuncio_nao_muda_etag_dos_detalhes(self, client, anuncio_factory):
+        anuncio = anuncio_factory("Cafeteira Elétrica")
+        etag = client.get(f"/anuncios/{anuncio.id}").headers["etag"]
+
+        anuncio_factory("Liquidificador")
+        response = client.get(f"/anuncios/{anuncio.id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_anuncio_indisponivel_sem_etag(self, client, anuncio_factory):
+        anuncio = anuncio_factory("Cafeteira Elétrica")
+        anuncio.ativo = False
+        anuncio_repo.alterar(anuncio)
+
+        response = client.get(f"/anuncios/{anuncio.id}", follow_redirects=False)
+
+        assert "etag" not in response.headers
+
+    def test_listagem_responde_304_ate_novo_anuncio(self, client, anuncio_factory):
+        anuncio_factory("Cafeteira Elétrica")
+        etag = client.get("/anuncios").headers["etag"]
+
+        assert client.get("/anuncios", headers={"If-None-Match": etag}).status_code == 304
+        # Outra query, outra página
+        assert client.get("/anuncios?pagina=2", headers={"If-None-Match": etag}).status_code == 200
+
+        anuncio_factory("Liquidificador")
+        response = client.get("/anuncios", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Liquidificador" in response.text
+
+    def test_listagem_em_cache_exige_mesma_versao(self, client, anuncio_factory):
+        """Escrita de outro worker (sem invalidação local) não serve página velha"""
+        anuncio = anuncio_factory("Cafeteira Elétrica")
+        client.get("/anuncios")
+
+        with obter_conexao() as conn:
+            conn.execute("UPDATE anuncio SET nome = 'Chaleira' WHERE id = ?", (anuncio.id,))
+        response = client.get("/anuncios")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert "Chaleira" in response.text
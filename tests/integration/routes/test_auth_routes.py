@@ -66,6 +66,31 @@ class TestLogin:
         assert response.status_code == status.HTTP_200_OK
         assert "e-mail ou senha" in response.text.lower()
 
+    def test_login_refaz_hash_com_custo_antigo(self, client, criar_usuario, usuario_teste):
+        """Login bem-sucedido regrava hash criado com custo menor que o configurado"""
+        from passlib.hash import bcrypt
+
+        from repo import usuario_repo
+        from util.config import SENHA_BCRYPT_ROUNDS
+
+        criar_usuario(
+            usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"]
+        )
+        usuario = usuario_repo.obter_por_email(usuario_teste["email"])
+        hash_antigo = bcrypt.using(rounds=SENHA_BCRYPT_ROUNDS - 1).hash(usuario_teste["senha"])
+        usuario_repo.atualizar_senha(usuario.id, hash_antigo)
+
+        response = client.post(
+            "/login",
+            data={"email": usuario_teste["email"], "senha": usuario_teste["senha"]},
+            follow_redirects=False,
+        )
+
+        assert_redirects_to(response, "/usuario")
+        hash_novo = usuario_repo.obter_por_email(usuario_teste["email"]).senha
+        assert hash_novo != hash_antigo
+        assert bcrypt.from_string(hash_novo).rounds == SENHA_BCRYPT_ROUNDS
+
     def test_login_com_email_vazio(self, client):
         """Deve validar e-mail obrigatório"""
         response = client.post(
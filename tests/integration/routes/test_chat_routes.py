@@ -8,6 +8,13 @@ envio de mensagens, listagem e busca de usuários.
 import pytest
 from unittest.mock import patch, MagicMock
 
+from repo import (
+    chat_mensagem_repo,
+    chat_participante_repo,
+    chat_sala_repo,
+    usuario_repo,
+)
+
 
 class TestChatRoutes:
     """Testes para rotas de chat"""
@@ -372,6 +379,15 @@ class TestChatRoutes:
         assert isinstance(data["total"], int)
         assert data["total"] >= 0
 
+    def test_contar_nao_lidas_caminho_antigo(self, usuarios_chat):
+        """O caminho antigo, com acento, continua respondendo"""
+        client = usuarios_chat["client"]
+
+        response = client.get("/chat/mensagens/não-lidas/total")
+
+        assert response.status_code == 200
+        assert response.json() == client.get("/chat/mensagens/nao-lidas/total").json()
+
 
 class TestChatRateLimiting:
     """Testes de rate limiting para rotas de chat"""
@@ -563,110 +579,103 @@ class TestChatListarConversasEdgeCases:
     def test_listar_conversas_sala_inexistente(
         self, client, fazer_login, criar_usuario_direto
     ):
-        """Deve tratar quando sala não existe mais (continue no loop)"""
+        """Sala excluída não deve aparecer na listagem"""
         usuario_id = criar_usuario_direto(
             nome="User Sala Inexistente",
             email="sala_inexistente@teste.com",
             senha="Teste@123",
         )
+        outro_id = criar_usuario_direto(
+            nome="Outro Sala Inexistente",
+            email="outro_sala_inexistente@teste.com",
+            senha="Teste@123",
+        )
         fazer_login("sala_inexistente@teste.com", "Teste@123")
 
-        # Mock para simular participação em sala que não existe
-        with patch(
-            "routes.chat_routes.chat_participante_repo.listar_por_usuario"
-        ) as mock_part:
-            mock_participacao = MagicMock()
-            mock_participacao.sala_id = "sala_que_nao_existe"
-            mock_part.return_value = [mock_participacao]
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario_id, outro_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+        chat_participante_repo.adicionar_participante(sala.id, outro_id)
+        chat_sala_repo.excluir(sala.id)
 
-            with patch(
-                "routes.chat_routes.chat_sala_repo.obter_por_id", return_value=None
-            ):
-                response = client.get("/chat/conversas")
+        response = client.get("/chat/conversas")
 
-                assert response.status_code == 200
-                # Lista deve estar vazia (sala inexistente é ignorada)
-                assert response.json() == []
+        assert response.status_code == 200
+        assert response.json() == []
 
     def test_listar_conversas_outro_participante_inexistente(
         self, client, fazer_login, criar_usuario_direto
     ):
-        """Deve tratar quando não encontra outro participante na sala"""
+        """Sala sem outro participante não deve aparecer na listagem"""
         usuario_id = criar_usuario_direto(
             nome="User Sem Outro", email="sem_outro@teste.com", senha="Teste@123"
         )
+        outro_id = criar_usuario_direto(
+            nome="Outro Sem Outro", email="outro_sem_outro@teste.com", senha="Teste@123"
+        )
         fazer_login("sem_outro@teste.com", "Teste@123")
 
-        # Mock para simular sala sem outro participante
-        with patch(
-            "routes.chat_routes.chat_participante_repo.listar_por_usuario"
-        ) as mock_list_user:
-            mock_participacao = MagicMock()
-            mock_participacao.sala_id = "sala_teste"
-            mock_list_user.return_value = [mock_participacao]
-
-            with patch("routes.chat_routes.chat_sala_repo.obter_por_id") as mock_sala:
-                mock_sala_obj = MagicMock()
-                mock_sala_obj.id = "sala_teste"
-                mock_sala.return_value = mock_sala_obj
-
-                # Simular lista de participantes com apenas o próprio usuário
-                with patch(
-                    "routes.chat_routes.chat_participante_repo.listar_por_sala"
-                ) as mock_list_sala:
-                    mock_part_proprio = MagicMock()
-                    mock_part_proprio.usuario_id = usuario_id
-                    mock_list_sala.return_value = [mock_part_proprio]
-
-                    response = client.get("/chat/conversas")
-
-                    assert response.status_code == 200
-                    # Lista deve estar vazia (sem outro participante)
-                    assert response.json() == []
+        # Apenas o próprio usuário participa da sala
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario_id, outro_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+
+        response = client.get("/chat/conversas")
+
+        assert response.status_code == 200
+        assert response.json() == []
 
     def test_listar_conversas_outro_usuario_excluido(
         self, client, fazer_login, criar_usuario_direto
     ):
-        """Deve tratar quando outro usuário foi excluído do sistema"""
+        """Sala cujo outro usuário foi excluído não deve aparecer na listagem"""
         usuario_id = criar_usuario_direto(
             nome="User Outro Excluido",
             email="outro_excluido@teste.com",
             senha="Teste@123",
         )
+        outro_id = criar_usuario_direto(
+            nome="Outro Excluido", email="excluido@teste.com", senha="Teste@123"
+        )
         fazer_login("outro_excluido@teste.com", "Teste@123")
 
-        # Mock para simular sala com participante cujo usuário foi excluído
-        with patch(
-            "routes.chat_routes.chat_participante_repo.listar_por_usuario"
-        ) as mock_list_user:
-            mock_participacao = MagicMock()
-            mock_participacao.sala_id = "sala_teste"
-            mock_list_user.return_value = [mock_participacao]
-
-            with patch("routes.chat_routes.chat_sala_repo.obter_por_id") as mock_sala:
-                mock_sala_obj = MagicMock()
-                mock_sala_obj.id = "sala_teste"
-                mock_sala.return_value = mock_sala_obj
-
-                with patch(
-                    "routes.chat_routes.chat_participante_repo.listar_por_sala"
-                ) as mock_list_sala:
-                    mock_part_proprio = MagicMock()
-                    mock_part_proprio.usuario_id = usuario_id
-                    mock_part_outro = MagicMock()
-                    mock_part_outro.usuario_id = 99999  # Usuário que foi excluído
-                    mock_list_sala.return_value = [mock_part_proprio, mock_part_outro]
-
-                    # Usuário excluído - retorna None
-                    with patch(
-                        "routes.chat_routes.usuario_repo.obter_por_id",
-                        return_value=None,
-                    ):
-                        response = client.get("/chat/conversas")
-
-                        assert response.status_code == 200
-                        # Lista deve estar vazia (outro usuário foi excluído)
-                        assert response.json() == []
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario_id, outro_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+        chat_participante_repo.adicionar_participante(sala.id, outro_id)
+        usuario_repo.excluir(outro_id)
+
+        response = client.get("/chat/conversas")
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_listar_conversas_com_ultima_mensagem_e_nao_lidas(
+        self, client, fazer_login, criar_usuario_direto
+    ):
+        """Conversa deve trazer outro usuário, última mensagem e não lidas"""
+        usuario_id = criar_usuario_direto(
+            nome="User Resumo", email="resumo@teste.com", senha="Teste@123"
+        )
+        outro_id = criar_usuario_direto(
+            nome="Outro Resumo", email="outro_resumo@teste.com", senha="Teste@123"
+        )
+        fazer_login("resumo@teste.com", "Teste@123")
+
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario_id, outro_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+        chat_participante_repo.adicionar_participante(sala.id, outro_id)
+        chat_mensagem_repo.inserir(sala.id, outro_id, "Primeira")
+        chat_mensagem_repo.inserir(sala.id, outro_id, "Segunda")
+
+        response = client.get("/chat/conversas")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["sala_id"] == sala.id
+        assert data[0]["outro_usuario"]["id"] == outro_id
+        assert data[0]["outro_usuario"]["nome"] == "Outro Resumo"
+        assert data[0]["ultima_mensagem"]["mensagem"] == "Segunda"
+        assert data[0]["ultima_mensagem"]["usuario_id"] == outro_id
+        assert data[0]["nao_lidas"] == 2
 
 
 class TestChatEnviarMensagemEdgeCases:
@@ -133,6 +133,13 @@ class TestHealthCheck:
         assert "status" in data
         assert data["status"] == "healthy"
 
+    def test_health_check_informa_versao_das_configuracoes(self, client):
+        """Health check deve informar a versão/geração das configurações do worker"""
+        data = client.get("/health").json()
+
+        assert "versao" in data["configuracoes"]
+        assert "geracao" in data["configuracoes"]
+
     def test_health_check_sem_autenticacao(self, client):
         """Health check deve ser acessível sem autenticação"""
         response = client.get("/health")
@@ -3,8 +3,13 @@ Testes de integração para rotas de usuário (/usuario)
 Testa dashboard, perfil, edição, alteração de senha e upload de foto
 """
 
+import re
+
 from fastapi import status
 from unittest.mock import patch
+
+from repo import usuario_repo
+from util.imagem_worker import obter_tarefa
 from tests.test_helpers import (
     assert_redirects_to,
     assert_permission_denied,
@@ -379,10 +384,54 @@ class TestAtualizarFoto:
 
             assert response.status_code == status.HTTP_303_SEE_OTHER
 
+    def test_atualizar_foto_acompanha_processamento(
+        self, comprador_autenticado, usuario_teste, foto_teste_base64
+    ):
+        """Upload enfileira a foto e a página de perfil recebe a tarefa para polling"""
+        comprador_autenticado.post(
+            "/usuario/perfil/atualizar-foto",
+            data={"foto_base64": foto_teste_base64},
+            follow_redirects=False,
+        )
+
+        pagina = comprador_autenticado.get("/usuario/perfil/visualizar")
+        match = re.search(r'data-tarefa-foto="([0-9a-f]+)"', pagina.text)
+        assert match
+
+        tarefa = obter_tarefa(match.group(1), usuario_repo.obter_por_email(usuario_teste["email"]).id)
+        assert tarefa.aguardar(timeout=30)
+
+        response = comprador_autenticado.get(f"/usuario/imagens/tarefas/{tarefa.id}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "concluida"
+        assert response.json()["url"].endswith(".jpg")
+
+        # A tarefa é entregue à página uma única vez
+        pagina = comprador_autenticado.get("/usuario/perfil/visualizar")
+        assert "data-tarefa-foto" not in pagina.text
+
+    def test_atualizar_foto_fila_cheia(self, comprador_autenticado, foto_teste_base64):
+        """Com a fila de imagens cheia o upload é recusado com mensagem"""
+        with patch("routes.usuario_routes.enfileirar_foto_usuario", return_value=None):
+            response = comprador_autenticado.post(
+                "/usuario/perfil/atualizar-foto",
+                data={"foto_base64": foto_teste_base64},
+                follow_redirects=True,
+            )
+
+        assert "processar a imagem agora" in response.text
+        assert "data-tarefa-foto" not in response.text
+
+    def test_status_tarefa_inexistente(self, comprador_autenticado):
+        """Tarefa inexistente (ou de outro usuário) retorna 404"""
+        response = comprador_autenticado.get("/usuario/imagens/tarefas/inexistente")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     def test_atualizar_foto_erro_io(self, comprador_autenticado):
         """Deve tratar erro de I/O ao salvar foto"""
         with patch(
-            "routes.usuario_routes.salvar_foto_cropada_usuario",
+            "routes.usuario_routes.enfileirar_foto_usuario",
             side_effect=IOError("Disk full"),
         ):
             response = comprador_autenticado.post(
@@ -396,7 +445,7 @@ class TestAtualizarFoto:
     def test_atualizar_foto_erro_os(self, comprador_autenticado):
         """Deve tratar OSError ao salvar foto"""
         with patch(
-            "routes.usuario_routes.salvar_foto_cropada_usuario",
+            "routes.usuario_routes.enfileirar_foto_usuario",
             side_effect=OSError("Permission denied"),
         ):
             response = comprador_autenticado.post(
@@ -8,7 +8,7 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch
 
-from util.chat_manager import GerenciadorChat, gerenciador_chat
+from util.chat_manager import FilaSSE, GerenciadorChat, formatar_lote_sse, gerenciador_chat
 
 
 class TestGerenciadorChat:
@@ -179,6 +179,148 @@ class TestGerenciadorChat:
         assert queue1 is not queue2
         assert gerenciador.esta_conectado(1)
 
+    @pytest.mark.asyncio
+    async def test_multiplas_conexoes_do_mesmo_usuario(self, gerenciador):
+        """Cada aba do usuário deve receber as mensagens da sala"""
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+
+        assert aba1 is not aba2
+        assert aba1.conexao_id != aba2.conexao_id
+
+        mensagem = {"texto": "Olá!", "remetente_id": 2}
+        await gerenciador.broadcast_para_sala("1_2", mensagem)
+
+        assert await aba1.get() == mensagem
+        assert await aba2.get() == mensagem
+
+    @pytest.mark.asyncio
+    async def test_desconectar_uma_conexao_mantem_as_demais(self, gerenciador):
+        """Fechar uma aba não deve derrubar as outras conexões do usuário"""
+        aba1 = await gerenciador.conectar(1)
+        aba2 = await gerenciador.conectar(1)
+
+        await gerenciador.desconectar(1, aba1.conexao_id)
+
+        assert gerenciador.esta_conectado(1)
+        await gerenciador.broadcast_para_sala("1_2", {"texto": "ainda aqui"})
+        assert aba1.empty()
+        assert await aba2.get() == {"texto": "ainda aqui"}
+
+        await gerenciador.desconectar(1, aba2.conexao_id)
+        assert not gerenciador.esta_conectado(1)
+        assert 1 not in gerenciador._connections
+
+    @pytest.mark.asyncio
+    async def test_desconectar_conexao_desconhecida(self, gerenciador):
+        """conexao_id inexistente não deve afetar as conexões do usuário"""
+        await gerenciador.conectar(1)
+
+        await gerenciador.desconectar(1, "inexistente")
+
+        assert gerenciador.esta_conectado(1)
+
+    @pytest.mark.asyncio
+    async def test_estatisticas_conexoes_por_usuario(self, gerenciador):
+        """Estatísticas devem contar as conexões de cada usuário"""
+        await gerenciador.conectar(1)
+        await gerenciador.conectar(1)
+        await gerenciador.conectar(2)
+
+        stats = gerenciador.obter_estatisticas()
+
+        assert stats["total_conexoes"] == 3
+        assert stats["total_usuarios_ativos"] == 2
+        assert stats["conexoes_por_usuario"] == {1: 2, 2: 1}
+
+
+class TestFilaSSE:
+    """Testes da fila limitada de eventos SSE"""
+
+    @pytest.mark.asyncio
+    async def test_descarta_mais_antigo_quando_cheia(self):
+        """Fila cheia deve descartar o evento mais antigo sem bloquear"""
+        fila = FilaSSE(maxsize=2)
+
+        for i in range(3):
+            await fila.put({"seq": i})
+
+        assert fila.qsize() == 2
+        assert fila.descartados == 1
+        assert [fila.get_nowait()["seq"] for _ in range(2)] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_coalesce_atualizar_contador_pendente(self):
+        """atualizar_contador repetido para a mesma sala deve ser coalescido"""
+        fila = FilaSSE()
+        evento = {"tipo": "atualizar_contador", "sala_id": "1_2"}
+
+        await fila.put(evento)
+        await fila.put(dict(evento))
+        await fila.put({"tipo": "atualizar_contador", "sala_id": "1_3"})
+
+        assert fila.qsize() == 2
+        assert fila.coalescidos == 1
+
+        # Depois de enviado, um novo evento da mesma sala volta a entrar
+        fila.get_nowait()
+        await fila.put(dict(evento))
+        assert fila.qsize() == 2
+
+    @pytest.mark.asyncio
+    async def test_nova_mensagem_nao_e_coalescida(self):
+        """Mensagens de chat nunca são coalescidas"""
+        fila = FilaSSE()
+        evento = {"tipo": "nova_mensagem", "sala_id": "1_2"}
+
+        await fila.put(evento)
+        await fila.put(dict(evento))
+
+        assert fila.qsize() == 2
+
+    @pytest.mark.asyncio
+    async def test_obter_lote_agrupa_eventos_enfileirados(self):
+        """Eventos já enfileirados devem sair juntos, respeitando o máximo"""
+        fila = FilaSSE()
+        for i in range(5):
+            await fila.put({"seq": i})
+
+        lote = await fila.obter_lote(maximo=3, timeout=1)
+
+        assert [e["seq"] for e in lote] == [0, 1, 2]
+        assert fila.qsize() == 2
+
+    @pytest.mark.asyncio
+    async def test_obter_lote_vazio_no_timeout(self):
+        """Sem eventos, obter_lote retorna lista vazia após o timeout"""
+        fila = FilaSSE()
+        assert await fila.obter_lote(timeout=0.01) == []
+
+    def test_formatar_lote_sse(self):
+        """Lote vira um bloco SSE único; lote vazio vira heartbeat"""
+        texto = formatar_lote_sse([{"a": 1}, {"b": 2}])
+
+        assert texto == 'data: {"a": 1}\n\ndata: {"b": 2}\n\n'
+        assert formatar_lote_sse([]) == ": heartbeat\n\n"
+
+    @pytest.mark.asyncio
+    async def test_estatisticas_das_filas(self):
+        """Estatísticas devem expor profundidade e eventos descartados"""
+        gerenciador = GerenciadorChat(tamanho_fila=1)
+        queue = await gerenciador.conectar(1)
+
+        await gerenciador.broadcast_para_sala("1_2", {"seq": 1})
+        await gerenciador.broadcast_para_sala("1_2", {"seq": 2})
+
+        stats = gerenciador.obter_estatisticas()
+        assert stats["profundidade_filas"] == {queue.conexao_id: 1}
+        assert stats["profundidade_max_filas"] == 1
+        assert stats["eventos_descartados"] == 1
+
+        # Contadores permanecem após a desconexão
+        await gerenciador.desconectar(1)
+        assert gerenciador.obter_estatisticas()["eventos_descartados"] == 1
+
 
 class TestGerenciadorChatSingleton:
     """Testes para a instância singleton"""
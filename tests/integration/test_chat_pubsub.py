@@ -0,0 +1,285 @@
+"""
+Testes para o módulo util/chat_pubsub.py
+
+Testa a entrega de broadcasts do chat entre instâncias do GerenciadorChat
+(cada uma representando um worker) e entre processos reais.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from util.chat_manager import GerenciadorChat
+from util.chat_pubsub import (
+    BackendPubSub,
+    BackendMemoria,
+    BackendSocket,
+    BackendSQLite,
+    criar_backend,
+)
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _receber(queue: asyncio.Queue, timeout: float = 3.0) -> dict:
+    """Aguarda o próximo evento da fila SSE"""
+    return await asyncio.wait_for(queue.get(), timeout)
+
+
+def _publicar_em_outro_processo(codigo_backend: str, *args: str) -> None:
+    """Publica um evento para a sala 1_2 a partir de um processo Python separado"""
+    codigo = textwrap.dedent(
+        f"""
+        import asyncio, sys
+        from util.chat_pubsub import BackendSQLite, BackendSocket
+
+        async def main():
+            backend = {codigo_backend}
+
+            async def entregar(sala_id, mensagem):
+                pass
+
+            await backend.iniciar(entregar)
+            await backend.publicar("1_2", {{"texto": "outro processo", "pid": {os.getpid()}}})
+            await backend.parar()
+
+        asyncio.run(main())
+        """
+    )
+    subprocess.run(
+        [sys.executable, "-c", codigo, *args],
+        cwd=RAIZ_PROJETO,
+        env=os.environ.copy(),
+        check=True,
+        timeout=30,
+    )
+
+
+class TestCriarBackend:
+    """Testes de criar_backend"""
+
+    def test_backends_conhecidos(self):
+        """Deve criar o backend pelo nome"""
+        assert isinstance(criar_backend("memoria"), BackendMemoria)
+        assert isinstance(criar_backend("SQLITE"), BackendSQLite)
+        assert isinstance(criar_backend("socket"), BackendSocket)
+
+    def test_backend_desconhecido(self):
+        """Nome inválido deve gerar ValueError"""
+        with pytest.raises(ValueError):
+            criar_backend("redis")
+
+    def test_backend_sem_publicar_falha_ao_instanciar(self):
+        """Backend que não implementa publicar() não pode ser criado"""
+
+        class Incompleto(BackendPubSub):
+            nome = "incompleto"
+
+        with pytest.raises(TypeError):
+            Incompleto()
+
+
+class TestBackendSQLite:
+    """Broadcast entre workers via log de eventos no banco"""
+
+    @pytest.fixture
+    async def workers(self):
+        a = GerenciadorChat(BackendSQLite(intervalo_segundos=0.01))
+        b = GerenciadorChat(BackendSQLite(intervalo_segundos=0.01))
+        yield a, b
+        await a.parar()
+        await b.parar()
+
+    async def test_broadcast_chega_a_outro_worker(self, workers):
+        """Mensagem publicada no worker A deve chegar ao usuário conectado no B"""
+        a, b = workers
+        queue1 = await a.conectar(1)
+        queue2 = await b.conectar(2)
+
+        await a.broadcast_para_sala("1_2", {"texto": "Olá!"})
+
+        assert await _receber(queue1) == {"texto": "Olá!"}
+        assert await _receber(queue2) == {"texto": "Olá!"}
+
+    async def test_eventos_entregues_em_ordem(self, workers):
+        """Eventos devem chegar na ordem em que foram publicados"""
+        a, b = workers
+        queue = await b.conectar(2)
+
+        for i in range(5):
+            await a.broadcast_para_sala("1_2", {"seq": i})
+
+        assert [(await _receber(queue))["seq"] for _ in range(5)] == list(range(5))
+
+    async def test_eventos_antigos_sao_excluidos(self):
+        """Limpeza deve remover eventos fora da retenção"""
+        from repo import chat_evento_repo
+
+        backend = BackendSQLite(intervalo_segundos=0.01)
+        gerenciador = GerenciadorChat(backend)
+        await gerenciador.broadcast_para_sala("1_2", {"texto": "antigo"})
+
+        assert chat_evento_repo.excluir_anteriores(float("inf")) == 1
+        assert chat_evento_repo.listar_posteriores(0) == []
+        await gerenciador.parar()
+
+    async def test_broadcast_de_outro_processo(self, workers):
+        """Evento gravado por outro processo deve chegar às conexões locais"""
+        _, b = workers
+        queue = await b.conectar(2)
+
+        await asyncio.to_thread(
+            _publicar_em_outro_processo, "BackendSQLite(intervalo_segundos=0.01)"
+        )
+
+        evento = await _receber(queue)
+        assert evento["texto"] == "outro processo"
+
+    async def test_evento_invalido_e_descartado(self):
+        """Payload que não é JSON é descartado e os eventos seguintes chegam"""
+        from repo import chat_evento_repo
+        from util.db_util import obter_conexao
+
+        backend = BackendSQLite(intervalo_segundos=0.01)
+        recebidos = asyncio.Queue()
+
+        async def entregar(sala_id, mensagem):
+            await recebidos.put(mensagem)
+
+        await backend.iniciar(entregar)
+        try:
+            with obter_conexao() as conn:
+                conn.execute(
+                    "INSERT INTO chat_evento (sala_id, payload, criado_em) VALUES ('1_2', '{', 0)"
+                )
+            chat_evento_repo.inserir("1_2", {"texto": "depois"})
+
+            assert await _receber(recebidos) == {"texto": "depois"}
+            assert backend._ultimo_id == chat_evento_repo.obter_ultimo_id()
+        finally:
+            await backend.parar()
+
+    async def test_falha_na_entrega_nao_interrompe_polling(self):
+        """Erro no entregador ou na leitura é registrado e o polling continua"""
+        backend = BackendSQLite(intervalo_segundos=0.01)
+        recebidos = asyncio.Queue()
+
+        async def entregar(sala_id, mensagem):
+            if mensagem.get("falhar"):
+                raise RuntimeError("entrega falhou")
+            await recebidos.put(mensagem)
+
+        await backend.iniciar(entregar)
+        try:
+            await backend.publicar("1_2", {"falhar": True})
+            await backend.publicar("1_2", {"texto": "entregue"})
+            assert await _receber(recebidos) == {"texto": "entregue"}
+
+            with patch(
+                "util.chat_pubsub.chat_evento_repo.listar_posteriores",
+                side_effect=ValueError("leitura falhou"),
+            ):
+                await asyncio.sleep(0.05)
+            assert not backend._tarefa.done()
+
+            await backend.publicar("1_2", {"texto": "após a falha"})
+            assert await _receber(recebidos) == {"texto": "após a falha"}
+        finally:
+            await backend.parar()
+
+
+class TestBackendSocket:
+    """Broadcast entre workers via broker em socket Unix"""
+
+    @pytest.fixture
+    def caminho_socket(self):
+        # Diretório curto: caminhos de socket Unix têm limite de ~100 caracteres
+        diretorio = tempfile.mkdtemp(prefix="chat")
+        yield os.path.join(diretorio, "pubsub.sock")
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    async def test_primeiro_worker_assume_broker(self, caminho_socket):
+        """Apenas um processo/instância deve atuar como broker"""
+        backend_a = BackendSocket(caminho_socket)
+        backend_b = BackendSocket(caminho_socket)
+        a = GerenciadorChat(backend_a)
+        b = GerenciadorChat(backend_b)
+        await a.conectar(1)
+        await b.conectar(2)
+
+        assert backend_a.eh_broker
+        assert not backend_b.eh_broker
+
+        await b.parar()
+        await a.parar()
+
+    async def test_broadcast_chega_a_outro_worker(self, caminho_socket):
+        """Mensagem publicada em um cliente deve chegar aos demais via broker"""
+        a = GerenciadorChat(BackendSocket(caminho_socket))
+        b = GerenciadorChat(BackendSocket(caminho_socket))
+        queue1 = await a.conectar(1)
+        queue2 = await b.conectar(2)
+
+        await b.broadcast_para_sala("1_2", {"texto": "Olá!"})
+
+        assert await _receber(queue1) == {"texto": "Olá!"}
+        assert await _receber(queue2) == {"texto": "Olá!"}
+
+        await b.parar()
+        await a.parar()
+
+    async def test_outro_worker_assume_quando_broker_encerra(self, caminho_socket):
+        """Ao encerrar o broker, um cliente deve assumir e a entrega continuar"""
+        backend_b = BackendSocket(caminho_socket, intervalo_reconexao=0.05)
+        a = GerenciadorChat(BackendSocket(caminho_socket))
+        b = GerenciadorChat(backend_b)
+        await a.conectar(1)
+        queue2 = await b.conectar(2)
+
+        await a.parar()
+        for _ in range(100):
+            if backend_b.eh_broker and backend_b._writer is not None:
+                break
+            await asyncio.sleep(0.05)
+        assert backend_b.eh_broker
+
+        c = GerenciadorChat(BackendSocket(caminho_socket))
+        await c.broadcast_para_sala("1_2", {"texto": "depois da troca"})
+
+        assert await _receber(queue2) == {"texto": "depois da troca"}
+
+        await c.parar()
+        await b.parar()
+
+    async def test_sem_broker_entrega_localmente(self, caminho_socket):
+        """Sem conexão com o broker, o evento ainda chega ao próprio processo"""
+        backend = BackendSocket(caminho_socket)
+        gerenciador = GerenciadorChat(backend)
+        queue = await gerenciador.conectar(1)
+        # Simular queda da conexão com o broker
+        backend._writer = None
+
+        await gerenciador.broadcast_para_sala("1_2", {"texto": "local"})
+
+        assert await _receber(queue) == {"texto": "local"}
+        await gerenciador.parar()
+
+    async def test_broadcast_de_outro_processo(self, caminho_socket):
+        """Evento publicado por outro processo deve chegar via broker"""
+        a = GerenciadorChat(BackendSocket(caminho_socket))
+        queue = await a.conectar(2)
+
+        await asyncio.to_thread(
+            _publicar_em_outro_processo, "BackendSocket(sys.argv[1])", caminho_socket
+        )
+
+        evento = await _receber(queue)
+        assert evento["texto"] == "outro processo"
+        await a.parar()
@@ -0,0 +1,76 @@
+"""
+Testes de convergência do cache de configurações entre workers
+
+Uma alteração feita por outro processo (outro worker) deve ser aplicada
+pelo cache deste processo em até CONFIG_CACHE_VERIFICACAO_SEGUNDOS.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from time import monotonic
+from unittest.mock import patch
+
+from repo import configuracao_repo
+from util.config import CONFIG_CACHE_VERIFICACAO_SEGUNDOS
+from util.config_cache import config
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def alterar_em_outro_worker(chave: str, valor: str):
+    """Altera uma configuração a partir de outro processo"""
+    codigo = textwrap.dedent(
+        """
+        import sys
+        from repo import configuracao_repo
+        assert configuracao_repo.atualizar(sys.argv[1], sys.argv[2])
+        """
+    )
+    subprocess.run(
+        [sys.executable, "-c", codigo, chave, valor],
+        cwd=RAIZ_PROJETO,
+        env=os.environ.copy(),
+        check=True,
+        timeout=30,
+    )
+
+
+def apos_intervalo():
+    """Simula a passagem do intervalo de verificação"""
+    return patch(
+        "util.config_cache.monotonic",
+        return_value=monotonic() + CONFIG_CACHE_VERIFICACAO_SEGUNDOS,
+    )
+
+
+class TestConvergenciaEntreWorkers:
+    """Invalidação do ConfigCache pelo contador de versão"""
+
+    def test_alteracao_em_outro_worker_converge(self):
+        configuracao_repo.inserir_ou_atualizar("teste_convergencia", "1")
+        config.limpar()
+        assert config.obter("teste_convergencia") == "1"
+        geracao = config.obter_geracao()
+
+        alterar_em_outro_worker("teste_convergencia", "2")
+
+        # Dentro do intervalo o snapshot atual continua valendo
+        assert config.obter("teste_convergencia") == "1"
+
+        with apos_intervalo():
+            assert config.obter("teste_convergencia") == "2"
+            assert config.obter_geracao() == geracao + 1
+        assert config.obter_estatisticas()["versao"] == configuracao_repo.obter_versao()
+
+    def test_escrita_sem_mudanca_de_configuracao_mantem_geracao(self):
+        configuracao_repo.inserir_ou_atualizar("teste_convergencia", "1")
+        config.limpar()
+        geracao = config.obter_geracao()
+
+        # Mesmo valor: o contador de versão não muda
+        alterar_em_outro_worker("teste_convergencia", "1")
+
+        with apos_intervalo():
+            assert config.obter_geracao() == geracao
@@ -0,0 +1,194 @@
+"""
+Testes para o módulo util/assets.py
+
+Testa a construção dos assets com hash, o manifesto usado pela global
+asset() e a política de cache de ArquivosEstaticos.
+"""
+
+import gzip
+import json
+from pathlib import Path
+from time import monotonic
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from util.assets import (
+    CACHE_IMUTAVEL,
+    CACHE_REVALIDAR,
+    ArquivosEstaticos,
+    ManifestoAssets,
+    construir_assets,
+    limpar_assets_antigos,
+)
+from util.config import ASSETS_VERIFICACAO_SEGUNDOS
+
+CSS = b"body { color: red; }\n" * 50
+
+
+@pytest.fixture
+def pasta_static(tmp_path):
+    """Redireciona a pasta static para um diretório temporário com alguns assets"""
+    static = tmp_path / "static"
+    (static / "css" / "bootswatch").mkdir(parents=True)
+    (static / "js").mkdir()
+    (static / "img").mkdir()
+    (static / "css" / "custom.css").write_bytes(CSS)
+    (static / "css" / "bootswatch" / "darkly.min.css").write_bytes(b"/* tema */")
+    (static / "js" / "toasts.js").write_bytes(b"console.log('ok');")
+    (static / "img" / "logo.png").write_bytes(b"png")
+
+    dist = static / "dist"
+    with patch("util.assets.PASTA_STATIC", static), patch(
+        "util.assets.PASTA_DIST", dist
+    ), patch("util.assets.ARQUIVO_MANIFESTO", dist / "manifest.json"):
+        yield static
+
+
+class TestConstruirAssets:
+    """Testes de construir_assets() e limpar_assets_antigos()"""
+
+    def test_gera_copias_com_hash_e_manifesto(self, pasta_static):
+        manifesto = construir_assets()
+
+        assert sorted(manifesto) == ["css/custom.css", "js/toasts.js"]
+        destino = pasta_static / manifesto["css/custom.css"]
+        assert destino.name.startswith("custom.") and destino.suffix == ".css"
+        assert destino.read_bytes() == CSS
+        assert gzip.decompress(destino.with_name(destino.name + ".gz").read_bytes()) == CSS
+        assert json.loads((pasta_static / "dist" / "manifest.json").read_text()) == manifesto
+
+    def test_hash_muda_com_o_conteudo(self, pasta_static):
+        antes = construir_assets()["css/custom.css"]
+        (pasta_static / "css" / "custom.css").write_bytes(b"body {}")
+
+        depois = construir_assets()["css/custom.css"]
+
+        assert depois != antes
+        # A versão anterior continua disponível para páginas já abertas
+        assert (pasta_static / antes).exists()
+
+    def test_nao_regrava_assets_existentes(self, pasta_static):
+        caminho = pasta_static / construir_assets()["js/toasts.js"]
+        mtime = caminho.stat().st_mtime_ns
+
+        construir_assets()
+
+        assert caminho.stat().st_mtime_ns == mtime
+
+    def test_limpar_remove_versoes_antigas(self, pasta_static):
+        antes = construir_assets()["css/custom.css"]
+        (pasta_static / "css" / "custom.css").write_bytes(b"body {}")
+        depois = construir_assets()["css/custom.css"]
+        antigos = list((pasta_static / antes).parent.glob(Path(antes).name + "*"))
+
+        assert limpar_assets_antigos() == len(antigos)  # .css, .css.gz e .css.br antigos
+
+        assert not (pasta_static / antes).exists()
+        assert (pasta_static / depois).exists()
+        assert (pasta_static / "dist" / "manifest.json").exists()
+
+
+class TestManifestoAssets:
+    """Testes de ManifestoAssets.url()"""
+
+    def test_url_com_hash(self, pasta_static):
+        manifesto = construir_assets()
+        assets = ManifestoAssets()
+        assets.carregar()
+
+        assert assets.url("css/custom.css") == f"/static/{manifesto['css/custom.css']}"
+
+    def test_asset_fora_do_manifesto_usa_url_original(self, pasta_static):
+        assets = ManifestoAssets()
+        assets.carregar()
+
+        assert assets.url("css/custom.css") == "/static/css/custom.css"
+
+    def test_reconstrucao_detectada_pelo_mtime(self, pasta_static):
+        construir_assets()
+        assets = ManifestoAssets()
+        assets.carregar()
+        antes = assets.url("css/custom.css")
+
+        # Outro worker reconstrói os assets (ex.: troca de tema)
+        (pasta_static / "css" / "custom.css").write_bytes(b"body {}")
+        construir_assets()
+
+        # Dentro do intervalo o manifesto atual continua valendo
+        assert assets.url("css/custom.css") == antes
+        with patch(
+            "util.assets.monotonic", return_value=monotonic() + ASSETS_VERIFICACAO_SEGUNDOS
+        ):
+            assert assets.url("css/custom.css") != antes
+
+
+class TestArquivosEstaticos:
+    """Testes dos cabeçalhos de cache e da negociação de arquivos pré-comprimidos"""
+
+    @pytest.fixture
+    def cliente(self, pasta_static):
+        app = Starlette(
+            routes=[Mount("/static", app=ArquivosEstaticos(directory=pasta_static))]
+        )
+        return TestClient(app)
+
+    def test_dist_imutavel_e_pre_comprimido(self, pasta_static, cliente):
+        url = f"/static/{construir_assets()['css/custom.css']}"
+
+        response = cliente.get(url, headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == CACHE_IMUTAVEL
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/css")
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == CSS
+
+    def test_dist_sem_compressao_aceita(self, pasta_static, cliente):
+        url = f"/static/{construir_assets()['css/custom.css']}"
+
+        response = cliente.get(url, headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["cache-control"] == CACHE_IMUTAVEL
+        assert response.content == CSS
+
+    def test_dist_prefere_brotli(self, pasta_static, cliente):
+        pytest.importorskip("brotli")
+        url = f"/static/{construir_assets()['css/custom.css']}"
+
+        response = cliente.get(url, headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["cache-control"] == CACHE_IMUTAVEL
+        assert response.content == CSS  # o httpx descomprime
+
+    def test_manifesto_revalidado(self, pasta_static, cliente):
+        construir_assets()
+
+        response = cliente.get("/static/dist/manifest.json")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == CACHE_REVALIDAR
+        assert "content-encoding" not in response.headers
+
+    def test_demais_arquivos_revalidados(self, cliente):
+        response = cliente.get("/static/img/logo.png")
+
+        assert response.headers["cache-control"] == CACHE_REVALIDAR
+        etag = response.headers["etag"]
+
+        revalidacao = cliente.get("/static/img/logo.png", headers={"If-None-Match": etag})
+        assert revalidacao.status_code == 304
+
+
+def test_paginas_referenciam_assets_com_hash(client):
+    """As páginas usam as URLs com hash geradas na inicialização"""
+    response = client.get("/login")
+
+    assert response.status_code == 200
+    assert "/static/dist/css/custom." in response.text
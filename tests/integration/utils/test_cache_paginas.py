@@ -0,0 +1,176 @@
+"""
+Testes para o módulo util/cache_paginas.py
+
+Testa o cache LRU com TTL das páginas públicas, a invalidação por grupo
+e as condições em que o cache não é usado.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from starlette.responses import HTMLResponse
+
+from util.cache_paginas import GRUPO_ANUNCIOS, GRUPO_CATEGORIAS, CachePaginas
+from util.csrf_protection import CSRF_SESSION_KEY
+
+CONTENT_TYPE = "text/html; charset=utf-8"
+
+
+class RequestFalso:
+    """Request mínimo: caminho, query e sessão"""
+
+    def __init__(self, caminho="/", query=None, sessao=None):
+        from starlette.datastructures import QueryParams, URL
+
+        self.url = URL(caminho)
+        self.query_params = QueryParams(query or {})
+        self.session = sessao if sessao is not None else {}
+
+
+def guardar(cache, chave, corpo=b"<html></html>", grupos=(GRUPO_ANUNCIOS,)):
+    return cache.guardar(chave, grupos, cache._obter_geracoes(grupos), corpo, CONTENT_TYPE)
+
+
+class TestCachePaginas:
+    """Testes de obter/guardar/invalidar"""
+
+    def test_guarda_e_obtem(self):
+        cache = CachePaginas(60)
+
+        assert guardar(cache, "/") is True
+
+        assert cache.obter("/").corpo == b"<html></html>"
+        assert cache.obter("/outra") is None
+
+    def test_expira_apos_ttl(self):
+        cache = CachePaginas(60)
+        guardar(cache, "/")
+
+        with patch("util.cache_paginas.time.monotonic", return_value=10**9):
+            assert cache.obter("/") is None
+
+    def test_descarta_menos_usada_ao_atingir_limite(self):
+        cache = CachePaginas(60, tamanho_max=2)
+        guardar(cache, "/a")
+        guardar(cache, "/b")
+        cache.obter("/a")
+
+        guardar(cache, "/c")
+
+        assert cache.obter("/b") is None
+        assert cache.obter("/a") is not None
+        assert cache.obter("/c") is not None
+
+    def test_nao_guarda_pagina_acima_do_limite_de_bytes(self):
+        cache = CachePaginas(60, bytes_max_item=10)
+
+        assert guardar(cache, "/", corpo=b"x" * 11) is False
+        assert cache.obter("/") is None
+
+    def test_invalidar_descarta_apenas_o_grupo(self):
+        cache = CachePaginas(60)
+        guardar(cache, "/", grupos=(GRUPO_ANUNCIOS, GRUPO_CATEGORIAS))
+        guardar(cache, "/categorias", grupos=(GRUPO_CATEGORIAS,))
+
+        cache.invalidar(GRUPO_ANUNCIOS)
+
+        assert cache.obter("/") is None
+        assert cache.obter("/categorias") is not None
+
+    def test_nao_guarda_pagina_renderizada_antes_de_invalidacao(self):
+        """Escrita concorrente durante a renderização: a página já nasce velha"""
+        cache = CachePaginas(60)
+        geracoes = cache._obter_geracoes((GRUPO_ANUNCIOS,))
+
+        cache.invalidar(GRUPO_ANUNCIOS)
+
+        assert cache.guardar("/", (GRUPO_ANUNCIOS,), geracoes, b"velha", CONTENT_TYPE) is False
+
+    def test_obter_exige_a_mesma_versao(self):
+        """Página guardada com outra versão dos dados (escrita em outro worker)"""
+        cache = CachePaginas(60)
+        grupos = (GRUPO_ANUNCIOS,)
+        cache.guardar("/", grupos, cache._obter_geracoes(grupos), b"v1", CONTENT_TYPE, [1])
+
+        assert cache.obter("/", [2]) is None
+        assert cache.obter("/", [1]) is None  # descartada ao ler com outra versão
+
+    def test_chave_ignora_ordem_dos_parametros(self):
+        a = RequestFalso("/anuncios", [("pagina", "2"), ("categoria", "1")])
+        b = RequestFalso("/anuncios", [("categoria", "1"), ("pagina", "2")])
+
+        assert CachePaginas.chave(a) == CachePaginas.chave(b) == "/anuncios?categoria=1&pagina=2"
+
+
+class TestResponder:
+    """Testes de responder() (HIT/MISS/BYPASS)"""
+
+    @pytest.fixture
+    def renderizacoes(self):
+        return []
+
+    @pytest.fixture
+    def renderizar(self, renderizacoes):
+        async def _renderizar(corpo="<html>página</html>", status_code=200):
+            renderizacoes.append(corpo)
+            return HTMLResponse(corpo, status_code=status_code)
+        return _renderizar
+
+    async def test_segunda_visita_anonima_vem_do_cache(self, renderizar, renderizacoes):
+        cache = CachePaginas(60)
+        request = RequestFalso("/")
+
+        primeira = await cache.responder(request, (GRUPO_ANUNCIOS,), renderizar)
+        segunda = await cache.responder(request, (GRUPO_ANUNCIOS,), renderizar)
+
+        assert primeira.headers["x-cache"] == "MISS"
+        assert segunda.headers["x-cache"] == "HIT"
+        assert segunda.body == primeira.body
+        assert segunda.headers["content-type"] == CONTENT_TYPE
+        assert len(renderizacoes) == 1
+
+    async def test_usuario_logado_nao_usa_cache(self, renderizar, renderizacoes):
+        cache = CachePaginas(60)
+        await cache.responder(RequestFalso("/"), (GRUPO_ANUNCIOS,), renderizar)
+
+        request = RequestFalso("/", sessao={"usuario_logado": {"id": 1}})
+        response = await cache.responder(request, (GRUPO_ANUNCIOS,), renderizar)
+
+        assert response.headers["x-cache"] == "BYPASS"
+        assert len(renderizacoes) == 2
+
+    async def test_flash_pendente_nao_usa_cache(self, renderizar):
+        cache = CachePaginas(60)
+        request = RequestFalso("/", sessao={"mensagens": [{"texto": "Erro", "tipo": "danger"}]})
+
+        response = await cache.responder(request, (GRUPO_ANUNCIOS,), renderizar)
+
+        assert response.headers["x-cache"] == "BYPASS"
+        assert cache.obter("/") is None
+
+    async def test_pagina_com_token_csrf_nao_e_guardada(self, renderizar):
+        cache = CachePaginas(60)
+        request = RequestFalso("/", sessao={CSRF_SESSION_KEY: "tok123"})
+
+        await cache.responder(
+            request, (GRUPO_ANUNCIOS,), lambda: renderizar('<input value="tok123">')
+        )
+
+        assert cache.obter("/") is None
+
+    async def test_erro_nao_e_guardado(self, renderizar):
+        cache = CachePaginas(60)
+
+        await cache.responder(
+            RequestFalso("/"), (GRUPO_ANUNCIOS,), lambda: renderizar(status_code=500)
+        )
+
+        assert cache.obter("/") is None
+
+    async def test_ttl_zero_desativa(self, renderizar):
+        cache = CachePaginas(0)
+
+        response = await cache.responder(RequestFalso("/"), (GRUPO_ANUNCIOS,), renderizar)
+
+        assert response.headers["x-cache"] == "BYPASS"
+        assert cache.obter("/") is None
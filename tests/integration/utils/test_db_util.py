@@ -178,3 +178,178 @@ class TestRegistrarAdaptadores:
             conn.close()
 
             assert row is not None
+
+
+class TestPoolConexoes:
+    """Testes para o pool de conexões (PoolConexoes)"""
+
+    def test_reutiliza_conexao_devolvida(self):
+        """Conexão devolvida deve ser reaproveitada na próxima aquisição"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_max=2)
+
+            conn1 = pool.adquirir()
+            pool.devolver(conn1)
+            conn2 = pool.adquirir()
+            pool.devolver(conn2)
+
+            assert conn1 is conn2
+            stats = pool.obter_estatisticas()
+            assert stats["criadas"] == 1
+            assert stats["hits"] == 1
+            assert stats["abertas"] == 1
+            pool.fechar()
+
+    def test_pragmas_aplicados_na_conexao(self):
+        """Conexões do pool devem vir com foreign_keys e row_factory configurados"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"))
+            conn = pool.adquirir()
+
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.row_factory is sqlite3.Row
+
+            pool.devolver(conn)
+            pool.fechar()
+
+    def test_pool_esgotado_levanta_erro(self):
+        """Deve falhar após timeout quando todas as conexões estão em uso"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_max=1, timeout=0.05)
+            conn = pool.adquirir()
+
+            with pytest.raises(sqlite3.OperationalError, match="esgotado"):
+                pool.adquirir()
+
+            assert pool.obter_estatisticas()["esperas"] == 1
+            pool.devolver(conn)
+            pool.fechar()
+
+    def test_descarta_conexao_fechada(self):
+        """Conexão que falha no health check deve ser substituída"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"))
+            conn = pool.adquirir()
+            pool.devolver(conn)
+            conn.close()
+
+            nova = pool.adquirir()
+
+            assert nova is not conn
+            assert pool.obter_estatisticas()["descartadas"] == 1
+            pool.devolver(nova)
+            pool.fechar()
+
+    def test_devolver_desfaz_transacao_pendente(self):
+        """Transação não finalizada deve ser desfeita ao devolver a conexão"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"))
+            conn = pool.adquirir()
+            conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+            conn.commit()
+            conn.execute("INSERT INTO test VALUES (1)")
+            pool.devolver(conn)
+
+            conn = pool.adquirir()
+            assert conn.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 0
+            pool.devolver(conn)
+            pool.fechar()
+
+    def test_obter_conexao_usa_pool_do_database_path(self):
+        """obter_conexao deve reutilizar conexões do pool do DATABASE_PATH atual"""
+        from util.db_util import obter_conexao, obter_pool, fechar_pools
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+
+            with patch('util.db_util.DATABASE_PATH', db_path):
+                with obter_conexao() as conn1:
+                    pass
+                with obter_conexao() as conn2:
+                    pass
+
+                assert conn1 is conn2
+                assert obter_pool().caminho == db_path
+
+            fechar_pools()
+
+
+class TestPerfilArmazenamento:
+    """Testes para perfis de armazenamento e separação leitura/escrita"""
+
+    def test_perfil_desempenho_ativa_wal(self):
+        """Conexão de escrita deve aplicar journal_mode WAL e synchronous NORMAL"""
+        from util.db_util import PoolConexoes, PERFIS_ARMAZENAMENTO
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(
+                os.path.join(temp_dir, "test.db"),
+                pragmas=PERFIS_ARMAZENAMENTO["desempenho"],
+            )
+            conn = pool.adquirir()
+
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # NORMAL = 1
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+            pool.devolver(conn)
+            pool.fechar()
+
+    def test_perfil_invalido_levanta_erro(self):
+        """Perfil desconhecido deve levantar ValueError"""
+        from util.db_util import obter_perfil_armazenamento
+
+        with patch('util.db_util.DB_PERFIL_ARMAZENAMENTO', "inexistente"):
+            with pytest.raises(ValueError, match="DB_PERFIL_ARMAZENAMENTO"):
+                obter_perfil_armazenamento()
+
+    def test_sobrescrita_de_pragma_do_perfil(self):
+        """Variáveis DB_* devem sobrescrever valores do perfil"""
+        from util.db_util import obter_perfil_armazenamento
+
+        with patch('util.db_util.DB_CACHE_SIZE', "-500"):
+            assert obter_perfil_armazenamento()["cache_size"] == -500
+
+    def test_conexao_leitura_rejeita_escrita(self):
+        """Conexão de leitura (mode=ro) não deve permitir escrita"""
+        from util.db_util import obter_conexao, obter_conexao_leitura, fechar_pools
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+
+            with patch('util.db_util.DATABASE_PATH', db_path):
+                with obter_conexao() as conn:
+                    conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+                    conn.execute("INSERT INTO test VALUES (1)")
+
+                with obter_conexao_leitura() as conn:
+                    assert conn.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 1
+                    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                        conn.execute("INSERT INTO test VALUES (2)")
+
+                fechar_pools()
+
+    def test_conexao_aninhada_reutiliza_escritora(self):
+        """obter_conexao aninhado na mesma thread deve reutilizar a conexão escritora"""
+        from util.db_util import obter_conexao, fechar_pools
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+
+            with patch('util.db_util.DATABASE_PATH', db_path):
+                with obter_conexao() as externa:
+                    with obter_conexao() as interna:
+                        assert interna is externa
+
+                fechar_pools()
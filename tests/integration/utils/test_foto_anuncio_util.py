@@ -0,0 +1,279 @@
+"""
+Testes para o módulo util/foto_anuncio_util.py
+
+Testa a geração das variantes responsivas das fotos de anúncios, o srcset
+e o manifesto em memória das fotos existentes.
+"""
+
+import base64
+import io
+import os
+from time import monotonic
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from util.cache_paginas import GRUPO_ANUNCIOS, cache_paginas
+from util.config import FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS
+from util.foto_anuncio_util import (
+    enfileirar_foto_anuncio,
+    excluir_foto_anuncio,
+    gerar_variantes_foto_anuncio,
+    manifesto_fotos_anuncios,
+    obter_caminho_foto_anuncio,
+    obter_srcset_foto_anuncio,
+    obter_variantes_foto_anuncio,
+    obter_tamanho_foto_anuncio,
+    salvar_foto_anuncio,
+    variantes_atualizadas,
+)
+
+
+def criar_imagem_base64(size=(1200, 1200)) -> str:
+    """Helper para criar imagem base64"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color="blue").save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+def pasta_fotos(tmp_path):
+    """Redireciona a pasta de fotos de anúncios para um diretório temporário"""
+    pasta = tmp_path / "anuncios"
+    with patch("util.foto_anuncio_util.PASTA_FOTOS_ANUNCIOS", pasta):
+        yield pasta
+
+
+class TestVariantes:
+    """Testes das variantes geradas no upload"""
+
+    def test_salvar_gera_variantes(self, pasta_fotos):
+        assert salvar_foto_anuncio(1, criar_imagem_base64()) is True
+
+        assert sorted(p.name for p in pasta_fotos.iterdir()) == [
+            "000001-160.jpg",
+            "000001-160.webp",
+            "000001-320.jpg",
+            "000001-320.webp",
+            "000001-800.webp",
+            "000001.jpg",
+        ]
+        with Image.open(pasta_fotos / "000001-160.webp") as variante:
+            assert variante.format == "WEBP"
+            assert variante.size == (160, 160)
+        with Image.open(pasta_fotos / "000001.jpg") as principal:
+            assert principal.size == (800, 800)
+
+    def test_variante_nao_amplia_imagem_pequena(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64((100, 100)))
+
+        with Image.open(pasta_fotos / "000001-320.jpg") as variante:
+            assert variante.size == (100, 100)
+
+    def test_enfileirar_gera_variantes(self, pasta_fotos):
+        tarefa = enfileirar_foto_anuncio(1, criar_imagem_base64(), id_usuario=5)
+
+        assert tarefa.aguardar(timeout=30)
+        assert tarefa.url.endswith("000001.jpg")
+        assert all(os.path.exists(caminho) for caminho, _, _ in obter_variantes_foto_anuncio(1))
+
+    def test_excluir_remove_variantes(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+
+        assert excluir_foto_anuncio(1) is True
+        assert list(pasta_fotos.iterdir()) == []
+
+
+class TestSrcset:
+    """Testes de obter_srcset_foto_anuncio()"""
+
+    def test_srcset_jpg_e_webp(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+
+        jpg = obter_srcset_foto_anuncio(1)
+        webp = obter_srcset_foto_anuncio(1, "webp")
+
+        urls = [c.split()[0].split("?")[0] for c in jpg.split(", ")]
+        assert urls[0].endswith("/000001-160.jpg")
+        assert [c.split()[1] for c in jpg.split(", ")] == ["160w", "320w", "800w"]
+        assert urls[2].endswith("/000001.jpg")
+        assert webp.split(", ")[2].split()[0].split("?")[0].endswith("/000001-800.webp")
+
+    def test_descritores_usam_largura_real(self, pasta_fotos):
+        """Foto em retrato cabe em 800px pela altura: a principal tem 600px de largura"""
+        salvar_foto_anuncio(1, criar_imagem_base64((900, 1200)))
+
+        jpg = obter_srcset_foto_anuncio(1)
+        webp = obter_srcset_foto_anuncio(1, "webp")
+
+        assert [c.split()[1] for c in jpg.split(", ")] == ["160w", "320w", "600w"]
+        assert [c.split()[1] for c in webp.split(", ")] == ["160w", "320w", "600w"]
+        with Image.open(pasta_fotos / "000001-800.webp") as variante:
+            assert variante.width == 600
+
+    def test_foto_estreita_sem_descritores_repetidos(self, pasta_fotos):
+        """Foto mais estreita que as variantes: um candidato por largura real"""
+        salvar_foto_anuncio(1, criar_imagem_base64((200, 100)))
+
+        srcset = obter_srcset_foto_anuncio(1)
+
+        assert [c.split()[1] for c in srcset.split(", ")] == ["160w", "200w"]
+        assert srcset.split(", ")[1].split("?")[0].endswith("/000001-320.jpg")
+
+    def test_largura_lida_na_carga_do_manifesto(self, pasta_fotos):
+        """A largura também vem da varredura completa da pasta (outro worker)"""
+        salvar_foto_anuncio(1, criar_imagem_base64((600, 800)))
+        manifesto_fotos_anuncios.carregar()
+
+        assert manifesto_fotos_anuncios.obter(1).largura == 600
+
+    def test_sem_variantes_retorna_vazio(self, pasta_fotos):
+        assert obter_srcset_foto_anuncio(1) == ""
+
+
+class TestBackfill:
+    """Testes de gerar_variantes_foto_anuncio() (fotos anteriores às variantes)"""
+
+    def test_gera_variantes_de_foto_existente(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        for caminho, _, _ in obter_variantes_foto_anuncio(1):
+            os.remove(caminho)
+        original = (pasta_fotos / "000001.jpg").read_bytes()
+        assert variantes_atualizadas(1) is False
+
+        assert gerar_variantes_foto_anuncio(1) is True
+
+        assert variantes_atualizadas(1) is True
+        # A foto principal não é regravada
+        assert (pasta_fotos / "000001.jpg").read_bytes() == original
+
+    def test_foto_inexistente(self, pasta_fotos):
+        assert gerar_variantes_foto_anuncio(1) is False
+
+
+def apos_intervalo():
+    """Simula a passagem do intervalo de verificação da pasta"""
+    return patch(
+        "util.foto_anuncio_util.monotonic",
+        return_value=monotonic() + FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS,
+    )
+
+
+class TestManifesto:
+    """Testes do manifesto em memória usado pelo filtro foto_anuncio"""
+
+    def test_consulta_nao_acessa_disco(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        manifesto_fotos_anuncios.carregar()
+
+        with patch(
+            "util.foto_anuncio_util.obter_path_absoluto_foto_anuncio",
+            side_effect=AssertionError("acesso ao disco"),
+        ), patch("util.foto_anuncio_util.os.scandir", side_effect=AssertionError("varredura")):
+            assert "/000001.jpg?v=" in obter_caminho_foto_anuncio(1)
+            assert obter_caminho_foto_anuncio(2).endswith("produto-sem-foto.jpg")
+            assert obter_srcset_foto_anuncio(1, "webp")
+
+    def test_salvar_e_excluir_atualizam_na_hora(self, pasta_fotos):
+        manifesto_fotos_anuncios.carregar()
+
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        assert obter_tamanho_foto_anuncio(1) == (pasta_fotos / "000001.jpg").stat().st_size
+
+        excluir_foto_anuncio(1)
+        assert obter_tamanho_foto_anuncio(1) is None
+        assert obter_caminho_foto_anuncio(1).endswith("produto-sem-foto.jpg")
+
+    def test_alteracao_de_outro_worker_detectada_pela_pasta(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        manifesto_fotos_anuncios.carregar()
+
+        # Outro processo grava a foto do anúncio 2 diretamente
+        (pasta_fotos / "000002.jpg").write_bytes((pasta_fotos / "000001.jpg").read_bytes())
+
+        # Dentro do intervalo o manifesto atual continua valendo
+        assert obter_caminho_foto_anuncio(2).endswith("produto-sem-foto.jpg")
+
+        with apos_intervalo():
+            assert "/000002.jpg?v=" in obter_caminho_foto_anuncio(2)
+
+    def test_alteracoes_invalidam_paginas_em_cache(self, pasta_fotos):
+        def geracao():
+            return cache_paginas._obter_geracoes((GRUPO_ANUNCIOS,))
+
+        manifesto_fotos_anuncios.carregar()
+
+        antes = geracao()
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        assert geracao() != antes
+
+        antes = geracao()
+        excluir_foto_anuncio(1)
+        assert geracao() != antes
+
+        # Foto gravada por outro worker
+        antes = geracao()
+        (pasta_fotos / "000002.jpg").write_bytes(b"foto")
+        with apos_intervalo():
+            obter_caminho_foto_anuncio(2)
+        assert geracao() != antes
+
+    def test_versao_muda_quando_foto_e_substituida(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        antes = obter_caminho_foto_anuncio(1)
+
+        os.utime(pasta_fotos / "000001.jpg", (1_000_000_000, 1_000_000_000))
+        manifesto_fotos_anuncios.atualizar(1)
+
+        assert obter_caminho_foto_anuncio(1) != antes
+        assert obter_caminho_foto_anuncio(1).endswith("?v=1000000000000000000")
+
+    def test_substituicoes_no_mesmo_segundo_geram_versoes_diferentes(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        foto = pasta_fotos / "000001.jpg"
+
+        os.utime(foto, ns=(1_000_000_000_100_000_000, 1_000_000_000_100_000_000))
+        manifesto_fotos_anuncios.atualizar(1)
+        antes = obter_caminho_foto_anuncio(1)
+        os.utime(foto, ns=(1_000_000_000_200_000_000, 1_000_000_000_200_000_000))
+        manifesto_fotos_anuncios.atualizar(1)
+
+        assert obter_caminho_foto_anuncio(1) != antes
+
+    def test_escrita_local_nao_provoca_nova_varredura(self, pasta_fotos):
+        manifesto_fotos_anuncios.carregar()
+
+        salvar_foto_anuncio(1, criar_imagem_base64())
+        excluir_foto_anuncio(2)
+
+        with apos_intervalo(), patch(
+            "util.foto_anuncio_util.os.scandir", side_effect=AssertionError("varredura")
+        ):
+            assert "/000001.jpg?v=" in obter_caminho_foto_anuncio(1)
+
+
+class TestComponenteImagemAnuncio:
+    """Testes do macro components/imagem_anuncio.html"""
+
+    def renderizar(self, id: int) -> str:
+        from util.template_util import criar_templates
+
+        modulo = criar_templates().env.get_template("components/imagem_anuncio.html").module
+        return str(modulo.imagem_anuncio(id, "Produto", sizes="60px"))
+
+    def test_com_variantes_emite_picture_com_webp(self, pasta_fotos):
+        salvar_foto_anuncio(1, criar_imagem_base64())
+
+        html = self.renderizar(1)
+
+        assert '<source type="image/webp"' in html
+        assert 'srcset="' in html
+        assert 'sizes="60px"' in html
+
+    def test_sem_variantes_emite_img_simples(self, pasta_fotos):
+        html = self.renderizar(1)
+
+        assert "<source" not in html
+        assert "srcset" not in html
+        assert 'src="/static/img/produto-sem-foto.jpg"' in html
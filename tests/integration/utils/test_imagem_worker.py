@@ -0,0 +1,171 @@
+"""
+Testes para o módulo util/imagem_worker.py
+
+Testa o processamento de imagens no pool de processos: fila limitada,
+status das tarefas e escrita atômica do arquivo final.
+"""
+
+import io
+import os
+import signal
+import time
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from util import imagem_worker
+from util.imagem_worker import (
+    STATUS_CONCLUIDA,
+    STATUS_ERRO,
+    decodificar_base64,
+    encerrar_pool_imagens,
+    enfileirar,
+    obter_estatisticas_imagens,
+    obter_tarefa,
+    processar_imagem,
+)
+
+TIMEOUT_S = 30
+
+
+def encerrar_processo(*args):
+    """Simula a morte do processo do pool (OOM killer, segfault)"""
+    os._exit(1)
+
+
+def criar_imagem(mode="RGB", size=(100, 100), formato="PNG") -> bytes:
+    """Helper para criar os bytes de uma imagem"""
+    buffer = io.BytesIO()
+    Image.new(mode, size, color="red").save(buffer, format=formato)
+    return buffer.getvalue()
+
+
+class TestDecodificarBase64:
+    """Testes de decodificar_base64()"""
+
+    def test_remove_prefixo_data_url(self):
+        assert decodificar_base64("data:image/png;base64,aGVsbG8=") == b"hello"
+
+    def test_sem_prefixo(self):
+        assert decodificar_base64("aGVsbG8=") == b"hello"
+
+
+class TestProcessarImagem:
+    """Testes de processar_imagem() (executada nos processos do pool)"""
+
+    def test_redimensiona_e_converte_para_jpg(self, tmp_path):
+        destino = tmp_path / "foto.jpg"
+
+        tamanho = processar_imagem(criar_imagem("RGBA", (400, 200)), str(destino), 100)
+
+        assert tamanho == (100, 50)
+        with Image.open(destino) as salva:
+            assert salva.format == "JPEG"
+            assert salva.mode == "RGB"
+            assert salva.size == (100, 50)
+
+    def test_nao_deixa_temporario(self, tmp_path):
+        processar_imagem(criar_imagem(), str(tmp_path / "foto.jpg"), 100)
+
+        assert [p.name for p in tmp_path.iterdir()] == ["foto.jpg"]
+
+    def test_imagem_invalida_preserva_arquivo_anterior(self, tmp_path):
+        destino = tmp_path / "foto.jpg"
+        destino.write_bytes(b"foto anterior")
+
+        with pytest.raises(OSError):
+            processar_imagem(b"texto qualquer", str(destino), 100)
+
+        assert destino.read_bytes() == b"foto anterior"
+
+
+class TestEnfileirar:
+    """Testes do pool de processos e do status das tarefas"""
+
+    def test_processa_em_outro_processo(self, tmp_path):
+        destino = tmp_path / "000001.jpg"
+
+        tarefa = enfileirar(1, criar_imagem(size=(300, 300)), destino, "/img/000001.jpg", 50)
+
+        assert tarefa is not None
+        assert tarefa.aguardar(TIMEOUT_S)
+        assert tarefa.status == STATUS_CONCLUIDA
+        with Image.open(destino) as salva:
+            assert salva.size == (50, 50)
+
+    def test_imagem_invalida_marca_erro(self, tmp_path):
+        tarefa = enfileirar(1, b"texto qualquer", tmp_path / "foto.jpg", "/img/foto.jpg", 50)
+
+        assert tarefa.aguardar(TIMEOUT_S)
+        assert tarefa.status == STATUS_ERRO
+        assert tarefa.erro
+        assert not (tmp_path / "foto.jpg").exists()
+
+    def test_tarefa_visivel_apenas_para_o_dono(self, tmp_path):
+        tarefa = enfileirar(7, criar_imagem(), tmp_path / "foto.jpg", "/img/foto.jpg", 50)
+        tarefa.aguardar(TIMEOUT_S)
+
+        assert obter_tarefa(tarefa.id, 7) is tarefa
+        assert obter_tarefa(tarefa.id, 8) is None
+        assert obter_tarefa("inexistente", 7) is None
+
+    def test_fila_cheia_rejeita(self, tmp_path):
+        rejeitadas = obter_estatisticas_imagens()["rejeitadas"]
+
+        with patch.object(imagem_worker, "IMAGEM_FILA_MAX", -imagem_worker.IMAGEM_PROCESSOS):
+            tarefa = enfileirar(1, criar_imagem(), tmp_path / "foto.jpg", "/img/foto.jpg", 50)
+
+        assert tarefa is None
+        assert obter_estatisticas_imagens()["rejeitadas"] == rejeitadas + 1
+
+    def test_tarefas_antigas_sao_descartadas(self, tmp_path):
+        tarefa = enfileirar(1, criar_imagem(), tmp_path / "a.jpg", "/img/a.jpg", 50)
+        tarefa.aguardar(TIMEOUT_S)
+
+        with patch.object(imagem_worker, "IMAGEM_TAREFA_RETENCAO_SEGUNDOS", -1):
+            outra = enfileirar(1, criar_imagem(), tmp_path / "b.jpg", "/img/b.jpg", 50)
+        outra.aguardar(TIMEOUT_S)
+
+        assert obter_tarefa(tarefa.id, 1) is None
+        assert obter_tarefa(outra.id, 1) is outra
+
+    def test_pool_recriado_apos_encerrar(self, tmp_path):
+        encerrar_pool_imagens()
+
+        tarefa = enfileirar(1, criar_imagem(), tmp_path / "foto.jpg", "/img/foto.jpg", 50)
+
+        assert tarefa.aguardar(TIMEOUT_S)
+        assert tarefa.status == STATUS_CONCLUIDA
+
+    def test_tarefa_em_andamento_falha_e_pool_e_recriado(self, tmp_path):
+        with patch.object(imagem_worker, "processar_imagem", encerrar_processo), patch.object(
+            imagem_worker, "logger"
+        ):
+            interrompida = enfileirar(1, criar_imagem(), tmp_path / "a.jpg", "/img/a.jpg", 50)
+            assert interrompida.aguardar(TIMEOUT_S)
+
+        tarefa = enfileirar(1, criar_imagem(), tmp_path / "b.jpg", "/img/b.jpg", 50)
+
+        assert interrompida.status == STATUS_ERRO
+        assert "interrompido" in interrompida.erro
+        assert tarefa.aguardar(TIMEOUT_S)
+        assert tarefa.status == STATUS_CONCLUIDA
+
+    def test_pool_quebrado_sem_tarefas_e_recriado(self, tmp_path):
+        enfileirar(1, criar_imagem(), tmp_path / "a.jpg", "/img/a.jpg", 50).aguardar(TIMEOUT_S)
+        quebrado = imagem_worker._obter_pool()
+        processo = next(iter(quebrado._processes.values()))
+
+        os.kill(processo.pid, signal.SIGKILL)
+        limite = time.monotonic() + TIMEOUT_S
+        while not quebrado._broken and time.monotonic() < limite:
+            time.sleep(0.01)
+
+        with patch.object(imagem_worker, "logger"):
+            tarefa = enfileirar(1, criar_imagem(), tmp_path / "b.jpg", "/img/b.jpg", 50)
+
+        assert tarefa is not None
+        assert tarefa.aguardar(TIMEOUT_S)
+        assert tarefa.status == STATUS_CONCLUIDA
+        assert imagem_worker._obter_pool() is not quebrado
@@ -0,0 +1,227 @@
+"""
+Testes para o módulo util/rate_limit_armazenamento.py
+
+Testa os armazenamentos de contagens dos rate limiters e o compartilhamento
+dos limites entre instâncias/processos (cada um representando um worker).
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from util.rate_limit_armazenamento import (
+    ArmazenamentoLimiter,
+    ArmazenamentoMemoria,
+    ArmazenamentoMmap,
+    ArmazenamentoSQLite,
+    avancar_registro,
+    criar_armazenamento,
+)
+from util.rate_limiter import RateLimiter
+
+RAIZ_PROJETO = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+
+@pytest.fixture(params=["memoria", "sqlite", "mmap"])
+def fabrica(request, tmp_path):
+    """Cria armazenamentos do tipo parametrizado; mesmos arquivos = mesmos registros"""
+    criados = []
+
+    def criar(limiter="teste"):
+        if request.param == "memoria":
+            armazenamento = ArmazenamentoMemoria(limiter)
+        elif request.param == "sqlite":
+            armazenamento = ArmazenamentoSQLite(limiter, str(tmp_path / "rate_limit.db"))
+        else:
+            armazenamento = ArmazenamentoMmap(limiter, str(tmp_path), capacidade=64)
+        criados.append(armazenamento)
+        return armazenamento
+
+    criar.nome = request.param
+    yield criar
+    for armazenamento in criados:
+        armazenamento.fechar()
+
+
+class TestAvancarRegistro:
+    """Testes de avancar_registro"""
+
+    def test_mesma_janela(self):
+        assert avancar_registro((10, 3, 2), 10) == (3, 2)
+
+    def test_janela_seguinte(self):
+        """Contagem atual vira a anterior"""
+        assert avancar_registro((9, 3, 2), 10) == (0, 3)
+
+    def test_registro_expirado_ou_ausente(self):
+        assert avancar_registro((5, 3, 2), 10) == (0, 0)
+        assert avancar_registro(None, 10) == (0, 0)
+
+
+class TestCriarArmazenamento:
+    """Testes de criar_armazenamento"""
+
+    def test_armazenamento_desconhecido(self):
+        """Nome inválido deve gerar ValueError"""
+        with pytest.raises(ValueError):
+            criar_armazenamento("teste", "redis")
+
+    def test_armazenamento_incompleto_falha_ao_instanciar(self):
+        """Armazenamento sem todos os métodos abstratos não pode ser criado"""
+
+        class Incompleto(ArmazenamentoLimiter):
+            def registrar(self, identificador, indice, peso, max_tentativas):
+                return True, 0.0
+
+        with pytest.raises(TypeError):
+            Incompleto("teste")
+
+    def test_algoritmo_registro_exige_memoria(self, tmp_path):
+        """Lista de instantes por identificador não é compartilhável"""
+        with pytest.raises(ValueError):
+            RateLimiter(
+                algoritmo="registro",
+                armazenamento=ArmazenamentoMmap("teste", str(tmp_path)),
+            )
+
+    def test_armazenamento_compartilhado_usa_janela_deslizante(self, tmp_path):
+        """Sem algoritmo explícito, armazenamento compartilhado usa janela_deslizante"""
+        limiter = RateLimiter(armazenamento=ArmazenamentoMmap("teste", str(tmp_path)))
+        assert limiter.algoritmo == "janela_deslizante"
+        assert RateLimiter().algoritmo == "registro"
+        limiter.armazenamento.fechar()
+
+
+class TestArmazenamentos:
+    """Contrato comum dos armazenamentos"""
+
+    def test_registrar_ate_o_limite(self, fabrica):
+        armazenamento = fabrica()
+
+        resultados = [armazenamento.registrar("ip", 100, 1.0, 3) for _ in range(4)]
+
+        assert [permitido for permitido, _ in resultados] == [True, True, True, False]
+        assert [estimativa for _, estimativa in resultados] == [0, 1, 2, 3]
+        assert armazenamento.obter("ip") == (100, 3, 0)
+
+    def test_peso_da_janela_anterior(self, fabrica):
+        armazenamento = fabrica()
+        for _ in range(3):
+            armazenamento.registrar("ip", 100, 1.0, 3)
+
+        # Na janela seguinte com peso 0.5: estimativa 1.5
+        assert armazenamento.registrar("ip", 101, 0.5, 3) == (True, 1.5)
+        assert armazenamento.registrar("ip", 101, 0.5, 3) == (True, 2.5)
+        assert armazenamento.registrar("ip", 101, 0.5, 3) == (False, 3.5)
+        assert armazenamento.obter("ip") == (101, 2, 3)
+
+    def test_remover_e_limpar(self, fabrica):
+        armazenamento = fabrica()
+        armazenamento.registrar("a", 100, 1.0, 3)
+        armazenamento.registrar("b", 100, 1.0, 3)
+
+        armazenamento.remover("a")
+        assert armazenamento.obter("a") is None
+        assert armazenamento.contar() == 1
+
+        armazenamento.limpar()
+        assert armazenamento.contar() == 0
+
+    def test_varrer_remove_ociosos(self, fabrica):
+        armazenamento = fabrica()
+        armazenamento.registrar("antigo", 98, 1.0, 3)
+        armazenamento.registrar("anterior", 99, 1.0, 3)
+        armazenamento.registrar("atual", 100, 1.0, 3)
+
+        assert armazenamento.varrer(100) == 1
+        assert armazenamento.obter("antigo") is None
+        assert armazenamento.obter("anterior") == (99, 1, 0)
+        assert armazenamento.contar() == 2
+
+    def test_limiters_isolados(self, fabrica):
+        """Limiters com nomes diferentes não compartilham registros"""
+        login = fabrica("login")
+        cadastro = fabrica("cadastro")
+        login.registrar("ip", 100, 1.0, 3)
+
+        assert cadastro.obter("ip") is None
+
+    def test_instancias_compartilham_registros(self, fabrica):
+        """Duas instâncias (workers) do mesmo limiter somam as tentativas"""
+        if fabrica.nome == "memoria":
+            pytest.skip("armazenamento em memória é por processo")
+        worker_a = fabrica()
+        worker_b = fabrica()
+
+        worker_a.registrar("ip", 100, 1.0, 2)
+        worker_b.registrar("ip", 100, 1.0, 2)
+
+        assert worker_a.registrar("ip", 100, 1.0, 2)[0] is False
+
+
+class TestArmazenamentoMmap:
+    """Casos específicos da tabela hash em arquivo"""
+
+    def test_tabela_cheia_libera_sem_contar(self, tmp_path):
+        armazenamento = ArmazenamentoMmap("teste", str(tmp_path), capacidade=2)
+        armazenamento.registrar("a", 100, 1.0, 1)
+        armazenamento.registrar("b", 100, 1.0, 1)
+
+        assert armazenamento.registrar("c", 100, 1.0, 1) == (True, 0.0)
+        assert armazenamento.obter("c") is None
+        armazenamento.fechar()
+
+    def test_tabela_cheia_reaproveita_ociosos(self, tmp_path):
+        armazenamento = ArmazenamentoMmap("teste", str(tmp_path), capacidade=2)
+        armazenamento.registrar("a", 90, 1.0, 1)
+        armazenamento.registrar("b", 100, 1.0, 1)
+
+        assert armazenamento.registrar("c", 100, 1.0, 1) == (True, 0)
+        assert armazenamento.obter("c") == (100, 1, 0)
+        assert armazenamento.obter("a") is None
+        armazenamento.fechar()
+
+    def test_capacidade_do_arquivo_existente_prevalece(self, tmp_path):
+        ArmazenamentoMmap("teste", str(tmp_path), capacidade=8).fechar()
+        armazenamento = ArmazenamentoMmap("teste", str(tmp_path), capacidade=1024)
+        assert armazenamento.capacidade == 8
+        armazenamento.fechar()
+
+
+class TestLimiteEntreProcessos:
+    """O limite deve valer somando as tentativas de processos diferentes"""
+
+    @pytest.mark.parametrize("armazenamento", ["sqlite", "mmap"])
+    def test_tentativas_de_outro_processo_contam(self, armazenamento, tmp_path):
+        caminho = str(tmp_path / "rl.db") if armazenamento == "sqlite" else str(tmp_path)
+        classe = ArmazenamentoSQLite if armazenamento == "sqlite" else ArmazenamentoMmap
+        codigo = textwrap.dedent(
+            f"""
+            import sys
+            from util.rate_limiter import RateLimiter
+            from util.rate_limit_armazenamento import {classe.__name__}
+
+            limiter = RateLimiter(3, 5, "login", armazenamento={classe.__name__}("login", sys.argv[1]))
+            assert limiter.verificar("10.0.0.1")
+            assert limiter.verificar("10.0.0.1")
+            """
+        )
+        subprocess.run(
+            [sys.executable, "-c", codigo, caminho],
+            cwd=RAIZ_PROJETO,
+            env=os.environ.copy(),
+            check=True,
+            timeout=30,
+        )
+
+        limiter = RateLimiter(3, 5, "login", armazenamento=classe("login", caminho))
+        assert limiter.verificar("10.0.0.1") is True
+        with patch("util.rate_limiter.logger"):
+            assert limiter.verificar("10.0.0.1") is False
+        limiter.armazenamento.fechar()
@@ -0,0 +1,115 @@
+"""
+Testes para o módulo util/respostas_condicionais.py
+
+Testa a geração e a comparação de ETags e as condições em que
+responder_condicional() responde 304 ou renderiza sem ETag.
+"""
+
+import pytest
+from starlette.datastructures import URL, Headers, QueryParams
+from starlette.responses import HTMLResponse
+
+from util.csrf_protection import CSRF_SESSION_KEY
+from util.respostas_condicionais import (
+    CACHE_CONTROL_CONDICIONAL,
+    etag_corresponde,
+    gerar_etag,
+    responder_condicional,
+)
+
+
+class RequestFalso:
+    """Request mínimo: caminho, query, cabeçalhos e sessão"""
+
+    def __init__(self, caminho="/anuncios/1", query=None, sessao=None, cabecalhos=None):
+        self.url = URL(caminho)
+        self.query_params = QueryParams(query or {})
+        self.session = sessao if sessao is not None else {}
+        self.headers = Headers(cabecalhos or {})
+
+
+class TestGerarEtag:
+    """Testes de gerar_etag()"""
+
+    def test_etag_fraco_e_estavel(self):
+        etag = gerar_etag(RequestFalso(), [1, "a"])
+
+        assert etag.startswith('W/"') and etag.endswith('"')
+        assert gerar_etag(RequestFalso(), [1, "a"]) == etag
+
+    @pytest.mark.parametrize(
+        "request_alterado, validador",
+        [
+            (RequestFalso(), [2, "a"]),
+            (RequestFalso("/anuncios/2"), [1, "a"]),
+            (RequestFalso(query={"pagina": "2"}), [1, "a"]),
+            (RequestFalso(sessao={"usuario_logado": {"id": 1}}), [1, "a"]),
+            (RequestFalso(sessao={CSRF_SESSION_KEY: "tok"}), [1, "a"]),
+        ],
+    )
+    def test_muda_com_dados_url_e_sessao(self, request_alterado, validador):
+        assert gerar_etag(request_alterado, validador) != gerar_etag(RequestFalso(), [1, "a"])
+
+
+class TestEtagCorresponde:
+    """Testes de etag_corresponde()"""
+
+    def test_comparacao_fraca_em_lista(self):
+        assert etag_corresponde('"x", W/"abc"', 'W/"abc"')
+        assert etag_corresponde('"abc"', 'W/"abc"')
+        assert etag_corresponde("*", 'W/"abc"')
+
+    def test_sem_correspondencia(self):
+        assert not etag_corresponde(None, 'W/"abc"')
+        assert not etag_corresponde('W/"abd"', 'W/"abc"')
+
+
+class TestResponderCondicional:
+    """Testes de responder_condicional()"""
+
+    @pytest.fixture
+    def renderizacoes(self):
+        return []
+
+    @pytest.fixture
+    def renderizar(self, renderizacoes):
+        async def _renderizar(status_code=200):
+            renderizacoes.append(status_code)
+            return HTMLResponse("<html>página</html>", status_code=status_code)
+        return _renderizar
+
+    async def test_304_sem_renderizar(self, renderizar, renderizacoes):
+        etag = (await responder_condicional(RequestFalso(), 1, renderizar)).headers["etag"]
+
+        request = RequestFalso(cabecalhos={"If-None-Match": etag})
+        response = await responder_condicional(request, 1, renderizar)
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == CACHE_CONTROL_CONDICIONAL
+        assert len(renderizacoes) == 1
+
+    async def test_validador_none_sem_etag(self, renderizar):
+        response = await responder_condicional(RequestFalso(), None, renderizar)
+
+        assert "etag" not in response.headers
+
+    async def test_flash_pendente_renderiza_sem_etag(self, renderizar, renderizacoes):
+        etag = gerar_etag(RequestFalso(), 1)
+        request = RequestFalso(
+            sessao={"mensagens": [{"texto": "Erro", "tipo": "danger"}]},
+            cabecalhos={"If-None-Match": etag},
+        )
+
+        response = await responder_condicional(request, 1, renderizar)
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert len(renderizacoes) == 1
+
+    async def test_erro_sem_etag(self, renderizar):
+        response = await responder_condicional(
+            RequestFalso(), 1, lambda: renderizar(status_code=500)
+        )
+
+        assert "etag" not in response.headers
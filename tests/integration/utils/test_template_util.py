@@ -16,7 +16,8 @@ from util.template_util import (
     formatar_hora,
     foto_usuario,
     csrf_input,
-    criar_templates
+    criar_templates,
+    precompilar_templates,
 )
 
 
@@ -223,3 +224,29 @@ class TestCriarTemplates:
         assert 'VERSION' in templates.env.globals
         assert 'csrf_input' in templates.env.globals
         assert 'TOAST_AUTO_HIDE_DELAY_MS' in templates.env.globals
+
+    def test_instancia_compartilhada(self):
+        """Todas as rotas usam o mesmo ambiente (um único cache de templates)"""
+        from routes.auth_routes import templates as templates_auth
+        from routes.public_routes import templates_public
+
+        assert criar_templates() is criar_templates()
+        assert templates_auth is templates_public is criar_templates()
+
+    def test_toast_delay_lido_a_cada_renderizacao(self):
+        """TOAST_AUTO_HIDE_DELAY_MS reflete a configuração atual, não a da importação"""
+        template = criar_templates().env.from_string("{{ TOAST_AUTO_HIDE_DELAY_MS }}")
+
+        with patch("util.template_util.config.obter_int", return_value=1234):
+            assert template.render() == "1234"
+        with patch("util.template_util.config.obter_int", return_value=9000):
+            assert template.render() == "9000"
+
+    def test_precompilar_carrega_todos_os_templates(self):
+        """precompilar_templates() compila todos os .html sem erro"""
+        env = criar_templates().env
+
+        compilados = precompilar_templates()
+
+        assert compilados == len(env.list_templates(extensions=["html"]))
+        assert env.cache is not None and len(env.cache) >= compilados
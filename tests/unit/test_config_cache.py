@@ -12,6 +12,24 @@ import sqlite3
 from util.config_cache import ConfigCache, config
 
 
+@pytest.fixture(autouse=True)
+def versao_dados_fixa():
+    """Isola os testes do data_version do banco real"""
+    with patch('util.config_cache.obter_versao_dados', return_value=1) as mock_versao:
+        yield mock_versao
+    ConfigCache.limpar()
+
+
+def publicar(valores, versao=1):
+    """Carrega o cache com os valores dados, como se viessem do banco"""
+    linhas = [MagicMock(chave=chave, valor=valor) for chave, valor in valores.items()]
+    with patch('util.config_cache.configuracao_repo') as mock_repo:
+        mock_repo.obter_todos.return_value = linhas
+        mock_repo.obter_versao.return_value = versao
+        ConfigCache.limpar()
+        ConfigCache.carregar()
+
+
 class TestConfigCacheObter:
     """Testes para o método obter()"""
 
@@ -21,46 +39,54 @@ class TestConfigCacheObter:
 
     def test_obter_valor_do_cache(self):
         """Quando valor está no cache, deve retornar sem acessar banco"""
-        # Preenche o cache manualmente
-        ConfigCache._cache["chave_teste"] = "valor_cacheado"
+        publicar({"chave_teste": "valor_cacheado"})
 
         with patch('util.config_cache.configuracao_repo') as mock_repo:
             resultado = ConfigCache.obter("chave_teste", "padrao")
 
             # Não deve chamar o repo, pois está no cache
+            mock_repo.obter_todos.assert_not_called()
             mock_repo.obter_por_chave.assert_not_called()
             assert resultado == "valor_cacheado"
 
-    def test_obter_valor_do_banco(self):
-        """Quando valor não está no cache, deve buscar do banco"""
-        mock_config = MagicMock()
-        mock_config.valor = "valor_do_banco"
+    def test_obter_carrega_todas_as_configuracoes(self):
+        """Primeira leitura carrega todas as chaves em uma única consulta"""
+        linhas = [
+            MagicMock(chave="chave_nova", valor="valor_do_banco"),
+            MagicMock(chave="outra", valor="outro_valor"),
+        ]
 
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = mock_config
+            mock_repo.obter_todos.return_value = linhas
 
-            resultado = ConfigCache.obter("chave_nova", "padrao")
+            assert ConfigCache.obter("chave_nova", "padrao") == "valor_do_banco"
+            assert ConfigCache.obter("outra", "padrao") == "outro_valor"
 
-            mock_repo.obter_por_chave.assert_called_once_with("chave_nova")
-            assert resultado == "valor_do_banco"
-            # Deve ter sido cacheado
-            assert ConfigCache._cache["chave_nova"] == "valor_do_banco"
+            mock_repo.obter_todos.assert_called_once()
+            mock_repo.obter_por_chave.assert_not_called()
 
     def test_obter_retorna_padrao_quando_nao_existe(self):
         """Quando configuração não existe no banco, retorna padrão"""
-        with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+        publicar({})
 
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
             resultado = ConfigCache.obter("chave_inexistente", "valor_padrao")
 
             assert resultado == "valor_padrao"
-            # Deve cachear o padrão também
-            assert ConfigCache._cache["chave_inexistente"] == "valor_padrao"
+            # Ausência também é resolvida pelo snapshot, sem nova consulta
+            mock_repo.obter_todos.assert_not_called()
+
+    def test_snapshot_imutavel(self):
+        """O snapshot publicado não pode ser alterado por leitores"""
+        publicar({"chave": "valor"})
+
+        with pytest.raises(TypeError):
+            ConfigCache._cache["chave"] = "outro"
 
     def test_obter_sqlite_error_retorna_padrao(self):
         """Em caso de sqlite3.Error, retorna padrão sem crashar"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.side_effect = sqlite3.Error("Erro de banco")
+            mock_repo.obter_todos.side_effect = sqlite3.Error("Erro de banco")
 
             with patch('util.config_cache.logger') as mock_logger:
                 resultado = ConfigCache.obter("chave_erro", "padrao_erro")
@@ -72,7 +98,7 @@ class TestConfigCacheObter:
     def test_obter_exception_generica_retorna_padrao(self):
         """Em caso de Exception genérica, retorna padrão e loga como crítico"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.side_effect = Exception("Erro inesperado")
+            mock_repo.obter_todos.side_effect = Exception("Erro inesperado")
 
             with patch('util.config_cache.logger') as mock_logger:
                 resultado = ConfigCache.obter("chave_critica", "padrao_critico")
@@ -91,7 +117,7 @@ class TestConfigCacheObterInt:
 
     def test_obter_int_conversao_sucesso(self):
         """Deve converter string numérica para int"""
-        ConfigCache._cache["numero"] = "42"
+        publicar({"numero": "42"})
 
         resultado = ConfigCache.obter_int("numero", 0)
 
@@ -101,7 +127,7 @@ class TestConfigCacheObterInt:
     def test_obter_int_usa_padrao_quando_nao_existe(self):
         """Deve usar padrão quando chave não existe"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_todos.return_value = []
 
             resultado = ConfigCache.obter_int("inexistente", 100)
 
@@ -109,7 +135,7 @@ class TestConfigCacheObterInt:
 
     def test_obter_int_valor_invalido_retorna_padrao(self):
         """Quando valor não é numérico, retorna padrão"""
-        ConfigCache._cache["texto"] = "nao_e_numero"
+        publicar({"texto": "nao_e_numero"})
 
         with patch('util.config_cache.logger') as mock_logger:
             resultado = ConfigCache.obter_int("texto", 999)
@@ -120,7 +146,7 @@ class TestConfigCacheObterInt:
 
     def test_obter_int_valor_float_trunca(self):
         """Valor float na string deve funcionar"""
-        ConfigCache._cache["decimal"] = "3.14"
+        publicar({"decimal": "3.14"})
 
         # int("3.14") levanta ValueError
         with patch('util.config_cache.logger'):
@@ -142,7 +168,7 @@ class TestConfigCacheObterBool:
         valores_true = ["true", "TRUE", "True", "1", "yes", "YES", "sim", "SIM", "verdadeiro"]
 
         for valor in valores_true:
-            ConfigCache._cache["bool_test"] = valor
+            publicar({"bool_test": valor})
             resultado = ConfigCache.obter_bool("bool_test", False)
             assert resultado is True, f"'{valor}' deveria ser True"
 
@@ -151,7 +177,7 @@ class TestConfigCacheObterBool:
         valores_false = ["false", "FALSE", "0", "no", "nao", "não", "qualquer_coisa"]
 
         for valor in valores_false:
-            ConfigCache._cache["bool_test"] = valor
+            publicar({"bool_test": valor})
             resultado = ConfigCache.obter_bool("bool_test", True)
             assert resultado is False, f"'{valor}' deveria ser False"
 
@@ -180,7 +206,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_conversao_sucesso(self):
         """Deve converter string para float"""
-        ConfigCache._cache["decimal"] = "3.14159"
+        publicar({"decimal": "3.14159"})
 
         resultado = ConfigCache.obter_float("decimal", 0.0)
 
@@ -189,7 +215,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_inteiro_funciona(self):
         """Deve converter inteiro para float"""
-        ConfigCache._cache["inteiro"] = "42"
+        publicar({"inteiro": "42"})
 
         resultado = ConfigCache.obter_float("inteiro", 0.0)
 
@@ -197,7 +223,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_valor_invalido_retorna_padrao(self):
         """Quando valor não é numérico, retorna padrão"""
-        ConfigCache._cache["texto"] = "nao_e_numero"
+        publicar({"texto": "nao_e_numero"})
 
         with patch('util.config_cache.logger') as mock_logger:
             resultado = ConfigCache.obter_float("texto", 9.99)
@@ -207,7 +233,7 @@ class TestConfigCacheObterFloat:
 
     def test_obter_float_notacao_cientifica(self):
         """Deve aceitar notação científica"""
-        ConfigCache._cache["cientifico"] = "1.5e-10"
+        publicar({"cientifico": "1.5e-10"})
 
         resultado = ConfigCache.obter_float("cientifico", 0.0)
 
@@ -223,8 +249,7 @@ class TestConfigCacheObterMultiplos:
 
     def test_obter_multiplos_sucesso(self):
         """Deve retornar dicionário com todas as configurações"""
-        ConfigCache._cache["config1"] = "valor1"
-        ConfigCache._cache["config2"] = "valor2"
+        publicar({"config1": "valor1", "config2": "valor2"})
 
         resultado = ConfigCache.obter_multiplos(
             ["config1", "config2"],
@@ -236,7 +261,7 @@ class TestConfigCacheObterMultiplos:
     def test_obter_multiplos_usa_padroes(self):
         """Deve usar padrões quando configs não existem"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_todos.return_value = []
 
             resultado = ConfigCache.obter_multiplos(
                 ["nova1", "nova2"],
@@ -270,38 +295,148 @@ class TestConfigCacheLimpar:
 
     def setup_method(self):
         """Prepara cache com dados de teste"""
-        ConfigCache._cache = {
+        publicar({
             "chave1": "valor1",
             "chave2": "valor2",
             "chave3": "valor3"
-        }
+        })
+
+    def test_limpar_recarrega_na_proxima_leitura(self):
+        """Após limpar(), a próxima leitura recarrega todas as chaves do banco"""
+        ConfigCache.limpar()
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [MagicMock(chave="chave1", valor="novo")]
 
-    def test_limpar_remove_todo_cache(self):
-        """limpar() deve remover todas as entradas do cache"""
+            assert ConfigCache.obter("chave1", "padrao") == "novo"
+            assert ConfigCache.obter("chave2", "padrao") == "padrao"
+            mock_repo.obter_todos.assert_called_once()
+
+    def test_limpar_mantem_snapshot_ate_recarga(self):
+        """Leitores concorrentes continuam vendo o snapshot anterior"""
+        snapshot = ConfigCache._cache
+
+        ConfigCache.limpar()
+
+        assert ConfigCache._cache is snapshot
         assert len(ConfigCache._cache) == 3
 
+    def test_limpar_chave_recarrega_snapshot(self):
+        """limpar_chave() recarrega o snapshot inteiro"""
+        ConfigCache.limpar_chave("chave1")
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [MagicMock(chave="chave2", valor="valor2")]
+
+            assert ConfigCache.obter("chave1", "padrao") == "padrao"
+            assert ConfigCache.obter("chave2", "padrao") == "valor2"
+
+    def test_falha_na_recarga_mantem_snapshot(self):
+        """Se a recarga falhar, o snapshot anterior continua publicado"""
         ConfigCache.limpar()
 
-        assert len(ConfigCache._cache) == 0
-        assert ConfigCache._cache == {}
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.side_effect = sqlite3.Error("Erro de banco")
+            with patch('util.config_cache.logger'):
+                ConfigCache.obter("chave1", "padrao")
 
-    def test_limpar_chave_existente(self):
-        """limpar_chave() deve remover apenas a chave especificada"""
-        assert "chave1" in ConfigCache._cache
+        assert ConfigCache._cache["chave1"] == "valor1"
 
-        ConfigCache.limpar_chave("chave1")
 
-        assert "chave1" not in ConfigCache._cache
-        assert "chave2" in ConfigCache._cache
-        assert "chave3" in ConfigCache._cache
+class TestConfigCacheGeracao:
+    """Testes da geração de configurações"""
 
-    def test_limpar_chave_inexistente(self):
-        """limpar_chave() não deve falhar para chave inexistente"""
-        # Não deve levantar exceção
-        ConfigCache.limpar_chave("chave_que_nao_existe")
+    def test_conteudo_novo_inicia_nova_geracao(self):
+        """Recarga com conteúdo diferente deve incrementar a geração"""
+        publicar({"chave": "1"})
+        geracao = ConfigCache.obter_geracao()
 
-        # Cache deve permanecer intacto
-        assert len(ConfigCache._cache) == 3
+        publicar({"chave": "2"})
+        assert ConfigCache.obter_geracao() == geracao + 1
+
+    def test_recarga_sem_mudanca_mantem_geracao(self):
+        """Recarga com o mesmo conteúdo não inicia nova geração"""
+        publicar({"chave": "1"})
+        geracao = ConfigCache.obter_geracao()
+
+        publicar({"chave": "1"})
+        assert ConfigCache.obter_geracao() == geracao
+
+    def test_obter_nao_altera_geracao(self):
+        """Leituras (inclusive de chaves ausentes) não mudam a geração"""
+        publicar({})
+        geracao = ConfigCache.obter_geracao()
+
+        ConfigCache.obter("chave_nova", "padrao")
+
+        assert ConfigCache.obter_geracao() == geracao
+
+
+class TestConfigCacheVersaoDados:
+    """Detecção de alterações feitas por outros workers (contador de versão)"""
+
+    def test_nova_versao_recarrega_snapshot(self, versao_dados_fixa):
+        """Versão das configurações diferente após o intervalo força a recarga"""
+        publicar({"chave": "antigo"}, versao=1)
+        versao_dados_fixa.return_value = 2
+
+        with patch('util.config_cache.monotonic', return_value=ConfigCache._proxima_verificacao):
+            with patch('util.config_cache.configuracao_repo') as mock_repo:
+                mock_repo.obter_versao.return_value = 2
+                mock_repo.obter_todos.return_value = [MagicMock(chave="chave", valor="novo")]
+
+                assert ConfigCache.obter("chave", "padrao") == "novo"
+                assert ConfigCache.obter_estatisticas()["versao"] == 2
+
+    def test_escrita_em_outra_tabela_nao_recarrega(self, versao_dados_fixa):
+        """data_version mudou, mas a versão das configurações não"""
+        publicar({"chave": "valor"}, versao=1)
+        versao_dados_fixa.return_value = 2
+
+        with patch('util.config_cache.monotonic', return_value=ConfigCache._proxima_verificacao):
+            with patch('util.config_cache.configuracao_repo') as mock_repo:
+                mock_repo.obter_versao.return_value = 1
+
+                assert ConfigCache.obter("chave", "padrao") == "valor"
+                mock_repo.obter_versao.assert_called_once()
+                mock_repo.obter_todos.assert_not_called()
+
+    def test_banco_inalterado_nao_consulta_versao(self):
+        """Mesmo data_version: nenhuma consulta à tabela de configurações"""
+        publicar({"chave": "valor"})
+
+        with patch('util.config_cache.monotonic', return_value=ConfigCache._proxima_verificacao):
+            with patch('util.config_cache.configuracao_repo') as mock_repo:
+                assert ConfigCache.obter("chave", "padrao") == "valor"
+                mock_repo.obter_versao.assert_not_called()
+                mock_repo.obter_todos.assert_not_called()
+
+    def test_verificacao_respeita_intervalo(self, versao_dados_fixa):
+        """Antes do intervalo, data_version não é consultado"""
+        publicar({"chave": "valor"})
+        versao_dados_fixa.reset_mock()
+
+        ConfigCache.obter("chave", "padrao")
+
+        versao_dados_fixa.assert_not_called()
+
+
+class TestConfigCacheEstatisticas:
+    """Testes de obter_estatisticas()"""
+
+    def test_contadores_de_acertos_e_falhas(self):
+        publicar({"chave": "valor"})
+        antes = ConfigCache.obter_estatisticas()
+
+        ConfigCache.obter("chave", "padrao")
+        ConfigCache.obter("chave", "padrao")
+        ConfigCache.obter("ausente", "padrao")
+
+        depois = ConfigCache.obter_estatisticas()
+        assert depois["acertos"] - antes["acertos"] == 2
+        assert depois["falhas"] - antes["falhas"] == 1
+        assert depois["chaves"] == 1
+        assert depois["geracao"] == ConfigCache._geracao
 
 
 class TestConfigCacheThreadSafety:
@@ -312,14 +447,14 @@ class TestConfigCacheThreadSafety:
         ConfigCache.limpar()
 
     def test_cache_usa_rlock(self):
-        """Verifica que a classe usa RLock para sincronização"""
+        """Verifica que a classe usa RLock para serializar recargas"""
         # RLock não é um tipo diretamente, verificamos pelo nome do tipo
         assert type(ConfigCache._lock).__name__ == 'RLock'
 
     def test_obter_thread_safe(self):
         """Verifica que obter() funciona com cache populado"""
         # Testa comportamento básico que demonstra thread-safety
-        ConfigCache._cache["teste"] = "valor"
+        publicar({"teste": "valor"})
 
         resultado = ConfigCache.obter("teste", "padrao")
 
@@ -339,6 +474,6 @@ class TestConfigInstanciaGlobal:
 
         # Deve funcionar sem erro
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_todos.return_value = []
             resultado = config.obter("teste", "valor_teste")
             assert resultado == "valor_teste"
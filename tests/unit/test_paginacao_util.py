@@ -0,0 +1,96 @@
+"""
+Testes para o módulo util/paginacao_util.py
+
+Testa codificação de cursores, corte de páginas e o cache de totais.
+"""
+
+from util.paginacao_util import (
+    CacheTotais,
+    codificar_cursor,
+    decodificar_cursor,
+    fatiar_pagina,
+)
+
+
+class TestCursor:
+    """Testes de codificar_cursor/decodificar_cursor"""
+
+    def test_ida_e_volta(self):
+        """Cursor decodificado deve devolver os mesmos valores"""
+        cursor = codificar_cursor(("2025-01-10 12:30:00", 42))
+        assert decodificar_cursor(cursor, 2) == ["2025-01-10 12:30:00", 42]
+
+    def test_cursor_seguro_para_url(self):
+        """Cursor não deve conter caracteres que exijam escape em URL"""
+        cursor = codificar_cursor(("João ç ~?/+", 1))
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_cursor_ausente(self):
+        """Cursor vazio ou None indica primeira página"""
+        assert decodificar_cursor(None, 2) is None
+        assert decodificar_cursor("", 2) is None
+
+    def test_cursor_invalido(self):
+        """Cursor malformado deve ser ignorado"""
+        assert decodificar_cursor("não-é-base64!", 2) is None
+        assert decodificar_cursor(codificar_cursor(("a",)), 2) is None
+
+    def test_cursor_com_tipos_invalidos(self):
+        """Somente textos e inteiros são aceitos como valores da chave"""
+        assert decodificar_cursor(codificar_cursor(([1], 2)), 2) is None
+        assert decodificar_cursor(codificar_cursor((True, 2)), 2) is None
+
+
+class TestFatiarPagina:
+    """Testes de fatiar_pagina"""
+
+    def test_ultima_pagina_sem_cursor(self):
+        """Sem linha extra não há próxima página"""
+        rows, proximo = fatiar_pagina([(1,), (2,)], 2, lambda r: r)
+        assert rows == [(1,), (2,)]
+        assert proximo is None
+
+    def test_linha_extra_gera_cursor(self):
+        """A linha extra é descartada e o cursor aponta para a última exibida"""
+        rows, proximo = fatiar_pagina([(1,), (2,), (3,)], 2, lambda r: r)
+        assert rows == [(1,), (2,)]
+        assert decodificar_cursor(proximo, 1) == [2]
+
+
+class TestCacheTotais:
+    """Testes de CacheTotais"""
+
+    def test_reaproveita_total(self):
+        """Contagem deve ser executada uma vez dentro do TTL"""
+        cache = CacheTotais(ttl_segundos=60)
+        chamadas = []
+
+        def contar():
+            chamadas.append(1)
+            return 7
+
+        assert cache.obter("chave", contar) == 7
+        assert cache.obter("chave", contar) == 7
+        assert len(chamadas) == 1
+
+    def test_ttl_zero_desativa_cache(self):
+        """Com TTL zero a contagem é sempre executada"""
+        cache = CacheTotais(ttl_segundos=0)
+        valores = iter([1, 2])
+        assert cache.obter("chave", lambda: next(valores)) == 1
+        assert cache.obter("chave", lambda: next(valores)) == 2
+
+    def test_limite_de_entradas(self):
+        """Entradas mais antigas são descartadas ao atingir o limite"""
+        cache = CacheTotais(ttl_segundos=60, tamanho_max=2)
+        cache.obter("a", lambda: 1)
+        cache.obter("b", lambda: 2)
+        cache.obter("c", lambda: 3)
+        assert cache.obter("a", lambda: 10) == 10
+
+    def test_limpar(self):
+        """limpar() força nova contagem"""
+        cache = CacheTotais(ttl_segundos=60)
+        cache.obter("chave", lambda: 1)
+        cache.limpar()
+        assert cache.obter("chave", lambda: 2) == 2
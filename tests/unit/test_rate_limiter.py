@@ -11,6 +11,7 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.testclient import TestClient
 
 from util.rate_limiter import (
+    ALGORITMO_JANELA_DESLIZANTE,
     RateLimiter,
     DynamicRateLimiter,
     RegistroLimiters,
@@ -210,6 +211,115 @@ class TestRateLimiter:
         assert "5" in repr_str
 
 
+class TestRateLimiterJanelaDeslizante:
+    """Testes do algoritmo janela_deslizante (registro compacto por identificador)"""
+
+    @pytest.fixture
+    def relogio(self):
+        """Relógio monotônico controlado pelo teste (segundos)"""
+        instante = [6000.0]
+        with patch("util.rate_limiter.monotonic", side_effect=lambda: instante[0]):
+            yield instante
+
+    def _criar(self, max_tentativas=3, **kwargs):
+        return RateLimiter(
+            max_tentativas=max_tentativas,
+            janela_minutos=1,
+            nome="teste",
+            algoritmo=ALGORITMO_JANELA_DESLIZANTE,
+            **kwargs,
+        )
+
+    def test_algoritmo_invalido_falha(self):
+        """Algoritmo desconhecido deve gerar ValueError"""
+        with pytest.raises(ValueError):
+            RateLimiter(algoritmo="balde")
+
+    def test_bloqueia_ao_atingir_limite(self, relogio):
+        """Deve permitir max_tentativas e bloquear a seguinte"""
+        limiter = self._criar()
+
+        assert [limiter.verificar("ip") for _ in range(3)] == [True, True, True]
+        with patch("util.rate_limiter.logger"):
+            assert limiter.verificar("ip") is False
+        assert limiter.obter_tentativas_restantes("ip") == 0
+
+    def test_registro_compacto(self, relogio):
+        """Cada identificador ocupa um único registro de tamanho fixo"""
+        limiter = self._criar(max_tentativas=100)
+
+        for _ in range(50):
+            limiter.verificar("ip")
+
+        assert limiter.armazenamento.obter("ip") == (100, 50, 0)
+
+    def test_contagem_anterior_decai_com_o_tempo(self, relogio):
+        """A janela anterior pesa proporcionalmente ao trecho ainda coberto"""
+        limiter = self._criar()
+        for _ in range(3):
+            limiter.verificar("ip")
+
+        # 1/6 da janela seguinte: anterior pesa 3 * 5/6 = 2.5
+        relogio[0] = 6070.0
+        assert limiter.verificar("ip") is True
+        with patch("util.rate_limiter.logger"):
+            assert limiter.verificar("ip") is False
+
+        # Libera quando 3 * peso + 1 < 3, isto é, após 1/3 da janela
+        assert limiter.obter_tempo_reset("ip") == timedelta(seconds=10)
+        relogio[0] = 6081.0
+        assert limiter.verificar("ip") is True
+
+    def test_janela_expirada_libera(self, relogio):
+        """Após duas janelas sem tentativas a contagem recomeça"""
+        limiter = self._criar()
+        for _ in range(3):
+            limiter.verificar("ip")
+
+        relogio[0] = 6125.0
+
+        assert limiter.obter_tentativas_restantes("ip") == 3
+        assert limiter.obter_tempo_reset("ip") is None
+
+    def test_consulta_nao_cria_registro(self, relogio):
+        """obter_tentativas_restantes não deve criar entrada para o identificador"""
+        limiter = self._criar()
+
+        assert limiter.obter_tentativas_restantes("novo") == 3
+        assert limiter.contar_identificadores() == 0
+
+    def test_varredura_remove_ociosos(self, relogio):
+        """Identificadores sem tentativas nas duas últimas janelas são removidos"""
+        limiter = self._criar(intervalo_varredura_segundos=3600)
+        limiter.verificar("antigo")
+        relogio[0] = 6120.0
+        limiter.verificar("recente")
+
+        assert limiter.varrer() == 1
+        assert list(limiter.armazenamento.registros) == ["recente"]
+
+    def test_varredura_automatica(self, relogio):
+        """verificar() deve disparar a varredura a cada intervalo"""
+        limiter = self._criar(intervalo_varredura_segundos=30)
+        for i in range(10):
+            limiter.verificar(f"ip{i}")
+
+        relogio[0] = 6200.0
+        limiter.verificar("outro")
+
+        assert list(limiter.armazenamento.registros) == ["outro"]
+
+    def test_varredura_algoritmo_registro(self):
+        """A varredura também remove identificadores ociosos do algoritmo registro"""
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="teste")
+        limiter.verificar("ip")
+        limiter.tentativas["ip"] = [limiter.tentativas["ip"][0] - timedelta(minutes=2)]
+        limiter.tentativas["vazio"] = []
+
+        assert limiter.varrer() == 2
+        assert len(limiter.tentativas) == 0
+
+
 class TestDynamicRateLimiter:
     """Testes para a classe DynamicRateLimiter"""
 
@@ -283,6 +393,7 @@ class TestDynamicRateLimiter:
         """verificar() deve atualizar valores antes de verificar"""
         with patch("util.rate_limiter.config") as mock_config:
             mock_config.obter_int.side_effect = lambda k, d: d
+            mock_config.obter_geracao.return_value = 1
 
             limiter = DynamicRateLimiter(
                 chave_max="teste_max",
@@ -292,14 +403,69 @@ class TestDynamicRateLimiter:
                 nome="teste",
             )
 
+            # Nova geração de configurações (ex.: salvar-lote no admin)
+            mock_config.obter_geracao.return_value = 2
+
             with patch.object(limiter, "_atualizar_valores") as mock_atualizar:
                 limiter.verificar("192.168.1.1")
                 mock_atualizar.assert_called_once()
 
+    def test_verificar_sem_mudanca_nao_rele_config(self):
+        """Com a geração inalterada, verificar() não deve acessar o config_cache"""
+        with patch("util.rate_limiter.config") as mock_config:
+            mock_config.obter_int.side_effect = lambda k, d: d
+            mock_config.obter_geracao.return_value = 1
+
+            limiter = DynamicRateLimiter(
+                chave_max="teste_max",
+                chave_minutos="teste_minutos",
+                padrao_max=5,
+                padrao_minutos=5,
+                nome="teste",
+            )
+            mock_config.obter_int.reset_mock()
+
+            for _ in range(3):
+                limiter.verificar("192.168.1.1")
+
+            mock_config.obter_int.assert_not_called()
+
+    def test_nova_geracao_aplica_valores(self):
+        """Após config.limpar() o limiter deve usar os valores novos"""
+        from util.config_cache import config
+
+        valores = {"teste_max": "5"}
+        with patch(
+            "util.config_cache.configuracao_repo.obter_todos",
+            side_effect=lambda: [
+                MagicMock(chave=chave, valor=valor) for chave, valor in valores.items()
+            ],
+        ):
+            config.limpar()
+            limiter = DynamicRateLimiter(
+                chave_max="teste_max",
+                chave_minutos="teste_minutos",
+                padrao_max=3,
+                padrao_minutos=5,
+                nome="teste",
+            )
+            assert limiter.max_tentativas == 5
+
+            valores["teste_max"] = "1"
+            limiter.verificar("192.168.1.1")
+            assert limiter.max_tentativas == 5
+
+            config.limpar()
+            with patch("util.rate_limiter.logger"):
+                assert limiter.verificar("192.168.1.1") is False
+            assert limiter.max_tentativas == 1
+        config.limpar()
+
     def test_obter_tentativas_restantes_atualiza_valores(self):
         """obter_tentativas_restantes() deve atualizar valores"""
         with patch("util.rate_limiter.config") as mock_config:
             mock_config.obter_int.side_effect = lambda k, d: d
+            mock_config.obter_geracao.return_value = 1
 
             limiter = DynamicRateLimiter(
                 chave_max="teste_max",
@@ -309,6 +475,9 @@ class TestDynamicRateLimiter:
                 nome="teste",
             )
 
+            # Nova geração de configurações (ex.: salvar-lote no admin)
+            mock_config.obter_geracao.return_value = 2
+
             with patch.object(limiter, "_atualizar_valores") as mock_atualizar:
                 limiter.obter_tentativas_restantes("192.168.1.1")
                 mock_atualizar.assert_called_once()
@@ -317,6 +486,7 @@ class TestDynamicRateLimiter:
         """obter_tempo_reset() deve atualizar valores"""
         with patch("util.rate_limiter.config") as mock_config:
             mock_config.obter_int.side_effect = lambda k, d: d
+            mock_config.obter_geracao.return_value = 1
 
             limiter = DynamicRateLimiter(
                 chave_max="teste_max",
@@ -326,6 +496,9 @@ class TestDynamicRateLimiter:
                 nome="teste",
             )
 
+            # Nova geração de configurações (ex.: salvar-lote no admin)
+            mock_config.obter_geracao.return_value = 2
+
             with patch.object(limiter, "_atualizar_valores") as mock_atualizar:
                 limiter.obter_tempo_reset("192.168.1.1")
                 mock_atualizar.assert_called_once()
@@ -0,0 +1,121 @@
+"""
+Testes para o módulo util/security.py
+
+Testa o hash/verificação de senhas no pool de processos, o rehash de
+hashes com custo antigo e as métricas de latência.
+"""
+
+import os
+import signal
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from util import security
+from util.config import SENHA_BCRYPT_ROUNDS
+from util.security import (
+    MetricasSenha,
+    criar_hash_senha,
+    criar_hash_senha_async,
+    metricas_senha,
+    verificar_e_atualizar_senha,
+    verificar_e_atualizar_senha_async,
+    verificar_senha_async,
+)
+
+
+class TestCustoBcrypt:
+    """Custo configurável e rehash"""
+
+    def test_hash_usa_custo_configurado(self):
+        assert bcrypt.from_string(criar_hash_senha("Senha@123")).rounds == SENHA_BCRYPT_ROUNDS
+
+    def test_hash_com_custo_menor_precisa_rehash(self):
+        hash_antigo = bcrypt.using(rounds=SENHA_BCRYPT_ROUNDS - 1).hash("Senha@123")
+
+        valida, novo_hash = verificar_e_atualizar_senha("Senha@123", hash_antigo)
+
+        assert valida is True
+        assert bcrypt.from_string(novo_hash).rounds == SENHA_BCRYPT_ROUNDS
+
+    def test_hash_atual_nao_precisa_rehash(self):
+        assert verificar_e_atualizar_senha("Senha@123", criar_hash_senha("Senha@123")) == (
+            True,
+            None,
+        )
+
+    def test_senha_incorreta_nao_gera_hash(self):
+        hash_antigo = bcrypt.using(rounds=SENHA_BCRYPT_ROUNDS - 1).hash("Senha@123")
+
+        assert verificar_e_atualizar_senha("Errada@123", hash_antigo) == (False, None)
+
+
+class TestPoolDeProcessos:
+    """Operações assíncronas executadas no pool de processos"""
+
+    async def test_hash_e_verificacao(self):
+        senha_hash = await criar_hash_senha_async("Senha@123")
+
+        assert await verificar_senha_async("Senha@123", senha_hash) is True
+        assert await verificar_senha_async("Errada@123", senha_hash) is False
+
+    async def test_rehash_contabilizado(self):
+        hash_antigo = bcrypt.using(rounds=SENHA_BCRYPT_ROUNDS - 1).hash("Senha@123")
+        rehashes = metricas_senha.obter()["rehashes"]
+
+        valida, novo_hash = await verificar_e_atualizar_senha_async("Senha@123", hash_antigo)
+
+        assert valida is True and novo_hash
+        assert metricas_senha.obter()["rehashes"] == rehashes + 1
+
+    async def test_pool_quebrado_e_recriado(self):
+        """Processo filho morto (ex.: OOM killer) não derruba as operações seguintes"""
+        await criar_hash_senha_async("Senha@123")
+        quebrado = security._obter_pool()
+        processo = next(iter(quebrado._processes.values()))
+
+        os.kill(processo.pid, signal.SIGKILL)
+        processo.join()
+
+        with patch("util.security.logger"):
+            senha_hash = await criar_hash_senha_async("Senha@123")
+
+        assert await verificar_senha_async("Senha@123", senha_hash) is True
+        assert security._obter_pool() is not quebrado
+
+    async def test_fila_cheia_rejeita_com_503(self):
+        with patch("util.security.SENHA_HASH_PROCESSOS", 0), patch(
+            "util.security.SENHA_HASH_FILA_MAX", 0
+        ), patch("util.security.logger"):
+            with pytest.raises(HTTPException) as exc_info:
+                await criar_hash_senha_async("Senha@123")
+
+        assert exc_info.value.status_code == 503
+
+
+class TestMetricasSenha:
+    """Testes de MetricasSenha"""
+
+    def test_latencias_e_percentis(self):
+        metricas = MetricasSenha()
+        for ms in range(1, 101):
+            assert metricas.reservar(10)
+            metricas.liberar("verificacao", ms / 1000)
+
+        dados = metricas.obter()
+
+        assert dados["pendentes"] == 0
+        assert dados["verificacao"]["total"] == 100
+        assert dados["verificacao"]["p50_ms"] == 51
+        assert dados["verificacao"]["p95_ms"] == 96
+        assert dados["verificacao"]["max_ms"] == 100
+        assert dados["hash"] == {"total": 0}
+
+    def test_reservar_respeita_limite(self):
+        metricas = MetricasSenha()
+
+        assert metricas.reservar(1) is True
+        assert metricas.reservar(1) is False
+        assert metricas.obter()["rejeitadas"] == 1
@@ -0,0 +1,309 @@
+"""
+Pipeline dos arquivos estáticos CSS/JS.
+
+construir_assets() (na inicialização ou via scripts/construir_assets.py):
+- Calcula o hash do conteúdo de cada .css/.js em static/css e static/js (exceto os temas
+  de css/bootswatch, que só são copiados para css/bootstrap.min.css)
+- Copia para static/dist/<caminho>.<hash>.<ext>, com irmãos .gz e .br
+  (o .br exige o pacote brotli; sem ele, só gzip)
+- Grava static/dist/manifest.json: nome lógico -> arquivo com hash
+
+Nos templates, a global asset() traduz o nome lógico para a URL com hash:
+
+    <link rel="stylesheet" href="{{ asset('css/custom.css') }}">
+
+Como a URL muda junto com o conteúdo, os arquivos de static/dist/ são
+servidos com Cache-Control immutable de um ano e com a versão pré-comprimida
+aceita pelo navegador (ArquivosEstaticos). Os demais arquivos de /static
+são revalidados a cada uso (ETag/Last-Modified -> 304).
+
+Os CSS não podem usar url() relativo a arquivos de static/: a cópia com
+hash fica em outra pasta.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from pathlib import Path
+from time import monotonic
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from util.config import ASSETS_VERIFICACAO_SEGUNDOS
+from util.logger_config import logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+
+# Configurações
+PASTA_STATIC = Path("static")
+PASTA_DIST = PASTA_STATIC / "dist"
+ARQUIVO_MANIFESTO = PASTA_DIST / "manifest.json"
+# Pastas varridas (as de fotos ficam de fora) e extensões processadas
+PASTAS_ASSETS = ("css", "js")
+EXTENSOES_ASSETS = (".css", ".js")
+# Fontes dos temas: copiados para css/bootstrap.min.css, nunca servidos direto
+PASTAS_IGNORADAS = ("css/bootswatch",)
+URL_STATIC = "/static"
+TAMANHO_HASH = 12
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+# Codificação aceita -> extensão do arquivo pré-comprimido, em ordem de preferência
+CODIFICACOES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _gravar_atomico(destino: Path, conteudo: bytes) -> None:
+    """Grava em um temporário e renomeia (leitores nunca veem arquivo parcial)."""
+    temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    temporario.write_bytes(conteudo)
+    os.replace(temporario, destino)
+
+
+def _nome_com_hash(relativo: Path, conteudo: bytes) -> Path:
+    """Ex.: css/custom.css -> css/custom.3f2a1b9c0d4e.css"""
+    digest = hashlib.sha256(conteudo).hexdigest()[:TAMANHO_HASH]
+    return relativo.with_name(f"{relativo.stem}.{digest}{relativo.suffix}")
+
+
+def construir_assets() -> Dict[str, str]:
+    """
+    Gera as cópias com hash (e comprimidas) dos CSS/JS e o manifesto.
+
+    Arquivos com hash já existentes não são regravados: após a primeira
+    execução só o que mudou é processado.
+
+    Returns:
+        Manifesto {nome lógico: caminho com hash}, relativos a static/
+    """
+    manifesto: Dict[str, str] = {}
+    gerados = 0
+
+    origens = sorted(
+        origem for pasta in PASTAS_ASSETS for origem in (PASTA_STATIC / pasta).rglob("*")
+    )
+    for origem in origens:
+        relativo = origem.relative_to(PASTA_STATIC)
+        if origem.suffix not in EXTENSOES_ASSETS or not origem.is_file():
+            continue
+        if relativo.parent.as_posix() in PASTAS_IGNORADAS:
+            continue
+
+        conteudo = origem.read_bytes()
+        destino_relativo = Path("dist") / _nome_com_hash(relativo, conteudo)
+        manifesto[relativo.as_posix()] = destino_relativo.as_posix()
+
+        destino = PASTA_STATIC / destino_relativo
+        if destino.exists():
+            continue
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # mtime=0: o .gz depende só do conteúdo
+        _gravar_atomico(
+            destino.with_name(destino.name + ".gz"), gzip.compress(conteudo, 9, mtime=0)
+        )
+        if brotli is not None:
+            _gravar_atomico(destino.with_name(destino.name + ".br"), brotli.compress(conteudo))
+        _gravar_atomico(destino, conteudo)
+        gerados += 1
+
+    PASTA_DIST.mkdir(parents=True, exist_ok=True)
+    _gravar_atomico(
+        ARQUIVO_MANIFESTO, json.dumps(manifesto, indent=2, sort_keys=True).encode()
+    )
+    logger.info(f"Assets construídos: {len(manifesto)} arquivos ({gerados} novos)")
+    return manifesto
+
+
+def limpar_assets_antigos() -> int:
+    """
+    Remove de static/dist/ as versões que não estão mais no manifesto.
+
+    Páginas já abertas podem referenciar versões antigas; use no deploy,
+    não a cada inicialização.
+
+    Returns:
+        Quantidade de arquivos removidos
+    """
+    manifesto = _ler_manifesto()
+    atuais = {PASTA_STATIC / caminho for caminho in manifesto.values()}
+    removidos = 0
+    for arquivo in PASTA_DIST.rglob("*"):
+        if not arquivo.is_file() or arquivo == ARQUIVO_MANIFESTO:
+            continue
+        base = arquivo.with_suffix("") if arquivo.suffix in (".gz", ".br") else arquivo
+        if base not in atuais:
+            arquivo.unlink()
+            removidos += 1
+    return removidos
+
+
+def _ler_manifesto() -> Dict[str, str]:
+    try:
+        return json.loads(ARQUIVO_MANIFESTO.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+class ManifestoAssets:
+    """
+    Manifesto de assets carregado em memória, usado pela global asset().
+
+    O arquivo é relido quando seu mtime muda (ex.: outro worker reconstruiu
+    os assets após a troca de tema), verificado no máximo a cada
+    ASSETS_VERIFICACAO_SEGUNDOS. Leituras não usam lock.
+    """
+
+    def __init__(self):
+        self._manifesto: Mapping[str, str] = MappingProxyType({})
+        self._versao = ""
+        self._mtime: Optional[int] = None
+        self._proxima_verificacao = 0.0
+        self._lock = threading.Lock()
+
+    def _obter_mtime(self) -> Optional[int]:
+        try:
+            return ARQUIVO_MANIFESTO.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def carregar(self) -> None:
+        """Relê o manifesto do disco."""
+        with self._lock:
+            self._mtime = self._obter_mtime()
+            manifesto = _ler_manifesto()
+            self._versao = hashlib.sha256(
+                json.dumps(manifesto, sort_keys=True).encode()
+            ).hexdigest()[:TAMANHO_HASH]
+            self._manifesto = MappingProxyType(manifesto)
+            self._proxima_verificacao = monotonic() + ASSETS_VERIFICACAO_SEGUNDOS
+
+    def _obter_snapshot(self) -> Mapping[str, str]:
+        if monotonic() >= self._proxima_verificacao:
+            self._proxima_verificacao = monotonic() + ASSETS_VERIFICACAO_SEGUNDOS
+            if self._obter_mtime() != self._mtime:
+                self.carregar()
+        return self._manifesto
+
+    def url(self, nome: str) -> str:
+        """
+        Retorna a URL do asset.
+
+        Args:
+            nome: Caminho lógico relativo a static/ (ex: "css/custom.css")
+
+        Returns:
+            URL com hash (ex: /static/dist/css/custom.3f2a1b9c0d4e.css) ou, se o
+            asset não estiver no manifesto, a URL original em /static
+        """
+        return f"{URL_STATIC}/{self._obter_snapshot().get(nome, nome)}"
+
+    def obter_versao(self) -> str:
+        """
+        Retorna a versão do manifesto (hash do conteúdo).
+
+        Muda quando algum CSS/JS muda: as páginas que referenciam os assets
+        mudam junto (usado no ETag das páginas HTML).
+        """
+        self._obter_snapshot()
+        return self._versao
+
+
+manifesto_assets = ManifestoAssets()
+
+
+def asset(nome: str) -> str:
+    """
+    Global de template: URL com hash de um CSS/JS de static/.
+
+    Args:
+        nome: Caminho lógico relativo a static/ (ex: "js/toasts.js")
+
+    Returns:
+        URL a usar no href/src
+    """
+    return manifesto_assets.url(nome)
+
+
+def _escolher_pre_comprimido(
+    caminho: str, accept_encoding: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Escolhe a versão pré-comprimida aceita pelo navegador.
+
+    Returns:
+        Tupla (caminho do arquivo comprimido, codificação) ou (None, None)
+    """
+    aceitas = set()
+    for item in accept_encoding.split(","):
+        codificacao, _, parametros = item.strip().partition(";")
+        if parametros.replace(" ", "") not in ("q=0", "q=0.0"):
+            aceitas.add(codificacao.strip().lower())
+
+    for codificacao, extensao in CODIFICACOES:
+        if codificacao in aceitas and os.path.isfile(caminho + extensao):
+            return caminho + extensao, codificacao
+    return None, None
+
+
+class ArquivosEstaticos(StaticFiles):
+    """
+    StaticFiles com política de cache e arquivos pré-comprimidos.
+
+    - static/dist/ (nome com hash): Cache-Control immutable de um ano e
+      .br/.gz conforme Accept-Encoding
+    - Demais arquivos (inclusive static/dist/manifest.json, sem hash no nome): Cache-Control no-cache (revalida com ETag/Last-Modified)
+    """
+
+    def _em_dist(self, caminho: str) -> bool:
+        """Indica se o arquivo está em static/dist/ com hash no nome (exceto o manifesto)."""
+        dist = os.path.realpath(os.path.join(self.directory, PASTA_DIST.name))
+        caminho = os.path.realpath(caminho)
+        return (
+            os.path.commonpath([caminho, dist]) == dist
+            and caminho != os.path.join(dist, ARQUIVO_MANIFESTO.name)
+        )
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        caminho = str(full_path)
+        media_type = None
+        headers = {"Cache-Control": CACHE_REVALIDAR}
+
+        if self._em_dist(caminho):
+            headers = {"Cache-Control": CACHE_IMUTAVEL, "Vary": "Accept-Encoding"}
+            comprimido, codificacao = _escolher_pre_comprimido(
+                caminho, request_headers.get("accept-encoding", "")
+            )
+            if comprimido:
+                media_type = mimetypes.guess_type(caminho)[0]
+                headers["Content-Encoding"] = codificacao
+                caminho, stat_result = comprimido, os.stat(comprimido)
+
+        response = FileResponse(
+            caminho,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -12,6 +12,7 @@ from typing import Optional, List
 from dataclasses import dataclass
 
 from util.config import DATABASE_PATH
+from util.db_util import fechar_pools, checkpoint_wal
 from util.logger_config import logger
 from util.datetime_util import agora
 
@@ -176,6 +177,23 @@ def _validar_integridade_backup(caminho: Path) -> tuple[bool, str]:
         return False, mensagem
 
 
+def _substituir_arquivo_banco(origem: Path) -> None:
+    """
+    Sobrescreve o arquivo do banco de dados com uma cópia de `origem`.
+
+    Fecha os pools de conexões e remove arquivos -wal/-shm remanescentes,
+    que pertencem ao banco antigo e corromperiam o banco restaurado.
+
+    Args:
+        origem: Arquivo de banco a ser copiado
+    """
+    fechar_pools()
+    db_path = Path(DATABASE_PATH)
+    for sufixo in ("-wal", "-shm"):
+        Path(f"{db_path}{sufixo}").unlink(missing_ok=True)
+    shutil.copy2(origem, db_path)
+
+
 def _verificar_database_pos_restauracao() -> bool:
     """
     Verifica se o banco de dados atual está válido após restauração
@@ -210,6 +228,12 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
             logger.error(mensagem)
             return False, mensagem
 
+        # Em modo WAL, transações recentes podem estar só no arquivo -wal
+        try:
+            checkpoint_wal()
+        except sqlite3.Error as e:
+            logger.warning(f"Não foi possível fazer checkpoint do WAL antes do backup: {e}")
+
         # Gerar nome do arquivo de backup com timestamp
         formato = BACKUP_AUTO_FILENAME_FORMAT if automatico else BACKUP_FILENAME_FORMAT
         nome_backup = agora().strftime(formato)
@@ -342,8 +366,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
                 # Continua mesmo se falhar o backup automático
 
         # Restaurar backup (copiar sobre o arquivo atual)
-        db_path = Path(DATABASE_PATH)
-        shutil.copy2(caminho_backup, db_path)
+        _substituir_arquivo_banco(caminho_backup)
 
         # VALIDAÇÃO PÓS-RESTAURAÇÃO: Verificar se banco restaurado está válido
         logger.info("Verificando integridade do banco após restauração...")
@@ -352,7 +375,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error("Banco corrompido após restauração! Executando rollback...")
 
             if caminho_backup_seguranca and caminho_backup_seguranca.exists():
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                _substituir_arquivo_banco(caminho_backup_seguranca)
                 mensagem = (
                     f"Restauração falhou! Banco revertido para estado anterior. "
                     f"Backup '{nome_arquivo}' pode estar corrompido."
@@ -379,8 +402,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
         # Tentar rollback em caso de exceção
         if caminho_backup_seguranca and caminho_backup_seguranca.exists():
             try:
-                db_path = Path(DATABASE_PATH)
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                _substituir_arquivo_banco(caminho_backup_seguranca)
                 logger.info("Rollback executado com sucesso após exceção")
                 mensagem += " (Banco revertido para estado anterior)"
             except OSError as rollback_error:
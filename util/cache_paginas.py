@@ -0,0 +1,260 @@
+"""
+Cache das páginas públicas para visitantes anônimos.
+
+A landing page e a listagem de anúncios são iguais para todo visitante sem
+login: o HTML renderizado é guardado por rota + parâmetros da query e
+reaproveitado até expirar (PAGINAS_CACHE_SEGUNDOS) ou até uma alteração nos
+dados de que a página depende:
+
+    return await cache_paginas.responder(
+        request, (GRUPO_ANUNCIOS,), lambda: renderizar_pagina(request)
+    )
+
+Os repositórios invalidam o grupo após cada escrita (ex.: anuncio_repo
+chama cache_paginas.invalidar(GRUPO_ANUNCIOS)). A invalidação vale para o
+processo atual; em outros workers a página antiga dura no máximo
+PAGINAS_CACHE_SEGUNDOS, a menos que a rota informe a versão dos dados
+(parâmetro versao de responder). Quem edita anúncios está logado e nunca
+recebe páginas do cache.
+
+Nunca usam o cache (nem para ler nem para gravar):
+- usuários logados
+- sessões com flash messages pendentes
+- páginas cujo HTML contém o token CSRF da sessão
+- respostas com status diferente de 200
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Sequence
+
+from fastapi import Request
+from starlette.responses import Response
+
+from util.config import (
+    PAGINAS_CACHE_MAX_BYTES_ITEM,
+    PAGINAS_CACHE_MAX_ITENS,
+    PAGINAS_CACHE_SEGUNDOS,
+)
+from util.csrf_protection import CSRF_SESSION_KEY
+
+# Grupos de dados de que as páginas dependem
+GRUPO_ANUNCIOS = "anuncios"
+GRUPO_CATEGORIAS = "categorias"
+
+CABECALHO_CACHE = "X-Cache"
+
+
+class PaginaCache(NamedTuple):
+    """Página renderizada guardada no cache."""
+    expira_em: float
+    grupos: frozenset
+    corpo: bytes
+    content_type: str
+    versao: Any = None
+
+
+class CachePaginas:
+    """
+    Cache LRU com TTL de páginas HTML completas.
+
+    Cada grupo tem um contador de geração incrementado na invalidação. A
+    geração é lida antes de renderizar e conferida antes de gravar: uma
+    página montada com dados anteriores a uma escrita concorrente não é
+    guardada.
+
+    Thread-safe: utiliza Lock para sincronização de acesso ao cache.
+    """
+
+    def __init__(
+        self,
+        ttl_segundos: float,
+        tamanho_max: int = PAGINAS_CACHE_MAX_ITENS,
+        bytes_max_item: int = PAGINAS_CACHE_MAX_BYTES_ITEM,
+    ):
+        self.ttl_segundos = ttl_segundos
+        self.tamanho_max = tamanho_max
+        self.bytes_max_item = bytes_max_item
+        self._paginas: "OrderedDict[str, PaginaCache]" = OrderedDict()
+        self._geracoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Contadores aproximados (incrementados sem lock)
+        self._acertos = 0
+        self._falhas = 0
+
+    @staticmethod
+    def chave(request: Request) -> str:
+        """
+        Chave da página: caminho + parâmetros da query em ordem canônica.
+
+        Args:
+            request: Request da página
+
+        Returns:
+            Chave (ex: "/anuncios?categoria=2&pagina=1")
+        """
+        parametros = sorted(request.query_params.multi_items())
+        if not parametros:
+            return request.url.path
+        return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in parametros)
+
+    @staticmethod
+    def pode_usar(request: Request) -> bool:
+        """
+        Indica se a requisição pode receber/gerar uma página do cache.
+
+        Args:
+            request: Request da página
+
+        Returns:
+            True para visitante anônimo sem flash messages pendentes
+        """
+        return "usuario_logado" not in request.session and not request.session.get("mensagens")
+
+    def _obter_geracoes(self, grupos: Sequence[str]) -> tuple:
+        return tuple(self._geracoes.get(grupo, 0) for grupo in grupos)
+
+    def obter(self, chave: str, versao: Any = None) -> Optional[PaginaCache]:
+        """
+        Obtém a página em cache, se existir e não tiver expirado.
+
+        Args:
+            chave: Chave retornada por chave()
+            versao: Versão dos dados exigida (a mesma passada a guardar)
+
+        Returns:
+            PaginaCache ou None
+        """
+        agora = time.monotonic()
+        with self._lock:
+            pagina = self._paginas.get(chave)
+            if pagina is None:
+                return None
+            if pagina.expira_em <= agora or pagina.versao != versao:
+                del self._paginas[chave]
+                return None
+            self._paginas.move_to_end(chave)
+            return pagina
+
+    def guardar(
+        self,
+        chave: str,
+        grupos: Sequence[str],
+        geracoes: tuple,
+        corpo: bytes,
+        content_type: str,
+        versao: Any = None,
+    ) -> bool:
+        """
+        Guarda uma página renderizada.
+
+        Args:
+            chave: Chave retornada por chave()
+            grupos: Grupos de dados usados pela página
+            geracoes: Gerações dos grupos lidas antes de renderizar
+            corpo: HTML renderizado
+            content_type: Content-Type da resposta
+            versao: Versão dos dados lida antes de renderizar (opcional)
+
+        Returns:
+            True se guardou; False se a página excede bytes_max_item ou algum
+            grupo foi invalidado durante a renderização
+        """
+        if len(corpo) > self.bytes_max_item:
+            return False
+
+        pagina = PaginaCache(
+            time.monotonic() + self.ttl_segundos, frozenset(grupos), corpo, content_type, versao
+        )
+        with self._lock:
+            if self._obter_geracoes(grupos) != geracoes:
+                return False
+            self._paginas[chave] = pagina
+            self._paginas.move_to_end(chave)
+            while len(self._paginas) > self.tamanho_max:
+                self._paginas.popitem(last=False)
+        return True
+
+    def invalidar(self, *grupos: str) -> None:
+        """
+        Descarta as páginas que dependem dos grupos informados.
+
+        Args:
+            grupos: Grupos cujos dados foram alterados (ex: GRUPO_ANUNCIOS)
+        """
+        with self._lock:
+            for grupo in grupos:
+                self._geracoes[grupo] = self._geracoes.get(grupo, 0) + 1
+            for chave in [c for c, p in self._paginas.items() if p.grupos.intersection(grupos)]:
+                del self._paginas[chave]
+
+    def limpar(self) -> None:
+        """Descarta todas as páginas em cache."""
+        with self._lock:
+            self._paginas.clear()
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Retorna os contadores do cache (para o /health)."""
+        return {
+            "paginas": len(self._paginas),
+            "bytes": sum(len(p.corpo) for p in list(self._paginas.values())),
+            "acertos": self._acertos,
+            "falhas": self._falhas,
+        }
+
+    async def responder(
+        self,
+        request: Request,
+        grupos: Sequence[str],
+        renderizar: Callable[[], Awaitable[Response]],
+        versao: Any = None,
+    ) -> Response:
+        """
+        Responde com a página em cache ou renderiza e guarda.
+
+        Args:
+            request: Request da página
+            grupos: Grupos de dados usados pela página
+            renderizar: Função assíncrona que monta a resposta (consultas + template)
+            versao: Versão dos dados lida antes de renderizar (ex.: o validador
+                do ETag); a página guardada só vale para a mesma versão, o que
+                também cobre escritas feitas por outros workers
+
+        Returns:
+            Response com o cabeçalho X-Cache (HIT, MISS ou BYPASS)
+        """
+        if self.ttl_segundos <= 0 or not self.pode_usar(request):
+            response = await renderizar()
+            response.headers[CABECALHO_CACHE] = "BYPASS"
+            return response
+
+        chave = self.chave(request)
+        pagina = self.obter(chave, versao)
+        if pagina is not None:
+            self._acertos += 1
+            return Response(
+                pagina.corpo,
+                headers={"content-type": pagina.content_type, CABECALHO_CACHE: "HIT"},
+            )
+
+        self._falhas += 1
+        geracoes = self._obter_geracoes(grupos)
+        response = await renderizar()
+        response.headers[CABECALHO_CACHE] = "MISS"
+
+        corpo = getattr(response, "body", None)
+        token_csrf = request.session.get(CSRF_SESSION_KEY)
+        if (
+            response.status_code == 200
+            and corpo
+            and not (token_csrf and token_csrf.encode() in corpo)
+        ):
+            self.guardar(
+                chave, grupos, geracoes, corpo, response.headers["content-type"], versao
+            )
+        return response
+
+
+# Instância global compartilhada pelas páginas públicas
+cache_paginas = CachePaginas(PAGINAS_CACHE_SEGUNDOS)
@@ -3,90 +3,282 @@ Gerenciador de conexões SSE do chat.
 Mantém conexões ativas e faz broadcast de mensagens para usuários conectados.
 """
 import asyncio
-from typing import Dict, Set
+import json
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+from util.chat_pubsub import BackendMemoria, BackendPubSub, criar_backend
+from util.config import CHAT_SSE_FILA_MAX, CHAT_SSE_HEARTBEAT_SEGUNDOS, CHAT_SSE_LOTE_MAX
 from util.logger_config import logger
 
 
+class FilaSSE(asyncio.Queue):
+    """
+    Fila limitada de eventos SSE de uma conexão.
+
+    put/put_nowait nunca bloqueiam quem faz o broadcast, mesmo que o
+    cliente tenha parado de ler (ex.: aba abandonada):
+    - eventos coalescíveis (ex.: atualizar_contador) repetidos para a mesma
+      sala enquanto o anterior ainda aguarda envio são descartados;
+    - com a fila cheia, o evento mais antigo é descartado.
+    """
+
+    # Eventos que só indicam "algo mudou": basta um pendente por sala
+    COALESCIVEIS = frozenset({"atualizar_contador"})
+
+    def __init__(self, maxsize: int = CHAT_SSE_FILA_MAX, conexao_id: str = ""):
+        super().__init__(maxsize)
+        # Identifica a conexão (aba) dona da fila; ver GerenciadorChat.conectar
+        self.conexao_id = conexao_id
+        self.descartados = 0
+        self.coalescidos = 0
+        self.profundidade_max = 0
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        # Chaves de coalescimento dos eventos atualmente na fila
+        self._pendentes: Set[tuple] = set()
+
+    @classmethod
+    def _chave_coalescimento(cls, evento) -> Optional[tuple]:
+        if isinstance(evento, dict) and evento.get("tipo") in cls.COALESCIVEIS:
+            return (evento["tipo"], evento.get("sala_id"))
+        return None
+
+    def _put(self, item):
+        super()._put(item)
+        chave = self._chave_coalescimento(item)
+        if chave is not None:
+            self._pendentes.add(chave)
+        self.profundidade_max = max(self.profundidade_max, self.qsize())
+
+    def _get(self):
+        item = super()._get()
+        chave = self._chave_coalescimento(item)
+        if chave is not None:
+            self._pendentes.discard(chave)
+        return item
+
+    def put_nowait(self, item):
+        chave = self._chave_coalescimento(item)
+        if chave is not None and chave in self._pendentes:
+            self.coalescidos += 1
+            return
+
+        if self.full():
+            self.get_nowait()
+            self.task_done()
+            self.descartados += 1
+            if self.descartados == 1:
+                logger.warning("[GerenciadorChat] Fila SSE cheia; descartando eventos antigos")
+        super().put_nowait(item)
+
+    async def put(self, item):
+        self.put_nowait(item)
+
+    async def obter_lote(
+        self,
+        maximo: int = CHAT_SSE_LOTE_MAX,
+        timeout: float = CHAT_SSE_HEARTBEAT_SEGUNDOS,
+    ) -> List[dict]:
+        """
+        Aguarda o próximo evento e o retorna junto com os já enfileirados.
+
+        Args:
+            maximo: Quantidade máxima de eventos no lote
+            timeout: Segundos aguardando o primeiro evento
+
+        Returns:
+            Lista de eventos (vazia se o tempo esgotar: hora do heartbeat)
+        """
+        try:
+            primeiro = await asyncio.wait_for(self.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+
+        lote = [primeiro]
+        while len(lote) < maximo and not self.empty():
+            lote.append(self.get_nowait())
+        return lote
+
+
+def formatar_lote_sse(eventos: List[dict]) -> str:
+    """
+    Formata um lote de eventos como um único bloco de texto SSE.
+
+    Args:
+        eventos: Eventos retornados por FilaSSE.obter_lote
+
+    Returns:
+        Um campo "data:" por evento; lote vazio vira um comentário de
+        heartbeat, que mantém a conexão viva em proxies e revela clientes
+        que já desconectaram
+    """
+    if not eventos:
+        return ": heartbeat\n\n"
+    return "".join(f"data: {json.dumps(evento)}\n\n" for evento in eventos)
+
+
 class GerenciadorChat:
     """
     Gerencia conexões SSE para o sistema de chat.
 
-    Cada usuário tem UMA conexão SSE que recebe mensagens de TODAS as suas salas.
+    Cada conexão SSE (uma por aba do navegador) recebe mensagens de TODAS as
+    salas do usuário; um usuário pode ter várias conexões simultâneas.
     Quando uma mensagem é enviada em uma sala, o GerenciadorChat faz broadcast
-    para ambos os participantes da sala (se estiverem conectados).
+    para todas as conexões dos dois participantes da sala.
+
+    O broadcast passa pelo backend de pub/sub (util/chat_pubsub.py), que o
+    leva a todos os workers; cada um entrega às conexões que mantém.
     """
 
-    def __init__(self):
-        # Dicionário de filas: usuario_id -> asyncio.Queue
-        self._connections: Dict[int, asyncio.Queue] = {}
+    def __init__(
+        self, backend: Optional[BackendPubSub] = None, tamanho_fila: int = CHAT_SSE_FILA_MAX
+    ):
+        # Filas por usuário: usuario_id -> {conexao_id -> FilaSSE}
+        self._connections: Dict[int, Dict[str, FilaSSE]] = {}
         # Set de usuários com conexão ativa
         self._active_connections: Set[int] = set()
+        self._tamanho_fila = tamanho_fila
+        # Eventos descartados/coalescidos em filas já encerradas
+        self._descartados_encerradas = 0
+        self._coalescidos_encerradas = 0
+        # Backend de pub/sub, iniciado no primeiro uso (dentro do event loop)
+        self._backend = backend or BackendMemoria()
+        self._backend_iniciado = False
+        self._lock_backend = asyncio.Lock()
 
-    async def conectar(self, usuario_id: int) -> asyncio.Queue:
+    async def _garantir_backend(self):
+        """Inicia o backend de pub/sub na primeira conexão ou broadcast."""
+        if self._backend_iniciado:
+            return
+        async with self._lock_backend:
+            if not self._backend_iniciado:
+                await self._backend.iniciar(self._entregar_local)
+                self._backend_iniciado = True
+
+    async def parar(self):
+        """Encerra o backend de pub/sub (chamado no shutdown da aplicação)."""
+        if self._backend_iniciado:
+            await self._backend.parar()
+            self._backend_iniciado = False
+
+    async def conectar(self, usuario_id: int) -> FilaSSE:
         """
         Registra nova conexão SSE para um usuário.
 
+        Conexões já abertas pelo mesmo usuário (outras abas) continuam ativas.
+
         Args:
             usuario_id: ID do usuário conectando
 
         Returns:
-            Queue para envio de mensagens SSE
+            Queue para envio de mensagens SSE; queue.conexao_id identifica a
+            conexão em desconectar()
         """
-        queue = asyncio.Queue()
-        self._connections[usuario_id] = queue
+        # Sem o backend iniciado, broadcasts de outros workers não chegariam
+        await self._garantir_backend()
+
+        queue = FilaSSE(self._tamanho_fila, conexao_id=uuid.uuid4().hex)
+        self._connections.setdefault(usuario_id, {})[queue.conexao_id] = queue
         self._active_connections.add(usuario_id)
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} conectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            f"[GerenciadorChat] Usuário {usuario_id} conectado "
+            f"({len(self._connections[usuario_id])} conexão(ões) do usuário). "
+            f"Total usuários: {len(self._active_connections)}"
         )
 
         return queue
 
-    async def desconectar(self, usuario_id: int):
+    async def desconectar(self, usuario_id: int, conexao_id: Optional[str] = None):
         """
         Remove conexão SSE de um usuário.
 
         Args:
             usuario_id: ID do usuário desconectando
+            conexao_id: Conexão a remover (FilaSSE.conexao_id); se omitido,
+                remove todas as conexões do usuário
         """
-        if usuario_id in self._connections:
-            del self._connections[usuario_id]
+        filas = self._connections.get(usuario_id, {})
+        if conexao_id is None:
+            removidas = list(filas.values())
+            filas.clear()
+        else:
+            queue = filas.pop(conexao_id, None)
+            removidas = [queue] if queue is not None else []
 
-        if usuario_id in self._active_connections:
-            self._active_connections.remove(usuario_id)
+        for queue in removidas:
+            self._descartados_encerradas += queue.descartados
+            self._coalescidos_encerradas += queue.coalescidos
+
+        # Usuário só deixa de estar conectado quando a última conexão fecha
+        if not filas:
+            self._connections.pop(usuario_id, None)
+            self._active_connections.discard(usuario_id)
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} desconectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            f"[GerenciadorChat] Usuário {usuario_id} desconectado "
+            f"({len(filas)} conexão(ões) restante(s) do usuário). "
+            f"Total usuários: {len(self._active_connections)}"
         )
 
-    async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
+    def _participantes_da_sala(self, sala_id: str) -> Optional[Tuple[int, int]]:
         """
-        Envia mensagem SSE para ambos os participantes de uma sala.
+        Extrai os IDs dos participantes do sala_id ("menor_id_maior_id").
 
-        Args:
-            sala_id: ID da sala (formato: "menor_id_maior_id")
-            mensagem_dict: Dicionário com dados da mensagem a enviar
+        Returns:
+            Tupla com os dois IDs ou None se o sala_id for inválido
         """
-        # Extrair IDs dos usuários do sala_id
         partes = sala_id.split("_")
         if len(partes) != 2:
             logger.error(f"[ChatManager] sala_id inválido: {sala_id}")
-            return
+            return None
 
         try:
-            usuario1_id = int(partes[0])
-            usuario2_id = int(partes[1])
+            return int(partes[0]), int(partes[1])
         except ValueError:
             logger.error(f"[ChatManager] Erro ao parsear IDs do sala_id: {sala_id}")
+            return None
+
+    async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
+        """
+        Envia mensagem SSE para ambos os participantes de uma sala.
+
+        A mensagem é publicada no backend de pub/sub, que a entrega em todos
+        os workers (inclusive este) via _entregar_local.
+
+        Args:
+            sala_id: ID da sala (formato: "menor_id_maior_id")
+            mensagem_dict: Dicionário com dados da mensagem a enviar
+        """
+        if self._participantes_da_sala(sala_id) is None:
+            return
+
+        await self._garantir_backend()
+        await self._backend.publicar(sala_id, mensagem_dict)
+
+    async def _entregar_local(self, sala_id: str, mensagem_dict: dict):
+        """
+        Entrega um evento às conexões dos participantes abertas neste processo.
+
+        Args:
+            sala_id: ID da sala (formato: "menor_id_maior_id")
+            mensagem_dict: Dicionário com dados da mensagem a enviar
+        """
+        participantes = self._participantes_da_sala(sala_id)
+        if participantes is None:
             return
 
-        # Enviar para cada participante se estiver conectado
-        for usuario_id in [usuario1_id, usuario2_id]:
-            if usuario_id in self._connections:
-                await self._connections[usuario_id].put(mensagem_dict)
-                logger.debug(f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE")
+        # Enviar para todas as conexões de cada participante conectado
+        for usuario_id in participantes:
+            filas = self._connections.get(usuario_id)
+            if filas:
+                for queue in filas.values():
+                    queue.put_nowait(mensagem_dict)
+                logger.debug(
+                    f"[ChatManager] Mensagem enviada para usuário {usuario_id} "
+                    f"via SSE ({len(filas)} conexão(ões))"
+                )
             else:
                 logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
 
@@ -107,14 +299,28 @@ class GerenciadorChat:
         Retorna estatísticas do chat manager.
 
         Returns:
-            Dicionário com estatísticas
+            Dicionário com estatísticas, incluindo as conexões por usuário, a
+            profundidade atual de cada fila SSE (por conexao_id), a maior
+            profundidade já atingida e os eventos descartados/coalescidos
+            (acumulados desde o início do processo)
         """
+        filas = [q for conexoes in self._connections.values() for q in conexoes.values()]
         return {
-            "total_conexoes": len(self._connections),
+            "total_conexoes": len(filas),
+            "conexoes_por_usuario": {
+                usuario_id: len(conexoes) for usuario_id, conexoes in self._connections.items()
+            },
             "usuarios_ativos": list(self._active_connections),
-            "total_usuarios_ativos": len(self._active_connections)
+            "total_usuarios_ativos": len(self._active_connections),
+            "backend_pubsub": self._backend.nome,
+            "profundidade_filas": {q.conexao_id: q.qsize() for q in filas},
+            "profundidade_max_filas": max((q.profundidade_max for q in filas), default=0),
+            "eventos_descartados": self._descartados_encerradas
+            + sum(q.descartados for q in filas),
+            "eventos_coalescidos": self._coalescidos_encerradas
+            + sum(q.coalescidos for q in filas),
         }
 
 
-# Instância singleton global
-gerenciador_chat = GerenciadorChat()
+# Instância singleton global (backend definido por CHAT_PUBSUB_BACKEND)
+gerenciador_chat = GerenciadorChat(criar_backend())
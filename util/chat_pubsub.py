@@ -0,0 +1,354 @@
+"""
+Backends de publicação/assinatura (pub/sub) do chat.
+
+O GerenciadorChat só conhece as conexões SSE abertas no próprio processo.
+Com mais de um worker (uvicorn --workers N), uma mensagem enviada em um
+worker precisa chegar às conexões abertas nos demais: o backend leva cada
+broadcast a todos os processos, e cada um entrega às suas conexões locais.
+
+- "memoria": entrega direta no próprio processo (um único worker).
+- "sqlite": cada broadcast vira uma linha em chat_evento; cada processo
+  acompanha a tabela pelo último id lido e entrega os eventos novos.
+- "socket": os processos se conectam a um broker via socket Unix. O
+  processo que obtém o lock do arquivo do socket assume o papel de broker
+  e retransmite cada evento a todos os conectados (inclusive quem enviou).
+  Se ele encerrar, outro processo assume ao reconectar.
+
+O backend é escolhido por CHAT_PUBSUB_BACKEND (ver util/config.py).
+"""
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import Awaitable, Callable, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: backend "socket" indisponível
+    fcntl = None
+
+from repo import chat_evento_repo
+from util.config import (
+    CHAT_PUBSUB_BACKEND,
+    CHAT_PUBSUB_INTERVALO_MS,
+    CHAT_PUBSUB_RETENCAO_SEGUNDOS,
+    CHAT_PUBSUB_SOCKET,
+)
+from util.logger_config import logger
+
+# Função do GerenciadorChat que entrega um evento às conexões do processo
+Entregador = Callable[[str, dict], Awaitable[None]]
+
+
+class BackendPubSub(ABC):
+    """
+    Interface dos backends de pub/sub do chat.
+
+    Todo evento publicado, em qualquer processo, deve ser entregue uma vez
+    ao Entregador de cada processo que chamou iniciar(). Subclasses
+    implementam publicar(); sem ele a instanciação falha.
+    """
+
+    nome = ""
+
+    def __init__(self):
+        self._entregar: Optional[Entregador] = None
+
+    async def iniciar(self, entregar: Entregador) -> None:
+        """
+        Começa a receber eventos publicados.
+
+        Args:
+            entregar: Função chamada com (sala_id, mensagem) para cada evento
+        """
+        self._entregar = entregar
+
+    @abstractmethod
+    async def publicar(self, sala_id: str, mensagem: dict) -> None:
+        """
+        Publica um evento para os participantes de uma sala.
+
+        Args:
+            sala_id: ID da sala
+            mensagem: Dicionário serializável em JSON
+        """
+
+    async def parar(self) -> None:
+        """Libera tarefas e conexões do backend."""
+
+
+class BackendMemoria(BackendPubSub):
+    """Entrega no próprio processo; suficiente com um único worker."""
+
+    nome = "memoria"
+
+    async def publicar(self, sala_id: str, mensagem: dict) -> None:
+        await self._entregar(sala_id, mensagem)
+
+
+class BackendSQLite(BackendPubSub):
+    """
+    Log de eventos na tabela chat_evento, acompanhado por polling.
+
+    Não depende de nenhum processo extra: basta que os workers usem o mesmo
+    arquivo de banco. A latência de entrega é de até um intervalo de polling.
+    """
+
+    nome = "sqlite"
+
+    def __init__(
+        self,
+        intervalo_segundos: float = CHAT_PUBSUB_INTERVALO_MS / 1000,
+        retencao_segundos: float = CHAT_PUBSUB_RETENCAO_SEGUNDOS,
+        lote: int = 500,
+    ):
+        super().__init__()
+        self.intervalo_segundos = intervalo_segundos
+        self.retencao_segundos = retencao_segundos
+        self.lote = lote
+        self._ultimo_id = 0
+        self._tarefa: Optional[asyncio.Task] = None
+
+    async def iniciar(self, entregar: Entregador) -> None:
+        await super().iniciar(entregar)
+        await asyncio.to_thread(chat_evento_repo.criar_tabela)
+        # Eventos anteriores à inicialização não são reentregues
+        self._ultimo_id = await asyncio.to_thread(chat_evento_repo.obter_ultimo_id)
+        self._tarefa = asyncio.create_task(self._acompanhar())
+
+    async def publicar(self, sala_id: str, mensagem: dict) -> None:
+        await asyncio.to_thread(chat_evento_repo.inserir, sala_id, mensagem)
+
+    async def processar_pendentes(self) -> int:
+        """
+        Entrega os eventos gravados desde a última leitura.
+
+        Returns:
+            Quantidade de eventos entregues
+        """
+        eventos = await asyncio.to_thread(
+            chat_evento_repo.listar_posteriores, self._ultimo_id, self.lote
+        )
+        for evento_id, sala_id, payload in eventos:
+            # Avança antes de entregar: um evento com defeito não é relido
+            self._ultimo_id = evento_id
+            try:
+                await self._entregar(sala_id, json.loads(payload))
+            except Exception:
+                logger.exception(f"[ChatPubSub] Evento {evento_id} do chat descartado")
+        return len(eventos)
+
+    async def _acompanhar(self) -> None:
+        proxima_limpeza = time.monotonic() + self.retencao_segundos
+        while True:
+            try:
+                # Lote cheio: ainda há eventos, ler de novo sem esperar
+                while await self.processar_pendentes() == self.lote:
+                    pass
+                if time.monotonic() >= proxima_limpeza:
+                    proxima_limpeza = time.monotonic() + self.retencao_segundos
+                    await asyncio.to_thread(
+                        chat_evento_repo.excluir_anteriores,
+                        time.time() - self.retencao_segundos,
+                    )
+            except Exception:
+                # Qualquer falha mantém o polling vivo; CancelledError (parar) passa
+                logger.exception("[ChatPubSub] Erro ao ler eventos do chat")
+            await asyncio.sleep(self.intervalo_segundos)
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._tarefa
+            self._tarefa = None
+
+
+class BackendSocket(BackendPubSub):
+    """
+    Broker de eventos via socket Unix, eleito entre os próprios workers.
+
+    Protocolo: uma linha JSON por evento ({"sala_id": ..., "mensagem": ...}).
+    O broker retransmite cada linha recebida a todos os clientes. Enquanto
+    o broker estiver indisponível, os eventos são entregues apenas no
+    processo que os publicou.
+    """
+
+    nome = "socket"
+
+    # Clientes que acumulam mais que isso sem ler são desconectados pelo
+    # broker (reconectam em seguida) em vez de crescer o buffer sem limite
+    LIMITE_BUFFER_CLIENTE = 1024 * 1024
+
+    def __init__(
+        self,
+        caminho: str = CHAT_PUBSUB_SOCKET,
+        intervalo_reconexao: float = 0.5,
+        espera_conexao: float = 2.0,
+    ):
+        if fcntl is None:
+            raise RuntimeError("Backend de pub/sub 'socket' requer um sistema POSIX")
+        super().__init__()
+        self.caminho = caminho
+        self.intervalo_reconexao = intervalo_reconexao
+        self.espera_conexao = espera_conexao
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._conectado = asyncio.Event()
+        self._tarefa: Optional[asyncio.Task] = None
+        # Estado do papel de broker (apenas no processo eleito)
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        self._clientes: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def eh_broker(self) -> bool:
+        """Indica se este processo está atuando como broker."""
+        return self._servidor is not None
+
+    async def iniciar(self, entregar: Entregador) -> None:
+        await super().iniciar(entregar)
+        self._tarefa = asyncio.create_task(self._manter_conexao())
+        try:
+            await asyncio.wait_for(self._conectado.wait(), self.espera_conexao)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"[ChatPubSub] Broker em {self.caminho} indisponível; "
+                "eventos serão entregues apenas neste processo até reconectar"
+            )
+
+    async def publicar(self, sala_id: str, mensagem: dict) -> None:
+        linha = json.dumps({"sala_id": sala_id, "mensagem": mensagem}) + "\n"
+        if self._writer is not None:
+            try:
+                self._writer.write(linha.encode("utf-8"))
+                await self._writer.drain()
+                return
+            except (ConnectionError, OSError) as e:
+                logger.warning(f"[ChatPubSub] Falha ao publicar no broker: {e}")
+        await self._entregar(sala_id, mensagem)
+
+    async def _assumir_broker(self) -> None:
+        """Torna-se o broker se nenhum outro processo detém o lock."""
+        if self._servidor is not None:
+            return
+        fd = os.open(f"{self.caminho}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return
+
+        # Com o lock, um socket existente só pode ter sobrado de um broker encerrado
+        with suppress(FileNotFoundError):
+            os.unlink(self.caminho)
+        try:
+            self._servidor = await asyncio.start_unix_server(
+                self._atender_cliente, path=self.caminho
+            )
+        except OSError:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+            raise
+        self._lock_fd = fd
+        logger.info(f"[ChatPubSub] Processo {os.getpid()} atuando como broker em {self.caminho}")
+
+    async def _atender_cliente(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._clientes.add(writer)
+        try:
+            while linha := await reader.readline():
+                for cliente in list(self._clientes):
+                    transporte = cliente.transport
+                    if transporte.get_write_buffer_size() > self.LIMITE_BUFFER_CLIENTE:
+                        logger.warning("[ChatPubSub] Cliente do broker lento; desconectando")
+                        self._clientes.discard(cliente)
+                        cliente.close()
+                        continue
+                    cliente.write(linha)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._clientes.discard(writer)
+            writer.close()
+
+    async def _manter_conexao(self) -> None:
+        while True:
+            try:
+                await self._assumir_broker()
+                reader, writer = await asyncio.open_unix_connection(self.caminho)
+            except OSError:
+                await asyncio.sleep(self.intervalo_reconexao)
+                continue
+
+            self._writer = writer
+            self._conectado.set()
+            try:
+                while linha := await reader.readline():
+                    try:
+                        evento = json.loads(linha)
+                        await self._entregar(evento["sala_id"], evento["mensagem"])
+                    except (ValueError, KeyError) as e:
+                        logger.error(f"[ChatPubSub] Evento inválido recebido do broker: {e}")
+            except (ConnectionError, OSError):
+                pass
+            finally:
+                self._conectado.clear()
+                self._writer = None
+                writer.close()
+
+            logger.warning("[ChatPubSub] Conexão com o broker encerrada; reconectando")
+            await asyncio.sleep(self.intervalo_reconexao)
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._tarefa
+            self._tarefa = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        if self._servidor is not None:
+            self._servidor.close()
+            for cliente in list(self._clientes):
+                cliente.close()
+            self._clientes.clear()
+            await self._servidor.wait_closed()
+            self._servidor = None
+            with suppress(FileNotFoundError):
+                os.unlink(self.caminho)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+BACKENDS = {
+    BackendMemoria.nome: BackendMemoria,
+    BackendSQLite.nome: BackendSQLite,
+    BackendSocket.nome: BackendSocket,
+}
+
+
+def criar_backend(nome: str = CHAT_PUBSUB_BACKEND) -> BackendPubSub:
+    """
+    Cria o backend de pub/sub configurado.
+
+    Args:
+        nome: Nome do backend (ver BACKENDS)
+
+    Returns:
+        Instância do backend
+
+    Raises:
+        ValueError: Se o nome não corresponder a um backend conhecido
+    """
+    classe = BACKENDS.get(nome.lower())
+    if classe is None:
+        raise ValueError(
+            f"CHAT_PUBSUB_BACKEND inválido: '{nome}'. Opções: {', '.join(BACKENDS)}"
+        )
+    return classe()
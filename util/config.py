@@ -42,6 +42,56 @@ if RUNNING_MODE_CHECK.lower() != "development":
 
 # === Configurações do Banco de Dados ===
 DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
+# Pool de conexões: máximo de conexões de leitura abertas por arquivo de banco
+# (escritas usam sempre uma única conexão escritora)
+DB_POOL_TAMANHO = int(os.getenv("DB_POOL_TAMANHO", "10"))
+# Tempo máximo (segundos) aguardando uma conexão livre quando o pool está cheio
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Threads do pool que executa as funções de repositório chamadas pelas rotas
+# assíncronas (util/repo_executor.py), fora do event loop
+REPO_EXECUTOR_THREADS = int(os.getenv("REPO_EXECUTOR_THREADS", str(DB_POOL_TAMANHO)))
+# Perfil de armazenamento do SQLite (ver util/db_util.PERFIS_ARMAZENAMENTO):
+#   "desempenho": WAL, synchronous=NORMAL, mmap e cache maiores
+#   "compatibilidade": rollback journal padrão do SQLite
+DB_PERFIL_ARMAZENAMENTO = os.getenv("DB_PERFIL_ARMAZENAMENTO", "desempenho")
+# Sobrescritas opcionais do perfil (vazio = usar valor do perfil)
+DB_MMAP_SIZE = os.getenv("DB_MMAP_SIZE", "")
+DB_CACHE_SIZE = os.getenv("DB_CACHE_SIZE", "")
+DB_BUSY_TIMEOUT_MS = os.getenv("DB_BUSY_TIMEOUT_MS", "")
+# Intervalo mínimo (segundos) entre verificações de alteração das configurações
+# no banco (PRAGMA data_version) pelo cache de configurações de cada worker
+CONFIG_CACHE_VERIFICACAO_SEGUNDOS = float(os.getenv("CONFIG_CACHE_VERIFICACAO_SEGUNDOS", "1"))
+# Intervalo mínimo (segundos) entre verificações de alteração das categorias
+# no banco pelo catálogo em memória de cada worker (categoria_repo)
+CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS = float(
+    os.getenv("CATEGORIAS_CACHE_VERIFICACAO_SEGUNDOS", "1")
+)
+# Tempo (segundos) que o total de uma listagem paginada fica em cache (0 = sem cache)
+PAGINACAO_CACHE_TOTAL_SEGUNDOS = float(os.getenv("PAGINACAO_CACHE_TOTAL_SEGUNDOS", "30"))
+# Cache das páginas públicas para visitantes anônimos (util/cache_paginas.py):
+# validade em segundos (0 = sem cache), quantidade máxima de páginas e tamanho
+# máximo de cada página guardada
+PAGINAS_CACHE_SEGUNDOS = float(os.getenv("PAGINAS_CACHE_SEGUNDOS", "60"))
+PAGINAS_CACHE_MAX_ITENS = int(os.getenv("PAGINAS_CACHE_MAX_ITENS", "256"))
+PAGINAS_CACHE_MAX_BYTES_ITEM = int(os.getenv("PAGINAS_CACHE_MAX_BYTES_ITEM", str(512 * 1024)))
+
+# === Configurações do Chat em Tempo Real ===
+# Backend de pub/sub que leva cada mensagem às conexões SSE de todos os
+# workers (ver util/chat_pubsub.py):
+#   "memoria": apenas o próprio processo (um único worker)
+#   "sqlite": log de eventos no banco, lido por polling em cada worker
+#   "socket": broker via socket Unix, eleito entre os workers
+CHAT_PUBSUB_BACKEND = os.getenv("CHAT_PUBSUB_BACKEND", "memoria")
+# Backend "sqlite": intervalo de leitura de eventos novos e retenção do log
+CHAT_PUBSUB_INTERVALO_MS = int(os.getenv("CHAT_PUBSUB_INTERVALO_MS", "100"))
+CHAT_PUBSUB_RETENCAO_SEGUNDOS = int(os.getenv("CHAT_PUBSUB_RETENCAO_SEGUNDOS", "300"))
+# Backend "socket": caminho do socket Unix do broker
+CHAT_PUBSUB_SOCKET = os.getenv("CHAT_PUBSUB_SOCKET", "chat_pubsub.sock")
+# Fila de eventos SSE por conexão: tamanho máximo (cheia, descarta o evento
+# mais antigo), eventos enviados por escrita e intervalo do heartbeat
+CHAT_SSE_FILA_MAX = int(os.getenv("CHAT_SSE_FILA_MAX", "100"))
+CHAT_SSE_LOTE_MAX = int(os.getenv("CHAT_SSE_LOTE_MAX", "50"))
+CHAT_SSE_HEARTBEAT_SEGUNDOS = float(os.getenv("CHAT_SSE_HEARTBEAT_SEGUNDOS", "15"))
 
 # === Configurações de Logging ===
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -56,24 +106,75 @@ RESEND_FROM_NAME = os.getenv("RESEND_FROM_NAME", APP_NAME)
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8403"))
 RELOAD = os.getenv("RELOAD", "True").lower() == "true"
+# Processos do uvicorn (ignorado com RELOAD); com mais de um, usar um
+# CHAT_PUBSUB_BACKEND compartilhado ("sqlite" ou "socket")
+WORKERS = int(os.getenv("WORKERS", "1"))
 
 # === Modo de Execução ===
 RUNNING_MODE = os.getenv("RUNNING_MODE", "Production")
 IS_DEVELOPMENT = RUNNING_MODE.lower() == "development"
 
+# === Configurações de Templates ===
+# Recarregar templates alterados no disco (padrão: só em desenvolvimento)
+TEMPLATES_AUTO_RELOAD = (
+    os.getenv("TEMPLATES_AUTO_RELOAD", str(IS_DEVELOPMENT)).lower() == "true"
+)
+# Pasta do cache de bytecode dos templates compilados (vazio = desativado)
+TEMPLATES_CACHE_DIR = os.getenv("TEMPLATES_CACHE_DIR", "cache/templates")
+# Compilar todos os templates na inicialização (padrão: fora de desenvolvimento)
+TEMPLATES_PRECOMPILAR = (
+    os.getenv("TEMPLATES_PRECOMPILAR", str(not IS_DEVELOPMENT)).lower() == "true"
+)
+
 # === Configurações de Fotos de Perfil ===
 FOTO_PERFIL_TAMANHO_MAX = int(os.getenv("FOTO_PERFIL_TAMANHO_MAX", "256"))
 # Tamanho máximo em bytes (5MB)
 FOTO_MAX_UPLOAD_BYTES = int(os.getenv("FOTO_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+# Processos dedicados a converter/redimensionar fotos (fora das requisições)
+IMAGEM_PROCESSOS = int(os.getenv("IMAGEM_PROCESSOS", "2"))
+# Imagens aguardando um processo livre; acima disso o upload é recusado
+IMAGEM_FILA_MAX = int(os.getenv("IMAGEM_FILA_MAX", "16"))
+# Por quanto tempo o status de uma imagem já processada fica disponível
+IMAGEM_TAREFA_RETENCAO_SEGUNDOS = int(os.getenv("IMAGEM_TAREFA_RETENCAO_SEGUNDOS", "300"))
+# Intervalo mínimo entre verificações da pasta de fotos de anúncios por
+# alterações feitas em outros workers (manifesto em foto_anuncio_util)
+FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS = float(os.getenv("FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS", "1"))
+
+# === Arquivos Estáticos (util/assets.py) ===
+# Gerar as cópias com hash/comprimidas dos CSS/JS ao iniciar a aplicação
+# (desligue se o build for feito com scripts/construir_assets.py no deploy)
+ASSETS_CONSTRUIR_NA_INICIALIZACAO = (
+    os.getenv("ASSETS_CONSTRUIR_NA_INICIALIZACAO", "True").lower() == "true"
+)
+# Intervalo mínimo entre verificações do manifesto de assets por outros workers
+ASSETS_VERIFICACAO_SEGUNDOS = float(os.getenv("ASSETS_VERIFICACAO_SEGUNDOS", "1"))
 
 # === Configurações de Senha ===
 PASSWORD_MIN_LENGTH = int(os.getenv("PASSWORD_MIN_LENGTH", "8"))
 PASSWORD_MAX_LENGTH = int(os.getenv("PASSWORD_MAX_LENGTH", "128"))
+# Custo do bcrypt (log2 das iterações). Hashes com custo menor são refeitos
+# no próximo login bem-sucedido
+SENHA_BCRYPT_ROUNDS = int(os.getenv("SENHA_BCRYPT_ROUNDS", "12"))
+# Processos dedicados ao hash/verificação de senhas (fora do event loop)
+SENHA_HASH_PROCESSOS = int(os.getenv("SENHA_HASH_PROCESSOS", "2"))
+# Operações aguardando um processo livre; acima disso a requisição recebe 503
+SENHA_HASH_FILA_MAX = int(os.getenv("SENHA_HASH_FILA_MAX", "32"))
 
 # === Configurações de UI (Frontend) ===
 TOAST_AUTO_HIDE_DELAY_MS = int(os.getenv("TOAST_AUTO_HIDE_DELAY_MS", "5000"))
 
 # === Configurações de Rate Limiting ===
+# Onde os rate limiters guardam as contagens (ver util/rate_limit_armazenamento.py):
+#   "memoria": no próprio processo (limites valem por worker)
+#   "sqlite": arquivo SQLite próprio, compartilhado pelos workers do host
+#   "mmap": tabela em arquivo mapeado em memória, compartilhada pelos workers
+# Com "sqlite" ou "mmap" os limiters usam o algoritmo janela_deslizante
+RATE_LIMIT_ARMAZENAMENTO = os.getenv("RATE_LIMIT_ARMAZENAMENTO", "memoria")
+RATE_LIMIT_SQLITE_ARQUIVO = os.getenv("RATE_LIMIT_SQLITE_ARQUIVO", "rate_limit.db")
+# Armazenamento "mmap": diretório dos arquivos (um por limiter) e número de
+# identificadores que cada arquivo comporta
+RATE_LIMIT_MMAP_DIRETORIO = os.getenv("RATE_LIMIT_MMAP_DIRETORIO", "rate_limit")
+RATE_LIMIT_MMAP_CAPACIDADE = int(os.getenv("RATE_LIMIT_MMAP_CAPACIDADE", "65536"))
 # Autenticação
 RATE_LIMIT_LOGIN_MAX = int(os.getenv("RATE_LIMIT_LOGIN_MAX", "5"))
 RATE_LIMIT_LOGIN_MINUTOS = int(os.getenv("RATE_LIMIT_LOGIN_MINUTOS", "5"))
@@ -1,7 +1,11 @@
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 import sqlite3
 import threading
+from time import monotonic
 from repo import configuracao_repo
+from util.config import CONFIG_CACHE_VERIFICACAO_SEGUNDOS
+from util.db_util import obter_versao_dados
 from util.logger_config import logger
 
 
@@ -9,18 +13,126 @@ class ConfigCache:
     """
     Cache de configurações do sistema para melhor performance.
 
-    Thread-safe: utiliza RLock para sincronização de acesso ao cache
-    em ambientes multi-thread.
+    Todas as configurações são carregadas em uma única consulta (carregar)
+    e publicadas como um snapshot imutável, substituído atomicamente a cada
+    recarga. Leitores não usam lock: pegam a referência do snapshot atual e
+    consultam o dicionário. O RLock serializa apenas as recargas.
+
+    Alterações feitas por outros workers (ou direto no banco) são detectadas
+    pelo contador de versão da tabela configuracao, mantido por triggers
+    (configuracao_repo.obter_versao). A verificação ocorre no máximo a cada
+    CONFIG_CACHE_VERIFICACAO_SEGUNDOS e só consulta o contador quando o
+    PRAGMA data_version indica que o banco mudou: todo worker passa a usar
+    os valores novos em até esse intervalo após o commit.
+
+    Cada snapshot com conteúdo diferente inicia uma nova geração
+    (obter_geracao). Quem deriva estado das configurações (ex.:
+    DynamicRateLimiter) guarda a geração lida e só relê os valores quando
+    ela muda; a comparação não usa lock.
     """
-    _cache: Dict[str, Any] = {}
+    _cache: Mapping[str, str] = MappingProxyType({})
+    _carregado: bool = False
     _lock: threading.RLock = threading.RLock()
+    _geracao: int = 0
+    # Versão das configurações do snapshot e data_version do banco na última verificação
+    _versao: Optional[int] = None
+    _versao_dados: Optional[int] = None
+    _proxima_verificacao: float = 0.0
+    # Contadores aproximados (incrementados sem lock)
+    _acertos: int = 0
+    _falhas: int = 0
+    _recargas: int = 0
+
+    @classmethod
+    def carregar(cls) -> int:
+        """
+        Carrega todas as configurações do banco em uma única consulta.
+
+        Publica um novo snapshot (e uma nova geração) somente se o conteúdo
+        mudou. Chamado no startup da aplicação e sob demanda após limpar()
+        ou quando o banco foi alterado.
+
+        Thread-safe: utiliza lock para serializar recargas.
+
+        Returns:
+            Quantidade de configurações carregadas
+
+        Raises:
+            sqlite3.Error: Se a consulta falhar (o snapshot anterior é mantido)
+        """
+        with cls._lock:
+            # Versões lidas antes da consulta: um commit concorrente força nova recarga
+            versao_dados = obter_versao_dados()
+            versao = configuracao_repo.obter_versao()
+            valores = {c.chave: c.valor for c in configuracao_repo.obter_todos()}
+            if valores != cls._cache:
+                cls._cache = MappingProxyType(valores)
+                cls._geracao += 1
+                logger.info(
+                    f"Configurações recarregadas: versão {versao}, geração {cls._geracao}"
+                )
+            cls._versao = versao
+            cls._versao_dados = versao_dados
+            cls._proxima_verificacao = monotonic() + CONFIG_CACHE_VERIFICACAO_SEGUNDOS
+            cls._recargas += 1
+            cls._carregado = True
+            return len(valores)
+
+    @classmethod
+    def _verificar_versao(cls) -> None:
+        """
+        Marca o snapshot para recarga se as configurações mudaram.
+
+        O contador de versão só é consultado se o data_version do banco
+        mudou (escritas em outras tabelas não recarregam o snapshot).
+        Usa o lock sem bloquear: se outra thread já está verificando ou
+        recarregando, o leitor segue com o snapshot atual.
+        """
+        if not cls._lock.acquire(blocking=False):
+            return
+        try:
+            agora = monotonic()
+            if agora < cls._proxima_verificacao:
+                return
+            cls._proxima_verificacao = agora + CONFIG_CACHE_VERIFICACAO_SEGUNDOS
+            try:
+                versao_dados = obter_versao_dados()
+                if versao_dados == cls._versao_dados:
+                    return
+                if configuracao_repo.obter_versao() != cls._versao:
+                    cls._carregado = False
+                cls._versao_dados = versao_dados
+            except sqlite3.Error as e:
+                logger.warning(f"Erro ao verificar versão das configurações: {e}")
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def _obter_snapshot(cls) -> Mapping[str, str]:
+        """
+        Retorna o snapshot atual, carregando-o se necessário.
+
+        Caminho comum sem lock: snapshot carregado e verificação de versão
+        ainda não vencida.
+
+        Raises:
+            sqlite3.Error: Se a carga inicial ou a recarga falhar
+        """
+        if cls._carregado and monotonic() >= cls._proxima_verificacao:
+            cls._verificar_versao()
+        if not cls._carregado:
+            with cls._lock:
+                # Outra thread pode ter carregado enquanto esperávamos o lock
+                if not cls._carregado:
+                    cls.carregar()
+        return cls._cache
 
     @classmethod
     def obter(cls, chave: str, padrao: str = "") -> str:
         """
-        Obtém configuração com cache e tratamento de erros.
+        Obtém configuração do snapshot em memória com tratamento de erros.
 
-        Thread-safe: utiliza lock para sincronização.
+        Sem lock: consulta o snapshot imutável atual.
 
         Args:
             chave: Chave da configuração
@@ -32,30 +144,25 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        with cls._lock:
-            # Retorna do cache se disponível
-            if chave in cls._cache:
-                return cls._cache[chave]
+        try:
+            snapshot = cls._obter_snapshot()
 
-            # Tenta buscar do banco com error handling
-            try:
-                config = configuracao_repo.obter_por_chave(chave)
-                if config:
-                    cls._cache[chave] = config.valor
-                    return config.valor
-                else:
-                    cls._cache[chave] = padrao
-                    return padrao
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
+            # Retorna padrão em vez de crashar a aplicação
+            return padrao
 
-            except sqlite3.Error as e:
-                logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
-                # Retorna padrão em vez de crashar a aplicação
-                return padrao
+        except Exception as e:
+            logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
+            # Ainda retorna padrão, mas loga como crítico
+            return padrao
 
-            except Exception as e:
-                logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
-                # Ainda retorna padrão, mas loga como crítico
-                return padrao
+        valor = snapshot.get(chave)
+        if valor is None:
+            cls._falhas += 1
+            return padrao
+        cls._acertos += 1
+        return valor
 
     @classmethod
     def obter_int(cls, chave: str, padrao: int) -> int:
@@ -127,7 +234,7 @@ class ConfigCache:
     @classmethod
     def obter_multiplos(cls, chaves: List[str], padroes: List[str]) -> Dict[str, str]:
         """
-        Obtém múltiplas configurações de uma vez para melhor performance
+        Obtém múltiplas configurações de um mesmo snapshot
 
         Args:
             chaves: Lista de chaves a buscar
@@ -143,32 +250,87 @@ class ConfigCache:
             logger.error("obter_multiplos: número de chaves diferente de padrões")
             return dict(zip(chaves, padroes))
 
+        try:
+            # Um único snapshot: valores consistentes entre si
+            snapshot = cls._obter_snapshot()
+        except Exception as e:
+            logger.error(f"Erro ao buscar configurações do banco: {e}")
+            return dict(zip(chaves, padroes))
+
         resultado = {}
         for chave, padrao in zip(chaves, padroes):
-            resultado[chave] = cls.obter(chave, padrao)
+            valor = snapshot.get(chave)
+            if valor is None:
+                cls._falhas += 1
+                valor = padrao
+            else:
+                cls._acertos += 1
+            resultado[chave] = valor
 
         return resultado
 
+    @classmethod
+    def obter_geracao(cls) -> int:
+        """
+        Retorna a geração atual das configurações.
+
+        Sem lock no caminho comum; aplica a verificação periódica de versão,
+        de modo que alterações feitas por outros workers também iniciam uma
+        nova geração.
+
+        Returns:
+            Número da geração (incrementado a cada snapshot com conteúdo novo)
+        """
+        try:
+            cls._obter_snapshot()
+        except Exception as e:
+            logger.error(f"Erro ao recarregar configurações: {e}")
+        return cls._geracao
+
+    @classmethod
+    def obter_estatisticas(cls) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do cache de configurações.
+
+        Returns:
+            Dicionário com chaves carregadas, acertos, falhas (chave ausente
+            no banco, valor padrão usado), recargas, geração local e versão
+            das configurações no banco (igual em todos os workers atualizados)
+        """
+        consultas = cls._acertos + cls._falhas
+        return {
+            "chaves": len(cls._cache),
+            "acertos": cls._acertos,
+            "falhas": cls._falhas,
+            "taxa_acerto": round(cls._acertos / consultas, 4) if consultas else 0.0,
+            "recargas": cls._recargas,
+            "geracao": cls._geracao,
+            "versao": cls._versao,
+        }
+
     @classmethod
     def limpar(cls):
         """
-        Limpa todo o cache de configurações.
+        Descarta o snapshot atual: a próxima leitura recarrega do banco.
+
+        Até a recarga, leitores concorrentes continuam vendo o snapshot
+        anterior. Se o conteúdo mudou, a recarga inicia uma nova geração.
 
         Thread-safe: utiliza lock para sincronização.
         """
         with cls._lock:
-            cls._cache = {}
+            cls._carregado = False
 
     @classmethod
     def limpar_chave(cls, chave: str):
         """
-        Limpa cache de uma chave específica.
+        Descarta o snapshot por causa da alteração de uma chave.
+
+        O snapshot é recarregado por inteiro (uma única consulta).
 
         Thread-safe: utiliza lock para sincronização.
         """
-        with cls._lock:
-            if chave in cls._cache:
-                del cls._cache[chave]
+        cls.limpar()
 
 
 # Instância global para uso em toda a aplicação
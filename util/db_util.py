@@ -1,10 +1,23 @@
 import sqlite3
 import os
+import queue
+import threading
 from contextlib import contextmanager
 from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+from util.config import (
+    DB_POOL_TAMANHO,
+    DB_POOL_TIMEOUT,
+    DB_PERFIL_ARMAZENAMENTO,
+    DB_MMAP_SIZE,
+    DB_CACHE_SIZE,
+    DB_BUSY_TIMEOUT_MS,
+)
+
 
 load_dotenv()
 
@@ -12,17 +25,381 @@ DATABASE_PATH = os.getenv('DATABASE_PATH', 'dados.db')
 TIMEZONE = os.getenv('TIMEZONE', 'America/Sao_Paulo')
 APP_TIMEZONE = ZoneInfo(TIMEZONE)
 
+# Perfis de armazenamento selecionáveis via DB_PERFIL_ARMAZENAMENTO (util/config.py)
+PERFIS_ARMAZENAMENTO: Dict[str, Dict[str, object]] = {
+    "desempenho": {
+        # Leitores não bloqueiam escritores (e vice-versa)
+        "journal_mode": "WAL",
+        # Seguro com WAL: só o último commit pode se perder em queda de energia
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        # Negativo = tamanho em KiB
+        "cache_size": -20000,
+        "busy_timeout": 5000,
+    },
+    "compatibilidade": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "busy_timeout": 5000,
+    },
+}
+
+
+def obter_perfil_armazenamento() -> Dict[str, object]:
+    """
+    Retorna os PRAGMAs do perfil de armazenamento configurado.
+
+    Valores de DB_MMAP_SIZE, DB_CACHE_SIZE e DB_BUSY_TIMEOUT_MS, se definidos,
+    sobrescrevem os do perfil.
+
+    Returns:
+        Dicionário pragma -> valor
+
+    Raises:
+        ValueError: Se DB_PERFIL_ARMAZENAMENTO não for um perfil conhecido
+    """
+    nome = DB_PERFIL_ARMAZENAMENTO.lower()
+    if nome not in PERFIS_ARMAZENAMENTO:
+        raise ValueError(
+            f"DB_PERFIL_ARMAZENAMENTO inválido: '{DB_PERFIL_ARMAZENAMENTO}'. "
+            f"Opções: {', '.join(PERFIS_ARMAZENAMENTO)}"
+        )
+
+    perfil = dict(PERFIS_ARMAZENAMENTO[nome])
+    for pragma, valor in (
+        ("mmap_size", DB_MMAP_SIZE),
+        ("cache_size", DB_CACHE_SIZE),
+        ("busy_timeout", DB_BUSY_TIMEOUT_MS),
+    ):
+        if valor:
+            perfil[pragma] = int(valor)
+    return perfil
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões SQLite reutilizáveis para um arquivo de banco.
+
+    Conexões são abertas sob demanda até `tamanho_max` e devolvidas ao pool
+    após o uso, evitando abrir/fechar o arquivo a cada operação. PRAGMAs e
+    row_factory são aplicados uma única vez, no momento da conexão.
+
+    Pools somente leitura abrem o arquivo com URI `mode=ro`, de modo que
+    qualquer tentativa de escrita falha com sqlite3.OperationalError.
+
+    Thread-safe: cada conexão é usada por uma única thread por vez; as
+    conexões são criadas com check_same_thread=False para poderem ser
+    devolvidas e reaproveitadas por outras threads.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho_max: int = DB_POOL_TAMANHO,
+        timeout: float = DB_POOL_TIMEOUT,
+        somente_leitura: bool = False,
+        pragmas: Optional[Dict[str, object]] = None,
+    ):
+        """
+        Inicializa o pool (sem abrir conexões).
+
+        Args:
+            caminho: Caminho do arquivo do banco de dados
+            tamanho_max: Número máximo de conexões abertas simultaneamente
+            timeout: Segundos aguardando uma conexão livre antes de falhar
+            somente_leitura: Se True, abre conexões com `mode=ro`
+            pragmas: PRAGMAs aplicados a cada nova conexão (ver PERFIS_ARMAZENAMENTO)
+        """
+        if tamanho_max <= 0:
+            raise ValueError("tamanho_max deve ser positivo")
+
+        self.caminho = caminho
+        self.tamanho_max = tamanho_max
+        self.timeout = timeout
+        self.somente_leitura = somente_leitura
+        self.pragmas = pragmas or {}
+        self._disponiveis: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._abertas = 0
+        self._fechado = False
+        self._estatisticas = {"hits": 0, "criadas": 0, "esperas": 0, "descartadas": 0}
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre uma nova conexão já configurada."""
+        if self.somente_leitura:
+            destino = f"file:{quote(os.path.abspath(self.caminho))}?mode=ro"
+        else:
+            destino = self.caminho
+
+        conn = sqlite3.connect(
+            destino,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False,
+            uri=self.somente_leitura
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        for pragma, valor in self.pragmas.items():
+            # journal_mode é persistente no arquivo e só pode ser definido pelo escritor
+            if pragma == "journal_mode" and self.somente_leitura:
+                continue
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _conexao_saudavel(conn: sqlite3.Connection) -> bool:
+        """Health check barato executado antes de entregar uma conexão reutilizada."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _descartar(self, conn: sqlite3.Connection) -> None:
+        """Fecha uma conexão e libera sua vaga no pool."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._abertas -= 1
+            self._estatisticas["descartadas"] += 1
+
+    def adquirir(self) -> sqlite3.Connection:
+        """
+        Obtém uma conexão do pool, abrindo uma nova se houver vaga.
+
+        Returns:
+            Conexão SQLite pronta para uso
+
+        Raises:
+            sqlite3.OperationalError: Se nenhuma conexão ficar livre dentro do timeout
+        """
+        while True:
+            try:
+                conn = self._disponiveis.get_nowait()
+            except queue.Empty:
+                conn = None
+                with self._lock:
+                    if self._abertas < self.tamanho_max:
+                        self._abertas += 1
+                        self._estatisticas["criadas"] += 1
+                        criar = True
+                    else:
+                        self._estatisticas["esperas"] += 1
+                        criar = False
+
+                if criar:
+                    try:
+                        return self._conectar()
+                    except Exception:
+                        with self._lock:
+                            self._abertas -= 1
+                        raise
+
+                try:
+                    conn = self._disponiveis.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"Pool de conexões esgotado ({self.tamanho_max} conexões em uso)"
+                    )
+
+            if self._conexao_saudavel(conn):
+                with self._lock:
+                    self._estatisticas["hits"] += 1
+                return conn
+
+            self._descartar(conn)
+
+    def devolver(self, conn: sqlite3.Connection) -> None:
+        """
+        Devolve uma conexão ao pool.
+
+        Transações pendentes são desfeitas para que a próxima thread receba
+        a conexão em estado limpo. Se o pool foi fechado, a conexão é fechada.
+
+        Args:
+            conn: Conexão obtida via adquirir()
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._descartar(conn)
+            return
+
+        if self._fechado:
+            self._descartar(conn)
+            return
+
+        self._disponiveis.put(conn)
+
+    def fechar(self) -> None:
+        """Fecha todas as conexões ociosas; as em uso são fechadas ao serem devolvidas."""
+        self._fechado = True
+        while True:
+            try:
+                conn = self._disponiveis.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(conn)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas de uso do pool.
+
+        Returns:
+            Dicionário com hits, conexões criadas, esperas, descartes,
+            conexões abertas, em uso e disponíveis
+        """
+        with self._lock:
+            disponiveis = self._disponiveis.qsize()
+            return {
+                **self._estatisticas,
+                "abertas": self._abertas,
+                "em_uso": self._abertas - disponiveis,
+                "disponiveis": disponiveis,
+                "tamanho_max": self.tamanho_max,
+                "somente_leitura": self.somente_leitura,
+            }
+
+
+# Pools por (arquivo de banco, somente_leitura); DATABASE_PATH pode ser alterado em testes
+_pools: Dict[Tuple[str, bool], PoolConexoes] = {}
+_pools_lock = threading.Lock()
+_adaptadores_registrados = False
+# Conexão dedicada a PRAGMA data_version, por arquivo de banco (ver obter_versao_dados)
+_pools_versao: Dict[str, PoolConexoes] = {}
+# Conexão escritora em uso pela thread atual (permite chamadas aninhadas)
+_local = threading.local()
+
+
+def obter_pool(somente_leitura: bool = False) -> PoolConexoes:
+    """
+    Retorna o pool de conexões do banco atual (DATABASE_PATH), criando-o se necessário.
+
+    O pool de escrita tem uma única conexão: todas as escritas são serializadas
+    nela, enquanto leituras usam o pool somente leitura (até DB_POOL_TAMANHO).
+
+    Args:
+        somente_leitura: Se True, retorna o pool de leitura
+
+    Returns:
+        PoolConexoes associado a DATABASE_PATH
+    """
+    global _adaptadores_registrados
+
+    chave = (DATABASE_PATH, somente_leitura)
+    pool = _pools.get(chave)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        if not _adaptadores_registrados:
+            registrar_adaptadores()
+            _adaptadores_registrados = True
+
+        pool = _pools.get(chave)
+        if pool is None:
+            pool = PoolConexoes(
+                DATABASE_PATH,
+                tamanho_max=DB_POOL_TAMANHO if somente_leitura else 1,
+                somente_leitura=somente_leitura,
+                pragmas=obter_perfil_armazenamento(),
+            )
+            _pools[chave] = pool
+        return pool
+
+
+def fechar_pools() -> None:
+    """
+    Fecha todos os pools de conexões.
+
+    Deve ser chamado quando o arquivo do banco é substituído (ex: restauração
+    de backup) ou no encerramento da aplicação.
+    """
+    with _pools_lock:
+        pools = list(_pools.values()) + list(_pools_versao.values())
+        _pools.clear()
+        _pools_versao.clear()
+
+    for pool in pools:
+        pool.fechar()
+
+
+def obter_estatisticas_pool() -> dict:
+    """
+    Retorna estatísticas dos pools de conexões do banco atual.
+
+    Returns:
+        Dicionário {"escrita": ..., "leitura": ...} (ver PoolConexoes.obter_estatisticas)
+    """
+    return {
+        "escrita": obter_pool().obter_estatisticas(),
+        "leitura": obter_pool(somente_leitura=True).obter_estatisticas(),
+    }
+
+
+def obter_versao_dados() -> Optional[int]:
+    """
+    Retorna o PRAGMA data_version do banco atual (DATABASE_PATH).
+
+    O valor muda sempre que outra conexão, deste ou de outro processo,
+    confirma uma transação no arquivo: serve como verificação barata de que
+    o banco foi alterado. Só é comparável entre leituras da mesma conexão,
+    por isso usa uma conexão somente leitura dedicada.
+
+    Returns:
+        Versão atual, ou None se o arquivo do banco ainda não existir
+    """
+    if not os.path.exists(DATABASE_PATH):
+        return None
+
+    pool = _pools_versao.get(DATABASE_PATH)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools_versao.get(DATABASE_PATH)
+            if pool is None:
+                pool = PoolConexoes(DATABASE_PATH, tamanho_max=1, somente_leitura=True)
+                _pools_versao[DATABASE_PATH] = pool
+
+    conn = pool.adquirir()
+    try:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+    finally:
+        pool.devolver(conn)
+
+
+def checkpoint_wal() -> None:
+    """
+    Transfere o conteúdo do arquivo WAL para o arquivo principal do banco.
+
+    Necessário antes de copiar o arquivo .db diretamente (ex: backups), pois
+    em modo WAL as últimas transações podem estar apenas no arquivo -wal.
+    Sem efeito no modo rollback journal.
+    """
+    with obter_conexao() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
 
 @contextmanager
 def obter_conexao():
-    """Context manager para conexão com banco de dados"""
-    registrar_adaptadores()
-    conn = sqlite3.connect(
-        DATABASE_PATH,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
-    )
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
+    """
+    Context manager para conexão de escrita com banco de dados.
+
+    Usa a conexão escritora única do pool. Chamadas aninhadas na mesma thread
+    reutilizam a conexão e participam da transação externa.
+    """
+    conn_atual = getattr(_local, "conexao_escrita", None)
+    if conn_atual is not None:
+        yield conn_atual
+        return
+
+    pool = obter_pool()
+    conn = pool.adquirir()
+    _local.conexao_escrita = conn
     try:
         yield conn
         conn.commit()
@@ -30,7 +407,29 @@ def obter_conexao():
         conn.rollback()
         raise e
     finally:
-        conn.close()
+        _local.conexao_escrita = None
+        pool.devolver(conn)
+
+
+@contextmanager
+def obter_conexao_leitura():
+    """
+    Context manager para conexão somente leitura (mode=ro) com banco de dados.
+
+    Deve ser usado por funções de repositório que apenas executam SELECT.
+    Se o arquivo do banco ainda não existir, usa a conexão de escrita.
+    """
+    if not os.path.exists(DATABASE_PATH):
+        with obter_conexao() as conn:
+            yield conn
+        return
+
+    pool = obter_pool(somente_leitura=True)
+    conn = pool.adquirir()
+    try:
+        yield conn
+    finally:
+        pool.devolver(conn)
 
 
 def adaptar_datetime(dt: datetime) -> str:
@@ -3,18 +3,34 @@ Utilitário para gerenciamento de fotos de anúncios.
 
 Este módulo fornece funções para:
 - Obter caminhos de fotos de anúncios (padrão: {id:06d}.jpg)
-- Salvar foto do upload
-- Verificar se foto existe
+- Salvar foto do upload (direto ou via pool de processos)
+- Gerar variantes responsivas ({id:06d}-{largura}.jpg/.webp) e o srcset
+- Verificar se foto existe (manifesto em memória, sem acessar o disco)
 """
 
-import base64
 import binascii
-import io
+import os
+import re
+import threading
+import zlib
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from time import monotonic
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional
 
 from PIL import Image, UnidentifiedImageError
 
+from util.cache_paginas import GRUPO_ANUNCIOS, cache_paginas
+from util.imagem_worker import (
+    TarefaImagem,
+    Variante,
+    decodificar_base64,
+    enfileirar,
+    gerar_variantes,
+    processar_imagem,
+)
+from util.config import FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS
 from util.logger_config import logger
 
 
@@ -22,24 +38,246 @@ from util.logger_config import logger
 PASTA_FOTO_DEFAULT = Path("static/img")
 FOTO_DEFAULT_ANUNCIO = PASTA_FOTO_DEFAULT / "produto-sem-foto.jpg"
 PASTA_FOTOS_ANUNCIOS = PASTA_FOTO_DEFAULT / "anuncios"
-FORMATO_FOTO = "JPEG"
 QUALIDADE_FOTO = 90
 TAMANHO_MAX_ANUNCIO = 800  # pixels
+# Larguras das variantes menores (cards, miniaturas); a foto principal
+# ({id:06d}.jpg) é a variante de TAMANHO_MAX_ANUNCIO
+LARGURAS_VARIANTES_ANUNCIO = (160, 320)
+# Extensão -> formato Pillow das variantes
+FORMATOS_VARIANTES_ANUNCIO = {"jpg": "JPEG", "webp": "WEBP"}
+
+
+# Arquivos da pasta de fotos: {id:06d}.jpg (principal) e {id:06d}-{largura}.{ext}
+PADRAO_ARQUIVO_FOTO = re.compile(r"^(\d+)(?:-(\d+))?\.(jpg|webp)$")
+
+
+class FotoAnuncio(NamedTuple):
+    """Entrada do manifesto: foto principal e variantes existentes."""
+
+    mtime_ns: int
+    tamanho: int
+    largura: int  # largura real da foto principal, em pixels
+    variantes: FrozenSet[str]  # ex: {"160.jpg", "160.webp", "800.webp"}
+
+    @property
+    def versao(self) -> int:
+        """
+        Versão para a URL (?v=): muda quando a foto é substituída.
+
+        Em nanossegundos: duas substituições no mesmo segundo geram versões
+        (e ETags) diferentes.
+        """
+        return self.mtime_ns
+
+
+def _obter_largura_foto(caminho: Path) -> int:
+    """Largura da foto principal (o Pillow lê apenas o cabeçalho do arquivo)."""
+    try:
+        with Image.open(caminho) as imagem:
+            return imagem.width
+    except OSError:
+        return TAMANHO_MAX_ANUNCIO
+
+
+def _assinatura_foto(id: int, foto: FotoAnuncio) -> int:
+    """Parcela da assinatura do manifesto referente a uma foto."""
+    return zlib.crc32(f"{id}:{foto.versao}:{','.join(sorted(foto.variantes))}".encode())
+
+
+class ManifestoFotosAnuncios:
+    """
+    Índice em memória das fotos de anúncios existentes em disco.
+
+    O filtro foto_anuncio é chamado para cada card renderizado; com o
+    manifesto ele vira uma consulta a dicionário em vez de mkdir + stat.
+
+    - Construído na inicialização (carregar) ou no primeiro uso
+    - Atualizado por salvar_foto_anuncio/excluir_foto_anuncio e ao fim do
+      processamento no pool de imagens (atualizar)
+    - Alterações feitas por outros workers/processos são detectadas pelo
+      mtime da pasta, verificado no máximo a cada
+      FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS (um único stat)
+    - Toda alteração descarta as páginas públicas em cache (GRUPO_ANUNCIOS),
+      que trazem as URLs das fotos
+
+    Leituras não usam lock: o dicionário é substituído inteiro (snapshot
+    imutável) a cada alteração.
+    """
+
+    def __init__(self):
+        self._fotos: Mapping[int, FotoAnuncio] = MappingProxyType({})
+        # XOR das parcelas de cada foto: mantida a cada atualizar(), muda
+        # quando qualquer foto (ou variante) muda e é igual entre workers
+        self._assinatura = 0
+        self._pasta: Optional[Path] = None
+        self._mtime_pasta: Optional[int] = None
+        self._proxima_verificacao = 0.0
+        self._lock = threading.Lock()
+        self._recargas = 0
+
+    def carregar(self) -> None:
+        """(Re)constrói o manifesto varrendo a pasta de fotos."""
+        with self._lock:
+            pasta = PASTA_FOTOS_ANUNCIOS
+            # mtime lido antes da varredura: mudanças durante ela geram nova recarga
+            self._mtime_pasta = self._obter_mtime_pasta(pasta)
+            principais: Dict[int, os.stat_result] = {}
+            variantes: Dict[int, set] = {}
+            try:
+                with os.scandir(pasta) as entradas:
+                    for entrada in entradas:
+                        match = PADRAO_ARQUIVO_FOTO.match(entrada.name)
+                        if not match:
+                            continue
+                        id, largura, extensao = int(match.group(1)), match.group(2), match.group(3)
+                        if largura is None:
+                            if extensao == "jpg":
+                                principais[id] = entrada.stat()
+                        else:
+                            variantes.setdefault(id, set()).add(f"{largura}.{extensao}")
+            except FileNotFoundError:
+                pass
+
+            self._fotos = MappingProxyType({
+                id: FotoAnuncio(
+                    info.st_mtime_ns,
+                    info.st_size,
+                    _obter_largura_foto(pasta / f"{id:06d}.jpg"),
+                    frozenset(variantes.get(id, ())),
+                )
+                for id, info in principais.items()
+            })
+            self._assinatura = 0
+            for id, foto in self._fotos.items():
+                self._assinatura ^= _assinatura_foto(id, foto)
+            self._pasta = pasta
+            self._proxima_verificacao = monotonic() + FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS
+            self._recargas += 1
+        logger.debug(f"Manifesto de fotos de anúncios carregado: {len(principais)} fotos")
+
+    @staticmethod
+    def _obter_mtime_pasta(pasta: Path) -> Optional[int]:
+        try:
+            return pasta.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _pasta_mudou(self) -> bool:
+        """Verifica (com intervalo mínimo) se a pasta foi alterada por fora."""
+        if self._pasta != PASTA_FOTOS_ANUNCIOS:
+            return True
+        if monotonic() < self._proxima_verificacao:
+            return False
+        self._proxima_verificacao = monotonic() + FOTOS_ANUNCIOS_VERIFICACAO_SEGUNDOS
+        return self._obter_mtime_pasta(self._pasta) != self._mtime_pasta
+
+    def _obter_snapshot(self) -> Mapping[int, FotoAnuncio]:
+        if self._pasta_mudou():
+            carregado = self._pasta is not None
+            self.carregar()
+            if carregado:
+                # Fotos alteradas por outro worker
+                cache_paginas.invalidar(GRUPO_ANUNCIOS)
+        return self._fotos
+
+    def obter(self, id: int) -> Optional[FotoAnuncio]:
+        """
+        Retorna a foto do anúncio, se existir.
+
+        Args:
+            id: ID do anúncio
+
+        Returns:
+            FotoAnuncio ou None
+        """
+        return self._obter_snapshot().get(id)
+
+    def atualizar(self, id: int) -> None:
+        """
+        Relê do disco a foto de um anúncio (após salvar ou excluir).
+
+        Args:
+            id: ID do anúncio
+        """
+        if self._pasta != PASTA_FOTOS_ANUNCIOS:
+            self.carregar()
+            cache_paginas.invalidar(GRUPO_ANUNCIOS)
+            return
+
+        with self._lock:
+            fotos = dict(self._fotos)
+            assinatura = self._assinatura
+            anterior = fotos.pop(id, None)
+            if anterior is not None:
+                assinatura ^= _assinatura_foto(id, anterior)
+            caminho_foto = PASTA_FOTOS_ANUNCIOS / f"{id:06d}.jpg"
+            try:
+                info = caminho_foto.stat()
+            except FileNotFoundError:
+                pass
+            else:
+                existentes = frozenset(
+                    Path(caminho).name.split("-", 1)[1]
+                    for caminho, _, _ in obter_variantes_foto_anuncio(id)
+                    if os.path.exists(caminho)
+                )
+                fotos[id] = FotoAnuncio(
+                    info.st_mtime_ns, info.st_size, _obter_largura_foto(caminho_foto), existentes
+                )
+                assinatura ^= _assinatura_foto(id, fotos[id])
+            self._fotos = MappingProxyType(fotos)
+            self._assinatura = assinatura
+            # A escrita local também muda o mtime da pasta: sem isto, a
+            # próxima verificação varreria a pasta inteira a cada foto salva
+            self._mtime_pasta = self._obter_mtime_pasta(PASTA_FOTOS_ANUNCIOS)
+        # Landing e listagem em cache trazem a URL antiga (ou a foto padrão)
+        cache_paginas.invalidar(GRUPO_ANUNCIOS)
+
+    def obter_assinatura(self) -> int:
+        """
+        Retorna a assinatura de todas as fotos (validador do ETag das listagens).
+
+        Returns:
+            Inteiro que muda quando alguma foto é adicionada, substituída ou removida
+        """
+        self._obter_snapshot()
+        return self._assinatura
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do manifesto.
+
+        Returns:
+            Dicionário com quantidade de fotos, bytes e recargas completas
+        """
+        fotos = self._fotos
+        return {
+            "fotos": len(fotos),
+            "bytes": sum(foto.tamanho for foto in fotos.values()),
+            "recargas": self._recargas,
+        }
+
+
+manifesto_fotos_anuncios = ManifestoFotosAnuncios()
 
 
 def obter_caminho_foto_anuncio(id: int) -> str:
     """
     Retorna o caminho absoluto da foto do anúncio para uso em templates.
 
+    Consulta o manifesto em memória (sem acesso ao disco). A URL leva a
+    versão da foto (?v=) para que uma foto substituída não venha do cache
+    do navegador.
+
     Args:
         id: ID do anúncio
 
     Returns:
-        String com caminho absoluto (ex: /static/img/anuncios/000001.jpg)
+        String com caminho absoluto (ex: /static/img/anuncios/000001.jpg?v=1700000000123456789)
     """
-    path = obter_path_absoluto_foto_anuncio(id)
-    if path.exists():
-        return f"/{PASTA_FOTOS_ANUNCIOS}/{id:06d}.jpg"
+    foto = manifesto_fotos_anuncios.obter(id)
+    if foto:
+        return f"/{PASTA_FOTOS_ANUNCIOS}/{id:06d}.jpg?v={foto.versao}"
     # Retorna imagem padrão se não existe foto
     return f"/{FOTO_DEFAULT_ANUNCIO}"
 
@@ -58,11 +296,71 @@ def obter_path_absoluto_foto_anuncio(id: int) -> Path:
     return PASTA_FOTOS_ANUNCIOS / f"{id:06d}.jpg"
 
 
+def obter_variantes_foto_anuncio(id: int) -> List[Variante]:
+    """
+    Lista as variantes da foto do anúncio geradas a partir da foto principal.
+
+    São JPEG e WebP em cada largura de LARGURAS_VARIANTES_ANUNCIO, mais o
+    WebP em TAMANHO_MAX_ANUNCIO (o JPEG nessa largura é a própria foto).
+
+    Args:
+        id: ID do anúncio
+
+    Returns:
+        Lista de tuplas (caminho, largura, formato Pillow)
+    """
+    pasta = obter_path_absoluto_foto_anuncio(id).parent
+    variantes = []
+    for largura in (*LARGURAS_VARIANTES_ANUNCIO, TAMANHO_MAX_ANUNCIO):
+        for extensao, formato in FORMATOS_VARIANTES_ANUNCIO.items():
+            if largura == TAMANHO_MAX_ANUNCIO and extensao == "jpg":
+                continue
+            variantes.append((str(pasta / f"{id:06d}-{largura}.{extensao}"), largura, formato))
+    return variantes
+
+
+def obter_srcset_foto_anuncio(id: int, extensao: str = "jpg") -> str:
+    """
+    Retorna o valor do atributo srcset da foto do anúncio (via manifesto).
+
+    Os descritores "w" são as larguras reais dos arquivos: as variantes só
+    reduzem a imagem, então uma foto estreita (ex: retrato 600x800) tem
+    variantes limitadas à largura da principal. Candidatos de mesma largura
+    real aparecem uma única vez (o menor arquivo).
+
+    Args:
+        id: ID do anúncio
+        extensao: "jpg" ou "webp"
+
+    Returns:
+        String srcset (ex: "/static/img/anuncios/000001-160.webp?v=... 160w, ...")
+        ou vazia se as variantes não existem (sem foto ou ainda sem backfill)
+    """
+    foto = manifesto_fotos_anuncios.obter(id)
+    if not foto or f"{LARGURAS_VARIANTES_ANUNCIO[0]}.{extensao}" not in foto.variantes:
+        return ""
+
+    url_base = f"/{PASTA_FOTOS_ANUNCIOS}/{id:06d}"
+    candidatos = [
+        (largura, f"{url_base}-{largura}.{extensao}") for largura in LARGURAS_VARIANTES_ANUNCIO
+    ]
+    if extensao == "jpg":
+        candidatos.append((TAMANHO_MAX_ANUNCIO, f"{url_base}.jpg"))
+    else:
+        candidatos.append((TAMANHO_MAX_ANUNCIO, f"{url_base}-{TAMANHO_MAX_ANUNCIO}.{extensao}"))
+
+    urls: Dict[int, str] = {}
+    for largura, url in candidatos:
+        urls.setdefault(min(largura, foto.largura), url)
+    return ", ".join(f"{url}?v={foto.versao} {largura}w" for largura, url in urls.items())
+
+
 def salvar_foto_anuncio(id: int, conteudo_base64: str) -> bool:
     """
     Salva a foto do anúncio enviada do frontend.
 
-    Recebe imagem em base64, decodifica, processa e salva como JPG.
+    Recebe imagem em base64, decodifica, processa e salva como JPG no próprio
+    processo. As rotas usam enfileirar_foto_anuncio().
 
     Args:
         id: ID do anúncio
@@ -72,35 +370,15 @@ def salvar_foto_anuncio(id: int, conteudo_base64: str) -> bool:
         True se salvou com sucesso, False caso contrário
     """
     try:
-        # Remover prefixo data:image/...;base64, se existir
-        if "," in conteudo_base64:
-            conteudo_base64 = conteudo_base64.split(",", 1)[1]
-
-        # Decodificar base64
-        image_data = base64.b64decode(conteudo_base64)
-
-        # Abrir imagem com Pillow
-        imagem = Image.open(io.BytesIO(image_data))
-
-        # Converter para RGB se necessário (remove canal alpha)
-        if imagem.mode in ("RGBA", "LA", "P"):
-            # Criar fundo branco
-            fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
-            if imagem.mode == "P":
-                imagem = imagem.convert("RGBA")
-            fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
-            imagem = fundo
-        elif imagem.mode != "RGB":
-            imagem = imagem.convert("RGB")
-
-        # Redimensionar se necessário (mantendo aspect ratio)
-        if imagem.width > TAMANHO_MAX_ANUNCIO or imagem.height > TAMANHO_MAX_ANUNCIO:
-            imagem.thumbnail((TAMANHO_MAX_ANUNCIO, TAMANHO_MAX_ANUNCIO), Image.Resampling.LANCZOS)
-            logger.info(f"Imagem do anúncio redimensionada para {imagem.width}x{imagem.height}px")
-
-        # Salvar como JPG
+        image_data = decodificar_base64(conteudo_base64)
         destino = obter_path_absoluto_foto_anuncio(id)
-        imagem.save(destino, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
+        processar_imagem(
+            image_data,
+            str(destino),
+            TAMANHO_MAX_ANUNCIO,
+            QUALIDADE_FOTO,
+            obter_variantes_foto_anuncio(id),
+        )
 
         logger.info(f"Foto salva para anúncio ID: {id}")
         return True
@@ -109,10 +387,84 @@ def salvar_foto_anuncio(id: int, conteudo_base64: str) -> bool:
         logger.error(f"Erro ao salvar foto para anúncio {id}: {e}")
         return False
 
+    finally:
+        manifesto_fotos_anuncios.atualizar(id)
+
+
+def enfileirar_foto_anuncio(
+    id: int, conteudo_base64: str, id_usuario: int
+) -> Optional[TarefaImagem]:
+    """
+    Decodifica a foto do anúncio e a envia para o pool de processamento de imagens.
+
+    Args:
+        id: ID do anúncio
+        conteudo_base64: String base64 da imagem (pode incluir prefixo data:image/...)
+        id_usuario: ID do vendedor que enviou a foto (dono da tarefa)
+
+    Returns:
+        TarefaImagem pendente, ou None se o base64 for inválido ou a fila estiver cheia
+    """
+    try:
+        image_data = decodificar_base64(conteudo_base64)
+    except (binascii.Error, ValueError) as e:
+        logger.error(f"Foto inválida para anúncio {id}: {e}")
+        return None
+
+    return enfileirar(
+        dono=id_usuario,
+        dados=image_data,
+        destino=obter_path_absoluto_foto_anuncio(id),
+        url=f"/{PASTA_FOTOS_ANUNCIOS}/{id:06d}.jpg",
+        tamanho_max=TAMANHO_MAX_ANUNCIO,
+        variantes=obter_variantes_foto_anuncio(id),
+        ao_concluir=partial(manifesto_fotos_anuncios.atualizar, id),
+    )
+
+
+def variantes_atualizadas(id: int) -> bool:
+    """
+    Verifica se todas as variantes existem e são mais novas que a foto principal.
+
+    Args:
+        id: ID do anúncio
+
+    Returns:
+        True se não há nada a (re)gerar
+    """
+    mtime_foto = obter_path_absoluto_foto_anuncio(id).stat().st_mtime
+    for caminho, _, _ in obter_variantes_foto_anuncio(id):
+        path = Path(caminho)
+        if not path.exists() or path.stat().st_mtime < mtime_foto:
+            return False
+    return True
+
+
+def gerar_variantes_foto_anuncio(id: int) -> bool:
+    """
+    Gera as variantes a partir da foto principal já salva (backfill).
+
+    Args:
+        id: ID do anúncio
+
+    Returns:
+        True se gerou com sucesso, False se a foto não existe ou em erro
+    """
+    origem = obter_path_absoluto_foto_anuncio(id)
+    if not origem.exists():
+        return False
+    try:
+        gerar_variantes(str(origem), obter_variantes_foto_anuncio(id), QUALIDADE_FOTO)
+        manifesto_fotos_anuncios.atualizar(id)
+        return True
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        logger.error(f"Erro ao gerar variantes da foto do anúncio {id}: {e}")
+        return False
+
 
 def foto_anuncio_existe(id: int) -> bool:
     """
-    Verifica se a foto do anúncio existe no filesystem.
+    Verifica se a foto do anúncio existe (via manifesto).
 
     Args:
         id: ID do anúncio
@@ -120,12 +472,12 @@ def foto_anuncio_existe(id: int) -> bool:
     Returns:
         True se a foto existe, False caso contrário
     """
-    return obter_path_absoluto_foto_anuncio(id).exists()
+    return manifesto_fotos_anuncios.obter(id) is not None
 
 
 def excluir_foto_anuncio(id: int) -> bool:
     """
-    Exclui a foto do anúncio do filesystem.
+    Exclui a foto do anúncio e suas variantes do filesystem.
 
     Args:
         id: ID do anúncio
@@ -134,10 +486,13 @@ def excluir_foto_anuncio(id: int) -> bool:
         True se excluiu com sucesso ou foto não existia, False em caso de erro
     """
     try:
+        for caminho, _, _ in obter_variantes_foto_anuncio(id):
+            Path(caminho).unlink(missing_ok=True)
         path = obter_path_absoluto_foto_anuncio(id)
         if path.exists():
             path.unlink()
             logger.info(f"Foto excluída para anúncio ID: {id}")
+        manifesto_fotos_anuncios.atualizar(id)
         return True
     except OSError as e:
         logger.error(f"Erro ao excluir foto do anúncio {id}: {e}")
@@ -154,5 +509,5 @@ def obter_tamanho_foto_anuncio(id: int) -> Optional[int]:
     Returns:
         Tamanho em bytes ou None se foto não existe
     """
-    path = obter_path_absoluto_foto_anuncio(id)
-    return path.stat().st_size if path.exists() else None
+    foto = manifesto_fotos_anuncios.obter(id)
+    return foto.tamanho if foto else None
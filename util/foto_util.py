@@ -4,27 +4,25 @@ Utilitário para gerenciamento de fotos de usuários.
 Este módulo fornece funções para:
 - Obter caminhos de fotos de usuários (padrão: {id:06d}.jpg)
 - Criar foto padrão ao cadastrar usuário
-- Salvar foto cropada do upload
+- Salvar foto cropada do upload (direto ou via pool de processos)
 """
 
-import base64
 import binascii
-import io
 from pathlib import Path
 from typing import Optional
 
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 
 from util.logger_config import logger
 from util.config import FOTO_PERFIL_TAMANHO_MAX
 from util.config_cache import config
+from util.imagem_worker import TarefaImagem, decodificar_base64, enfileirar, processar_imagem
 
 
 # Configurações
 PASTA_FOTO_DEFAULT = Path("static/img")
 FOTO_DEFAULT = PASTA_FOTO_DEFAULT / "user.jpg"
 PASTA_FOTOS = PASTA_FOTO_DEFAULT / "usuarios"
-FORMATO_FOTO = "JPEG"
 QUALIDADE_FOTO = 90
 
 
@@ -92,7 +90,8 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
     """
     Salva a foto cropada do usuário enviada do frontend.
 
-    Recebe imagem em base64, decodifica, processa e salva como JPG.
+    Recebe imagem em base64, decodifica, processa e salva como JPG no próprio
+    processo. As rotas usam enfileirar_foto_usuario().
 
     Args:
         id: ID do usuário
@@ -102,38 +101,11 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
         True se salvou com sucesso, False caso contrário
     """
     try:
-        # Remover prefixo data:image/...;base64, se existir
-        if "," in conteudo_base64:
-            conteudo_base64 = conteudo_base64.split(",", 1)[1]
-
-        # Decodificar base64
-        image_data = base64.b64decode(conteudo_base64)
-
-        # Abrir imagem com Pillow
-        imagem = Image.open(io.BytesIO(image_data))
-
-        # Converter para RGB se necessário (remove canal alpha)
-        if imagem.mode in ("RGBA", "LA", "P"):
-            # Criar fundo branco
-            fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
-            if imagem.mode == "P":
-                imagem = imagem.convert("RGBA")
-            fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
-            imagem = fundo
-        elif imagem.mode != "RGB":
-            imagem = imagem.convert("RGB")
-
-        # Redimensionar se necessário (mantendo aspect ratio)
+        image_data = decodificar_base64(conteudo_base64)
+
         # Lê tamanho máximo do cache (database → .env)
         tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
-        if imagem.width > tamanho_max or imagem.height > tamanho_max:
-            # thumbnail redimensiona mantendo aspect ratio
-            imagem.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS)
-            logger.info(f"Imagem redimensionada para {imagem.width}x{imagem.height}px (max: {tamanho_max}px)")
-
-        # Salvar como JPG
-        destino = obter_path_absoluto_foto(id)
-        imagem.save(destino, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
+        processar_imagem(image_data, str(obter_path_absoluto_foto(id)), tamanho_max, QUALIDADE_FOTO)
 
         logger.info(f"Foto cropada salva para usuário ID: {id}")
         return True
@@ -147,6 +119,33 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
         return False
 
 
+def enfileirar_foto_usuario(id: int, conteudo_base64: str) -> Optional[TarefaImagem]:
+    """
+    Decodifica a foto cropada e a envia para o pool de processamento de imagens.
+
+    Args:
+        id: ID do usuário (também o dono da tarefa)
+        conteudo_base64: String base64 da imagem (pode incluir prefixo data:image/...)
+
+    Returns:
+        TarefaImagem pendente, ou None se o base64 for inválido ou a fila estiver cheia
+    """
+    try:
+        image_data = decodificar_base64(conteudo_base64)
+    except (binascii.Error, ValueError) as e:
+        logger.error(f"Foto de perfil inválida para usuário {id}: {e}")
+        return None
+
+    tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
+    return enfileirar(
+        dono=id,
+        dados=image_data,
+        destino=obter_path_absoluto_foto(id),
+        url=obter_caminho_foto_usuario(id),
+        tamanho_max=tamanho_max,
+    )
+
+
 def foto_existe(id: int) -> bool:
     """
     Verifica se a foto do usuário existe no filesystem.
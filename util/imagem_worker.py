@@ -0,0 +1,405 @@
+"""
+Processamento de imagens (fotos de perfil e de anúncios) fora das requisições.
+
+Decodificar, converter e redimensionar (LANCZOS) uma foto de celular com
+Pillow leva centenas de milissegundos de CPU. Dentro de uma rota `async def`
+esse tempo é todo de event loop bloqueado.
+
+As rotas apenas decodificam o base64 (rápido) e enfileiram os bytes:
+
+    tarefa = enfileirar(dono=usuario_id, dados=dados, destino=path,
+                        url=url, tamanho_max=256)
+
+O trabalho de Pillow roda em um pool de processos (IMAGEM_PROCESSOS) e a
+rota responde imediatamente. O estado da tarefa fica em memória, neste
+worker, e pode ser consultado por polling (obter_tarefa) até ficar
+"concluida" ou "erro". Tarefas finalizadas são descartadas após
+IMAGEM_TAREFA_RETENCAO_SEGUNDOS.
+
+A fila é limitada a IMAGEM_PROCESSOS + IMAGEM_FILA_MAX tarefas; acima disso
+enfileirar() retorna None e a rota informa o usuário em vez de acumular
+espera.
+
+Se um processo do pool morre (OOM killer, segfault), o pool inteiro fica
+quebrado: as tarefas em andamento terminam com erro e o pool é recriado no
+próximo enfileirar().
+"""
+
+import base64
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from util.config import IMAGEM_FILA_MAX, IMAGEM_PROCESSOS, IMAGEM_TAREFA_RETENCAO_SEGUNDOS
+from util.logger_config import logger
+
+FORMATO_IMAGEM = "JPEG"
+QUALIDADE_IMAGEM = 90
+QUALIDADE_WEBP = 80
+
+# (destino, largura máxima, formato Pillow) de uma versão adicional da imagem
+Variante = Tuple[str, int, str]
+
+STATUS_PENDENTE = "pendente"
+STATUS_CONCLUIDA = "concluida"
+STATUS_ERRO = "erro"
+
+
+def decodificar_base64(conteudo_base64: str) -> bytes:
+    """
+    Decodifica a imagem enviada pelo frontend.
+
+    Args:
+        conteudo_base64: String base64 da imagem (pode incluir prefixo data:image/...)
+
+    Returns:
+        Bytes da imagem
+
+    Raises:
+        binascii.Error: Se o conteúdo não for base64 válido
+    """
+    # Remover prefixo data:image/...;base64, se existir
+    if "," in conteudo_base64:
+        conteudo_base64 = conteudo_base64.split(",", 1)[1]
+    return base64.b64decode(conteudo_base64)
+
+
+def _converter_para_rgb(imagem: Image.Image) -> Image.Image:
+    """Converte para RGB, trocando transparência por fundo branco."""
+    if imagem.mode in ("RGBA", "LA", "P"):
+        # Criar fundo branco
+        fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
+        if imagem.mode == "P":
+            imagem = imagem.convert("RGBA")
+        fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
+        return fundo
+    if imagem.mode != "RGB":
+        return imagem.convert("RGB")
+    return imagem
+
+
+def _salvar(imagem: Image.Image, destino: str, formato: str, qualidade: int) -> None:
+    """
+    Salva a imagem em um temporário e renomeia, de modo que quem serve
+    /static nunca vê um arquivo pela metade.
+    """
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    if formato == "WEBP":
+        opcoes = {"quality": QUALIDADE_WEBP, "method": 4}
+    else:
+        opcoes = {"quality": qualidade, "optimize": True}
+    try:
+        imagem.save(temporario, format=formato, **opcoes)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.unlink(temporario)
+
+
+def _salvar_variantes(
+    imagem: Image.Image, variantes: Sequence[Variante], qualidade: int
+) -> None:
+    """Salva cópias reduzidas (pela largura, mantendo a proporção) da imagem."""
+    for destino, largura, formato in variantes:
+        variante = imagem
+        if imagem.width > largura:
+            altura = max(1, round(imagem.height * largura / imagem.width))
+            variante = imagem.resize((largura, altura), Image.Resampling.LANCZOS)
+        _salvar(variante, destino, formato, qualidade)
+
+
+def processar_imagem(
+    dados: bytes,
+    destino: str,
+    tamanho_max: int,
+    qualidade: int = QUALIDADE_IMAGEM,
+    variantes: Sequence[Variante] = (),
+) -> Tuple[int, int]:
+    """
+    Converte a imagem para RGB, redimensiona e salva como JPG.
+
+    Executada nos processos do pool (ou diretamente, nas funções síncronas de
+    foto_util/foto_anuncio_util). Recebe tudo por parâmetro: os processos não
+    enxergam patches nem o cache de configurações do processo principal.
+
+    Args:
+        dados: Bytes da imagem enviada
+        destino: Caminho do arquivo JPG final
+        tamanho_max: Maior dimensão permitida, em pixels
+        qualidade: Qualidade do JPEG
+        variantes: Versões menores/em outros formatos a gerar a partir da
+            imagem final, como tuplas (destino, largura_max, formato Pillow)
+
+    Returns:
+        Tupla (largura, altura) da imagem salva
+
+    Raises:
+        UnidentifiedImageError: Formato de imagem inválido ou não suportado
+        OSError: Erro de I/O ao salvar o arquivo
+        ValueError: Erro ao processar dados da imagem
+    """
+    imagem = _converter_para_rgb(Image.open(io.BytesIO(dados)))
+
+    # Redimensionar se necessário (thumbnail mantém o aspect ratio)
+    if imagem.width > tamanho_max or imagem.height > tamanho_max:
+        imagem.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS)
+
+    _salvar(imagem, destino, FORMATO_IMAGEM, qualidade)
+    _salvar_variantes(imagem, variantes, qualidade)
+
+    return imagem.width, imagem.height
+
+
+def gerar_variantes(
+    origem: str, variantes: Sequence[Variante], qualidade: int = QUALIDADE_IMAGEM
+) -> int:
+    """
+    Gera as variantes a partir de uma imagem já salva (backfill).
+
+    A imagem de origem não é regravada.
+
+    Args:
+        origem: Caminho da imagem existente
+        variantes: Tuplas (destino, largura_max, formato Pillow)
+        qualidade: Qualidade dos JPEGs
+
+    Returns:
+        Quantidade de arquivos gerados
+    """
+    with Image.open(origem) as imagem:
+        _salvar_variantes(_converter_para_rgb(imagem), variantes, qualidade)
+    return len(variantes)
+
+
+@dataclass
+class TarefaImagem:
+    """Estado de uma imagem enviada para o pool de processos."""
+
+    id: str
+    dono: int
+    url: str
+    status: str = STATUS_PENDENTE
+    criada_em: float = field(default_factory=time.monotonic)
+    concluida_em: Optional[float] = None
+    erro: Optional[str] = None
+    _finalizada: threading.Event = field(
+        default_factory=threading.Event, repr=False, compare=False
+    )
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até a tarefa terminar (uso em testes e scripts).
+
+        Returns:
+            True se terminou dentro do timeout
+        """
+        return self._finalizada.wait(timeout)
+
+    def para_dict(self) -> dict:
+        """Representação pública da tarefa (resposta do endpoint de status)."""
+        return {"id": self.id, "status": self.status, "url": self.url, "erro": self.erro}
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+_tarefas: Dict[str, TarefaImagem] = {}
+_tarefas_lock = threading.Lock()
+_estatisticas = {"pendentes": 0, "rejeitadas": 0, "concluidas": 0, "falhas": 0, "segundos": 0.0}
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de imagens, criando-o se necessário."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=IMAGEM_PROCESSOS)
+        return _pool
+
+
+def _descartar_pool(quebrado: ProcessPoolExecutor) -> None:
+    """
+    Esquece um pool quebrado; o próximo _obter_pool() cria outro.
+
+    O próprio executor já encerrou os processos restantes e falhou as
+    tarefas pendentes. Só limpa a referência global se ela ainda aponta
+    para o pool quebrado (outra thread pode já ter criado o substituto).
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is quebrado:
+            _pool = None
+
+
+def _descartar_antigas(agora: float) -> None:
+    """Remove tarefas finalizadas há mais de IMAGEM_TAREFA_RETENCAO_SEGUNDOS."""
+    limite = agora - IMAGEM_TAREFA_RETENCAO_SEGUNDOS
+    for tarefa_id in [
+        t.id for t in _tarefas.values() if t.concluida_em is not None and t.concluida_em < limite
+    ]:
+        del _tarefas[tarefa_id]
+
+
+def _finalizar(
+    tarefa: TarefaImagem,
+    destino: str,
+    future: Future,
+    ao_concluir: Optional[Callable[[], None]] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> None:
+    """Callback do pool: registra o resultado da tarefa."""
+    erro = future.exception()
+    interrompida = isinstance(erro, BrokenProcessPool)
+    if interrompida and pool is not None:
+        _descartar_pool(pool)
+    if ao_concluir is not None:
+        try:
+            ao_concluir()
+        except Exception as e:
+            logger.error(f"Erro no callback de conclusão da imagem {destino}: {e}")
+    with _tarefas_lock:
+        tarefa.concluida_em = time.monotonic()
+        _estatisticas["pendentes"] -= 1
+        _estatisticas["segundos"] += tarefa.concluida_em - tarefa.criada_em
+        if erro is None:
+            tarefa.status = STATUS_CONCLUIDA
+            _estatisticas["concluidas"] += 1
+        else:
+            tarefa.status = STATUS_ERRO
+            tarefa.erro = (
+                "Processamento da imagem interrompido. Envie a imagem novamente."
+                if interrompida
+                else "Não foi possível processar a imagem."
+            )
+            _estatisticas["falhas"] += 1
+    tarefa._finalizada.set()
+
+    if erro is None:
+        largura, altura = future.result()
+        logger.info(f"Imagem processada ({largura}x{altura}px): {destino}")
+    else:
+        logger.error(f"Erro ao processar imagem {destino}: {erro}")
+
+
+def enfileirar(
+    dono: int,
+    dados: bytes,
+    destino: Path,
+    url: str,
+    tamanho_max: int,
+    variantes: Sequence[Variante] = (),
+    ao_concluir: Optional[Callable[[], None]] = None,
+) -> Optional[TarefaImagem]:
+    """
+    Envia uma imagem para processamento no pool de processos.
+
+    Args:
+        dono: ID do usuário que pode consultar a tarefa
+        dados: Bytes da imagem (já decodificados)
+        destino: Caminho do arquivo JPG final
+        url: URL pública da imagem, devolvida na consulta de status
+        tamanho_max: Maior dimensão permitida, em pixels
+        variantes: Versões adicionais (ver processar_imagem)
+        ao_concluir: Chamada neste processo quando a tarefa termina (com
+            sucesso ou erro), antes de a tarefa ser marcada como finalizada
+
+    Returns:
+        TarefaImagem pendente, ou None se a fila estiver cheia
+    """
+    tarefa = TarefaImagem(id=uuid.uuid4().hex, dono=dono, url=url)
+    with _tarefas_lock:
+        if _estatisticas["pendentes"] >= IMAGEM_PROCESSOS + IMAGEM_FILA_MAX:
+            _estatisticas["rejeitadas"] += 1
+            logger.warning(f"Fila de processamento de imagens cheia; {destino} rejeitada")
+            return None
+        _estatisticas["pendentes"] += 1
+        _descartar_antigas(tarefa.criada_em)
+        _tarefas[tarefa.id] = tarefa
+
+    def submeter(pool: ProcessPoolExecutor) -> Future:
+        return pool.submit(
+            processar_imagem, dados, str(destino), tamanho_max, QUALIDADE_IMAGEM, variantes
+        )
+
+    pool = _obter_pool()
+    try:
+        try:
+            future = submeter(pool)
+        except BrokenProcessPool:
+            # Processo do pool morreu desde a última tarefa: recria e tenta de novo
+            logger.error(f"Pool de processos de imagens quebrado; recriando para {destino}")
+            _descartar_pool(pool)
+            pool = _obter_pool()
+            future = submeter(pool)
+    except RuntimeError as e:
+        # Pool encerrado (shutdown em andamento)
+        with _tarefas_lock:
+            _estatisticas["pendentes"] -= 1
+            del _tarefas[tarefa.id]
+        logger.error(f"Não foi possível enfileirar imagem {destino}: {e}")
+        return None
+
+    future.add_done_callback(lambda f: _finalizar(tarefa, str(destino), f, ao_concluir, pool))
+    return tarefa
+
+
+def obter_tarefa(tarefa_id: str, dono: int) -> Optional[TarefaImagem]:
+    """
+    Retorna a tarefa, se existir neste worker e pertencer ao usuário.
+
+    Args:
+        tarefa_id: ID devolvido por enfileirar()
+        dono: ID do usuário logado
+
+    Returns:
+        TarefaImagem ou None
+    """
+    with _tarefas_lock:
+        tarefa = _tarefas.get(tarefa_id)
+    if tarefa is None or tarefa.dono != dono:
+        return None
+    return tarefa
+
+
+def obter_estatisticas_imagens() -> dict:
+    """
+    Retorna estatísticas do processamento de imagens.
+
+    Returns:
+        Dicionário com processos, limite da fila, pendentes, rejeitadas,
+        concluidas, falhas e tempo médio (fila + processamento) em ms
+    """
+    with _tarefas_lock:
+        finalizadas = _estatisticas["concluidas"] + _estatisticas["falhas"]
+        return {
+            "processos": IMAGEM_PROCESSOS,
+            "fila_max": IMAGEM_FILA_MAX,
+            "pendentes": _estatisticas["pendentes"],
+            "rejeitadas": _estatisticas["rejeitadas"],
+            "concluidas": _estatisticas["concluidas"],
+            "falhas": _estatisticas["falhas"],
+            "media_ms": (
+                round(_estatisticas["segundos"] / finalizadas * 1000, 2) if finalizadas else None
+            ),
+        }
+
+
+def encerrar_pool_imagens() -> None:
+    """Encerra o pool de processos de imagens (shutdown da aplicação)."""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -0,0 +1,148 @@
+"""
+Utilitários de paginação por cursor (keyset).
+
+A paginação por OFFSET obriga o SQLite a percorrer e descartar todas as
+linhas anteriores à página pedida, e cada página costuma vir acompanhada
+de um COUNT(*) com os mesmos filtros. A paginação por cursor guarda a
+chave de ordenação da última linha exibida (ex.: ``(data_cadastro, id)``)
+e a próxima página começa diretamente a partir dela via índice.
+
+O cursor é opaco para o cliente: base64 (URL-safe) de uma lista JSON com
+os valores da chave. Os valores só são usados como parâmetros das
+consultas, então um cursor adulterado no máximo muda a página exibida.
+"""
+
+import base64
+import binascii
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+from util.config import PAGINACAO_CACHE_TOTAL_SEGUNDOS
+
+# Quantidade máxima de totais distintos (combinações de filtros) em cache
+_MAX_TOTAIS_CACHE = 256
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """
+    Codifica os valores da chave de ordenação em um cursor opaco.
+
+    Args:
+        valores: Valores da chave de ordenação da última linha da página
+
+    Returns:
+        Cursor em base64 URL-safe, sem padding
+    """
+    dados = json.dumps(list(valores), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(dados).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str], tamanho: int) -> Optional[list]:
+    """
+    Decodifica um cursor gerado por codificar_cursor.
+
+    Args:
+        cursor: Cursor recebido do cliente
+        tamanho: Quantidade de valores esperada na chave
+
+    Returns:
+        Lista com os valores da chave, ou None se o cursor estiver
+        ausente ou for inválido (nesse caso, exibe-se a primeira página)
+    """
+    if not cursor:
+        return None
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        dados = base64.urlsafe_b64decode(cursor + preenchimento)
+        valores = json.loads(dados.decode("utf-8"))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+
+    if not isinstance(valores, list) or len(valores) != tamanho:
+        return None
+    if not all(isinstance(v, (str, int)) and not isinstance(v, bool) for v in valores):
+        return None
+    return valores
+
+
+def fatiar_pagina(
+    rows: list, limite: int, chave: Callable[[Any], Sequence[Any]]
+) -> tuple[list, Optional[str]]:
+    """
+    Separa a página atual do resultado de uma consulta com LIMIT limite + 1.
+
+    A linha extra só serve para saber se existe próxima página, evitando
+    um COUNT(*) apenas para montar a navegação.
+
+    Args:
+        rows: Linhas retornadas pela consulta (até limite + 1)
+        limite: Tamanho da página
+        chave: Função que extrai os valores da chave de ordenação de uma linha
+
+    Returns:
+        Tupla com (linhas da página, cursor da próxima página ou None)
+    """
+    if len(rows) <= limite:
+        return rows, None
+    pagina = rows[:limite]
+    return pagina, codificar_cursor(chave(pagina[-1]))
+
+
+class CacheTotais:
+    """
+    Cache com TTL para totais de listagens (COUNT(*)).
+
+    O total exibido ao lado de uma listagem paginada pode ser aproximado;
+    guardá-lo por alguns segundos evita repetir o COUNT(*) a cada página
+    navegada com os mesmos filtros.
+
+    Thread-safe: utiliza Lock para sincronização de acesso ao cache.
+    """
+
+    def __init__(self, ttl_segundos: float, tamanho_max: int = _MAX_TOTAIS_CACHE):
+        self.ttl_segundos = ttl_segundos
+        self.tamanho_max = tamanho_max
+        self._totais: "OrderedDict[Hashable, tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable, contar: Callable[[], int]) -> int:
+        """
+        Obtém o total em cache ou executa a contagem.
+
+        Args:
+            chave: Identificação da listagem e dos filtros aplicados
+            contar: Função que executa o COUNT(*) real
+
+        Returns:
+            Total (possivelmente com até ttl_segundos de atraso)
+        """
+        if self.ttl_segundos <= 0:
+            return contar()
+
+        agora = time.monotonic()
+        with self._lock:
+            item = self._totais.get(chave)
+            if item is not None and item[0] > agora:
+                self._totais.move_to_end(chave)
+                return item[1]
+
+        total = contar()
+
+        with self._lock:
+            self._totais[chave] = (agora + self.ttl_segundos, total)
+            self._totais.move_to_end(chave)
+            while len(self._totais) > self.tamanho_max:
+                self._totais.popitem(last=False)
+        return total
+
+    def limpar(self) -> None:
+        """Descarta todos os totais em cache."""
+        with self._lock:
+            self._totais.clear()
+
+
+# Instância global compartilhada pelas listagens públicas
+cache_totais = CacheTotais(PAGINACAO_CACHE_TOTAL_SEGUNDOS)
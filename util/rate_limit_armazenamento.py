@@ -0,0 +1,523 @@
+"""
+Armazenamentos das contagens dos rate limiters (algoritmo janela_deslizante).
+
+Cada limiter guarda um registro compacto por identificador (ver
+RegistroJanela). Com o armazenamento em memória os limites valem por
+processo; com vários workers (uvicorn --workers N) o limite efetivo seria
+N vezes o configurado e um reinício apagaria a proteção contra força bruta.
+Os armazenamentos "sqlite" e "mmap" guardam os registros em arquivos
+compartilhados pelos workers do mesmo host.
+
+- "memoria": dicionário no próprio processo.
+- "sqlite": tabela rate_limit em um arquivo SQLite próprio
+  (RATE_LIMIT_SQLITE_ARQUIVO); verificação e registro em um único UPSERT.
+- "mmap": tabela hash de tamanho fixo em um arquivo mapeado em memória
+  (um arquivo por limiter em RATE_LIMIT_MMAP_DIRETORIO), protegida por flock.
+
+Os índices de janela derivam de time.monotonic(), que no Linux é o mesmo
+relógio para todos os processos do host.
+
+O armazenamento é escolhido por RATE_LIMIT_ARMAZENAMENTO (ver util/config.py).
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: armazenamento "mmap" indisponível
+    fcntl = None
+
+from sql.rate_limit_sql import (
+    CRIAR_TABELA,
+    REGISTRAR,
+    OBTER,
+    EXCLUIR,
+    EXCLUIR_POR_LIMITER,
+    EXCLUIR_OCIOSOS,
+    CONTAR_POR_LIMITER,
+)
+from util.config import (
+    RATE_LIMIT_ARMAZENAMENTO,
+    RATE_LIMIT_MMAP_CAPACIDADE,
+    RATE_LIMIT_MMAP_DIRETORIO,
+    RATE_LIMIT_SQLITE_ARQUIVO,
+)
+from util.db_util import PoolConexoes
+from util.logger_config import logger
+
+# Registro do algoritmo janela_deslizante: (índice da janela fixa atual,
+# contagem atual, contagem anterior); índice = segundos monotônicos // janela
+RegistroJanela = tuple[int, int, int]
+
+
+def avancar_registro(
+    registro: Optional[RegistroJanela], indice_atual: int
+) -> tuple[int, int]:
+    """
+    Avança um registro até a janela atual.
+
+    Args:
+        registro: Registro armazenado (None se o identificador não existe)
+        indice_atual: Índice da janela fixa atual
+
+    Returns:
+        Tupla (contagem atual, contagem anterior) válida para indice_atual
+    """
+    if registro is None:
+        return 0, 0
+    indice, atual, anterior = registro
+    if indice == indice_atual:
+        return atual, anterior
+    # Janela imediatamente seguinte: contagem atual vira a anterior
+    if indice == indice_atual - 1:
+        return 0, atual
+    return 0, 0
+
+
+class ArmazenamentoLimiter(ABC):
+    """
+    Interface dos armazenamentos de contagens de um rate limiter.
+
+    Cada instância pertence a um limiter (identificado pelo nome); registros
+    de limiters diferentes nunca se misturam. Um armazenamento que não
+    implemente todos os métodos abstratos falha já ao ser instanciado.
+    """
+
+    nome = ""
+
+    def __init__(self, limiter: str):
+        """
+        Args:
+            limiter: Nome do limiter dono dos registros
+        """
+        self.limiter = limiter
+
+    @abstractmethod
+    def registrar(
+        self, identificador: str, indice: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, float]:
+        """
+        Verifica o limite e, se permitido, registra a tentativa (atomicamente).
+
+        Args:
+            identificador: Identificador único (geralmente IP)
+            indice: Índice da janela fixa atual
+            peso: Fração da janela anterior ainda coberta pela janela deslizante
+            max_tentativas: Limite de tentativas na janela
+
+        Returns:
+            Tupla (permitido, estimativa de tentativas antes desta)
+        """
+
+    @abstractmethod
+    def obter(self, identificador: str) -> Optional[RegistroJanela]:
+        """Retorna o registro do identificador, ou None se não existir."""
+
+    @abstractmethod
+    def remover(self, identificador: str) -> None:
+        """Remove o registro de um identificador."""
+
+    @abstractmethod
+    def limpar(self) -> None:
+        """Remove todos os registros do limiter."""
+
+    @abstractmethod
+    def varrer(self, indice_atual: int) -> int:
+        """
+        Remove registros sem tentativas na janela atual nem na anterior.
+
+        Args:
+            indice_atual: Índice da janela fixa atual
+
+        Returns:
+            Quantidade de registros removidos
+        """
+
+    @abstractmethod
+    def contar(self) -> int:
+        """Retorna a quantidade de identificadores registrados."""
+
+    def fechar(self) -> None:
+        """Libera arquivos e conexões do armazenamento."""
+
+
+class ArmazenamentoMemoria(ArmazenamentoLimiter):
+    """Registros em um dicionário do próprio processo."""
+
+    nome = "memoria"
+
+    def __init__(self, limiter: str):
+        super().__init__(limiter)
+        self.registros: Dict[str, RegistroJanela] = {}
+
+    def registrar(
+        self, identificador: str, indice: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, float]:
+        atual, anterior = avancar_registro(self.registros.get(identificador), indice)
+        estimativa = anterior * peso + atual
+        if estimativa >= max_tentativas:
+            return False, estimativa
+        self.registros[identificador] = (indice, atual + 1, anterior)
+        return True, estimativa
+
+    def obter(self, identificador: str) -> Optional[RegistroJanela]:
+        return self.registros.get(identificador)
+
+    def remover(self, identificador: str) -> None:
+        self.registros.pop(identificador, None)
+
+    def limpar(self) -> None:
+        self.registros.clear()
+
+    def varrer(self, indice_atual: int) -> int:
+        ociosos = [
+            identificador
+            for identificador, (indice, _, _) in self.registros.items()
+            if indice < indice_atual - 1 or indice > indice_atual
+        ]
+        for identificador in ociosos:
+            del self.registros[identificador]
+        return len(ociosos)
+
+    def contar(self) -> int:
+        return len(self.registros)
+
+
+class ArmazenamentoSQLite(ArmazenamentoLimiter):
+    """
+    Registros na tabela rate_limit de um arquivo SQLite dedicado.
+
+    Cada verificação é um único UPSERT com RETURNING (ver
+    sql/rate_limit_sql.REGISTRAR), atômico entre processos. Erros do banco
+    liberam a requisição (registrados no log) em vez de derrubar a rota.
+    """
+
+    nome = "sqlite"
+
+    # WAL + synchronous=NORMAL: cada verificação não espera fsync
+    PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000}
+
+    # Um pool por arquivo, compartilhado pelos limiters do processo
+    _pools: Dict[str, PoolConexoes] = {}
+    _lock_pools = threading.Lock()
+
+    def __init__(self, limiter: str, caminho: str = RATE_LIMIT_SQLITE_ARQUIVO):
+        super().__init__(limiter)
+        self.caminho = caminho
+        self._pool = self._obter_pool(caminho)
+
+    @classmethod
+    def _obter_pool(cls, caminho: str) -> PoolConexoes:
+        with cls._lock_pools:
+            pool = cls._pools.get(caminho)
+            if pool is None:
+                pool = PoolConexoes(caminho, pragmas=cls.PRAGMAS)
+                conn = pool.adquirir()
+                try:
+                    conn.execute(CRIAR_TABELA)
+                    conn.commit()
+                finally:
+                    pool.devolver(conn)
+                cls._pools[caminho] = pool
+            return pool
+
+    def _executar(self, sql: str, parametros, escrita: bool = True) -> list:
+        conn = self._pool.adquirir()
+        try:
+            linhas = conn.execute(sql, parametros).fetchall()
+            if escrita:
+                conn.commit()
+            return linhas
+        finally:
+            self._pool.devolver(conn)
+
+    def registrar(
+        self, identificador: str, indice: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, float]:
+        try:
+            linhas = self._executar(
+                REGISTRAR,
+                {
+                    "limiter": self.limiter,
+                    "identificador": identificador,
+                    "indice": indice,
+                    "peso": peso,
+                    "max_tentativas": max_tentativas,
+                },
+            )
+            if linhas:
+                atual, anterior = linhas[0]
+                return True, anterior * peso + atual - 1
+
+            # Bloqueado: o registro não foi alterado
+            atual, anterior = avancar_registro(self.obter(identificador), indice)
+            return False, anterior * peso + atual
+        except sqlite3.Error as e:
+            logger.error(f"[RateLimit] Erro no armazenamento sqlite [{self.limiter}]: {e}")
+            return True, 0.0
+
+    def obter(self, identificador: str) -> Optional[RegistroJanela]:
+        linhas = self._executar(OBTER, (self.limiter, identificador), escrita=False)
+        return tuple(linhas[0]) if linhas else None
+
+    def remover(self, identificador: str) -> None:
+        self._executar(EXCLUIR, (self.limiter, identificador))
+
+    def limpar(self) -> None:
+        self._executar(EXCLUIR_POR_LIMITER, (self.limiter,))
+
+    def varrer(self, indice_atual: int) -> int:
+        conn = self._pool.adquirir()
+        try:
+            cursor = conn.execute(
+                EXCLUIR_OCIOSOS, (self.limiter, indice_atual - 1, indice_atual)
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            self._pool.devolver(conn)
+
+    def contar(self) -> int:
+        return self._executar(CONTAR_POR_LIMITER, (self.limiter,), escrita=False)[0][0]
+
+    def fechar(self) -> None:
+        with self._lock_pools:
+            pool = self._pools.pop(self.caminho, None)
+        if pool is not None:
+            pool.fechar()
+
+
+class ArmazenamentoMmap(ArmazenamentoLimiter):
+    """
+    Tabela hash de tamanho fixo em um arquivo mapeado em memória.
+
+    Layout: cabeçalho (MAGICO, capacidade) seguido de `capacidade` posições
+    de FORMATO_POSICAO (hash do identificador, índice, atual, anterior),
+    com endereçamento aberto (sondagem linear). Guardar só o hash de 64 bits
+    mantém as posições com tamanho fixo; colisões são desprezíveis.
+
+    Operações tomam um flock exclusivo no arquivo (exclusão entre processos)
+    e um threading.Lock (flock não exclui threads do mesmo processo).
+    Com a tabela cheia mesmo após a varredura, novos identificadores são
+    liberados sem contagem (registrado no log).
+    """
+
+    nome = "mmap"
+
+    MAGICO = b"RLM1"
+    FORMATO_CABECALHO = "<4sI8x"
+    FORMATO_POSICAO = "<QqII"
+    TAMANHO_CABECALHO = struct.calcsize(FORMATO_CABECALHO)
+    TAMANHO_POSICAO = struct.calcsize(FORMATO_POSICAO)
+    # Hashes reservados: posição livre e posição removida
+    LIVRE = 0
+    REMOVIDA = 1
+
+    def __init__(
+        self,
+        limiter: str,
+        diretorio: str = RATE_LIMIT_MMAP_DIRETORIO,
+        capacidade: int = RATE_LIMIT_MMAP_CAPACIDADE,
+    ):
+        if fcntl is None:
+            raise RuntimeError("Armazenamento de rate limit 'mmap' requer um sistema POSIX")
+        if capacidade <= 0:
+            raise ValueError("capacidade deve ser positiva")
+        super().__init__(limiter)
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = os.path.join(diretorio, f"{limiter}.bin")
+        self._lock = threading.Lock()
+        self._fd = os.open(self.caminho, os.O_CREAT | os.O_RDWR, 0o600)
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(
+                    self._fd, self.TAMANHO_CABECALHO + capacidade * self.TAMANHO_POSICAO
+                )
+                os.pwrite(
+                    self._fd, struct.pack(self.FORMATO_CABECALHO, self.MAGICO, capacidade), 0
+                )
+            magico, self.capacidade = struct.unpack(
+                self.FORMATO_CABECALHO, os.pread(self._fd, self.TAMANHO_CABECALHO, 0)
+            )
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        if magico != self.MAGICO:
+            os.close(self._fd)
+            raise ValueError(f"Arquivo de rate limit inválido: {self.caminho}")
+        self._mapa = mmap.mmap(self._fd, 0)
+
+    def __enter__(self):
+        self._lock.acquire()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self._mapa
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+    @classmethod
+    def _hash(cls, identificador: str) -> int:
+        valor = int.from_bytes(
+            hashlib.blake2b(identificador.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        return max(valor, cls.REMOVIDA + 1)
+
+    def _deslocamento(self, posicao: int) -> int:
+        return self.TAMANHO_CABECALHO + posicao * self.TAMANHO_POSICAO
+
+    def _localizar(self, chave: int, criar: bool) -> Optional[int]:
+        """
+        Procura a posição da chave (com o lock já obtido).
+
+        Args:
+            chave: Hash do identificador
+            criar: Se True e a chave não existir, retorna uma posição livre
+
+        Returns:
+            Posição na tabela, ou None se não encontrada (ou tabela cheia)
+        """
+        removida = None
+        inicio = chave % self.capacidade
+        for i in range(self.capacidade):
+            posicao = (inicio + i) % self.capacidade
+            existente = self._chave(posicao)
+            if existente == chave:
+                return posicao
+            if existente == self.LIVRE:
+                if not criar:
+                    return None
+                return removida if removida is not None else posicao
+            if existente == self.REMOVIDA and removida is None:
+                removida = posicao
+        return removida if criar else None
+
+    def _chave(self, posicao: int) -> int:
+        return struct.unpack_from("<Q", self._mapa, self._deslocamento(posicao))[0]
+
+    def _ler(self, posicao: int) -> RegistroJanela:
+        _, indice, atual, anterior = struct.unpack_from(
+            self.FORMATO_POSICAO, self._mapa, self._deslocamento(posicao)
+        )
+        return indice, atual, anterior
+
+    def _gravar(self, posicao: int, chave: int, indice: int, atual: int, anterior: int) -> None:
+        struct.pack_into(
+            self.FORMATO_POSICAO, self._mapa, self._deslocamento(posicao),
+            chave, indice, atual, anterior,
+        )
+
+    def registrar(
+        self, identificador: str, indice: int, peso: float, max_tentativas: int
+    ) -> tuple[bool, float]:
+        chave = self._hash(identificador)
+        with self:
+            posicao = self._localizar(chave, criar=True)
+            if posicao is None:
+                self._varrer(indice)
+                posicao = self._localizar(chave, criar=True)
+                if posicao is None:
+                    logger.warning(
+                        f"[RateLimit] Tabela mmap cheia [{self.limiter}]; "
+                        f"aumente RATE_LIMIT_MMAP_CAPACIDADE"
+                    )
+                    return True, 0.0
+
+            registro = self._ler(posicao) if self._chave(posicao) == chave else None
+            atual, anterior = avancar_registro(registro, indice)
+            estimativa = anterior * peso + atual
+            if estimativa >= max_tentativas:
+                return False, estimativa
+            self._gravar(posicao, chave, indice, atual + 1, anterior)
+            return True, estimativa
+
+    def obter(self, identificador: str) -> Optional[RegistroJanela]:
+        with self:
+            posicao = self._localizar(self._hash(identificador), criar=False)
+            return self._ler(posicao) if posicao is not None else None
+
+    def remover(self, identificador: str) -> None:
+        with self:
+            posicao = self._localizar(self._hash(identificador), criar=False)
+            if posicao is not None:
+                self._gravar(posicao, self.REMOVIDA, 0, 0, 0)
+
+    def limpar(self) -> None:
+        with self:
+            self._mapa[self.TAMANHO_CABECALHO:] = bytes(len(self._mapa) - self.TAMANHO_CABECALHO)
+
+    def _vivos(self) -> list[tuple[int, RegistroJanela]]:
+        vivos = []
+        for posicao in range(self.capacidade):
+            chave = self._chave(posicao)
+            if chave > self.REMOVIDA:
+                vivos.append((chave, self._ler(posicao)))
+        return vivos
+
+    def _varrer(self, indice_atual: int) -> int:
+        """Reconstrói a tabela só com os registros ativos (com o lock já obtido)."""
+        vivos = self._vivos()
+        ativos = [
+            (chave, registro)
+            for chave, registro in vivos
+            if indice_atual - 1 <= registro[0] <= indice_atual
+        ]
+        # Reinserir do zero também descarta as posições REMOVIDA
+        self._mapa[self.TAMANHO_CABECALHO:] = bytes(len(self._mapa) - self.TAMANHO_CABECALHO)
+        for chave, registro in ativos:
+            self._gravar(self._localizar(chave, criar=True), chave, *registro)
+        return len(vivos) - len(ativos)
+
+    def varrer(self, indice_atual: int) -> int:
+        with self:
+            return self._varrer(indice_atual)
+
+    def contar(self) -> int:
+        with self:
+            return len(self._vivos())
+
+    def fechar(self) -> None:
+        if not self._mapa.closed:
+            self._mapa.close()
+            os.close(self._fd)
+
+
+ARMAZENAMENTOS = {
+    ArmazenamentoMemoria.nome: ArmazenamentoMemoria,
+    ArmazenamentoSQLite.nome: ArmazenamentoSQLite,
+    ArmazenamentoMmap.nome: ArmazenamentoMmap,
+}
+
+
+def criar_armazenamento(
+    limiter: str, nome: str = RATE_LIMIT_ARMAZENAMENTO
+) -> ArmazenamentoLimiter:
+    """
+    Cria o armazenamento de contagens de um limiter.
+
+    Args:
+        limiter: Nome do limiter dono dos registros
+        nome: Nome do armazenamento (ver ARMAZENAMENTOS)
+
+    Returns:
+        Instância do armazenamento
+
+    Raises:
+        ValueError: Se o nome não corresponder a um armazenamento conhecido
+    """
+    classe = ARMAZENAMENTOS.get(nome.lower())
+    if classe is None:
+        raise ValueError(
+            f"RATE_LIMIT_ARMAZENAMENTO inválido: '{nome}'. "
+            f"Opções: {', '.join(ARMAZENAMENTOS)}"
+        )
+    return classe(limiter)
@@ -6,15 +6,44 @@ rotas contra abuso, brute force e DDoS.
 
 Oferece duas classes:
     - RateLimiter: Rate limiter estático (valores fixos na inicialização)
-    - DynamicRateLimiter: Rate limiter dinâmico (lê valores do config_cache)
+    - DynamicRateLimiter: Rate limiter dinâmico (lê valores do config_cache
+      quando a geração das configurações muda)
+
+Ambas aceitam dois algoritmos (parâmetro algoritmo):
+    - "registro": guarda o instante de cada tentativa (contagem exata,
+      memória proporcional ao limite)
+    - "janela_deslizante": guarda um registro compacto por identificador
+      (início da janela fixa atual, contagem atual e contagem anterior) e
+      estima a janela deslizante ponderando a contagem anterior; indicado
+      para limiters de alto volume, como o das páginas públicas
+
+Os registros da janela deslizante ficam em um armazenamento (parâmetro
+armazenamento, padrão RATE_LIMIT_ARMAZENAMENTO): em memória ou em arquivos
+compartilhados pelos workers (ver util/rate_limit_armazenamento.py).
+
+Identificadores sem tentativas na janela são removidos periodicamente.
 """
 
+import math
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Optional
+from time import monotonic
+from typing import Optional, Union
 from util.logger_config import logger
+from util.config import RATE_LIMIT_ARMAZENAMENTO
 from util.config_cache import config
 from util.datetime_util import agora as obter_agora
+from util.rate_limit_armazenamento import (
+    ArmazenamentoLimiter,
+    ArmazenamentoMemoria,
+    RegistroJanela,
+    avancar_registro,
+    criar_armazenamento,
+)
+
+ALGORITMO_REGISTRO = "registro"
+ALGORITMO_JANELA_DESLIZANTE = "janela_deslizante"
+ALGORITMOS = (ALGORITMO_REGISTRO, ALGORITMO_JANELA_DESLIZANTE)
 
 
 class RateLimiter:
@@ -27,7 +56,10 @@ class RateLimiter:
     Attributes:
         max_tentativas: Número máximo de tentativas permitidas
         janela: Timedelta representando janela de tempo
-        tentativas: Dict de identificador -> lista de timestamps
+        algoritmo: "registro" ou "janela_deslizante" (ver docstring do módulo)
+        tentativas: Dict de identificador -> lista de timestamps (apenas
+                    no algoritmo "registro")
+        armazenamento: Registros da janela deslizante (None no "registro")
     """
 
     def __init__(
@@ -35,6 +67,9 @@ class RateLimiter:
         max_tentativas: int = 5,
         janela_minutos: int = 5,
         nome: str = "default",
+        algoritmo: Optional[str] = None,
+        intervalo_varredura_segundos: Optional[float] = None,
+        armazenamento: Union[str, ArmazenamentoLimiter, None] = None,
     ):
         """
         Inicializa rate limiter.
@@ -43,17 +78,137 @@ class RateLimiter:
             max_tentativas: Número máximo de tentativas na janela
             janela_minutos: Tamanho da janela em minutos
             nome: Nome descritivo do limiter (para logs)
+            algoritmo: Algoritmo de contagem (ver ALGORITMOS); se omitido,
+                "registro" com armazenamento em memória e "janela_deslizante"
+                com armazenamento compartilhado
+            intervalo_varredura_segundos: Intervalo entre remoções de
+                identificadores ociosos (padrão: tamanho da janela)
+            armazenamento: Nome do armazenamento (ver ARMAZENAMENTOS) ou
+                instância já criada; padrão RATE_LIMIT_ARMAZENAMENTO
         """
         if max_tentativas <= 0:
             raise ValueError("max_tentativas deve ser positivo")
         if janela_minutos <= 0:
             raise ValueError("janela_minutos deve ser positivo")
 
+        if armazenamento is None:
+            armazenamento = RATE_LIMIT_ARMAZENAMENTO
+        nome_armazenamento = (
+            armazenamento.lower() if isinstance(armazenamento, str) else armazenamento.nome
+        )
+        compartilhado = nome_armazenamento != ArmazenamentoMemoria.nome
+        if algoritmo is None:
+            algoritmo = ALGORITMO_JANELA_DESLIZANTE if compartilhado else ALGORITMO_REGISTRO
+        if algoritmo not in ALGORITMOS:
+            raise ValueError(
+                f"algoritmo deve ser um de: {', '.join(ALGORITMOS)}"
+            )
+        if algoritmo == ALGORITMO_REGISTRO and compartilhado:
+            raise ValueError(
+                f"algoritmo '{ALGORITMO_REGISTRO}' só é suportado com armazenamento em memória"
+            )
+
         self.max_tentativas = max_tentativas
         self.janela = timedelta(minutes=janela_minutos)
         self.janela_minutos = janela_minutos
         self.nome = nome
+        self.algoritmo = algoritmo
+        self.intervalo_varredura_segundos = intervalo_varredura_segundos
+        self._proxima_varredura = monotonic() + self._obter_intervalo_varredura()
         self.tentativas: defaultdict[str, list[datetime]] = defaultdict(list)
+        self.armazenamento: Optional[ArmazenamentoLimiter] = None
+        if algoritmo == ALGORITMO_JANELA_DESLIZANTE:
+            self.armazenamento = (
+                criar_armazenamento(nome, armazenamento)
+                if isinstance(armazenamento, str)
+                else armazenamento
+            )
+
+    def _obter_intervalo_varredura(self) -> float:
+        """Retorna o intervalo entre varreduras (a janela pode mudar no dinâmico)."""
+        if self.intervalo_varredura_segundos is not None:
+            return self.intervalo_varredura_segundos
+        return self.janela.total_seconds()
+
+    def _varrer_se_necessario(self) -> None:
+        """Executa a varredura de identificadores ociosos quando chega a hora."""
+        instante = monotonic()
+        if instante >= self._proxima_varredura:
+            self._proxima_varredura = instante + self._obter_intervalo_varredura()
+            self.varrer()
+
+    def varrer(self) -> int:
+        """
+        Remove identificadores sem tentativas dentro da janela.
+
+        Chamado automaticamente por verificar() a cada intervalo de varredura,
+        mantendo a memória proporcional aos clientes ativos.
+
+        Returns:
+            Quantidade de identificadores removidos
+        """
+        if self.algoritmo == ALGORITMO_REGISTRO:
+            limite = obter_agora() - self.janela
+            ociosos = [
+                identificador
+                for identificador, instantes in self.tentativas.items()
+                if not instantes or instantes[-1] <= limite
+            ]
+            for identificador in ociosos:
+                del self.tentativas[identificador]
+            removidos = len(ociosos)
+        else:
+            indice_atual, _ = self._janela_atual(monotonic())
+            removidos = self.armazenamento.varrer(indice_atual)
+
+        if removidos:
+            logger.debug(
+                f"Rate limiter [{self.nome}] removeu {removidos} identificador(es) ocioso(s)"
+            )
+        return removidos
+
+    def contar_identificadores(self) -> int:
+        """
+        Retorna quantos identificadores têm tentativas registradas.
+
+        Returns:
+            Quantidade de identificadores
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.contar()
+        return len(self.tentativas)
+
+    def _janela_atual(self, instante: float) -> tuple[int, float]:
+        """
+        Calcula a janela fixa atual do algoritmo janela_deslizante.
+
+        Args:
+            instante: Instante atual (time.monotonic)
+
+        Returns:
+            Tupla (índice da janela, peso da janela anterior = fração dela
+            ainda coberta pela janela deslizante)
+        """
+        posicao = instante / self.janela.total_seconds()
+        indice = int(posicao)
+        return indice, 1 - (posicao - indice)
+
+    def _obter_registro_janela(
+        self, identificador: str, instante: float
+    ) -> tuple[RegistroJanela, float]:
+        """
+        Obtém o registro do identificador avançado até a janela atual.
+
+        Args:
+            identificador: Identificador único
+            instante: Instante atual (time.monotonic)
+
+        Returns:
+            Tupla (registro, estimativa de tentativas na janela deslizante)
+        """
+        indice, peso = self._janela_atual(instante)
+        atual, anterior = avancar_registro(self.armazenamento.obter(identificador), indice)
+        return (indice, atual, anterior), anterior * peso + atual
 
     def verificar(self, identificador: str) -> bool:
         """
@@ -69,6 +224,11 @@ class RateLimiter:
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
+        self._varrer_se_necessario()
+
+        if self.algoritmo == ALGORITMO_JANELA_DESLIZANTE:
+            return self._verificar_janela(identificador)
+
         momento_atual = obter_agora()
 
         # Limpar tentativas antigas (fora da janela)
@@ -89,6 +249,21 @@ class RateLimiter:
         self.tentativas[identificador].append(momento_atual)
         return True
 
+    def _verificar_janela(self, identificador: str) -> bool:
+        """verificar() do algoritmo janela_deslizante: O(1) por chamada."""
+        indice, peso = self._janela_atual(monotonic())
+        permitido, estimativa = self.armazenamento.registrar(
+            identificador, indice, peso, self.max_tentativas
+        )
+
+        if not permitido:
+            logger.warning(
+                f"Rate limit excedido [{self.nome}] - "
+                f"Identificador: {identificador}, "
+                f"Tentativas: {estimativa:.1f}/{self.max_tentativas}"
+            )
+        return permitido
+
     def limpar(self, identificador: Optional[str] = None) -> None:
         """
         Limpa tentativas registradas.
@@ -97,6 +272,14 @@ class RateLimiter:
             identificador: Se fornecido, limpa apenas este identificador.
                           Se None, limpa todos (útil para testes).
         """
+        if self.armazenamento is not None:
+            if identificador:
+                self.armazenamento.remover(identificador)
+            else:
+                self.armazenamento.limpar()
+            logger.debug(f"Limpo rate limit [{self.nome}]: {identificador or 'todos'}")
+            return
+
         if identificador:
             if identificador in self.tentativas:
                 del self.tentativas[identificador]
@@ -115,6 +298,14 @@ class RateLimiter:
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
+        if self.armazenamento is not None:
+            _, estimativa = self._obter_registro_janela(identificador, monotonic())
+            return max(0, math.floor(self.max_tentativas - estimativa))
+
+        # Consultas não criam registro para identificadores desconhecidos
+        if identificador not in self.tentativas:
+            return self.max_tentativas
+
         momento_atual = obter_agora()
 
         # Limpar tentativas antigas
@@ -135,6 +326,9 @@ class RateLimiter:
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
+        if self.armazenamento is not None:
+            return self._obter_tempo_reset_janela(identificador)
+
         if identificador not in self.tentativas or not self.tentativas[identificador]:
             return None
 
@@ -154,22 +348,47 @@ class RateLimiter:
 
         return None
 
+    def _obter_tempo_reset_janela(self, identificador: str) -> Optional[timedelta]:
+        """obter_tempo_reset() do algoritmo janela_deslizante."""
+        instante = monotonic()
+        (indice, atual, anterior), estimativa = self._obter_registro_janela(
+            identificador, instante
+        )
+        if estimativa < self.max_tentativas:
+            return None
+
+        janela_segundos = self.janela.total_seconds()
+        inicio = indice * janela_segundos
+        if atual >= self.max_tentativas:
+            # Só libera na próxima janela, quando o peso de "atual" decair
+            liberacao = inicio + janela_segundos * (2 - self.max_tentativas / atual)
+        else:
+            # Libera quando o peso da janela anterior cair o suficiente
+            liberacao = inicio + janela_segundos * (
+                1 - (self.max_tentativas - atual) / anterior
+            )
+        segundos = liberacao - instante
+        return timedelta(seconds=segundos) if segundos > 0 else None
+
     def __repr__(self) -> str:
         """Representação string do limiter."""
         return (
             f"RateLimiter(nome='{self.nome}', "
             f"max_tentativas={self.max_tentativas}, "
-            f"janela_minutos={self.janela_minutos})"
+            f"janela_minutos={self.janela_minutos}, "
+            f"algoritmo='{self.algoritmo}')"
         )
 
 
 class DynamicRateLimiter(RateLimiter):
     """
-    Rate limiter dinâmico que busca valores do config_cache a cada verificação.
+    Rate limiter dinâmico que acompanha os valores do config_cache.
 
     Permite alteração de rate limits sem reiniciar o servidor. Os valores
     max_tentativas e janela_minutos são lidos do cache de configuração
-    usando as chaves fornecidas.
+    usando as chaves fornecidas, e relidos somente quando a geração das
+    configurações muda (ver ConfigCache.obter_geracao): no caminho normal
+    a verificação não toca no lock do cache.
 
     Attributes:
         chave_max: Chave de configuração para max_tentativas
@@ -185,6 +404,9 @@ class DynamicRateLimiter(RateLimiter):
         padrao_max: int = 5,
         padrao_minutos: int = 5,
         nome: str = "dynamic",
+        algoritmo: Optional[str] = None,
+        intervalo_varredura_segundos: Optional[float] = None,
+        armazenamento: Union[str, ArmazenamentoLimiter, None] = None,
     ):
         """
         Inicializa rate limiter dinâmico.
@@ -195,6 +417,10 @@ class DynamicRateLimiter(RateLimiter):
             padrao_max: Valor padrão para max_tentativas
             padrao_minutos: Valor padrão para janela_minutos
             nome: Nome descritivo do limiter (para logs)
+            algoritmo: Algoritmo de contagem (ver RateLimiter)
+            intervalo_varredura_segundos: Intervalo entre remoções de
+                identificadores ociosos (padrão: tamanho da janela)
+            armazenamento: Armazenamento das contagens (ver RateLimiter)
         """
         # Validar valores padrão
         if padrao_max <= 0:
@@ -207,21 +433,29 @@ class DynamicRateLimiter(RateLimiter):
         self.padrao_max = padrao_max
         self.padrao_minutos = padrao_minutos
 
-        # Inicializar com valores atuais do config
+        # Inicializar com valores atuais do config (geração lida antes dos
+        # valores: uma limpeza no meio do caminho força nova leitura)
+        self._geracao_config = config.obter_geracao()
         max_tentativas = config.obter_int(chave_max, padrao_max)
         janela_minutos = config.obter_int(chave_minutos, padrao_minutos)
 
         super().__init__(
-            max_tentativas=max_tentativas, janela_minutos=janela_minutos, nome=nome
+            max_tentativas=max_tentativas,
+            janela_minutos=janela_minutos,
+            nome=nome,
+            algoritmo=algoritmo,
+            intervalo_varredura_segundos=intervalo_varredura_segundos,
+            armazenamento=armazenamento,
         )
 
     def _atualizar_valores(self) -> None:
         """
         Atualiza valores de max_tentativas e janela_minutos do config_cache.
 
-        Chamado internamente antes de cada verificação para garantir
-        que está usando os valores mais recentes.
+        Chamado por _sincronizar_config quando a geração das configurações
+        muda; registra a geração correspondente aos valores lidos.
         """
+        self._geracao_config = config.obter_geracao()
         max_tentativas = config.obter_int(self.chave_max, self.padrao_max)
         janela_minutos = config.obter_int(self.chave_minutos, self.padrao_minutos)
 
@@ -241,12 +475,22 @@ class DynamicRateLimiter(RateLimiter):
             self.janela_minutos = janela_minutos
             self.janela = timedelta(minutes=janela_minutos)
 
+    def _sincronizar_config(self) -> None:
+        """
+        Relê os valores do config_cache se a geração das configurações mudou.
+
+        Caminho normal (geração inalterada): uma comparação de inteiros,
+        sem lock e sem acesso ao cache.
+        """
+        if config.obter_geracao() != self._geracao_config:
+            self._atualizar_valores()
+
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite (com valores atualizados).
 
-        Atualiza valores do config_cache antes de verificar, garantindo
-        que mudanças em configurações sejam aplicadas imediatamente.
+        Relê os valores do config_cache se as configurações mudaram,
+        garantindo que alterações sejam aplicadas na próxima verificação.
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -255,8 +499,8 @@ class DynamicRateLimiter(RateLimiter):
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        # Atualizar valores antes de verificar
-        self._atualizar_valores()
+        # Atualizar valores antes de verificar (apenas se mudaram)
+        self._sincronizar_config()
 
         # Usar lógica da classe pai
         return super().verificar(identificador)
@@ -271,7 +515,7 @@ class DynamicRateLimiter(RateLimiter):
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        self._atualizar_valores()
+        self._sincronizar_config()
         return super().obter_tentativas_restantes(identificador)
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
@@ -284,7 +528,7 @@ class DynamicRateLimiter(RateLimiter):
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
-        self._atualizar_valores()
+        self._sincronizar_config()
         return super().obter_tempo_reset(identificador)
 
     def __repr__(self) -> str:
@@ -294,7 +538,8 @@ class DynamicRateLimiter(RateLimiter):
             f"chave_max='{self.chave_max}', "
             f"chave_minutos='{self.chave_minutos}', "
             f"max_tentativas={self.max_tentativas}, "
-            f"janela_minutos={self.janela_minutos})"
+            f"janela_minutos={self.janela_minutos}, "
+            f"algoritmo='{self.algoritmo}')"
         )
 
 
@@ -376,7 +621,13 @@ class RegistroLimiters:
             stats["limiters"][nome] = {
                 "max_tentativas": limiter.max_tentativas,
                 "janela_minutos": limiter.janela_minutos,
-                "identificadores_ativos": len(limiter.tentativas),
+                "identificadores_ativos": limiter.contar_identificadores(),
+                "algoritmo": limiter.algoritmo,
+                "armazenamento": (
+                    limiter.armazenamento.nome
+                    if limiter.armazenamento is not None
+                    else ArmazenamentoMemoria.nome
+                ),
                 "tipo": (
                     "dinamico"
                     if isinstance(limiter, DynamicRateLimiter)
@@ -0,0 +1,103 @@
+"""
+Camada de execução dos repositórios para rotas assíncronas.
+
+As funções de repo/*.py usam sqlite3 de forma síncrona. Chamadas direto de
+uma rota `async def`, bloqueiam o event loop do worker durante toda a
+consulta: streams SSE e demais requisições ficam parados até ela terminar.
+
+executar_repo() roda a função em um pool de threads dedicado e limitado
+(REPO_EXECUTOR_THREADS), separado do executor padrão do asyncio, e devolve
+o resultado ao event loop:
+
+    anuncio = await executar_repo(anuncio_repo.obter_por_id, id)
+
+A função é resolvida no momento da chamada (anuncio_repo.obter_por_id), de
+modo que patches de teste nos módulos de repositório continuam valendo.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from util.config import REPO_EXECUTOR_THREADS
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def obter_executor() -> ThreadPoolExecutor:
+    """
+    Retorna o pool de threads dos repositórios, criando-o se necessário.
+
+    Returns:
+        ThreadPoolExecutor com até REPO_EXECUTOR_THREADS threads
+    """
+    global _executor
+
+    executor = _executor
+    if executor is not None:
+        return executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=REPO_EXECUTOR_THREADS, thread_name_prefix="repo"
+            )
+        return _executor
+
+
+async def executar_repo(funcao: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função de repositório no pool de threads sem bloquear o event loop.
+
+    Variáveis de contexto (contextvars) da requisição são propagadas para a
+    thread. Exceções da função são relançadas no chamador.
+
+    Args:
+        funcao: Função síncrona de repositório
+        *args: Argumentos posicionais da função
+        **kwargs: Argumentos nomeados da função
+
+    Returns:
+        Retorno da função
+    """
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    return await loop.run_in_executor(
+        obter_executor(), partial(contexto.run, funcao, *args, **kwargs)
+    )
+
+
+def obter_estatisticas_executor() -> dict:
+    """
+    Retorna estatísticas do pool de threads dos repositórios.
+
+    Returns:
+        Dicionário com limite de threads, threads criadas e chamadas na fila
+    """
+    executor = _executor
+    return {
+        "threads_max": REPO_EXECUTOR_THREADS,
+        "threads": len(executor._threads) if executor else 0,
+        "pendentes": executor._work_queue.qsize() if executor else 0,
+    }
+
+
+def encerrar_executor() -> None:
+    """
+    Encerra o pool de threads aguardando as chamadas em andamento.
+
+    Chamado no shutdown da aplicação; um novo pool é criado sob demanda
+    se executar_repo() for usado depois.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
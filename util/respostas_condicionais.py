@@ -0,0 +1,118 @@
+"""
+Respostas condicionais (ETag / If-None-Match) para páginas HTML.
+
+A rota informa um validador barato - por exemplo a versão das linhas
+envolvidas, mantida por triggers (anuncio_repo.obter_versao) - e o ETag é
+o hash desse validador com tudo o mais que muda o HTML:
+
+- versão dos templates e do manifesto de assets (deploy, troca de tema)
+- URL (caminho + query)
+- usuário logado e token CSRF da sessão (navbar e formulários)
+
+Se o navegador (ou crawler) já tem a página com esse ETag, a resposta é
+304 sem corpo, antes de qualquer consulta pesada ou renderização:
+
+    validador = await obter_validador_da_pagina(id)
+    return await responder_condicional(
+        request, validador, lambda: renderizar_pagina(request)
+    )
+
+Sem ETag (renderização normal): sessão com flash messages pendentes ou
+validador None (ex.: página de erro que adiciona uma flash message).
+"""
+
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request
+from starlette.responses import Response
+
+from util.assets import manifesto_assets
+from util.csrf_protection import CSRF_SESSION_KEY
+from util.template_util import obter_versao_templates
+
+# A página depende da sessão: só o navegador pode reaproveitá-la, sempre revalidando
+CACHE_CONTROL_CONDICIONAL = "private, no-cache"
+
+
+def gerar_etag(request: Request, validador: Any) -> str:
+    """
+    Gera o ETag da página.
+
+    Args:
+        request: Request da página
+        validador: Valor serializável em JSON que muda quando os dados mudam
+
+    Returns:
+        ETag fraco (W/"..."): o HTML é equivalente, não idêntico byte a byte
+        após uma eventual compressão
+    """
+    partes = [
+        validador,
+        obter_versao_templates(),
+        manifesto_assets.obter_versao(),
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        request.session.get("usuario_logado"),
+        request.session.get(CSRF_SESSION_KEY),
+    ]
+    serializado = json.dumps(partes, sort_keys=True, default=str).encode()
+    return f'W/"{hashlib.sha256(serializado).hexdigest()[:32]}"'
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica se o cabeçalho If-None-Match contém o ETag (comparação fraca).
+
+    Args:
+        if_none_match: Valor do cabeçalho (lista separada por vírgulas ou "*")
+        etag: ETag atual da página
+
+    Returns:
+        True se a cópia do cliente ainda é válida
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    atual = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == atual
+        for candidato in if_none_match.split(",")
+    )
+
+
+async def responder_condicional(
+    request: Request,
+    validador: Any,
+    renderizar: Callable[[], Awaitable[Response]],
+) -> Response:
+    """
+    Responde 304 se a cópia do cliente ainda vale; senão renderiza com ETag.
+
+    O validador deve ser obtido antes de renderizar: se os dados mudarem no
+    meio, o cliente recebe um ETag mais antigo que a página e apenas
+    renderiza de novo na próxima visita.
+
+    Args:
+        request: Request da página
+        validador: Valor serializável em JSON que muda quando os dados da
+            página mudam (None para responder sem ETag)
+        renderizar: Função assíncrona que monta a resposta completa
+
+    Returns:
+        Response 304 (sem corpo) ou a resposta renderizada com ETag
+    """
+    if validador is None or request.session.get("mensagens"):
+        return await renderizar()
+
+    etag = gerar_etag(request, validador)
+    cabecalhos = {"ETag": etag, "Cache-Control": CACHE_CONTROL_CONDICIONAL}
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabecalhos)
+
+    response = await renderizar()
+    if response.status_code == 200:
+        response.headers.update(cabecalhos)
+    return response
@@ -1,9 +1,25 @@
 from passlib.context import CryptContext
+import asyncio
 import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from util.config import SENHA_BCRYPT_ROUNDS, SENHA_HASH_PROCESSOS, SENHA_HASH_FILA_MAX
 from util.datetime_util import agora
+from util.logger_config import logger
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds: hashes com custo abaixo do configurado precisam ser refeitos
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=SENHA_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=SENHA_BCRYPT_ROUNDS,
+)
 
 
 def criar_hash_senha(senha: str) -> str:
@@ -16,6 +32,189 @@ def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
     return pwd_context.verify(senha_plana, senha_hash)
 
 
+def verificar_e_atualizar_senha(senha_plana: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash usa parâmetros antigos, gera um novo.
+
+    Args:
+        senha_plana: Senha digitada
+        senha_hash: Hash armazenado
+
+    Returns:
+        Tupla (senha_valida, novo_hash ou None se o hash está atualizado)
+    """
+    return pwd_context.verify_and_update(senha_plana, senha_hash)
+
+
+class MetricasSenha:
+    """
+    Latência das operações de senha executadas no pool de processos.
+
+    A latência inclui a espera na fila, que é o que a requisição percebe.
+    Percentis calculados sobre as últimas `amostras` operações de cada tipo.
+    """
+
+    OPERACOES = ("hash", "verificacao")
+
+    def __init__(self, amostras: int = 1000):
+        self._lock = threading.Lock()
+        self._latencias = {op: deque(maxlen=amostras) for op in self.OPERACOES}
+        self._total = {op: 0 for op in self.OPERACOES}
+        self.pendentes = 0
+        self.rejeitadas = 0
+        self.rehashes = 0
+
+    def reservar(self, limite: int) -> bool:
+        """Ocupa uma vaga no pool/fila; False se todas estão ocupadas."""
+        with self._lock:
+            if self.pendentes >= limite:
+                self.rejeitadas += 1
+                return False
+            self.pendentes += 1
+            return True
+
+    def liberar(self, operacao: str, segundos: float) -> None:
+        """Libera a vaga e registra a latência da operação."""
+        with self._lock:
+            self.pendentes -= 1
+            self._latencias[operacao].append(segundos)
+            self._total[operacao] += 1
+
+    def registrar_rehash(self) -> None:
+        with self._lock:
+            self.rehashes += 1
+
+    def obter(self) -> dict:
+        """
+        Retorna as métricas atuais.
+
+        Returns:
+            Dicionário com pendentes, rejeitadas, rehashes e, por operação,
+            total, media_ms, p50_ms, p95_ms e max_ms
+        """
+        with self._lock:
+            resultado = {
+                "pendentes": self.pendentes,
+                "rejeitadas": self.rejeitadas,
+                "rehashes": self.rehashes,
+            }
+            for op in self.OPERACOES:
+                amostras = sorted(self._latencias[op])
+                estatisticas = {"total": self._total[op]}
+                if amostras:
+                    estatisticas.update(
+                        media_ms=round(sum(amostras) / len(amostras) * 1000, 2),
+                        p50_ms=round(amostras[len(amostras) // 2] * 1000, 2),
+                        p95_ms=round(amostras[int(len(amostras) * 0.95)] * 1000, 2),
+                        max_ms=round(amostras[-1] * 1000, 2),
+                    )
+                resultado[op] = estatisticas
+            return resultado
+
+
+metricas_senha = MetricasSenha()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de senhas, criando-o se necessário."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=SENHA_HASH_PROCESSOS)
+        return _pool
+
+
+def _descartar_pool(quebrado: ProcessPoolExecutor) -> None:
+    """
+    Descarta um pool quebrado (processo filho encerrado, ex.: OOM killer).
+
+    Só limpa a referência global se ela ainda aponta para o pool quebrado:
+    outra requisição pode já ter criado o substituto.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is quebrado:
+            _pool = None
+    quebrado.shutdown(wait=False)
+
+
+async def _executar_no_pool(operacao: str, funcao, *args):
+    """
+    Executa uma função de senha no pool de processos.
+
+    A fila é limitada a SENHA_HASH_PROCESSOS + SENHA_HASH_FILA_MAX operações;
+    acima disso a requisição falha rapidamente com 503 em vez de acumular
+    espera (ex.: rajada de logins).
+
+    Se um processo do pool morreu, o pool inteiro fica quebrado
+    (BrokenProcessPool): ele é recriado e a operação é repetida uma vez.
+
+    Raises:
+        HTTPException: 503 se a fila estiver cheia
+    """
+    if not metricas_senha.reservar(SENHA_HASH_PROCESSOS + SENHA_HASH_FILA_MAX):
+        logger.warning(f"Fila de operações de senha cheia; {operacao} rejeitado")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+        )
+
+    inicio = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        pool = _obter_pool()
+        try:
+            return await loop.run_in_executor(pool, funcao, *args)
+        except BrokenProcessPool:
+            logger.error(f"Pool de processos de senhas quebrado; recriando para {operacao}")
+            _descartar_pool(pool)
+            return await loop.run_in_executor(_obter_pool(), funcao, *args)
+    finally:
+        metricas_senha.liberar(operacao, time.perf_counter() - inicio)
+
+
+async def criar_hash_senha_async(senha: str) -> str:
+    """Cria hash da senha em um processo do pool, sem bloquear o event loop"""
+    return await _executar_no_pool("hash", criar_hash_senha, senha)
+
+
+async def verificar_senha_async(senha_plana: str, senha_hash: str) -> bool:
+    """Verifica a senha em um processo do pool, sem bloquear o event loop"""
+    return await _executar_no_pool("verificacao", verificar_senha, senha_plana, senha_hash)
+
+
+async def verificar_e_atualizar_senha_async(
+    senha_plana: str, senha_hash: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Versão assíncrona de verificar_e_atualizar_senha (usada no login).
+
+    Returns:
+        Tupla (senha_valida, novo_hash ou None)
+    """
+    valida, novo_hash = await _executar_no_pool(
+        "verificacao", verificar_e_atualizar_senha, senha_plana, senha_hash
+    )
+    if novo_hash:
+        metricas_senha.registrar_rehash()
+    return valida, novo_hash
+
+
+def encerrar_pool_senhas() -> None:
+    """Encerra o pool de processos de senhas (shutdown da aplicação)."""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
 def gerar_token_redefinicao() -> str:
     """Gera token seguro para redefinição de senha"""
     return secrets.token_urlsafe(32)
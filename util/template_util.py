@@ -5,16 +5,32 @@ Fornece filtros customizados, funções globais e configuração
 do ambiente Jinja2 para a aplicação FastAPI.
 """
 
+import hashlib
+import os
+import threading
 from typing import Union, Optional
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateError
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 
 from util.flash_messages import obter_mensagens
-from util.config import APP_NAME, VERSION, TOAST_AUTO_HIDE_DELAY_MS
+from util.config import (
+    APP_NAME,
+    VERSION,
+    TOAST_AUTO_HIDE_DELAY_MS,
+    TEMPLATES_AUTO_RELOAD,
+    TEMPLATES_CACHE_DIR,
+)
 from util.csrf_protection import obter_token_csrf, CSRF_FORM_FIELD
 from util.config_cache import config
+from util.assets import asset
+from util.logger_config import logger
+
+# Diretório raiz dos templates (base.html, componentes e subpastas)
+PASTA_TEMPLATES = "templates"
+# Templates compilados mantidos em memória (acima da quantidade em templates/)
+TEMPLATES_CACHE_TAMANHO = 1000
 
 
 def formatar_data_br(
@@ -157,6 +173,23 @@ def foto_anuncio(id: int) -> str:
     return obter_caminho_foto_anuncio(id)
 
 
+def foto_anuncio_srcset(id: int, extensao: str = "jpg") -> str:
+    """
+    Retorna o srcset das variantes da foto do anúncio para uso em templates.
+
+    Uso: components/imagem_anuncio.html (elemento <picture> com WebP e JPEG).
+
+    Args:
+        id: ID do anúncio
+        extensao: "jpg" ou "webp"
+
+    Returns:
+        String srcset ou vazia se as variantes não existirem
+    """
+    from util.foto_anuncio_util import obter_srcset_foto_anuncio
+    return obter_srcset_foto_anuncio(id, extensao)
+
+
 def csrf_input(request: Optional[Request] = None) -> str:
     """
     Gera input HTML hidden com token CSRF.
@@ -175,24 +208,56 @@ def csrf_input(request: Optional[Request] = None) -> str:
     return f'<input type="hidden" name="{CSRF_FORM_FIELD}" value="{token}">'
 
 
-def criar_templates() -> Jinja2Templates:
+class ConfigTemplate:
     """
-    Cria instância de Jinja2Templates com configurações customizadas.
+    Global de template com o valor atual de uma configuração inteira.
 
-    Configura o ambiente Jinja2 com:
-    - Funções globais (obter_mensagens, csrf_input)
-    - Variáveis globais (APP_NAME, VERSION)
-    - Filtros customizados (data_br, data_hora_br, foto_usuario)
+    O valor é lido do cache de configurações (banco → .env) a cada
+    renderização, e não congelado na criação do ambiente: alterações em
+    /admin/configuracoes valem sem reiniciar.
 
-    Returns:
-        Instância configurada de Jinja2Templates
+    Uso no template: {{ TOAST_AUTO_HIDE_DELAY_MS }}
+    """
 
-    Note:
-        Sempre usa o diretório raiz 'templates' para permitir
-        acesso a templates base e componentes compartilhados.
+    def __init__(self, chave: str, padrao: int):
+        self.chave = chave
+        self.padrao = padrao
+
+    def __int__(self) -> int:
+        return config.obter_int(self.chave, self.padrao)
+
+    def __str__(self) -> str:
+        return str(int(self))
+
+    def __repr__(self) -> str:
+        return f"ConfigTemplate({self.chave!r}, {self.padrao!r})"
+
+
+_templates: Optional[Jinja2Templates] = None
+_templates_lock = threading.Lock()
+_versao_templates: Optional[str] = None
+
+
+def _criar_ambiente() -> Environment:
     """
-    # Usar o diretório raiz 'templates' para permitir acesso a base.html e subpastas
-    env = Environment(loader=FileSystemLoader("templates"))
+    Cria o ambiente Jinja2 compartilhado por todas as rotas.
+
+    Returns:
+        Environment com loader, cache de bytecode, globais e filtros
+    """
+    bytecode_cache = None
+    if TEMPLATES_CACHE_DIR:
+        os.makedirs(TEMPLATES_CACHE_DIR, exist_ok=True)
+        # Compartilhado entre workers e reinícios; invalidado pelo checksum do fonte
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATES_CACHE_DIR)
+
+    env = Environment(
+        loader=FileSystemLoader(PASTA_TEMPLATES),
+        bytecode_cache=bytecode_cache,
+        # Sem recarga, o template em memória é usado sem stat() do arquivo
+        auto_reload=TEMPLATES_AUTO_RELOAD,
+        cache_size=TEMPLATES_CACHE_TAMANHO,
+    )
 
     # Adicionar função global para obter mensagens
     env.globals['obter_mensagens'] = obter_mensagens
@@ -201,8 +266,8 @@ def criar_templates() -> Jinja2Templates:
     env.globals['APP_NAME'] = APP_NAME
     env.globals['VERSION'] = VERSION
 
-    # Adicionar configuração dinâmica de toast delay (lê do banco → .env)
-    env.globals['TOAST_AUTO_HIDE_DELAY_MS'] = config.obter_int(
+    # Adicionar configuração dinâmica de toast delay (lê do banco → .env a cada uso)
+    env.globals['TOAST_AUTO_HIDE_DELAY_MS'] = ConfigTemplate(
         'toast_auto_hide_delay_ms',
         TOAST_AUTO_HIDE_DELAY_MS
     )
@@ -212,10 +277,15 @@ def criar_templates() -> Jinja2Templates:
     # Uso no template: {{ csrf_input(request) }}
     env.globals['csrf_input'] = csrf_input
 
+    # URLs com hash dos CSS/JS de static/ (cache imutável no navegador)
+    # Uso no template: {{ asset('css/custom.css') }}
+    env.globals['asset'] = asset
+
     # Adicionar filtros customizados
     env.filters['data_br'] = formatar_data_br
     env.filters['foto_usuario'] = foto_usuario
     env.filters['foto_anuncio'] = foto_anuncio
+    env.filters['foto_anuncio_srcset'] = foto_anuncio_srcset
 
     # Filtros de formatação de data/hora (em português)
     env.filters['formatar_data'] = formatar_data
@@ -223,5 +293,80 @@ def criar_templates() -> Jinja2Templates:
     env.filters['formatar_data_as_hora'] = formatar_data_as_hora
     env.filters['formatar_hora'] = formatar_hora
 
-    templates = Jinja2Templates(env=env)
-    return templates
+    return env
+
+
+def criar_templates() -> Jinja2Templates:
+    """
+    Retorna a instância de Jinja2Templates compartilhada pela aplicação.
+
+    Todas as rotas usam o mesmo ambiente Jinja2, criado na primeira chamada:
+    base.html e os componentes são compilados uma única vez por processo.
+    O ambiente é configurado com:
+    - Funções globais (obter_mensagens, csrf_input, asset)
+    - Variáveis globais (APP_NAME, VERSION, TOAST_AUTO_HIDE_DELAY_MS)
+    - Filtros customizados (data_br, data_hora_br, foto_usuario)
+    - Cache de bytecode em TEMPLATES_CACHE_DIR
+    - Recarga de templates alterados apenas com TEMPLATES_AUTO_RELOAD
+
+    Returns:
+        Instância configurada de Jinja2Templates
+
+    Note:
+        Sempre usa o diretório raiz 'templates' para permitir
+        acesso a templates base e componentes compartilhados.
+    """
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = Jinja2Templates(env=_criar_ambiente())
+    return _templates
+
+
+def precompilar_templates() -> int:
+    """
+    Compila todos os templates .html para o cache em memória (e de bytecode).
+
+    Chamada na inicialização (TEMPLATES_PRECOMPILAR): a primeira requisição
+    de cada página após o deploy não paga a compilação.
+
+    Returns:
+        Quantidade de templates compilados
+    """
+    env = criar_templates().env
+    compilados = 0
+    for nome in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(nome)
+            compilados += 1
+        except TemplateError as e:
+            # Template com erro não impede a inicialização; falha ao ser usado
+            logger.error(f"Erro ao compilar template {nome}: {e}")
+    return compilados
+
+
+def obter_versao_templates() -> str:
+    """
+    Retorna a versão dos templates (hash de nome, tamanho e mtime dos arquivos).
+
+    Usada no ETag das páginas HTML: um deploy que altera templates muda o
+    ETag de todas as páginas. Calculada uma vez por processo; com
+    TEMPLATES_AUTO_RELOAD é recalculada a cada chamada, acompanhando as
+    edições em desenvolvimento.
+
+    Returns:
+        Hash hexadecimal curto
+    """
+    global _versao_templates
+    if _versao_templates is not None and not TEMPLATES_AUTO_RELOAD:
+        return _versao_templates
+
+    digest = hashlib.sha256(VERSION.encode())
+    for raiz, pastas, arquivos in os.walk(PASTA_TEMPLATES):
+        pastas.sort()
+        for nome in sorted(arquivos):
+            info = os.stat(os.path.join(raiz, nome))
+            digest.update(f"{raiz}/{nome}:{info.st_size}:{info.st_mtime_ns};".encode())
+    _versao_templates = digest.hexdigest()[:16]
+    return _versao_templates